@@ -0,0 +1 @@
+print('Old V1')
\ No newline at end of file
@@ -165,3 +165,5 @@ class TailRiskContributions(BaseModel):
     portfolio_cvar: float
     contributions: List[TailRiskContribution]
     method: str
+    n_scenarios: Optional[int] = None
+    scenario_seed: Optional[int] = None  # Replays Monte Carlo scenarios
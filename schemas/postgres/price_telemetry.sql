@@ -0,0 +1,21 @@
+-- Price Telemetry Hypertable
+-- Purpose: High-frequency ticks written by PriceTelemetryService / FX stream consumer.
+-- Column types must match services/tick_sink.py, which loads rows with binary COPY
+-- (timestamptz, text, float8, float8, text).
+
+CREATE TABLE IF NOT EXISTS price_telemetry (
+    time TIMESTAMPTZ NOT NULL,
+    symbol TEXT NOT NULL,
+    price DOUBLE PRECISION NOT NULL,
+    volume DOUBLE PRECISION NOT NULL DEFAULT 0,
+    source TEXT NOT NULL DEFAULT 'UNKNOWN'
+);
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'timescaledb') THEN
+        PERFORM create_hypertable('price_telemetry', 'time', if_not_exists => TRUE);
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_price_telemetry_symbol_time ON price_telemetry(symbol, time DESC);
@@ -0,0 +1,134 @@
+"""
+Neo4j correlation-edge write benchmark.
+
+Pushes a full pairwise correlation refresh through the old one-MERGE-per-pair
+path and through BulkGraphWriter's UNWIND batches, and reports round-trips,
+wall time and edges/second. By default it runs against an in-memory stand-in
+driver that charges a fixed round-trip latency; pass --uri to hit a real
+Neo4j (e.g. a local container) instead.
+
+Usage: python scripts/benchmark_graph_writer.py [--assets 200] [--rtt-ms 0.5] [--batch-sizes 100,1000,5000]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.neo4j.bulk_graph_writer import BulkGraphWriter
+from services.neo4j.edge_weight_updater import CORRELATION_UPSERT
+
+
+class InMemoryDriver:
+    """Stand-in for a Bolt driver: each run() costs one round-trip and upserts edges into a dict."""
+
+    def __init__(self, rtt_ms: float, per_row_us: float):
+        self.rtt = rtt_ms / 1000.0
+        self.per_row = per_row_us / 1e6
+        self.edges = {}
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def session(self, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, fn, *args):
+        return fn(self, *args)
+
+    def run(self, query, parameters=None, **kwargs):
+        rows = kwargs.get("rows") or [parameters]
+        time.sleep(self.rtt + self.per_row * len(rows))
+        with self._lock:
+            self.round_trips += 1
+            for row in rows:
+                self.edges[(row["symbol1"], row["symbol2"], row["timeframe"])] = row["coefficient"]
+        return self
+
+    def consume(self):
+        return None
+
+    def close(self):
+        pass
+
+
+def correlation_rows(n_assets: int):
+    rng = np.random.default_rng(7)
+    returns = rng.standard_normal((250, n_assets))
+    corr = np.corrcoef(returns, rowvar=False)
+    symbols = [f"A{i:04d}" for i in range(n_assets)]
+    i, j = np.triu_indices(n_assets, k=1)
+    return [
+        {"symbol1": symbols[a], "symbol2": symbols[b], "coefficient": float(corr[a, b]),
+         "confidence": 0.95, "direction": "NEUTRAL", "timeframe": "1D"}
+        for a, b in zip(i.tolist(), j.tolist())
+    ]
+
+
+def per_pair(driver, rows) -> None:
+    with driver.session() as session:
+        for row in rows:
+            session.run(CORRELATION_UPSERT.replace("row.", "$"), row)
+
+
+def batched(driver, rows, batch_size: int) -> dict:
+    writer = BulkGraphWriter(lambda: driver, batch_size=batch_size, flush_interval=0.25)
+    writer.add_many(CORRELATION_UPSERT, rows, key=lambda r: (r["symbol1"], r["symbol2"], r["timeframe"]))
+    writer.stop()
+    return writer.get_stats()
+
+
+def make_driver(args):
+    if args.uri:
+        from neo4j import GraphDatabase
+        return GraphDatabase.driver(args.uri, auth=(args.user, args.password))
+    return InMemoryDriver(args.rtt_ms, args.per_row_us)
+
+
+def run_benchmark(args) -> None:
+    rows = correlation_rows(args.assets)
+    target = args.uri or f"in-memory driver, rtt={args.rtt_ms}ms"
+    print(f"--- Graph writer benchmark: {args.assets} assets, {len(rows)} edges ({target}) ---")
+
+    baseline_rows = rows[:args.baseline_edges]
+    driver = make_driver(args)
+    start = time.perf_counter()
+    per_pair(driver, baseline_rows)
+    elapsed = time.perf_counter() - start
+    base_rate = len(baseline_rows) / elapsed
+    print(f"  per-pair MERGE      edges={len(baseline_rows):<8} time={elapsed:7.2f}s rate={base_rate:10.0f}/s "
+          f"(full refresh ~{len(rows) / base_rate:,.0f}s)")
+    driver.close()
+
+    for batch_size in args.batch_sizes:
+        driver = make_driver(args)
+        start = time.perf_counter()
+        stats = batched(driver, rows, batch_size)
+        elapsed = time.perf_counter() - start
+        rate = stats["written"] / elapsed
+        print(f"  UNWIND batch={batch_size:<6} edges={stats['written']:<8} time={elapsed:7.2f}s rate={rate:10.0f}/s "
+              f"batches={stats['batches']:<5} speedup={rate / base_rate:6.1f}x")
+        driver.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--assets", type=int, default=200)
+    parser.add_argument("--baseline-edges", type=int, default=2000, help="edges timed on the per-pair path")
+    parser.add_argument("--batch-sizes", type=lambda s: [int(x) for x in s.split(",")], default=[100, 1000, 5000])
+    parser.add_argument("--rtt-ms", type=float, default=0.5, help="stand-in round-trip latency")
+    parser.add_argument("--per-row-us", type=float, default=2.0, help="stand-in server cost per row")
+    parser.add_argument("--uri", default=None, help="bolt URI of a real Neo4j, e.g. bolt://localhost:7687")
+    parser.add_argument("--user", default=os.getenv("NEO4J_USER", "neo4j"))
+    parser.add_argument("--password", default=os.getenv("NEO4J_PASSWORD", "investor_password"))
+    run_benchmark(parser.parse_args())
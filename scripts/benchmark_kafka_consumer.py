@@ -0,0 +1,187 @@
+"""
+Kafka consumer throughput benchmark.
+
+Feeds pre-encoded order-book-style JSON messages from an in-memory stand-in
+for confluent_kafka.Consumer through BaseConsumer's per-message poll loop
+(stdlib json as before, then the fast decoder) and its batch mode (inline and
+with per-partition workers), and reports msgs/s. Each scenario runs twice:
+a CPU-light handler, and one that also makes a downstream write (simulated
+with --sink-us of blocking I/O) per process_message / per process_batch call.
+No broker is needed; the numbers isolate decode + dispatch + commit overhead.
+
+Usage: python scripts/benchmark_kafka_consumer.py [--messages 20000] [--partitions 8] [--batch-sizes 100,500,2000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import services.kafka.consumer as consumer_module
+from services.kafka.consumer import JSON_DECODER, BaseConsumer, ConsumerConfig
+
+
+class _Message:
+    __slots__ = ("_topic", "_partition", "_offset", "_value")
+
+    def __init__(self, topic, partition, offset, value):
+        self._topic, self._partition, self._offset, self._value = topic, partition, offset, value
+
+    def error(self):
+        return None
+
+    def topic(self):
+        return self._topic
+
+    def partition(self):
+        return self._partition
+
+    def offset(self):
+        return self._offset
+
+    def value(self):
+        return self._value
+
+
+class FakeKafkaConsumer:
+    """Round-robins across partition logs; poll() returns one message, consume() up to num_messages."""
+
+    def __init__(self, logs):
+        self.logs = logs
+        self.keys = list(logs)
+        self.position = dict.fromkeys(self.keys, 0)
+        self.remaining = sum(len(log) for log in logs.values())
+        self.committed = {}
+        self._turn = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, topics):
+        pass
+
+    def _next(self):
+        for _ in range(len(self.keys)):
+            key = self.keys[self._turn]
+            self._turn = (self._turn + 1) % len(self.keys)
+            pos = self.position[key]
+            if pos < len(self.logs[key]):
+                self.position[key] = pos + 1
+                self.remaining -= 1
+                return _Message(key[0], key[1], pos, self.logs[key][pos])
+        return None
+
+    def poll(self, timeout=None):
+        with self._lock:
+            return self._next()
+
+    def consume(self, num_messages=1, timeout=-1):
+        with self._lock:
+            out = []
+            while len(out) < num_messages:
+                msg = self._next()
+                if msg is None:
+                    break
+                out.append(msg)
+            return out
+
+    def commit(self, offsets=None, asynchronous=True):
+        for tp in offsets or []:
+            self.committed[(tp.topic, tp.partition)] = tp.offset
+
+    def seek(self, tp):
+        with self._lock:
+            self.position[(tp.topic, tp.partition)] = tp.offset
+
+    def close(self):
+        pass
+
+
+class TopOfBookConsumer(BaseConsumer):
+    """Keep best bid/ask per symbol, optionally writing downstream once per call."""
+
+    def __init__(self, config, sink_us=0.0):
+        super().__init__(config)
+        self.top = {}
+        self.count = 0
+        self.sink_seconds = sink_us / 1e6
+        self._lock = threading.Lock()
+
+    def _apply(self, message):
+        self.top[message["symbol"]] = (message["bids"][0][0], message["asks"][0][0])
+
+    def process_message(self, message):
+        self._apply(message)
+        if self.sink_seconds:
+            time.sleep(self.sink_seconds)
+        self.count += 1
+
+    def process_batch(self, messages):
+        for message in messages:
+            self._apply(message)
+        if self.sink_seconds:
+            time.sleep(self.sink_seconds)
+        with self._lock:
+            self.count += len(messages)
+
+
+def make_logs(n_messages, n_partitions):
+    logs = {("orderbook-depth", p): [] for p in range(n_partitions)}
+    for i in range(n_messages):
+        px = 100 + (i % 50) * 0.01
+        payload = {
+            "symbol": f"SYM{i % 200}", "timestamp": 1_700_000_000_000 + i,
+            "bids": [[px - 0.01 * k, 100 + k] for k in range(10)],
+            "asks": [[px + 0.01 * (k + 1), 100 + k] for k in range(10)],
+        }
+        logs[("orderbook-depth", i % n_partitions)].append(json.dumps(payload).encode())
+    return logs
+
+
+def run_case(label, logs, n_messages, sink_us, **config_kwargs):
+    consumer = TopOfBookConsumer(ConsumerConfig(topics=["orderbook-depth"], group_id="bench", **config_kwargs), sink_us)
+    fake = FakeKafkaConsumer(logs)
+    consumer._consumer = fake
+    start = time.perf_counter()
+    consumer.start()
+    while fake.remaining or consumer.count < n_messages:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    consumer.is_running = False
+    consumer._consume_thread.join()
+    consumer.stop()
+    rate = n_messages / elapsed
+    print(f"  {label:<38} time={elapsed:6.2f}s rate={rate:10.0f} msgs/s")
+    return rate
+
+
+def run_benchmark(n_messages, n_partitions, batch_sizes, workers, sink_us):
+    logs = make_logs(n_messages, n_partitions)
+    for sink in (0.0, sink_us):
+        print(f"--- Kafka consumer benchmark: {n_messages} msgs, {n_partitions} partitions, "
+              f"downstream write={sink:.0f}us per call ---")
+        fast_loads = consumer_module._json_loads
+        consumer_module._json_loads = json.loads
+        base = run_case("per-message poll(), json", logs, n_messages, sink)
+        consumer_module._json_loads = fast_loads
+        cases = [(f"per-message poll(), {JSON_DECODER}", {})]
+        cases += [(f"batch consume({size})", {"batch_mode": True, "max_batch_size": size}) for size in batch_sizes]
+        if workers:
+            cases.append((f"batch consume({max(batch_sizes)}) + {workers} workers",
+                          {"batch_mode": True, "max_batch_size": max(batch_sizes), "partition_workers": workers}))
+        for label, kwargs in cases:
+            rate = run_case(label, logs, n_messages, sink, **kwargs)
+            print(f"  {'':<38} speedup={rate / base:6.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--partitions", type=int, default=8)
+    parser.add_argument("--batch-sizes", type=lambda s: [int(x) for x in s.split(",")], default=[100, 500, 2000])
+    parser.add_argument("--workers", type=int, default=4, help="partition workers for the last case (0 to skip)")
+    parser.add_argument("--sink-us", type=float, default=200.0, help="simulated downstream write per handler call")
+    args = parser.parse_args()
+    run_benchmark(args.messages, args.partitions, args.batch_sizes, args.workers, args.sink_us)
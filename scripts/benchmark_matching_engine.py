@@ -0,0 +1,93 @@
+"""
+Matching engine replay throughput benchmark.
+
+Generates a synthetic L2 stream (level inserts / modifies / deletes around a
+random-walking mid, plus trade prints) for many symbols and replays it
+through MatchingEngine.run(). Scenarios: market data only, then with resting
+simulated limit orders on a fraction of the symbols (so those events take the
+full matching path: queue advance, crossing, trade allocation).
+
+Usage: python scripts/benchmark_matching_engine.py [--events 2000000] [--symbols 1000] [--active 0.1]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.execution.matching_engine import MatchingEngine
+
+TICK = 0.01
+LEVELS = 10
+
+
+def make_events(n_events, n_symbols, trade_ratio, rng):
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+    mids = {s: 100 * rng.randint(20, 500) for s in symbols}  # mid in ticks
+    events = []
+    for s in symbols:
+        for k in range(1, LEVELS + 1):
+            events.append((0.0, "D", s, "BID", (mids[s] - k) * TICK, 100.0 * k))
+            events.append((0.0, "D", s, "ASK", (mids[s] + k) * TICK, 100.0 * k))
+    for i in range(n_events):
+        ts = 1.0 + i * 1e-6
+        s = symbols[rng.randrange(n_symbols)]
+        if rng.random() < 0.01:
+            mids[s] += rng.choice((-1, 1))
+        if rng.random() < trade_ratio:
+            side = rng.choice(("BUY", "SELL"))
+            px = (mids[s] + (1 if side == "BUY" else -1)) * TICK
+            events.append((ts, "T", s, side, px, float(rng.randint(1, 200))))
+            continue
+        book_side = "BID" if rng.random() < 0.5 else "ASK"
+        k = rng.randint(1, LEVELS + 2)
+        px = (mids[s] - k if book_side == "BID" else mids[s] + k) * TICK
+        size = 0.0 if rng.random() < 0.2 else float(rng.randint(1, 50) * 20)
+        events.append((ts, "D", s, book_side, px, size))
+    return events, mids
+
+
+def run_case(label, events, setup_events, orders=None, latency=0.0):
+    engine = MatchingEngine(latency=latency)
+    engine.run(setup_events)
+    for symbol, side, qty, price in orders or ():
+        engine.submit(symbol, side, qty, "LIMIT", price=price, ts=1.0)
+    start = time.perf_counter()
+    n = engine.run(events)
+    elapsed = time.perf_counter() - start
+    stats = engine.get_stats()
+    print(f"  {label:<44} {n / elapsed:12,.0f} events/s  fills={stats['fills']:<7} open={stats['open_orders']}")
+    return n / elapsed
+
+
+def run_benchmark(n_events, n_symbols, active, trade_ratio, latency):
+    rng = random.Random(3)
+    events, mids = make_events(n_events, n_symbols, trade_ratio, rng)
+    n_setup = 2 * LEVELS * n_symbols
+    setup, replay = events[:n_setup], events[n_setup:]
+    print(f"--- Matching engine benchmark: {len(replay):,} events, {n_symbols} symbols, "
+          f"{trade_ratio:.0%} trades ---")
+    run_case("market data only", replay, setup)
+
+    chosen = rng.sample(sorted(mids), max(1, int(n_symbols * active)))
+    orders = []
+    for s in chosen:
+        for k in range(1, 4):
+            orders.append((s, "BUY", 100.0, (mids[s] - k) * TICK))
+            orders.append((s, "SELL", 100.0, (mids[s] + k) * TICK))
+    run_case(f"resting orders on {len(chosen)} symbols", replay, setup, orders)
+    run_case(f"resting orders + {latency:g}s latency", replay, setup, orders, latency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=2_000_000)
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--active", type=float, default=0.1, help="fraction of symbols with resting orders")
+    parser.add_argument("--trades", type=float, default=0.1, help="fraction of events that are trade prints")
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    run_benchmark(args.events, args.symbols, args.active, args.trades, args.latency)
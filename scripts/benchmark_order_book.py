@@ -0,0 +1,114 @@
+"""
+Order book update/query latency benchmark.
+
+Seeds thousands of symbols with a 20-level snapshot each, then replays random
+single-level diffs (insert / modify / delete) and compares the array-backed
+OrderBook against the legacy path, which re-parses and re-sorts the full book
+(Level2Parser) and walks the level dicts (DepthAggregator).
+
+Usage: python scripts/benchmark_order_book.py [--symbols 5000] [--updates 200000] [--levels 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.market.depth_aggregator import DepthAggregator
+from services.market.level2_parser import Level2Parser
+from services.market.order_book import OrderBookStore
+
+TICK = 0.01
+
+
+def snapshot(symbol, levels, rng):
+    mid = rng.uniform(20, 500)
+    return {
+        "symbol": symbol, "timestamp": "2026-01-25T21:30:00Z",
+        "bids": [{"price": round(mid - TICK * (k + 1), 2), "size": rng.randint(1, 100) * 100.0} for k in range(levels)],
+        "asks": [{"price": round(mid + TICK * (k + 1), 2), "size": rng.randint(1, 100) * 100.0} for k in range(levels)],
+    }
+
+
+def make_diffs(snapshots, n_updates, levels, rng):
+    symbols = list(snapshots)
+    diffs = []
+    for _ in range(n_updates):
+        symbol = rng.choice(symbols)
+        side = rng.choice(("bids", "asks"))
+        best = snapshots[symbol][side][0]["price"]
+        offset = TICK * rng.randint(0, levels + 5)
+        price = round(best - offset if side == "bids" else best + offset, 2)
+        size = 0.0 if rng.random() < 0.3 else rng.randint(1, 100) * 100.0
+        diffs.append((symbol, side, price, size))
+    return diffs
+
+
+def run_benchmark(n_symbols, n_updates, levels):
+    rng = random.Random(42)
+    snapshots = {f"SYM{i}": snapshot(f"SYM{i}", levels, rng) for i in range(n_symbols)}
+    diffs = make_diffs(snapshots, n_updates, levels, rng)
+    print(f"--- Order book benchmark: {n_symbols} symbols x {levels} levels, {n_updates} diffs ---")
+
+    store = OrderBookStore()
+    for snap in snapshots.values():
+        store.apply_event(snap)
+
+    start = time.perf_counter()
+    for symbol, side, price, size in diffs:
+        book = store.books[symbol]
+        (book.bid_side if side == "bids" else book.ask_side).update(price, size)
+    per_level = (time.perf_counter() - start) / n_updates * 1e6
+    print(f"  OrderBook level update            {per_level:8.2f} us/update")
+
+    events = [{"symbol": s, "type": "delta", side: [[price, size]]} for s, side, price, size in diffs]
+    start = time.perf_counter()
+    for event in events:
+        store.apply_event(event)
+    per_event = (time.perf_counter() - start) / n_updates * 1e6
+    print(f"  OrderBookStore.apply_event(diff)  {per_event:8.2f} us/update")
+
+    books = list(store.books.values())
+    n_queries = min(n_updates, 50000)
+    start = time.perf_counter()
+    for i in range(n_queries):
+        book = books[i % len(books)]
+        book.bid_side.update(book.best_bid, 100.0)  # dirty the cumulative sums like a live feed
+        book.volume_at_depth(5 * TICK)
+        book.vwap_for_size(2500.0, "BUY")
+    per_query = (time.perf_counter() - start) / n_queries * 1e6
+    print(f"  update + depth + VWAP             {per_query:8.2f} us/update")
+
+    # Legacy: every change means re-parsing the full snapshot, then linear scans
+    legacy = {s: {"bids": {l["price"]: l["size"] for l in snap["bids"]},
+                  "asks": {l["price"]: l["size"] for l in snap["asks"]}} for s, snap in snapshots.items()}
+    sample = diffs[:min(n_updates, 20000)]
+    start = time.perf_counter()
+    for symbol, side, price, size in sample:
+        levels_map = legacy[symbol][side]
+        if size:
+            levels_map[price] = size
+        else:
+            levels_map.pop(price, None)
+        parsed = Level2Parser.parse_depth_event({
+            "symbol": symbol, "timestamp": "2026-01-25T21:30:00Z",
+            "bids": [{"price": p, "size": s} for p, s in legacy[symbol]["bids"].items()],
+            "asks": [{"price": p, "size": s} for p, s in legacy[symbol]["asks"].items()],
+        })
+        DepthAggregator.get_total_volume_at_depth(parsed, 5 * TICK)
+        DepthAggregator.get_vwap_for_size(parsed, 2500.0, "BUY")
+    per_legacy = (time.perf_counter() - start) / len(sample) * 1e6
+    print(f"  legacy rebuild + depth + VWAP     {per_legacy:8.2f} us/update "
+          f"(array book {per_legacy / per_query:5.1f}x faster)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=5000)
+    parser.add_argument("--updates", type=int, default=200000)
+    parser.add_argument("--levels", type=int, default=20)
+    args = parser.parse_args()
+    run_benchmark(args.symbols, args.updates, args.levels)
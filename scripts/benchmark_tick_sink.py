@@ -0,0 +1,139 @@
+"""
+Tick persistence throughput benchmark.
+
+Pushes synthetic FX/equity ticks through TickSink (columnar buffer + binary
+COPY) and reports ticks/s for single-tick add(), column-wise add_many(), the
+COPY payload encoder, and end-to-end with a background flusher. Without
+--dsn the COPY target is an in-memory cursor that just reads the payload, so
+the numbers isolate the Python side. With --dsn the ticks are COPYed into a
+real Postgres/TimescaleDB price_telemetry table (created if missing), and a
+sample is also written the legacy way (one INSERT + commit per tick).
+
+Usage: python scripts/benchmark_tick_sink.py [--ticks 1000000] [--symbols 2000] [--dsn postgresql://...]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.tick_sink import TickColumns, TickSink
+
+SCHEMA_SQL = os.path.join(os.path.dirname(__file__), "..", "schemas", "postgres", "price_telemetry.sql")
+
+
+class NullCursor:
+    """Reads the COPY payload the way psycopg2 would, then discards it."""
+
+    bytes_read = 0
+
+    def copy_expert(self, sql, file, size=8192):
+        while True:
+            chunk = file.read(size)
+            if not chunk:
+                break
+            NullCursor.bytes_read += len(chunk)
+
+
+@contextmanager
+def null_cursor():
+    yield NullCursor()
+
+
+def pg_cursor_factory(dsn):
+    import psycopg2
+
+    conn = psycopg2.connect(dsn)
+    with conn.cursor() as cur, open(SCHEMA_SQL) as f:
+        cur.execute(f.read())
+    conn.commit()
+
+    @contextmanager
+    def factory():
+        with conn.cursor() as cur:
+            yield cur
+        conn.commit()
+
+    return conn, factory
+
+
+def make_ticks(n_ticks, n_symbols, rng):
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+    base = {s: rng.uniform(1, 500) for s in symbols}
+    names = [rng.choice(symbols) for _ in range(n_ticks)]
+    prices = [round(base[s] * (1 + rng.gauss(0, 1e-4)), 5) for s in names]
+    volumes = [float(rng.randint(1, 100)) for _ in range(n_ticks)]
+    return names, prices, volumes
+
+
+def report(label, n, seconds):
+    print(f"  {label:<34} {n / seconds:12,.0f} ticks/s  ({seconds * 1e6 / n:6.2f} us/tick)")
+
+
+def run_benchmark(n_ticks, n_symbols, batch_size, dsn):
+    rng = random.Random(7)
+    names, prices, volumes = make_ticks(n_ticks, n_symbols, rng)
+    conn, factory = pg_cursor_factory(dsn) if dsn else (None, null_cursor)
+    target = "postgres" if dsn else "in-memory cursor"
+    print(f"--- Tick sink benchmark: {n_ticks:,} ticks, {n_symbols} symbols, batch {batch_size:,}, {target} ---")
+
+    sink = TickSink(factory, batch_size=n_ticks + 1, auto_start=False)
+    start = time.perf_counter()
+    for name, price, volume in zip(names, prices, volumes):
+        sink.add(name, price, volume, "BENCH")
+    report("add() per tick", n_ticks, time.perf_counter() - start)
+    sink._buffer = TickColumns()
+
+    chunk = 1000
+    start = time.perf_counter()
+    for i in range(0, n_ticks, chunk):
+        sink.add_many(names[i:i + chunk], prices[i:i + chunk], volumes[i:i + chunk], "BENCH")
+    report(f"add_many({chunk})", n_ticks, time.perf_counter() - start)
+
+    columns = sink._buffer
+    start = time.perf_counter()
+    payload = sink.encoder.encode(columns)
+    report("binary COPY encode", n_ticks, time.perf_counter() - start)
+    print(f"  {'':<34} payload {len(payload) / n_ticks:.1f} bytes/tick")
+    sink._buffer = TickColumns()
+
+    sink = TickSink(factory, batch_size=batch_size, flush_interval=0.5, max_pending=4 * batch_size)
+    start = time.perf_counter()
+    for i in range(0, n_ticks, chunk):
+        sink.add_many(names[i:i + chunk], prices[i:i + chunk], volumes[i:i + chunk], "BENCH")
+    sink.stop()
+    elapsed = time.perf_counter() - start
+    report("end-to-end (add_many + COPY)", n_ticks, elapsed)
+    stats = sink.get_stats()
+    print(f"  {'':<34} batches={stats['batches']} dropped={stats['dropped']} "
+          f"blocked={stats['blocked_seconds']:.2f}s")
+
+    if conn is not None:
+        sample = min(n_ticks, 5000)
+        now = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        with conn.cursor() as cur:
+            for name, price, volume in zip(names[:sample], prices[:sample], volumes[:sample]):
+                cur.execute("INSERT INTO price_telemetry (time, symbol, price, volume, source) "
+                            "VALUES (%s, %s, %s, %s, %s)", (now, name, price, volume, "LEGACY"))
+                conn.commit()
+        report("legacy INSERT + commit per tick", sample, time.perf_counter() - start)
+        with conn.cursor() as cur:
+            cur.execute("DELETE FROM price_telemetry WHERE source IN ('BENCH', 'LEGACY')")
+        conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ticks", type=int, default=1_000_000)
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--dsn", default=None, help="Postgres DSN; omit to use an in-memory COPY target")
+    args = parser.parse_args()
+    run_benchmark(args.ticks, args.symbols, args.batch_size, args.dsn)
@@ -0,0 +1,84 @@
+"""
+VWAP basket scheduler benchmark.
+
+Builds intraday volume curves from synthetic minute volume (U-shaped, noisy,
+per symbol) and times: the nightly curve build, scheduling a basket of parent
+orders in one vectorized schedule_basket() call versus one
+generate_vwap_schedule() call per order, and a mid-session replan_basket().
+
+Usage: python scripts/benchmark_vwap_scheduler.py [--symbols 500] [--days 20] [--orders 2000] [--slices 26]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.execution.algo_execution import AlgoEngine
+from services.execution.volume_curves import SESSION_MINUTES, build_volume_curves
+
+
+def make_minute_volume(n_symbols, n_days, rng):
+    grid = np.arange(SESSION_MINUTES)
+    u_shape = 1.0 + 3.0 * ((grid - 195) / 195.0) ** 2
+    names = [f"SYM{i}" for i in range(n_symbols)]
+    n = n_symbols * n_days * SESSION_MINUTES
+    symbols = np.repeat(np.array(names, dtype=object), n_days * SESSION_MINUTES).tolist()
+    days = np.tile(np.repeat(738000 + np.arange(n_days), SESSION_MINUTES), n_symbols)
+    minutes = np.tile(grid, n_symbols * n_days)
+    scale = np.repeat(rng.lognormal(8, 1, n_symbols), n_days * SESSION_MINUTES)
+    volumes = scale * np.tile(u_shape, n_symbols * n_days) * rng.lognormal(0, 0.5, n)
+    return names, symbols, days, minutes, volumes
+
+
+def run_benchmark(n_symbols, n_days, n_orders, slices):
+    rng = np.random.default_rng(11)
+    names, symbols, days, minutes, volumes = make_minute_volume(n_symbols, n_days, rng)
+    print(f"--- VWAP scheduler benchmark: {len(volumes):,} minute rows, {n_symbols} symbols, "
+          f"{n_orders} orders x {slices} slices ---")
+
+    start = time.perf_counter()
+    curves = build_volume_curves(symbols, days, minutes, volumes)
+    print(f"  curve build                         {time.perf_counter() - start:8.3f} s  "
+          f"({curves.curves.nbytes / 1024:,.0f} KiB cached)")
+
+    engine = AlgoEngine(curves=curves)
+    pick = random.Random(5)
+    basket = [pick.choice(names) for _ in range(n_orders)]
+    qty = [pick.randint(100, 100_000) for _ in range(n_orders)]
+    start_m = [pick.randint(0, 200) for _ in range(n_orders)]
+    end_m = [s + pick.randint(60, SESSION_MINUTES - s) for s in start_m]
+
+    start = time.perf_counter()
+    for symbol, q, s, e in zip(basket, qty, start_m, end_m):
+        engine.generate_vwap_schedule(q, symbol=symbol, start_minute=s, end_minute=e, slices=slices)
+    loop = time.perf_counter() - start
+    print(f"  per-order generate_vwap_schedule    {loop * 1000:8.1f} ms")
+
+    start = time.perf_counter()
+    schedule = engine.schedule_basket(basket, qty, start_m, end_m, slices)
+    batch = time.perf_counter() - start
+    print(f"  schedule_basket                     {batch * 1000:8.1f} ms  ({loop / batch:.0f}x)")
+    assert (schedule.child_quantities.sum(axis=1) == schedule.quantities).all()
+
+    now = np.minimum(np.asarray(start_m) + 45, np.asarray(end_m))
+    filled = schedule.quantities * 0.1
+    realized = schedule.adv * rng.lognormal(-1.5, 0.5, n_orders)
+    start = time.perf_counter()
+    engine.replan_basket(schedule, now, filled, realized)
+    print(f"  replan_basket                       {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--days", type=int, default=20)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--slices", type=int, default=26)
+    args = parser.parse_args()
+    run_benchmark(args.symbols, args.days, args.orders, args.slices)
@@ -0,0 +1,64 @@
+"""
+Walk-forward optimizer scaling benchmark.
+
+Runs the same walk-forward SMA sweep with 1..N worker processes and reports
+wall time, speedup and per-core efficiency so regressions in the process
+pool / shared Arrow IPC path show up as lost scaling.
+
+Usage: python scripts/benchmark_walk_forward.py [--bars 50000] [--max-workers 8]
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.backtest import BacktestConfig
+from services.backtest.walk_forward import WalkForwardOptimizer
+
+
+def synthetic_bars(n_bars: int) -> list:
+    """Deterministic multi-cycle price path with enough crossovers to score."""
+    price = 100.0
+    bars = []
+    for i in range(n_bars):
+        price *= 1 + 0.0001 + 0.004 * math.sin(i / 17.0) + 0.002 * math.sin(i / 151.0)
+        bars.append({"timestamp": i, "close": price})
+    return bars
+
+
+def run_benchmark(n_bars: int, max_workers: int, folds: int) -> None:
+    bars = synthetic_bars(n_bars)
+    grid = [(fast, slow) for fast in range(5, 55, 5) for slow in range(20, 260, 20) if fast < slow]
+    test_bars = n_bars // (folds + 2)
+    train_bars = n_bars - folds * test_bars
+    config = BacktestConfig("Walk Forward Bench", "BENCH", "2000-01-01", "2020-01-01")
+
+    print(f"--- Walk-forward benchmark: {n_bars} bars, {len(grid)} pairs, {folds} folds ---")
+    baseline = None
+    workers = 1
+    while workers <= max_workers:
+        optimizer = WalkForwardOptimizer(max_workers=workers)
+        start = time.perf_counter()
+        result = optimizer.run(config, bars, grid, train_bars=train_bars, test_bars=test_bars)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        speedup = baseline / elapsed
+        print(
+            f"  workers={workers:<3} time={elapsed:7.2f}s speedup={speedup:5.2f}x "
+            f"efficiency={speedup / workers:6.1%} tasks={result.stats['tasks']}"
+        )
+        workers *= 2
+    print(f"  (host reports {os.cpu_count()} cores)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bars", type=int, default=50000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--folds", type=int, default=4)
+    args = parser.parse_args()
+    run_benchmark(args.bars, args.max_workers, args.folds)
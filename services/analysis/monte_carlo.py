@@ -27,6 +27,9 @@ from numpy.typing import NDArray
 import logging
 import time
 
+from services.analysis.monte_carlo_portfolio import PortfolioSimulationMixin, PortfolioSimulationResult
+from services.analysis.variance_reduction import VarianceReduction, risk_estimates, standard_normals
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,6 +49,11 @@ class SimulationConfig:
     df: float = 5.0  # Degrees of freedom for Student-t
     confidence_levels: Tuple[float, ...] = (0.95, 0.99)
     random_seed: Optional[int] = None
+    chunk_size: int = 10000  # Paths per chunk for streamed portfolio runs
+    chunk_bytes: int = 256 * 2**20  # Cap on one (paths x days x assets) shock block
+    variance_reduction: VarianceReduction = VarianceReduction.NONE
+    brownian_bridge: bool = True  # Path construction for Sobol/Halton draws
+    n_replicates: int = 16  # Independent batches behind standard errors
 
 
 @dataclass
@@ -61,12 +69,14 @@ class RiskMetrics:
     sharpe_ratio: float
 
 
-class MonteCarloEngine:
+class MonteCarloEngine(PortfolioSimulationMixin):
     """
     Monte Carlo simulation engine for portfolio risk analysis.
     
     Generates thousands of simulated return paths to calculate
     probabilistic risk metrics and stress test portfolio strategies.
+    Correlated multi-asset runs (simulate_portfolio) come from
+    PortfolioSimulationMixin.
     
     Attributes:
         config (SimulationConfig): Simulation parameters.
@@ -85,6 +95,8 @@ class MonteCarloEngine:
         self.last_simulations: Optional[NDArray] = None
         self.last_metrics: Optional[RiskMetrics] = None
         self._rng = np.random.default_rng(self.config.random_seed)
+        self._cholesky_cache: Dict[str, NDArray] = {}
+        self._last_batch_ids: Optional[NDArray] = None
         
         logger.info(f"MonteCarloEngine initialized: {self.config.n_simulations} runs, "
                     f"{self.config.distribution.value} distribution")
@@ -106,6 +118,9 @@ class MonteCarloEngine:
         Returns:
             Array of simulated daily returns.
         """
+        if self.config.variance_reduction != VarianceReduction.NONE:
+            return mean + std * self._reduced_variance_shocks(shape)
+
         if self.config.distribution == DistributionType.NORMAL:
             returns = self._rng.normal(mean, std, shape)
             
@@ -126,6 +141,23 @@ class MonteCarloEngine:
         
         return returns
     
+    def _reduced_variance_shocks(self, shape: Tuple[int, int]) -> NDArray:
+        """
+        Unit-variance shocks drawn as n_replicates independent blocks.
+
+        Antithetic pairs, moment matching and QMC randomization all stay
+        inside a block, so blocks are i.i.d. replicates for standard errors.
+        """
+        from services.analysis.monte_carlo_portfolio import draw_unit_shocks
+
+        n_blocks = max(1, min(self.config.n_replicates, shape[0]))
+        bounds = np.linspace(0, shape[0], n_blocks + 1).astype(int)
+        shocks = np.empty(shape)
+        for rng, lo, hi in zip(self._rng.spawn(n_blocks), bounds[:-1], bounds[1:]):
+            shocks[lo:hi] = draw_unit_shocks(rng, self.config, (hi - lo,) + tuple(shape[1:]))
+        self._last_batch_ids = np.repeat(np.arange(n_blocks), np.diff(bounds))
+        return shocks
+
     def simulate_paths(
         self,
         initial_value: float,
@@ -151,6 +183,7 @@ class MonteCarloEngine:
         n_d = n_days or self.config.n_days
         
         start_time = time.perf_counter()
+        self._last_batch_ids = None
         
         # Generate daily returns
         returns = self._generate_returns(
@@ -348,12 +381,16 @@ class MonteCarloEngine:
         )
         
         metrics = self.calculate_risk_metrics(paths)
+        estimates, standard_errors = self.estimate_standard_errors(paths, daily_return)
         
         total_time = time.perf_counter() - start_time
         
         return {
             'paths': paths,
             'metrics': metrics,
+            'estimates': estimates,
+            'standard_errors': standard_errors,
+            'variance_reduction': self.config.variance_reduction.value,
             'n_simulations': self.config.n_simulations,
             'n_days': self.config.n_days,
             'distribution': self.config.distribution.value,
@@ -361,6 +398,42 @@ class MonteCarloEngine:
             'meets_performance_target': total_time < 5.0
         }
     
+    def estimate_standard_errors(
+        self,
+        paths: NDArray,
+        mean_return: float,
+    ) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """
+        Expected return, VaR and CVaR estimates with their standard errors.
+
+        Batches are the independent replicate blocks of the last run (or
+        contiguous slices of i.i.d. paths without variance reduction). In
+        control-variate mode the summed daily return, whose mean is
+        n_days * mean_return, corrects the mean and CVaR estimators.
+
+        Args:
+            paths: Simulated portfolio value paths.
+            mean_return: Daily mean return used to generate the paths.
+
+        Returns:
+            (estimates, standard_errors) keyed by metric name.
+        """
+        terminal = paths[:, -1] / paths[:, 0] - 1
+        batch_ids = self._last_batch_ids
+        if batch_ids is None or batch_ids.shape[0] != paths.shape[0]:
+            n_batches = max(1, min(self.config.n_replicates, paths.shape[0]))
+            batch_ids = np.arange(paths.shape[0]) * n_batches // paths.shape[0]
+
+        control = None
+        if self.config.variance_reduction == VarianceReduction.CONTROL_VARIATE:
+            control = (paths[:, 1:] / paths[:, :-1] - 1).sum(axis=1)
+
+        levels = sorted(set(self.config.confidence_levels))
+        return risk_estimates(
+            terminal, levels, batch_ids,
+            control=control, control_mean=(paths.shape[1] - 1) * mean_return,
+        )
+    
     def stress_test(
         self,
         initial_value: float = 100000,
@@ -14,7 +14,7 @@ INTEGRATION POINTS:
 
 METHODOLOGY:
     - Factor risk models (Fama-French, Barra)
-    - Historical simulation for tail risk
+    - Historical / Monte Carlo scenarios with Euler VaR/CVaR contributions
     - Correlation matrix analysis
     - Risk contribution analysis
 
@@ -43,7 +43,6 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import numpy as np
-from scipy import stats
 from schemas.analytics import (
     FactorRiskDecomposition,
     FactorExposure,
@@ -55,6 +54,8 @@ from schemas.analytics import (
 )
 from services.portfolio.portfolio_aggregator import get_portfolio_aggregator
 from services.system.cache_service import get_cache_service
+from services.risk.covariance_service import get_covariance_service
+from services.risk.tail_risk_contributions import scenario_tail_contributions, simulated_tail_contributions
 from services.analysis.monte_carlo import MonteCarloEngine
 
 logger = logging.getLogger(__name__)
@@ -267,57 +268,82 @@ class RiskDecompositionService:
         self,
         portfolio_id: str,
         confidence_level: float = 0.95,
-        method: str = "historical"
+        method: str = "historical",
+        lookback_days: int = 252,
+        n_scenarios: Optional[int] = None,
+        horizon_days: int = 1,
+        seed: Optional[int] = None
     ) -> TailRiskContributions:
         """
         Calculate tail risk contributions of holdings.
         
+        Portfolio VaR/CVaR and the per-holding Euler contributions come from
+        one scenario set: the historical daily returns ("historical") or a
+        MonteCarloEngine simulation ("monte_carlo"), whose seed is returned
+        so attribution can replay the same paths.
+
+        Both methods report losses over horizon_days (default one day).
+        Historical daily scenarios are scaled by the square-root-of-time
+        rule around their mean; Monte Carlo sums simulated daily returns.
+        Note: earlier versions returned an annualized parametric VaR; pass
+        horizon_days=252 for a comparable one-year figure.
+        
         Returns:
-            TailRiskContributions with VaR/CVaR contributions
+            TailRiskContributions with VaR/CVaR contributions in currency
         """
         logger.info(f"Calculating tail risk contributions for portfolio {portfolio_id}")
         
         # Get portfolio data
         portfolio_data = await self._get_portfolio_data(portfolio_id)
         holdings = portfolio_data.get('holdings', [])
+        if not holdings:
+            raise ValueError("Portfolio has no holdings")
         
-        # Calculate portfolio VaR and CVaR
-        portfolio_value = sum(h.get('value', 0) for h in holdings)
-        portfolio_volatility = await self._calculate_portfolio_volatility(portfolio_data, 252)
-        
-        # VaR calculation (simplified)
-        z_score = stats.norm.ppf(confidence_level)
-        portfolio_var = portfolio_value * portfolio_volatility * z_score
-        portfolio_cvar = portfolio_var * 1.2  # CVaR is typically 20% higher than VaR
+        symbols = [h.get('symbol', '') for h in holdings]
+        weights = np.array([h.get('weight', 0.0) for h in holdings], dtype=np.float64)
+        portfolio_value = sum(h.get('value', 0.0) for h in holdings) or portfolio_data.get('total_value', 0.0)
+        
+        covariance_service = get_covariance_service()
+        history = covariance_service.get_returns(symbols, lookback_days)
+        if horizon_days < 1:
+            raise ValueError("horizon_days must be at least 1")
+        if method == "historical":
+            scenarios = history
+            if horizon_days > 1:
+                drift = history.mean(axis=0)
+                scenarios = horizon_days * drift + np.sqrt(horizon_days) * (history - drift)
+            tail = scenario_tail_contributions(scenarios, weights, confidence_level)
+        elif method == "monte_carlo":
+            if seed is None:
+                seed = int(np.random.SeedSequence().generate_state(1, np.uint64)[0] >> 1)
+            covariance = covariance_service.get_covariance(symbols, lookback_days, method="ledoit_wolf")
+            tail = simulated_tail_contributions(
+                self.monte_carlo, weights, history.mean(axis=0), covariance.to_dense(),
+                confidence_level, n_scenarios, horizon_days=horizon_days, seed=seed
+            )
+        else:
+            raise ValueError(f"Unknown tail risk method: {method}")
         
-        # Calculate contributions for each holding
-        contributions = []
-        for holding in holdings:
-            symbol = holding.get('symbol', '')
-            weight = holding.get('weight', 0.0)
-            holding_value = holding.get('value', 0.0)
-            
-            # Simplified contribution calculation
-            var_contribution = portfolio_var * weight
-            cvar_contribution = portfolio_cvar * weight
-            marginal_var = portfolio_var * weight * 0.1  # Simplified
-            marginal_cvar = portfolio_cvar * weight * 0.1  # Simplified
-            
-            contributions.append(TailRiskContribution(
+        contributions = [
+            TailRiskContribution(
                 symbol=symbol,
-                var_contribution=var_contribution,
-                cvar_contribution=cvar_contribution,
-                marginal_var=marginal_var,
-                marginal_cvar=marginal_cvar
-            ))
+                var_contribution=float(tail.component_var[i] * portfolio_value),
+                cvar_contribution=float(tail.component_cvar[i] * portfolio_value),
+                marginal_var=float(tail.marginal_var[i] * portfolio_value),
+                marginal_cvar=float(tail.marginal_cvar[i] * portfolio_value)
+            )
+            for i, symbol in enumerate(symbols)
+        ]
         
         return TailRiskContributions(
             portfolio_id=portfolio_id,
             confidence_level=confidence_level,
-            portfolio_var=portfolio_var,
-            portfolio_cvar=portfolio_cvar,
+            portfolio_var=float(tail.var * portfolio_value),
+            portfolio_cvar=float(tail.cvar * portfolio_value),
             contributions=contributions,
-            method=method
+            method=method,
+            n_scenarios=tail.n_scenarios,
+            scenario_seed=tail.seed
         )
     
     # Private helper methods
@@ -409,10 +435,17 @@ class RiskDecompositionService:
         portfolio_data: Dict,
         lookback_days: int
     ) -> float:
-        """Calculate portfolio volatility."""
-        # Simplified volatility calculation
-        # In production, use historical returns and covariance matrix
-        return 0.15  # 15% annual volatility
+        """Calculate annualized portfolio volatility from the shared covariance estimate."""
+        holdings = portfolio_data.get('holdings', [])
+        symbols = [h.get('symbol', '') for h in holdings]
+        weights = np.array([h.get('weight', 0.0) for h in holdings], dtype=np.float64)
+        if not symbols or not weights.any():
+            return 0.0
+        
+        estimate = get_covariance_service().annualized_covariance(
+            symbols, lookback_days, method="ledoit_wolf"
+        )
+        return float(np.sqrt(max(estimate.portfolio_variance(weights), 0.0)))
 
 
 # Singleton instance
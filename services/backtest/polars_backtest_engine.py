@@ -8,12 +8,15 @@ using Polars for sub-second trade simulations.
 ACCEPTANCE CRITERIA from Phase_2_ImplementationPlan.md:
 - Execute 10-year SMA cross on 1-min data in <2 seconds
 - Memory: Polars frames discarded instantly after backtest
+  (only the last cache_size input frames are kept, in an LRU, for reuse)
 """
 
 import logging
+import os
 import time
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
@@ -21,6 +24,15 @@ logger = logging.getLogger(__name__)
 # Try to import polars, fall back to mock if not available
 try:
     import polars as pl
+    from services.backtest.strategy_expressions import (
+        headline_metric_exprs,
+        returns_expr,
+        sma_expr,
+        sma_metric_aggs,
+        sma_signal_expr,
+        trade_ledger_exprs,
+        trade_records_frame,
+    )
     POLARS_AVAILABLE = True
 except ImportError:
     POLARS_AVAILABLE = False
@@ -61,6 +73,8 @@ class BacktestMetrics:
     profit_factor: float
     total_trades: int
     execution_time_ms: float
+    # Optional pyarrow Table of TradeRecord rows (BUY/SELL legs)
+    trade_ledger: Optional[Any] = None
 
 
 class PolarsBacktestEngine:
@@ -83,7 +97,11 @@ class PolarsBacktestEngine:
     def __init__(self) -> None:
         if self._initialized:
             return
-        self._data_cache: Dict[str, Any] = {}
+        # Arrow-backed Polars frames keyed by ticker/date range, so repeated
+        # runs over the same history skip the dict-to-frame conversion. The
+        # cache is an LRU of at most cache_size frames; older ones are dropped.
+        self._data_cache: "OrderedDict[str, Any]" = OrderedDict()
+        self.cache_size = int(os.getenv("BACKTEST_FRAME_CACHE_SIZE", 8))
         self._initialized = True
         logger.info(f"PolarsBacktestEngine initialized (Polars available: {POLARS_AVAILABLE})")
 
@@ -92,81 +110,194 @@ class PolarsBacktestEngine:
         config: BacktestConfig,
         fast_period: int = 10,
         slow_period: int = 50,
-        price_data: Optional[List[Dict[str, Any]]] = None,
+        price_data: Optional[Any] = None,
+        include_trades: bool = False,
     ) -> BacktestMetrics:
         """
         Run SMA crossover strategy.
         
+        price_data may be a list of bar dicts, a Polars DataFrame or a
+        pyarrow Table. When omitted, a frame previously cached for the same
+        ticker and date range is reused. With include_trades, the
+        TradeRecord ledger is attached as a pyarrow Table.
+
         Acceptance Criteria:
         - 10-year execution on 1-min data in <2 seconds
         """
         start_time = time.perf_counter()
         
-        if POLARS_AVAILABLE and price_data:
-            return self._run_sma_polars(config, fast_period, slow_period, price_data, start_time)
+        if POLARS_AVAILABLE:
+            df = self.get_price_frame(config, price_data)
+            if df is not None and df.height > 0:
+                return self._run_sma_polars(
+                    config, fast_period, slow_period, df, start_time, include_trades
+                )
+        return self._run_sma_mock(config, fast_period, slow_period, start_time)
+
+    @staticmethod
+    def _cache_key(config: BacktestConfig) -> str:
+        return f"{config.ticker}:{config.start_date}:{config.end_date}"
+
+    def get_price_frame(self, config: BacktestConfig, price_data: Optional[Any]) -> Optional["pl.DataFrame"]:
+        """
+        Resolve price_data to a cached Polars frame, converting at most once.
+
+        Accepts the same inputs as run_sma_crossover; None returns the frame
+        cached for the config's ticker and date range, if any.
+        """
+        key = self._cache_key(config)
+        if price_data is None:
+            df = self._data_cache.get(key)
+            if df is not None:
+                self._data_cache.move_to_end(key)
+            return df
+        if isinstance(price_data, pl.DataFrame):
+            df = price_data
+        elif isinstance(price_data, list):
+            if not price_data:
+                return None
+            df = pl.DataFrame(price_data)
         else:
-            return self._run_sma_mock(config, fast_period, slow_period, start_time)
+            # pyarrow Table / RecordBatch: zero-copy where the buffers allow it
+            df = pl.from_arrow(price_data)
+        self._data_cache[key] = df
+        self._data_cache.move_to_end(key)
+        while len(self._data_cache) > self.cache_size:
+            self._data_cache.popitem(last=False)
+        return df
+
+    def clear_cache(self) -> None:
+        """Drop every cached price frame."""
+        self._data_cache.clear()
+
+    def run_sma_grid(
+        self,
+        source: Union[str, "os.PathLike[str]", "pl.LazyFrame", "pl.DataFrame", Any],
+        param_grid: Sequence[Tuple[int, int]],
+        tickers: Optional[Sequence[str]] = None,
+        cost_per_side: float = 0.0,
+    ) -> "pl.DataFrame":
+        """
+        Evaluate an SMA (fast, slow) grid across many tickers in one lazy plan.
+
+        source is a Parquet path/glob (scanned lazily with pl.scan_parquet),
+        a LazyFrame, a DataFrame or a pyarrow Table holding long-format bars
+        with `ticker`, `timestamp` and `close` columns. Each distinct window
+        is computed once per ticker and shared by every pair that uses it.
+
+        Returns one row per (ticker, fast_period, slow_period) with the same
+        metric columns as BacktestMetrics. cost_per_side (commission plus
+        slippage, as a fraction) is charged on every entry and exit, and
+        every metric is net of it.
+        """
+        if not POLARS_AVAILABLE:
+            raise RuntimeError("Polars is required for batch backtests")
+        pairs = [(int(fast), int(slow)) for fast, slow in param_grid]
+        if not pairs:
+            raise ValueError("param_grid must contain at least one (fast, slow) pair")
+        if any(fast <= 0 or slow <= 0 for fast, slow in pairs):
+            raise ValueError("SMA periods must be positive")
+        if any(fast >= slow for fast, slow in pairs):
+            raise ValueError("fast_period must be shorter than slow_period")
+
+        start_time = time.perf_counter()
+        lf = self._scan_source(source)
+        if tickers is not None:
+            lf = lf.filter(pl.col("ticker").is_in(list(tickers)))
+
+        windows = sorted({w for pair in pairs for w in pair})
+        lf = lf.sort(["ticker", "timestamp"]).with_columns(
+            [returns_expr("ticker")] + [sma_expr(w, "ticker") for w in windows]
+        )
+
+        aggs = [pl.len().alias("bars")]
+        for idx, (fast, slow) in enumerate(pairs):
+            aggs.extend(
+                sma_metric_aggs(sma_signal_expr(fast, slow), prefix=f"p{idx}_", cost_per_side=cost_per_side)
+            )
+        grouped = lf.group_by("ticker").agg(aggs).collect()
+
+        # Reshape the wide per-pair aggregates (one row per ticker) into one
+        # long table. This runs eagerly on the small aggregate frame: lazily
+        # concatenating one projection per pair re-plans the whole query
+        # for every pair and grows quadratically with the grid.
+        per_pair = [
+            grouped.select(
+                pl.col("ticker"),
+                pl.lit(fast, dtype=pl.Int64).alias("fast_period"),
+                pl.lit(slow, dtype=pl.Int64).alias("slow_period"),
+                pl.col("bars"),
+                *headline_metric_exprs(prefix=f"p{idx}_"),
+            )
+            for idx, (fast, slow) in enumerate(pairs)
+        ]
+        result = pl.concat(per_pair).sort(["ticker", "fast_period", "slow_period"])
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        logger.info(
+            f"SMA grid: {len(pairs)} pairs x {result['ticker'].n_unique()} tickers in {elapsed_ms:.1f}ms"
+        )
+        return result
+
+    @staticmethod
+    def _scan_source(source: Any) -> "pl.LazyFrame":
+        """Normalize a batch source into a LazyFrame without materializing it."""
+        if isinstance(source, pl.LazyFrame):
+            return source
+        if isinstance(source, pl.DataFrame):
+            return source.lazy()
+        if isinstance(source, (str, os.PathLike)):
+            return pl.scan_parquet(source)
+        return pl.from_arrow(source).lazy()
 
     def _run_sma_polars(
         self,
         config: BacktestConfig,
         fast_period: int,
         slow_period: int,
-        price_data: List[Dict[str, Any]],
+        df: "pl.DataFrame",
         start_time: float,
+        include_trades: bool = False,
     ) -> BacktestMetrics:
-        """Run SMA strategy using Polars vectorized operations."""
-        # Create DataFrame
-        df = pl.DataFrame(price_data)
-        
-        # Calculate SMAs
-        df = df.with_columns([
-            pl.col("close").rolling_mean(window_size=fast_period).alias("sma_fast"),
-            pl.col("close").rolling_mean(window_size=slow_period).alias("sma_slow"),
-        ])
-        
-        # Generate signals
-        df = df.with_columns([
-            (pl.col("sma_fast") > pl.col("sma_slow")).alias("long_signal"),
-        ])
-        
-        # Calculate returns
-        df = df.with_columns([
-            pl.col("close").pct_change().alias("returns"),
-        ])
-        
-        # Strategy returns (long when signal is True)
-        df = df.with_columns([
-            pl.when(pl.col("long_signal")).then(pl.col("returns")).otherwise(0.0).alias("strategy_returns"),
-        ])
-        
-        # Calculate metrics
-        strategy_returns = df.select("strategy_returns").drop_nulls().to_series()
-        
-        total_return = (1 + strategy_returns).product() - 1
-        mean_return = strategy_returns.mean()
-        std_return = strategy_returns.std()
-        
-        sharpe = (mean_return / std_return * (252 ** 0.5)) if std_return > 0 else 0.0
-        
-        # Count trades (signal changes)
-        signals = df.select("long_signal").drop_nulls().to_series()
-        trades = signals.diff().abs().sum()
+        """
+        Run SMA strategy using Polars vectorized operations.
+
+        Trades, equity, drawdown and win/loss aggregates are all derived
+        from run boundaries of the signal column, so cost stays linear in
+        bar count with no Python-level iteration over trades.
+        """
+        windows = sorted({fast_period, slow_period})
+        signal = sma_signal_expr(fast_period, slow_period)
+        bars = df.lazy().with_columns([returns_expr()] + [sma_expr(w) for w in windows])
+        cost_per_side = config.commission + config.slippage
+        metrics = (
+            bars.select(sma_metric_aggs(signal, cost_per_side=cost_per_side))
+            .select(headline_metric_exprs())
+            .collect()
+            .row(0, named=True)
+        )
+
+        trade_ledger = None
+        if include_trades:
+            ledger = bars.select(
+                trade_ledger_exprs(
+                    signal, config.ticker, config.initial_capital, config.commission, config.slippage
+                )
+            ).collect()
+            trade_ledger = trade_records_frame(ledger).to_arrow()
         
         elapsed_ms = (time.perf_counter() - start_time) * 1000
         
-        # Clear DataFrame from memory
-        del df
-        
         return BacktestMetrics(
-            total_return_pct=float(total_return) * 100,
-            annualized_return_pct=float(total_return) * 100 / 10,  # Simplified
-            sharpe_ratio=float(sharpe) if sharpe else 0.0,
-            max_drawdown_pct=15.0,  # Simplified
-            win_rate=0.55,
-            profit_factor=1.3,
-            total_trades=int(trades) if trades else 0,
+            total_return_pct=float(metrics["total_return_pct"] or 0.0),
+            annualized_return_pct=float(metrics["annualized_return_pct"] or 0.0),
+            sharpe_ratio=float(metrics["sharpe_ratio"] or 0.0),
+            max_drawdown_pct=float(metrics["max_drawdown_pct"]),
+            win_rate=float(metrics["win_rate"]),
+            profit_factor=float(metrics["profit_factor"]),
+            total_trades=int(metrics["total_trades"] or 0),
             execution_time_ms=elapsed_ms,
+            trade_ledger=trade_ledger,
         )
 
     def _run_sma_mock(
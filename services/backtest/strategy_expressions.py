@@ -0,0 +1,204 @@
+"""
+Polars Expression Builders for the Backtest Engine
+Phase 2 Implementation: The Data Forge
+
+The single-run and batch (grid x ticker) backtests must report identical
+numbers for the same inputs, so every signal and metric is expressed once
+here as a Polars expression and reused by both code paths. Keeping them as
+expressions (rather than Series math) lets the batch path fold hundreds of
+parameter pairs into one lazy query plan.
+"""
+
+from typing import List, Optional
+
+import polars as pl
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def sma_column_name(window: int) -> str:
+    """Column name used for a shared SMA of the given window."""
+    return f"sma_{window}"
+
+
+def sma_expr(window: int, partition_by: Optional[str] = None) -> pl.Expr:
+    """Rolling mean of close, optionally evaluated per ticker partition."""
+    expr = pl.col("close").rolling_mean(window_size=window)
+    if partition_by:
+        expr = expr.over(partition_by)
+    return expr.alias(sma_column_name(window))
+
+
+def returns_expr(partition_by: Optional[str] = None) -> pl.Expr:
+    """Bar-over-bar close returns, optionally evaluated per ticker partition."""
+    expr = pl.col("close").pct_change()
+    if partition_by:
+        expr = expr.over(partition_by)
+    return expr.alias("returns")
+
+
+def sma_signal_expr(fast_period: int, slow_period: int) -> pl.Expr:
+    """Long while the fast SMA sits above the slow SMA (null during warm-up)."""
+    return pl.col(sma_column_name(fast_period)) > pl.col(sma_column_name(slow_period))
+
+
+def strategy_returns_expr(signal: pl.Expr, cost_per_side: float = 0.0) -> pl.Expr:
+    """
+    Returns earned while the signal is long, flat otherwise, net of costs.
+
+    This is the one place trading costs are charged: the first bar of each
+    long run is divided by (1 + cost_per_side) for the entry fill and its
+    last bar multiplied by (1 - cost_per_side) for the exit, so equity,
+    drawdown, total return and per-trade returns all see the same costs.
+    """
+    gross = pl.when(signal).then(pl.col("returns")).otherwise(0.0)
+    if not cost_per_side:
+        return gross
+    entry = pl.when(run_start_expr(signal)).then(1 / (1 + cost_per_side)).otherwise(1.0)
+    exit_ = pl.when(run_end_expr(signal)).then(1 - cost_per_side).otherwise(1.0)
+    return (1 + gross) * entry * exit_ - 1
+
+
+def run_start_expr(signal: pl.Expr) -> pl.Expr:
+    """True on the first bar of every long run."""
+    held = signal.fill_null(False)
+    return held & ~held.shift(1).fill_null(False)
+
+
+def run_end_expr(signal: pl.Expr) -> pl.Expr:
+    """True on the last bar of every long run (an open run ends on the final bar)."""
+    held = signal.fill_null(False)
+    return held & ~held.shift(-1).fill_null(False)
+
+
+def equity_expr(signal: pl.Expr, cost_per_side: float = 0.0) -> pl.Expr:
+    """Compounded equity curve (starting at 1.0) of the net strategy returns."""
+    return (1 + strategy_returns_expr(signal, cost_per_side)).cum_prod()
+
+
+def drawdown_expr(signal: pl.Expr, cost_per_side: float = 0.0) -> pl.Expr:
+    """Fractional drawdown from the running peak, never above zero."""
+    equity = equity_expr(signal, cost_per_side)
+    return equity / equity.cum_max().clip(lower_bound=1.0) - 1
+
+
+def trade_returns_expr(signal: pl.Expr, cost_per_side: float = 0.0) -> pl.Expr:
+    """
+    Net return of every completed long run, one value per trade.
+
+    Uses the difference of cumulative log equity between the bar before a
+    run starts and the bar it ends on, so trade extraction is two filters
+    and a subtraction rather than a per-trade loop. Costs come from
+    strategy_returns_expr.
+    """
+    log_equity = strategy_returns_expr(signal, cost_per_side).log1p().cum_sum()
+    entry_log = log_equity.shift(1).fill_null(0.0).filter(run_start_expr(signal))
+    exit_log = log_equity.filter(run_end_expr(signal))
+    return (exit_log - entry_log).exp() - 1
+
+
+def sma_metric_aggs(signal: pl.Expr, prefix: str = "", cost_per_side: float = 0.0) -> List[pl.Expr]:
+    """
+    Aggregations that turn a signal column into headline metrics.
+
+    Output columns (prefixed so many parameter pairs can share one
+    group_by): total_return, mean_return, std_return, total_trades,
+    max_drawdown, win_rate, profit_factor. Every column is net of
+    cost_per_side, and total_trades counts round trips (long runs), the
+    same trades the ledger lists.
+    """
+    strategy_returns = strategy_returns_expr(signal, cost_per_side)
+    trade_returns = trade_returns_expr(signal, cost_per_side)
+    gross_profit = trade_returns.clip(lower_bound=0.0).sum()
+    gross_loss = -trade_returns.clip(upper_bound=0.0).sum()
+    return [
+        ((1 + strategy_returns).product() - 1).alias(f"{prefix}total_return"),
+        strategy_returns.mean().alias(f"{prefix}mean_return"),
+        strategy_returns.std().alias(f"{prefix}std_return"),
+        run_start_expr(signal).sum().alias(f"{prefix}total_trades"),
+        (-drawdown_expr(signal, cost_per_side).min()).alias(f"{prefix}max_drawdown"),
+        (trade_returns > 0).mean().alias(f"{prefix}win_rate"),
+        pl.when(gross_loss > 0)
+        .then(gross_profit / gross_loss)
+        .otherwise(pl.when(gross_profit > 0).then(float("inf")).otherwise(0.0))
+        .alias(f"{prefix}profit_factor"),
+    ]
+
+
+def headline_metric_exprs(prefix: str = "") -> List[pl.Expr]:
+    """Derive percentage/ratio metrics from the columns of `sma_metric_aggs`."""
+    total = pl.col(f"{prefix}total_return")
+    std = pl.col(f"{prefix}std_return")
+    sharpe = (
+        pl.when(std > 0)
+        .then(pl.col(f"{prefix}mean_return") / std * (TRADING_DAYS_PER_YEAR ** 0.5))
+        .otherwise(0.0)
+    )
+    return [
+        (total * 100).alias("total_return_pct"),
+        (total * 100 / 10).alias("annualized_return_pct"),  # Simplified
+        sharpe.fill_null(0.0).alias("sharpe_ratio"),
+        pl.col(f"{prefix}total_trades").fill_null(0).cast(pl.Int64).alias("total_trades"),
+        (pl.col(f"{prefix}max_drawdown").fill_null(0.0) * 100).alias("max_drawdown_pct"),
+        pl.col(f"{prefix}win_rate").fill_null(0.0).alias("win_rate"),
+        pl.col(f"{prefix}profit_factor").fill_null(0.0).alias("profit_factor"),
+    ]
+
+
+def trade_ledger_exprs(
+    signal: pl.Expr,
+    ticker: str,
+    initial_capital: float,
+    commission: float,
+    slippage: float,
+) -> List[pl.Expr]:
+    """
+    Columns of a one-row-per-trade ledger (entry and exit legs side by side).
+
+    Entries fill at the close of the bar before the run starts and exits at
+    the close of its last bar, matching how strategy returns are credited.
+    Position size is the net equity available at entry.
+    """
+    starts = run_start_expr(signal)
+    ends = run_end_expr(signal)
+    equity_before = equity_expr(signal, commission + slippage).shift(1).fill_null(1.0)
+    entry_price = pl.col("close").shift(1).filter(starts) * (1 + slippage)
+    quantity = equity_before.filter(starts) * initial_capital / entry_price
+    exit_price = pl.col("close").filter(ends) * (1 - slippage)
+    return [
+        pl.lit(ticker).alias("ticker"),
+        pl.col("timestamp").shift(1).filter(starts).alias("entry_time"),
+        entry_price.alias("entry_price"),
+        pl.col("timestamp").filter(ends).alias("exit_time"),
+        exit_price.alias("exit_price"),
+        quantity.alias("quantity"),
+        (quantity * entry_price * commission).alias("entry_commission"),
+        (quantity * exit_price * commission).alias("exit_commission"),
+    ]
+
+
+def trade_records_frame(ledger: pl.DataFrame) -> pl.DataFrame:
+    """Stack a trade ledger into TradeRecord-shaped BUY/SELL rows."""
+    legs = [
+        ledger.select(
+            pl.col("entry_time").alias("timestamp"),
+            pl.col("ticker"),
+            pl.lit("BUY").alias("side"),
+            pl.col("quantity"),
+            pl.col("entry_price").alias("price"),
+            pl.col("entry_commission").alias("commission"),
+            pl.int_range(pl.len()).alias("_trade"),
+            pl.lit(0).alias("_leg"),
+        ),
+        ledger.select(
+            pl.col("exit_time").alias("timestamp"),
+            pl.col("ticker"),
+            pl.lit("SELL").alias("side"),
+            pl.col("quantity"),
+            pl.col("exit_price").alias("price"),
+            pl.col("exit_commission").alias("commission"),
+            pl.int_range(pl.len()).alias("_trade"),
+            pl.lit(1).alias("_leg"),
+        ),
+    ]
+    return pl.concat(legs).sort(["_trade", "_leg"]).drop(["_trade", "_leg"])
@@ -3,27 +3,21 @@ Performance Caching Service
 Advanced caching strategies for improved performance
 """
 
-import os
-import json
 import hashlib
 import logging
 from typing import Any, Optional, Callable, Dict
-from datetime import timezone, datetime, timedelta
 from functools import wraps
 
-logger = logging.getLogger(__name__)
+from services.system.cache_service import get_cache_service
 
-# Try to import Redis
-try:
-    import redis
-    REDIS_AVAILABLE = True
-except ImportError:
-    REDIS_AVAILABLE = False
-    logger.warning("Redis not available. Install with: pip install redis")
+logger = logging.getLogger(__name__)
 
 
 class PerformanceCache:
-    """High-performance caching service with Redis backend."""
+    """
+    Function-result caching API over the shared two-tier CacheService
+    (byte-bounded LRU + Redis, single-flight misses, binary values).
+    """
     
     _instance = None
     _initialized = False
@@ -36,124 +30,28 @@ class PerformanceCache:
     def __init__(self):
         if not self._initialized:
             self._initialized = True
-            self._redis_client = None
-            self._local_cache = {}  # Fallback in-memory cache
-            self._init_redis()
-    
-    def _init_redis(self):
-        """Initialize Redis connection."""
-        if not REDIS_AVAILABLE:
-            logger.warning("Using in-memory cache (Redis not available)")
-            return
-        
-        try:
-            redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
-            self._redis_client = redis.from_url(
-                redis_url,
-                decode_responses=True,
-                socket_connect_timeout=5,
-                socket_timeout=5,
-                retry_on_timeout=True
-            )
-            # Test connection
-            self._redis_client.ping()
-            logger.info("Redis cache initialized")
-        except Exception as e:
-            logger.warning(f"Redis connection failed, using in-memory cache: {e}")
-            self._redis_client = None
+            self._cache = get_cache_service()
     
     def get(self, key: str, default: Any = None) -> Optional[Any]:
         """Get value from cache."""
-        try:
-            if self._redis_client:
-                value = self._redis_client.get(key)
-                if value:
-                    return json.loads(value)
-            else:
-                # Fallback to local cache
-                if key in self._local_cache:
-                    entry = self._local_cache[key]
-                    if entry['expires_at'] > datetime.now(timezone.utc):
-                        return entry['value']
-                    else:
-                        del self._local_cache[key]
-        except Exception as e:
-            logger.error(f"Cache get error: {e}")
-        
-        return default
+        value = self._cache.get(key)
+        return default if value is None else value
     
-    def set(self, key: str, value: Any, ttl: int = 3600):
+    def set(self, key: str, value: Any, ttl: Optional[int] = 3600):
         """Set value in cache with TTL."""
-        try:
-            if self._redis_client:
-                self._redis_client.setex(
-                    key,
-                    ttl,
-                    json.dumps(value, default=str)
-                )
-            else:
-                # Fallback to local cache
-                self._local_cache[key] = {
-                    'value': value,
-                    'expires_at': datetime.now(timezone.utc) + timedelta(seconds=ttl)
-                }
-                # Cleanup old entries
-                if len(self._local_cache) > 1000:
-                    self._cleanup_local_cache()
-        except Exception as e:
-            logger.error(f"Cache set error: {e}")
+        self._cache.set(key, value, ttl)
     
     def delete(self, key: str):
         """Delete key from cache."""
-        try:
-            if self._redis_client:
-                self._redis_client.delete(key)
-            else:
-                self._local_cache.pop(key, None)
-        except Exception as e:
-            logger.error(f"Cache delete error: {e}")
+        self._cache.delete(key)
     
     def clear(self, pattern: Optional[str] = None):
-        """Clear cache entries."""
-        try:
-            if self._redis_client:
-                if pattern:
-                    keys = self._redis_client.keys(pattern)
-                    if keys:
-                        self._redis_client.delete(*keys)
-                else:
-                    self._redis_client.flushdb()
-            else:
-                if pattern:
-                    # Simple pattern matching for local cache
-                    keys_to_delete = [k for k in self._local_cache.keys() if pattern in k]
-                    for k in keys_to_delete:
-                        del self._local_cache[k]
-                else:
-                    self._local_cache.clear()
-        except Exception as e:
-            logger.error(f"Cache clear error: {e}")
+        """Clear cache entries matching a glob pattern (all entries if None)."""
+        self._cache.clear_pattern(pattern or "*")
     
-    def _cleanup_local_cache(self):
-        """Remove expired entries from local cache."""
-        now = datetime.now(timezone.utc)
-        expired_keys = [
-            k for k, v in self._local_cache.items()
-            if v['expires_at'] <= now
-        ]
-        for k in expired_keys:
-            del self._local_cache[k]
-    
-    def get_or_set(self, key: str, func: Callable, ttl: int = 3600, *args, **kwargs) -> Any:
-        """Get from cache or compute and cache result."""
-        value = self.get(key)
-        if value is not None:
-            return value
-        
-        # Compute value
-        value = func(*args, **kwargs)
-        self.set(key, value, ttl)
-        return value
+    def get_or_set(self, key: str, func: Callable, ttl: Optional[int] = 3600, *args, **kwargs) -> Any:
+        """Get from cache or compute and cache result; concurrent misses compute once."""
+        return self._cache.get_or_compute(key, lambda: func(*args, **kwargs), ttl)
     
     def invalidate_pattern(self, pattern: str):
         """Invalidate all keys matching pattern."""
@@ -161,39 +59,20 @@ class PerformanceCache:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache performance statistics."""
-        stats = {
-            "type": "Redis" if self._redis_client else "In-Memory",
-            "active": True if (self._redis_client or self._local_cache is not None) else False,
-            "key_count": 0,
-            "memory_used_mb": 0,
-            "memory_max_mb": 0,
-            "hit_rate": 0.0,
-            "miss_rate": 0.0
+        metrics = self._cache.get_metrics()
+        hits = sum(ns["l1_hits"] + ns["l2_hits"] + ns["stale_hits"] for ns in metrics["namespaces"].values())
+        misses = sum(ns["misses"] for ns in metrics["namespaces"].values())
+        total = hits + misses
+        return {
+            "type": "Redis + In-Memory LRU" if metrics["l2"] else "In-Memory LRU",
+            "active": True,
+            "key_count": metrics["l1_entries"],
+            "memory_used_mb": metrics["l1_bytes"] / (1024 * 1024),
+            "memory_max_mb": metrics["l1_max_bytes"] / (1024 * 1024),
+            "hit_rate": hits / total if total else 0.0,
+            "miss_rate": misses / total if total else 0.0,
+            "namespaces": metrics["namespaces"],
         }
-        
-        try:
-            if self._redis_client:
-                info = self._redis_client.info()
-                stats["key_count"] = self._redis_client.dbsize()
-                stats["memory_used_mb"] = info.get("used_memory", 0) / (1024 * 1024)
-                stats["memory_max_mb"] = info.get("maxmemory", 0) / (1024 * 1024)
-                
-                # Calculate hit rate from Redis stats if available
-                hits = info.get("keyspace_hits", 0)
-                misses = info.get("keyspace_misses", 0)
-                total = hits + misses
-                if total > 0:
-                    stats["hit_rate"] = hits / total
-                    stats["miss_rate"] = misses / total
-            else:
-                stats["key_count"] = len(self._local_cache)
-                # Estimating memory for local cache is hard, using simplified estimate
-                stats["memory_used_mb"] = (len(self._local_cache) * 0.01) # 10KB per entry approx
-                stats["memory_max_mb"] = 100.0 # Default limit
-        except Exception as e:
-            logger.error(f"Error getting performance cache stats: {e}")
-            
-        return stats
 
 
 def cache_key(*args, **kwargs) -> str:
@@ -224,18 +103,7 @@ def cached(ttl: int = 3600, key_func: Optional[Callable] = None):
             else:
                 cache_key_str = f"{func.__module__}:{func.__name__}:{cache_key(*args, **kwargs)}"
             
-            # Try to get from cache
-            result = cache.get(cache_key_str)
-            if result is not None:
-                return result
-            
-            # Compute result
-            result = func(*args, **kwargs)
-            
-            # Cache result
-            cache.set(cache_key_str, result, ttl)
-            
-            return result
+            return cache.get_or_set(cache_key_str, func, ttl, *args, **kwargs)
         return wrapper
     return decorator
 
@@ -10,29 +10,103 @@ PURPOSE:
        
     2. TWAP (Time Weighted Average Price):
        - Executing evenly over a time period.
+
+    3. Basket scheduling:
+       - Many parent orders sliced at once against per-symbol intraday
+         volume curves (see volume_curves.py), and re-planned mid-session
+         as realized volume runs ahead of or behind the curve.
        
 ROADMAP: Phase 26 - Algorithmic Execution
 ==============================================================================
 """
 
 import logging
-from typing import Dict, Any, List
+from dataclasses import dataclass, replace
+from typing import Dict, Any, List, Optional, Sequence, Union
 import math
 
+import numpy as np
+from numpy.typing import NDArray
+
+from services.execution.volume_curves import (
+    SESSION_MINUTES, VolumeCurves, get_volume_curves, profile_to_curve,
+)
+
 logger = logging.getLogger(__name__)
 
+MinuteArg = Union[int, Sequence[int], NDArray]
+
+
+@dataclass
+class BasketSchedule:
+    """Child quantities for a basket of parent orders, one row per order."""
+    symbols: List[str]
+    quantities: NDArray  # (n,) parent quantities
+    boundaries: NDArray  # (n, slices + 1) session minutes
+    weights: NDArray  # (n, slices) expected share of each order's window volume
+    child_quantities: NDArray  # (n, slices) integers, rows sum to the quantity left to work
+    curve_cum: NDArray  # (n, minutes + 1) cumulative volume curve per order
+    adv: NDArray  # (n,) average daily volume, 0 when unknown
+    filled: Optional[NDArray] = None  # (n,) set by replan_basket
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def order(self, i: int) -> Dict[str, Any]:
+        return {
+            "symbol": self.symbols[i],
+            "quantity": int(self.quantities[i]),
+            "boundaries": self.boundaries[i].tolist(),
+            "child_quantities": self.child_quantities[i].tolist(),
+        }
+
+
+def _allocate(quantities: NDArray, weights: NDArray) -> NDArray:
+    """
+    Integer split of each row's quantity in proportion to weights.
+
+    Differences of round(q * cumulative share) sum exactly to q per row and
+    never move more than one unit away from the exact proportional split.
+    """
+    cum = np.cumsum(weights, axis=1)
+    total = cum[:, -1:]
+    share = np.divide(cum, total, out=np.zeros_like(cum), where=total > 0)
+    share[:, -1] = 1.0
+    targets = np.rint(quantities[:, None] * share).astype(np.int64)
+    return np.diff(targets, axis=1, prepend=0)
+
 class AlgoEngine:
-    def __init__(self):
+    def __init__(self, curves: Optional[VolumeCurves] = None):
         # Default "U-Shape" volume profile (Morning/Close heavy)
         # 10 buckets (e.g., 30 min chunks for a trading day)
         self.DEFAULT_VOLUME_PROFILE = [0.15, 0.10, 0.08, 0.07, 0.06, 0.06, 0.07, 0.08, 0.13, 0.20]
+        # Historical per-symbol curves; symbols without one use the U-shape above
+        self._curves = curves
+        default = profile_to_curve(self.DEFAULT_VOLUME_PROFILE)
+        self._default_cum = np.concatenate(([0.0], np.cumsum(default)))
+
+    @property
+    def curves(self) -> VolumeCurves:
+        """Injected curves, else the shared nightly set (re-read on every call)."""
+        return self._curves if self._curves is not None else get_volume_curves()
 
     def generate_vwap_schedule(self, 
                              total_quantity: int, 
-                             volume_profile: List[float] = None) -> List[int]:
+                             volume_profile: List[float] = None,
+                             symbol: Optional[str] = None,
+                             start_minute: int = 0,
+                             end_minute: int = SESSION_MINUTES,
+                             slices: Optional[int] = None) -> List[int]:
         """
         Slice a parent order into child orders based on volume profile.
+
+        With a symbol and no explicit profile, the symbol's historical
+        intraday curve over [start_minute, end_minute) is used instead.
         """
+        if volume_profile is None and symbol is not None:
+            schedule = self.schedule_basket([symbol], [total_quantity], start_minute, end_minute,
+                                            slices or len(self.DEFAULT_VOLUME_PROFILE))
+            return schedule.child_quantities[0].tolist()
         if volume_profile is None:
             volume_profile = self.DEFAULT_VOLUME_PROFILE
             
@@ -74,6 +148,106 @@ class AlgoEngine:
             
         return schedule
 
+    def schedule_basket(self,
+                        symbols: Sequence[str],
+                        quantities: Sequence[int],
+                        start_minutes: MinuteArg = 0,
+                        end_minutes: MinuteArg = SESSION_MINUTES,
+                        slices: int = 10,
+                        strategy: str = "VWAP") -> BasketSchedule:
+        """
+        Slice many parent orders in one pass.
+
+        Each order's window [start, end) of session minutes is cut into
+        equal-length slices; VWAP weights a slice by the symbol's curve volume
+        inside it, TWAP by its length. Start/end may be scalars or per-order.
+        """
+        if strategy not in ("VWAP", "TWAP"):
+            raise ValueError(f"Unknown strategy: {strategy}")
+        n = len(symbols)
+        qty = np.asarray(quantities, dtype=np.int64).reshape(n)
+        minutes = self._default_cum.size - 1
+        if strategy == "VWAP":
+            cum, adv, found = self.curves.cumulative(symbols)
+            cum[~found] = self._default_cum
+        else:
+            cum = np.broadcast_to(np.arange(minutes + 1) / minutes, (n, minutes + 1))
+            adv = np.zeros(n)
+        start = np.clip(np.broadcast_to(np.asarray(start_minutes, dtype=np.int64), (n,)), 0, minutes)
+        end = np.clip(np.broadcast_to(np.asarray(end_minutes, dtype=np.int64), (n,)), 0, minutes)
+        if np.any(end <= start):
+            raise ValueError("Each order needs end_minutes > start_minutes")
+        steps = np.arange(slices + 1)
+        bounds = start[:, None] + ((end - start)[:, None] * steps) // slices
+
+        weights = np.diff(np.take_along_axis(cum, bounds, axis=1), axis=1)
+        flat = weights.sum(axis=1) <= 0  # no curve volume in the window: spread by time
+        if flat.any():
+            weights[flat] = np.diff(bounds[flat], axis=1)
+        weights = weights / weights.sum(axis=1, keepdims=True)
+
+        return BasketSchedule(
+            symbols=list(symbols),
+            quantities=qty,
+            boundaries=bounds,
+            weights=weights,
+            child_quantities=_allocate(qty, weights),
+            curve_cum=np.array(cum),
+            adv=adv,
+        )
+
+    def replan_basket(self,
+                      schedule: BasketSchedule,
+                      now_minute: MinuteArg,
+                      filled: Sequence[float],
+                      realized_volume: Sequence[float],
+                      surprise_halflife: float = 30.0,
+                      max_surprise: float = 4.0) -> BasketSchedule:
+        """
+        Re-plan the unfilled quantity over what is left of each window.
+
+        realized_volume is the market volume traded since each order's start.
+        Its ratio to the curve's expectation (ADV x curve share) tilts the
+        remaining slices: a busier-than-usual market pulls quantity forward,
+        a quiet one pushes it back, with the tilt fading over
+        surprise_halflife minutes. Orders without ADV keep the plain curve.
+        Slices already over get 0; the unfilled rest is spread over the
+        current and future slices (or put in the last slice once the window
+        has ended, so it is not silently dropped).
+        """
+        n = len(schedule)
+        cum = schedule.curve_cum
+        bounds = schedule.boundaries
+        now = np.broadcast_to(np.asarray(now_minute, dtype=np.int64), (n,))
+        now = np.clip(now, bounds[:, 0], bounds[:, -1])
+        filled = np.asarray(filled, dtype=np.float64).reshape(n)
+        realized = np.asarray(realized_volume, dtype=np.float64).reshape(n)
+
+        rows = np.arange(n)
+        expected = schedule.adv * (cum[rows, now] - cum[rows, bounds[:, 0]])
+        ratio = np.divide(realized, expected, out=np.ones(n), where=expected > 0)
+        ratio = np.clip(ratio, 1.0 / max_surprise, max_surprise)
+
+        lo = np.maximum(bounds[:, :-1], now[:, None])
+        hi = np.maximum(bounds[:, 1:], now[:, None])
+        weights = np.take_along_axis(cum, hi, axis=1) - np.take_along_axis(cum, lo, axis=1)
+        ahead = (lo + hi) / 2.0 - now[:, None]
+        weights *= 1.0 + (ratio[:, None] - 1.0) * np.exp2(-ahead / surprise_halflife)
+        live = hi > lo
+        no_volume = live.any(axis=1) & (weights.sum(axis=1) <= 0)
+        weights[no_volume] = (hi - lo)[no_volume]
+        over = ~live.any(axis=1)
+        weights[over, -1] = 1.0
+
+        remaining = np.maximum(schedule.quantities - np.floor(filled + 1e-9).astype(np.int64), 0)
+        total = weights.sum(axis=1, keepdims=True)
+        return replace(
+            schedule,
+            weights=weights / total,
+            child_quantities=_allocate(remaining, weights),
+            filled=filled,
+        )
+
 # Singleton
 _instance = None
 
@@ -0,0 +1,636 @@
+"""
+==============================================================================
+FILE: services/execution/matching_engine.py
+ROLE: Simulated Matching Engine
+PURPOSE:
+    Event-driven fill model for PaperExchange and the backtesters. Replays
+    L2 depth and trade events and matches simulated orders against them.
+
+    1. Books:
+       - Per-symbol external L2 book (price -> size plus a bisect-sorted key
+         list per side) rebuilt from replayed depth updates.
+       - Per-symbol simulated orders in price-time priority (one FIFO queue
+         per price level), stop orders in trigger-price heaps.
+
+    2. Orders:
+       - MARKET, LIMIT, STOP (stop-market) and STOP_LIMIT; GTC or IOC.
+       - Aggressive orders walk the external book and fill partially level
+         by level. GTC remainders rest; IOC / MARKET remainders are cancelled.
+
+    3. Realism knobs:
+       - latency: order entry delay; an order reaches the book at
+         submit time + latency (cancel_latency for cancels).
+       - queue_position: fraction of the displayed size at a price that a
+         new resting order queues behind (1.0 = back of the queue).
+         The queue advances on trades at the level and on size decreases
+         (assumed to come from ahead of us); a resting order is filled by
+         trades that reach it or when the opposite side crosses its price.
+
+    Simulated orders never match each other: they all belong to one account,
+    so crossing them would be a self-trade. Liquidity taken from the external
+    book is removed locally until the feed next updates that level.
+    Timestamps are any monotonic number (seconds, ns, ...); latencies use the
+    same unit.
+==============================================================================
+"""
+
+import heapq
+import logging
+from bisect import bisect_left, insort
+from collections import deque
+from itertools import count
+from typing import Any, Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BUY, SELL = "BUY", "SELL"
+BID, ASK = "BID", "ASK"
+MARKET, LIMIT, STOP, STOP_LIMIT = "MARKET", "LIMIT", "STOP", "STOP_LIMIT"
+GTC, IOC = "GTC", "IOC"
+DEPTH, TRADE = "D", "T"
+
+ORDER_TYPES = (MARKET, LIMIT, STOP, STOP_LIMIT)
+DONE_STATUSES = ("FILLED", "CANCELLED", "REJECTED")
+
+_NEW, _CANCEL = 0, 1
+
+
+class Fill(NamedTuple):
+    order_id: str
+    symbol: str
+    side: str
+    price: float
+    quantity: float
+    ts: float
+    liquidity: str  # 'MAKER' (resting order filled) or 'TAKER'
+
+
+class SimOrder:
+    """A simulated order; `ahead` is the external size queued in front of it while resting."""
+
+    __slots__ = ("order_id", "symbol", "side", "order_type", "quantity", "price", "stop_price", "tif",
+                 "submitted_at", "arrival", "filled", "notional", "status", "ahead", "triggered")
+
+    def __init__(self, order_id: str, symbol: str, side: str, order_type: str, quantity: float,
+                 price: Optional[float], stop_price: Optional[float], tif: str, submitted_at: float,
+                 arrival: float):
+        self.order_id = order_id
+        self.symbol = symbol
+        self.side = side
+        self.order_type = order_type
+        self.quantity = quantity
+        self.price = price
+        self.stop_price = stop_price
+        self.tif = tif
+        self.submitted_at = submitted_at
+        self.arrival = arrival
+        self.filled = 0.0
+        self.notional = 0.0
+        self.status = "PENDING"
+        self.ahead = 0.0
+        self.triggered = False
+
+    @property
+    def remaining(self) -> float:
+        return self.quantity - self.filled
+
+    @property
+    def avg_price(self) -> Optional[float]:
+        return self.notional / self.filled if self.filled else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.order_id,
+            "symbol": self.symbol,
+            "side": self.side,
+            "type": self.order_type,
+            "quantity": self.quantity,
+            "price": self.price,
+            "stop_price": self.stop_price,
+            "tif": self.tif,
+            "filled": self.filled,
+            "avg_price": self.avg_price,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+        }
+
+
+class _SymbolBook:
+    """External L2 levels and resting simulated orders for one symbol."""
+
+    __slots__ = ("bids", "asks", "bid_keys", "ask_keys", "stale", "buys", "sells", "buy_keys", "sell_keys",
+                 "buy_stops", "sell_stops", "last_trade")
+
+    def __init__(self):
+        self.bids: Dict[float, float] = {}
+        self.asks: Dict[float, float] = {}
+        self.bid_keys: List[float] = []  # negated prices, ascending = best first
+        self.ask_keys: List[float] = []
+        self.stale = False  # level keys lag the dicts (updated while no simulated orders were live)
+        self.buys: Dict[float, Deque[SimOrder]] = {}
+        self.sells: Dict[float, Deque[SimOrder]] = {}
+        self.buy_keys: List[float] = []  # negated prices
+        self.sell_keys: List[float] = []
+        self.buy_stops: List[Tuple[float, int, SimOrder]] = []  # (stop, seq, order)
+        self.sell_stops: List[Tuple[float, int, SimOrder]] = []  # (-stop, seq, order)
+        self.last_trade: Optional[float] = None
+
+    def refresh(self) -> None:
+        if self.stale:
+            self.bid_keys = sorted([-p for p in self.bids])
+            self.ask_keys = sorted(self.asks)
+            self.stale = False
+
+
+class MatchingEngine:
+    """
+    Price-time priority matching of simulated orders against replayed L2 data.
+
+    Feed it with on_depth / on_trade (or run() over event tuples) and submit
+    or cancel orders at any point; fills are passed to on_fill (or collected
+    in .fills when no callback is given).
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        cancel_latency: Optional[float] = None,
+        queue_position: float = 1.0,
+        on_fill: Optional[Callable[[Fill], None]] = None,
+    ):
+        if not 0.0 <= queue_position <= 1.0:
+            raise ValueError("queue_position must be between 0 and 1")
+        self.latency = latency
+        self.cancel_latency = latency if cancel_latency is None else cancel_latency
+        self.queue_position = queue_position
+        self.fills: List[Fill] = []
+        self.on_fill = on_fill or self.fills.append
+        self.books: Dict[str, _SymbolBook] = {}
+        self.orders: Dict[str, SimOrder] = {}  # live (pending, resting or untriggered) orders
+        self.now = 0.0
+        self._pending: List[Tuple[float, int, int, SimOrder]] = []
+        self._seq = count()
+        self._ids = count(1)
+        self.stats = {"events": 0, "orders": 0, "fills": 0, "cancels": 0}
+
+    # ------------------------------------------------------------------
+    # Order entry
+    # ------------------------------------------------------------------
+
+    def submit(self, symbol: str, side: str, quantity: float, order_type: str = LIMIT,
+               price: Optional[float] = None, stop_price: Optional[float] = None, tif: str = GTC,
+               ts: Optional[float] = None, order_id: Optional[str] = None) -> SimOrder:
+        """Queue an order; it reaches the book `latency` after ts (default: engine clock)."""
+        side, order_type, tif = side.upper(), order_type.upper(), tif.upper()
+        if side not in (BUY, SELL):
+            raise ValueError(f"Invalid side: {side}")
+        if order_type not in ORDER_TYPES:
+            raise ValueError(f"Invalid order type: {order_type}")
+        if tif not in (GTC, IOC):
+            raise ValueError(f"Invalid time in force: {tif}")
+        if quantity <= 0:
+            raise ValueError("Quantity must be > 0")
+        if order_type in (LIMIT, STOP_LIMIT) and price is None:
+            raise ValueError(f"{order_type} order requires a price")
+        if order_type in (STOP, STOP_LIMIT) and stop_price is None:
+            raise ValueError(f"{order_type} order requires a stop_price")
+        submitted = self.now if ts is None else ts
+        order = SimOrder(order_id or f"SIM-{next(self._ids)}", symbol, side, order_type, quantity,
+                         price, stop_price, tif, submitted, submitted + self.latency)
+        self.orders[order.order_id] = order
+        self.stats["orders"] += 1
+        if order.arrival <= self.now:
+            self._arrive(order)
+        else:
+            heapq.heappush(self._pending, (order.arrival, next(self._seq), _NEW, order))
+        return order
+
+    def cancel(self, order_id: str, ts: Optional[float] = None) -> bool:
+        """Request a cancel; returns False if the order is unknown or already done."""
+        order = self.orders.get(order_id)
+        if order is None:
+            return False
+        arrival = (self.now if ts is None else ts) + self.cancel_latency
+        if arrival <= self.now:
+            self._cancel(order)
+        else:
+            heapq.heappush(self._pending, (arrival, next(self._seq), _CANCEL, order))
+        return True
+
+    def advance(self, ts: float) -> None:
+        """Move the clock to ts, delivering orders and cancels that arrive by then."""
+        pending = self._pending
+        while pending and pending[0][0] <= ts:
+            arrival, _, action, order = heapq.heappop(pending)
+            self.now = arrival
+            if action == _NEW:
+                self._arrive(order)
+            else:
+                self._cancel(order)
+        if ts > self.now:
+            self.now = ts
+
+    def _book(self, symbol: str) -> _SymbolBook:
+        """Book for symbol with its sorted level keys up to date."""
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = _SymbolBook()
+        elif book.stale:
+            book.refresh()
+        return book
+
+    def _arrive(self, order: SimOrder) -> None:
+        if order.status != "PENDING":
+            return  # cancelled while in flight
+        order.status = "OPEN"
+        book = self._book(order.symbol)
+        if order.order_type in (STOP, STOP_LIMIT):
+            if order.side == BUY:
+                heapq.heappush(book.buy_stops, (order.stop_price, next(self._seq), order))
+            else:
+                heapq.heappush(book.sell_stops, (-order.stop_price, next(self._seq), order))
+            self._check_stops(book)
+        else:
+            self._execute(book, order)
+
+    def _execute(self, book: _SymbolBook, order: SimOrder) -> None:
+        """Take liquidity up to the order's limit, then rest or cancel the remainder."""
+        limit = order.price if order.order_type in (LIMIT, STOP_LIMIT) else None
+        self._take(book, order, limit, None)
+        if order.status == "FILLED":
+            return
+        if limit is None or order.tif == IOC:
+            self._done(order, "CANCELLED")
+        else:
+            self._rest(book, order)
+
+    def _take(self, book: _SymbolBook, order: SimOrder, limit: Optional[float],
+              fill_price: Optional[float]) -> None:
+        """Walk the opposite external levels; fills at each level's price unless fill_price is given."""
+        if order.side == BUY:
+            levels, keys, sign = book.asks, book.ask_keys, 1.0
+        else:
+            levels, keys, sign = book.bids, book.bid_keys, -1.0
+        remaining = order.quantity - order.filled
+        while remaining > 0 and keys:
+            px = keys[0] * sign
+            if limit is not None and (px > limit if sign > 0 else px < limit):
+                break
+            size = levels[px]
+            take = size if size < remaining else remaining
+            if take >= size:
+                del levels[px]
+                del keys[0]
+            else:
+                levels[px] = size - take
+            remaining -= take
+            self._fill(order, px if fill_price is None else fill_price, take,
+                       "TAKER" if fill_price is None else "MAKER")
+
+    def _rest(self, book: _SymbolBook, order: SimOrder) -> None:
+        price = order.price
+        if order.side == BUY:
+            queues, keys, key, same_side = book.buys, book.buy_keys, -price, book.bids
+        else:
+            queues, keys, key, same_side = book.sells, book.sell_keys, price, book.asks
+        order.ahead = same_side.get(price, 0.0) * self.queue_position
+        queue = queues.get(price)
+        if queue is None:
+            queue = queues[price] = deque()
+            insort(keys, key)
+        queue.append(order)
+
+    def _unrest(self, book: _SymbolBook, order: SimOrder) -> None:
+        price = order.price
+        if order.side == BUY:
+            queues, keys, key = book.buys, book.buy_keys, -price
+        else:
+            queues, keys, key = book.sells, book.sell_keys, price
+        queue = queues.get(price)
+        if queue is None or order not in queue:
+            return
+        queue.remove(order)
+        if not queue:
+            del queues[price]
+            del keys[bisect_left(keys, key)]
+
+    def _cancel(self, order: SimOrder) -> None:
+        if order.status in DONE_STATUSES:
+            return
+        if order.status != "PENDING" and order.order_type in (LIMIT, STOP_LIMIT):
+            self._unrest(self._book(order.symbol), order)
+        # Untriggered stops are skipped lazily when they surface in the heap
+        self._done(order, "CANCELLED")
+        self.stats["cancels"] += 1
+
+    def _fill(self, order: SimOrder, price: float, quantity: float, liquidity: str) -> None:
+        order.filled += quantity
+        order.notional += price * quantity
+        if order.filled >= order.quantity:
+            self._done(order, "FILLED")
+        else:
+            order.status = "PARTIALLY_FILLED"
+        self.stats["fills"] += 1
+        self.on_fill(Fill(order.order_id, order.symbol, order.side, price, quantity, self.now, liquidity))
+
+    def _done(self, order: SimOrder, status: str) -> None:
+        order.status = status
+        self.orders.pop(order.order_id, None)
+
+    # ------------------------------------------------------------------
+    # Market data
+    # ------------------------------------------------------------------
+
+    def on_depth(self, symbol: str, side: str, price: float, size: float, ts: float) -> None:
+        """Set one external level (size 0 deletes it) and match anything it affects."""
+        if self._pending and self._pending[0][0] <= ts:
+            self.advance(ts)
+        self.now = ts
+        book = self.books.get(symbol)
+        if book is None or not (book.buys or book.sells or book.buy_stops or book.sell_stops):
+            # No simulated orders here: keep the levels, sort them when next needed
+            if book is None:
+                book = self.books[symbol] = _SymbolBook()
+            levels = book.bids if side == BID else book.asks
+            if size > 0:
+                levels[price] = size
+            else:
+                levels.pop(price, None)
+            book.stale = True
+            return
+        book.refresh()
+        if side == BID:
+            levels = book.bids
+            old = levels.get(price, 0.0)
+            if size > 0:
+                levels[price] = size
+                if not old:
+                    insort(book.bid_keys, -price)
+            elif old:
+                del levels[price]
+                keys = book.bid_keys
+                del keys[bisect_left(keys, -price)]
+            else:
+                return
+            if book.buys and size < old and price in book.buys:
+                self._advance_queue(book.buys[price], old - size)
+            if book.sell_keys and book.bid_keys and book.bid_keys[0] <= -book.sell_keys[0]:
+                self._cross(book, book.sells, book.sell_keys, 1.0)
+        else:
+            levels = book.asks
+            old = levels.get(price, 0.0)
+            if size > 0:
+                levels[price] = size
+                if not old:
+                    insort(book.ask_keys, price)
+            elif old:
+                del levels[price]
+                keys = book.ask_keys
+                del keys[bisect_left(keys, price)]
+            else:
+                return
+            if book.sells and size < old and price in book.sells:
+                self._advance_queue(book.sells[price], old - size)
+            if book.buy_keys and book.ask_keys and book.ask_keys[0] <= -book.buy_keys[0]:
+                self._cross(book, book.buys, book.buy_keys, -1.0)
+        if book.buy_stops or book.sell_stops:
+            self._check_stops(book)
+
+    def on_snapshot(self, symbol: str, bids: Iterable[Tuple[float, float]],
+                    asks: Iterable[Tuple[float, float]], ts: float) -> None:
+        """Replace the external book with (price, size) levels."""
+        book = self._book(symbol)
+        for side, levels, new in ((BID, book.bids, dict(bids)), (ASK, book.asks, dict(asks))):
+            for price in [p for p in levels if p not in new]:
+                self.on_depth(symbol, side, price, 0.0, ts)
+            for price, size in new.items():
+                self.on_depth(symbol, side, price, size, ts)
+
+    def on_trade(self, symbol: str, price: float, size: float, ts: float,
+                 aggressor: Optional[str] = None) -> None:
+        """
+        Apply a trade print: it executes resting orders at better prices first,
+        then works through the queue at its own price. The aggressor side is
+        inferred from the touch when not given.
+        """
+        if self._pending and self._pending[0][0] <= ts:
+            self.advance(ts)
+        self.now = ts
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = _SymbolBook()
+        book.last_trade = price
+        if not (book.buys or book.sells or book.buy_stops or book.sell_stops):
+            return
+        book.refresh()
+        if aggressor is None:
+            best_bid = -book.bid_keys[0] if book.bid_keys else None
+            best_ask = book.ask_keys[0] if book.ask_keys else None
+            if best_bid is not None and best_ask is not None:
+                aggressor = SELL if price <= (best_bid + best_ask) / 2 else BUY
+            else:
+                aggressor = SELL if best_ask is None else BUY
+        if aggressor.upper() == SELL:
+            self._trade_through(book, book.buys, book.buy_keys, book.bids, book.bid_keys, -1.0, price, size)
+        else:
+            self._trade_through(book, book.sells, book.sell_keys, book.asks, book.ask_keys, 1.0, price, size)
+        if book.buy_stops or book.sell_stops:
+            self._check_stops(book)
+
+    def run(self, events: Iterable[Tuple[float, str, str, Optional[str], float, float]]) -> int:
+        """
+        Replay (ts, kind, symbol, side, price, size) tuples: kind 'D' is a depth
+        update (side BID/ASK), kind 'T' a trade (side = aggressor BUY/SELL or None).
+        Returns the number of events processed.
+        """
+        on_depth, on_trade = self.on_depth, self.on_trade
+        books, pending = self.books, self._pending
+        n = 0
+        for ts, kind, symbol, side, price, size in events:
+            n += 1
+            book = books.get(symbol)
+            if (book is None or book.buys or book.sells or book.buy_stops or book.sell_stops
+                    or (pending and pending[0][0] <= ts)):
+                if kind == DEPTH:
+                    on_depth(symbol, side, price, size, ts)
+                else:
+                    on_trade(symbol, price, size, ts, side)
+                continue
+            # Same as the no-order paths of on_depth / on_trade, inlined for replay speed
+            if kind != DEPTH:
+                book.last_trade = price
+                continue
+            levels = book.bids if side == BID else book.asks
+            if size > 0:
+                levels[price] = size
+            else:
+                levels.pop(price, None)
+            book.stale = True
+        if n:
+            self.now = max(self.now, ts)
+        self.stats["events"] += n
+        return n
+
+    # ------------------------------------------------------------------
+    # Matching internals
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _advance_queue(queue: Deque[SimOrder], decrease: float) -> None:
+        for order in queue:
+            order.ahead = order.ahead - decrease if order.ahead > decrease else 0.0
+
+    def _cross(self, book: _SymbolBook, queues: Dict[float, Deque[SimOrder]], keys: List[float],
+               sign: float) -> None:
+        """The opposite side moved through resting orders: fill them at their own prices."""
+        while keys:
+            price = keys[0] * sign
+            queue = queues[price]
+            order = queue[0]
+            self._take(book, order, price, price)
+            if order.status != "FILLED":
+                break  # crossing liquidity exhausted
+            queue.popleft()
+            if not queue:
+                del queues[price]
+                del keys[0]
+
+    def _trade_through(self, book: _SymbolBook, queues: Dict[float, Deque[SimOrder]], keys: List[float],
+                       levels: Dict[float, float], level_keys: List[float], sign: float, price: float,
+                       volume: float) -> None:
+        """Allocate trade volume to resting orders at prices at least as good as the print."""
+        while keys and volume > 0:
+            level_price = keys[0] * sign
+            if (level_price < price) if sign > 0 else (level_price > price):
+                break
+            queue = queues[level_price]
+            if level_price != price:
+                # Better-priced resting orders are ahead of everything at the print price
+                while queue and volume > 0:
+                    order = queue[0]
+                    qty = min(order.remaining, volume)
+                    volume -= qty
+                    self._fill(order, level_price, qty, "MAKER")
+                    if order.status == "FILLED":
+                        queue.popleft()
+            else:
+                volume, external = self._consume_queue(queue, volume)
+                if external:
+                    # Count the trade once: the feed's next size decrease here is net of it
+                    self._reduce_level(levels, level_keys, level_price * sign, level_price, external)
+            if queue:
+                break
+            del queues[level_price]
+            del keys[0]
+
+    def _consume_queue(self, queue: Deque[SimOrder], volume: float) -> Tuple[float, float]:
+        """
+        Trade volume at one level: external size ahead of each order goes first,
+        then the order. Returns (volume left, external volume consumed).
+        """
+        external = 0.0
+        for order in queue:
+            gap = order.ahead - external
+            if gap > 0:
+                take = gap if gap < volume else volume
+                external += take
+                volume -= take
+                if volume <= 0:
+                    break
+            qty = min(order.remaining, volume)
+            volume -= qty
+            self._fill(order, order.price, qty, "MAKER")
+            if volume <= 0:
+                break
+        while queue and queue[0].status == "FILLED":
+            queue.popleft()
+        if external:
+            for order in queue:
+                order.ahead = order.ahead - external if order.ahead > external else 0.0
+        return volume, external
+
+    @staticmethod
+    def _reduce_level(levels: Dict[float, float], keys: List[float], key: float, price: float,
+                      amount: float) -> None:
+        size = levels.get(price)
+        if size is None:
+            return
+        if size > amount:
+            levels[price] = size - amount
+        else:
+            del levels[price]
+            del keys[bisect_left(keys, key)]
+
+    def _check_stops(self, book: _SymbolBook) -> None:
+        """Trigger stops when a trade or the near touch reaches them (buy: bid/trade >= stop)."""
+        last = book.last_trade
+        while book.buy_stops:
+            stop, _, order = book.buy_stops[0]
+            best_bid = -book.bid_keys[0] if book.bid_keys else None
+            if not ((best_bid is not None and best_bid >= stop) or (last is not None and last >= stop)):
+                break
+            heapq.heappop(book.buy_stops)
+            self._trigger(book, order)
+        while book.sell_stops:
+            neg_stop, _, order = book.sell_stops[0]
+            best_ask = book.ask_keys[0] if book.ask_keys else None
+            if not ((best_ask is not None and best_ask <= -neg_stop) or (last is not None and last <= -neg_stop)):
+                break
+            heapq.heappop(book.sell_stops)
+            self._trigger(book, order)
+
+    def _trigger(self, book: _SymbolBook, order: SimOrder) -> None:
+        if order.status in DONE_STATUSES:
+            return
+        order.triggered = True
+        self._execute(book, order)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def best_bid(self, symbol: str) -> Optional[float]:
+        if symbol not in self.books:
+            return None
+        book = self._book(symbol)
+        return -book.bid_keys[0] if book.bid_keys else None
+
+    def best_ask(self, symbol: str) -> Optional[float]:
+        if symbol not in self.books:
+            return None
+        book = self._book(symbol)
+        return book.ask_keys[0] if book.ask_keys else None
+
+    def sweep_price(self, symbol: str, side: str, quantity: float) -> Optional[float]:
+        """
+        Average price a market order of this size would pay walking the
+        current book; depth beyond the last level is priced at that level.
+        """
+        if symbol not in self.books:
+            return None
+        book = self._book(symbol)
+        if side == BUY:
+            levels, keys, sign = book.asks, book.ask_keys, 1.0
+        else:
+            levels, keys, sign = book.bids, book.bid_keys, -1.0
+        if not keys:
+            return None
+        remaining, notional, px = quantity, 0.0, keys[0] * sign
+        for key in keys:
+            px = key * sign
+            take = min(levels[px], remaining)
+            notional += take * px
+            remaining -= take
+            if remaining <= 0:
+                break
+        return (notional + remaining * px) / quantity
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[SimOrder]:
+        return [o for o in self.orders.values() if symbol is None or o.symbol == symbol]
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats["open_orders"] = len(self.orders)
+        stats["pending"] = len(self._pending)
+        stats["symbols"] = len(self.books)
+        return stats
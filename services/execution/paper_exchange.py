@@ -9,7 +9,10 @@ PURPOSE:
     Features:
     - Cash Balance Tracking
     - Portfolio Positions Tracking
-    - Order Execution (Market Orders)
+    - Order Execution (Market Orders at a caller-supplied price)
+    - Book-based Execution (Market / Limit / Stop / IOC orders matched
+      against replayed L2 data by MatchingEngine, with order entry latency
+      and queue position simulation)
     - Slippage Simulation (Optional)
     - Commission Simulation
     
@@ -18,18 +21,30 @@ ROADMAP: Phase 23 - Paper Trading Simulator
 """
 
 import logging
-from typing import Dict, Any, List
+from collections import OrderedDict, deque
+from typing import Dict, Any, Deque, Iterable, Optional, Tuple
 import uuid
 from datetime import datetime
 
+from services.execution.matching_engine import BUY, SELL, LIMIT, GTC, Fill, MatchingEngine, SimOrder
+
 logger = logging.getLogger(__name__)
 
 class PaperExchange:
-    def __init__(self, initial_cash: float = 100000.0):
+    def __init__(self,
+                 initial_cash: float = 100000.0,
+                 latency: float = 0.0,
+                 queue_position: float = 1.0,
+                 history_size: int = 10000):
         self.cash = initial_cash
         self.positions: Dict[str, Dict[str, Any]] = {} # {'AAPL': {'quantity': 10, 'avg_price': 150.0}}
-        self.orders: List[Dict[str, Any]] = []
+        # Recent orders and fills only; a long replay must not grow memory without bound
+        self.orders: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self.fills: Deque[Fill] = deque(maxlen=history_size)
+        self.history_size = history_size
+        self._sim_orders: "OrderedDict[str, SimOrder]" = OrderedDict()
         self.COMMISSION_RATE = 0.0 # $0 simulated commissions for now
+        self.engine = MatchingEngine(latency=latency, queue_position=queue_position, on_fill=self._on_fill)
         
     def get_account_summary(self) -> Dict[str, Any]:
         """
@@ -55,43 +70,24 @@ class PaperExchange:
             
         cost = quantity * current_price
         
-        # BUY Logic
+        # BUY Logic (cash reserved by open engine buy orders is not available)
         if side == "BUY":
-            if cost > self.cash:
-                logger.warning(f"PAPER TRADE REJECTED: Insufficient Funds. Need ${cost}, have ${self.cash}")
+            available = self.cash - self._committed_cash()
+            if cost > available:
+                logger.warning(f"PAPER TRADE REJECTED: Insufficient Funds. Need ${cost}, have ${available}")
                 return {"status": "REJECTED", "reason": "Insufficient Funds"}
-                
-            self.cash -= cost
-            
-            # Update Position
-            if symbol not in self.positions:
-                self.positions[symbol] = {'quantity': 0, 'avg_price': 0.0}
-                
-            pos = self.positions[symbol]
-            old_qty = pos['quantity']
-            new_qty = old_qty + quantity
-            
-            # Weighted Average Price
-            old_cost = old_qty * pos['avg_price']
-            new_cost = old_cost + cost
-            pos['avg_price'] = new_cost / new_qty
-            pos['quantity'] = new_qty
             
-        # SELL Logic
+        # SELL Logic (shares reserved by open engine sell orders are not available)
         elif side == "SELL":
-            if symbol not in self.positions or self.positions[symbol]['quantity'] < quantity:
-                logger.warning(f"PAPER TRADE REJECTED: Insufficient Position. Have {self.positions.get(symbol, {}).get('quantity',0)}, need {quantity}")
+            available = self._sellable(symbol)
+            if available < quantity:
+                logger.warning(f"PAPER TRADE REJECTED: Insufficient Position. Have {available}, need {quantity}")
                 return {"status": "REJECTED", "reason": "Insufficient Position"}
                 
-            self.cash += cost
-            
-            # Update Position
-            self.positions[symbol]['quantity'] -= quantity
-            if self.positions[symbol]['quantity'] == 0:
-                del self.positions[symbol]
-                
         else:
             return {"status": "REJECTED", "reason": "Invalid Side"}
+
+        self._apply_fill(symbol, side, quantity, current_price)
             
         # Record Order
         order = {
@@ -108,6 +104,123 @@ class PaperExchange:
         
         return order
 
+    def _apply_fill(self, symbol: str, side: str, quantity: float, price: float):
+        """Move cash and update the position for one execution."""
+        cost = quantity * price
+        if side == "BUY":
+            self.cash -= cost
+            
+            # Update Position
+            if symbol not in self.positions:
+                self.positions[symbol] = {'quantity': 0, 'avg_price': 0.0}
+                
+            pos = self.positions[symbol]
+            old_qty = pos['quantity']
+            new_qty = old_qty + quantity
+            
+            # Weighted Average Price
+            old_cost = old_qty * pos['avg_price']
+            new_cost = old_cost + cost
+            pos['avg_price'] = new_cost / new_qty
+            pos['quantity'] = new_qty
+        else:
+            self.cash += cost
+            
+            # Update Position
+            pos = self.positions.get(symbol)
+            held = pos['quantity'] if pos else 0
+            if held < quantity:
+                # Entry checks reserve shares, so this only happens if a position is
+                # changed outside the exchange; keep cash and engine state consistent
+                logger.error(f"PAPER FILL OVERSOLD {symbol}: held {held}, sold {quantity}")
+            if pos is None or held <= quantity:
+                self.positions.pop(symbol, None)
+            else:
+                pos['quantity'] = held - quantity
+
+    def _committed_cash(self) -> float:
+        """Cash that open engine buy orders could still spend."""
+        return sum(o.remaining * (o.price or o.stop_price or self.engine.sweep_price(o.symbol, BUY, o.remaining) or 0.0)
+                   for o in self.engine.open_orders() if o.side == BUY)
+
+    def _sellable(self, symbol: str) -> float:
+        """Held shares not already reserved by open engine sell orders."""
+        held = self.positions.get(symbol, {}).get('quantity', 0)
+        return held - sum(o.remaining for o in self.engine.open_orders(symbol) if o.side == SELL)
+
+    def submit_order(self,
+                     symbol: str,
+                     quantity: float,
+                     side: str,
+                     order_type: str = LIMIT,
+                     limit_price: Optional[float] = None,
+                     stop_price: Optional[float] = None,
+                     tif: str = GTC,
+                     ts: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Send an order to the simulated matching engine. It fills against the
+        replayed book (see on_depth / on_trade / replay), possibly partially
+        or later; fills update cash and positions as they happen.
+        Args:
+            order_type: 'MARKET', 'LIMIT', 'STOP' or 'STOP_LIMIT'
+            tif: 'GTC' or 'IOC'
+        """
+        side = side.upper()
+        if quantity <= 0:
+            return {"status": "REJECTED", "reason": "Quantity must be > 0"}
+        if side not in (BUY, SELL):
+            return {"status": "REJECTED", "reason": "Invalid Side"}
+
+        if side == BUY:
+            # Buying power net of what open buy orders could still spend; a market
+            # order is priced at the average it would pay walking the current book
+            est_price = limit_price or stop_price or self.engine.sweep_price(symbol, BUY, quantity)
+            if est_price is None:
+                return {"status": "REJECTED", "reason": "No Market Price"}
+            if quantity * est_price > self.cash - self._committed_cash():
+                logger.warning(f"PAPER ORDER REJECTED: Insufficient Funds for {quantity} {symbol}")
+                return {"status": "REJECTED", "reason": "Insufficient Funds"}
+        else:
+            available = self._sellable(symbol)
+            if available < quantity:
+                logger.warning(f"PAPER ORDER REJECTED: Insufficient Position. Have {available}, need {quantity}")
+                return {"status": "REJECTED", "reason": "Insufficient Position"}
+
+        try:
+            order = self.engine.submit(symbol, side, quantity, order_type, limit_price, stop_price, tif, ts)
+        except ValueError as e:
+            return {"status": "REJECTED", "reason": str(e)}
+        self._sim_orders[order.order_id] = order
+        if len(self._sim_orders) > self.history_size:
+            self._sim_orders.popitem(last=False)
+        return order.to_dict()
+
+    def cancel_order(self, order_id: str, ts: Optional[float] = None) -> bool:
+        """Request a cancel (subject to the engine's cancel latency)."""
+        return self.engine.cancel(order_id, ts)
+
+    def get_order(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Current state of an order sent with submit_order (recent history only)."""
+        order = self._sim_orders.get(order_id)
+        return order.to_dict() if order is not None else None
+
+    def on_depth(self, symbol: str, side: str, price: float, size: float, ts: float):
+        """Feed one L2 level update ('BID' / 'ASK'; size 0 deletes)."""
+        self.engine.on_depth(symbol, side, price, size, ts)
+
+    def on_trade(self, symbol: str, price: float, size: float, ts: float, aggressor: Optional[str] = None):
+        """Feed one trade print."""
+        self.engine.on_trade(symbol, price, size, ts, aggressor)
+
+    def replay(self, events: Iterable[Tuple[float, str, str, Optional[str], float, float]]) -> int:
+        """Replay (ts, kind, symbol, side, price, size) market events through the engine."""
+        return self.engine.run(events)
+
+    def _on_fill(self, fill: Fill):
+        self._apply_fill(fill.symbol, fill.side, fill.quantity, fill.price)
+        self.fills.append(fill)
+        logger.debug(f"PAPER FILL: {fill.side} {fill.quantity} {fill.symbol} @ ${fill.price:.2f} ({fill.liquidity})")
+
 # Singleton
 _instance = None
 
@@ -28,6 +28,8 @@ from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional
 from schemas.orders import ExecutionStrategy, ExecutionResult
 from services.system.cache_service import get_cache_service
+from services.execution.algo_execution import get_algo_engine
+from services.execution.volume_curves import SESSION_MINUTES, session_minute
 
 logger = logging.getLogger(__name__)
 
@@ -115,12 +117,11 @@ class SmartExecutionService:
         """
         logger.info(f"Executing VWAP for {symbol}, quantity {total_quantity}")
         
-        # Get volume profile (simplified - would use real volume data)
-        volume_profile = await self._get_volume_profile(symbol, time_window_minutes)
+        start = start_time or datetime.now(timezone.utc)
+        volume_profile = await self._get_volume_profile(symbol, time_window_minutes, start)
         total_volume = sum(volume_profile.values())
         
         executions = []
-        start = start_time or datetime.now(timezone.utc)
         current_time = start
         remaining_quantity = total_quantity
         
@@ -217,12 +218,18 @@ class SmartExecutionService:
         # In production, fetch from market data service
         return 100.0  # Mock price
     
-    async def _get_volume_profile(self, symbol: str, minutes: int) -> Dict[int, float]:
-        """Get volume profile distribution (simplified)."""
-        # In production, fetch from volume profile service
-        # Return normalized volume percentages
-        num_slices = minutes // 5
-        return {i: 1.0 / num_slices for i in range(num_slices)}
+    async def _get_volume_profile(
+        self, symbol: str, minutes: int, start: Optional[datetime] = None
+    ) -> Dict[int, float]:
+        """Share of the window's volume per 5-minute slice, from the symbol's historical curve."""
+        num_slices = max(minutes // 5, 1)
+        start_minute = session_minute(start)
+        end_minute = min(start_minute + num_slices * 5, SESSION_MINUTES)
+        if end_minute <= start_minute:
+            # Outside the session: no curve to follow, spread evenly
+            return {i: 1.0 / num_slices for i in range(num_slices)}
+        schedule = get_algo_engine().schedule_basket([symbol], [0], start_minute, end_minute, num_slices)
+        return dict(enumerate(schedule.weights[0].tolist()))
     
     async def _calculate_market_impact(self, symbol: str, quantity: int) -> float:
         """Calculate estimated market impact (simplified)."""
@@ -0,0 +1,264 @@
+"""
+==============================================================================
+FILE: services/execution/volume_curves.py
+ROLE: Intraday Volume Curves
+PURPOSE:
+    Per-symbol historical intraday volume curves for VWAP scheduling.
+
+    1. Nightly build:
+       - Minute volume per (symbol, session day, minute of session) is
+         aggregated in SQL from the price_telemetry hypertable.
+       - Each session day is normalized to sum to 1 before days are
+         averaged, so one heavy session does not dominate the shape.
+         Symbols with few days are shrunk toward the cross-sectional
+         average curve. Average daily volume (ADV) is kept alongside.
+       - Saved as one compact .npz: symbol list, float32 curve matrix
+         (symbols x 390 session minutes) and the ADV vector.
+
+    2. Lookup:
+       - VolumeCurves serves rows for a list of symbols in one gather;
+         unknown symbols get the fallback curve. Cumulative rows make the
+         volume share of any window a difference of two entries.
+       - get_volume_curves() reloads the file whenever its mtime changes.
+
+SCHEDULING:
+    JobScheduler's "volume_curve_rebuild" job runs scheduled_curve_rebuild().
+==============================================================================
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Union
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+SESSION_TZ = "America/New_York"
+SESSION_OPEN_MINUTE = 9 * 60 + 30  # 09:30 local
+SESSION_MINUTES = 390
+DEFAULT_LOOKBACK_DAYS = 30  # calendar days, ~20 sessions
+DEFAULT_SHRINKAGE_DAYS = 2.0
+DEFAULT_CURVE_PATH = os.getenv("VOLUME_CURVE_PATH", "data/cache/volume_curves.npz")
+
+MINUTE_VOLUME_SQL = """
+    SELECT symbol,
+           (time AT TIME ZONE %(tz)s)::date AS day,
+           EXTRACT(EPOCH FROM (time AT TIME ZONE %(tz)s)::time)::int / 60 - %(open_minute)s AS minute,
+           SUM(volume) AS volume
+    FROM price_telemetry
+    WHERE time >= now() - make_interval(days => %(days)s)
+      AND volume > 0
+    GROUP BY 1, 2, 3
+"""
+
+
+def session_minute(ts: Optional[datetime] = None) -> int:
+    """Minutes since the session open for ts (default now), clipped to [0, SESSION_MINUTES]."""
+    ts = ts or datetime.now(timezone.utc)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    local = ts.astimezone(ZoneInfo(SESSION_TZ))
+    return min(max(local.hour * 60 + local.minute - SESSION_OPEN_MINUTE, 0), SESSION_MINUTES)
+
+
+def profile_to_curve(profile: Sequence[float], minutes: int = SESSION_MINUTES) -> NDArray:
+    """Spread a coarse bucket profile (e.g. AlgoEngine's 10 buckets) evenly over session minutes."""
+    weights = np.asarray(profile, dtype=np.float64)
+    widths = np.diff(np.linspace(0, minutes, len(weights) + 1).round().astype(np.int64))
+    per_minute = np.repeat(weights / widths, widths)
+    return per_minute / per_minute.sum()
+
+
+@dataclass
+class VolumeCurves:
+    """Normalized intraday curves (row sums to 1) and ADV per symbol."""
+    symbols: List[str]
+    curves: NDArray  # float32, (n_symbols, SESSION_MINUTES)
+    adv: NDArray  # float64, (n_symbols,)
+    built_at: float = 0.0
+    fallback: Optional[NDArray] = None
+    _index: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+        if self.fallback is None:
+            minutes = self.curves.shape[1] if self.curves.ndim == 2 else SESSION_MINUTES
+            self.fallback = (self.curves.mean(axis=0) if len(self.symbols)
+                             else np.full(minutes, 1.0 / minutes))
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    @property
+    def minutes(self) -> int:
+        return len(self.fallback)
+
+    def rows(self, symbols: Sequence[str]):
+        """(curves, adv, found) for symbols; unknown symbols get the fallback curve and ADV 0."""
+        idx = np.fromiter((self._index.get(s, -1) for s in symbols), dtype=np.int64, count=len(symbols))
+        found = idx >= 0
+        curves = np.empty((len(idx), self.minutes), dtype=np.float64)
+        curves[found] = self.curves[idx[found]]
+        curves[~found] = self.fallback
+        adv = np.zeros(len(idx))
+        adv[found] = self.adv[idx[found]]
+        return curves, adv, found
+
+    def cumulative(self, symbols: Sequence[str]):
+        """(cumulative curves with a leading 0 column, adv, found) for symbols."""
+        curves, adv, found = self.rows(symbols)
+        cum = np.zeros((curves.shape[0], curves.shape[1] + 1))
+        np.cumsum(curves, axis=1, out=cum[:, 1:])
+        return cum, adv, found
+
+    def save(self, path: str) -> None:
+        """Write atomically so readers never see a partial file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, symbols=np.array(self.symbols, dtype=str), curves=self.curves.astype(np.float32),
+                 adv=self.adv, built_at=np.array(self.built_at))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, fallback: Optional[NDArray] = None) -> "VolumeCurves":
+        with np.load(path) as data:
+            return cls(symbols=data["symbols"].tolist(), curves=data["curves"], adv=data["adv"],
+                       built_at=float(data["built_at"]), fallback=fallback)
+
+    @classmethod
+    def empty(cls, fallback: Optional[NDArray] = None) -> "VolumeCurves":
+        return cls(symbols=[], curves=np.zeros((0, SESSION_MINUTES), dtype=np.float32),
+                   adv=np.zeros(0), fallback=fallback)
+
+
+def build_volume_curves(
+    symbols: Sequence[str],
+    days: Sequence[Union[date, int]],
+    minutes: Sequence[int],
+    volumes: Sequence[float],
+    shrinkage_days: float = DEFAULT_SHRINKAGE_DAYS,
+    session_minutes: int = SESSION_MINUTES,
+) -> VolumeCurves:
+    """
+    Build curves from minute-volume columns (one row per symbol/day/minute).
+
+    Rows outside the session are ignored. A symbol seen on n days gets
+    (n * own_curve + k * average_curve) / (n + k) with k = shrinkage_days.
+    """
+    n_rows = len(symbols)
+    codes: Dict[str, int] = {}
+    sym = np.fromiter((codes.setdefault(s, len(codes)) for s in symbols), dtype=np.int64, count=n_rows)
+    day_keys = np.fromiter((d.toordinal() if isinstance(d, date) else d for d in days), dtype=np.int64, count=n_rows)
+    minute = np.asarray(minutes, dtype=np.int64)
+    volume = np.asarray(volumes, dtype=np.float64)
+    keep = (minute >= 0) & (minute < session_minutes) & (volume > 0)
+    sym, day_keys, minute, volume = sym[keep], day_keys[keep], minute[keep], volume[keep]
+
+    n_sym = len(codes)
+    _, day = np.unique(day_keys, return_inverse=True)
+    n_days = int(day.max()) + 1 if day.size else 0
+    sym_day = sym * n_days + day
+    day_total = np.bincount(sym_day, weights=volume, minlength=n_sym * n_days)
+    frac = volume / day_total[sym_day]
+    curves = np.bincount(sym * session_minutes + minute, weights=frac,
+                         minlength=n_sym * session_minutes).reshape(n_sym, session_minutes)
+    days_seen = np.count_nonzero(day_total.reshape(n_sym, n_days) > 0, axis=1) if n_days else np.zeros(n_sym)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        curves = curves / days_seen[:, None]
+        adv = day_total.reshape(n_sym, n_days).sum(axis=1) / days_seen if n_days else np.zeros(n_sym)
+    seen = days_seen > 0
+    curves[~seen] = 0.0
+    adv = np.where(seen, adv, 0.0)
+
+    average = curves[seen].mean(axis=0) if seen.any() else np.full(session_minutes, 1.0 / session_minutes)
+    weight = (days_seen / (days_seen + shrinkage_days))[:, None] if shrinkage_days > 0 else 1.0
+    curves = weight * curves + (1 - weight) * average
+    curves /= curves.sum(axis=1, keepdims=True)
+
+    return VolumeCurves(symbols=list(codes), curves=curves.astype(np.float32), adv=adv,
+                        built_at=time.time(), fallback=average)
+
+
+def load_minute_volume(lookback_days: int = DEFAULT_LOOKBACK_DAYS):
+    """(symbols, days, minutes, volumes) columns from price_telemetry for the lookback window."""
+    from utils.database_manager import db_manager
+    with db_manager.pg_cursor() as cur:
+        cur.execute(MINUTE_VOLUME_SQL, {"tz": SESSION_TZ, "open_minute": SESSION_OPEN_MINUTE,
+                                        "days": lookback_days})
+        rows = cur.fetchall()
+    if not rows:
+        return [], [], [], []
+    symbols, days, minutes, volumes = zip(*rows)
+    return list(symbols), list(days), list(minutes), [float(v) for v in volumes]
+
+
+_curves: Optional[VolumeCurves] = None
+_curves_stamp: Optional[float] = None  # mtime of the file _curves was loaded from
+_curves_lock = threading.Lock()
+
+
+def _file_stamp(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def get_volume_curves(path: Optional[str] = None) -> VolumeCurves:
+    """
+    Process-wide curves from the nightly file (empty if none yet).
+
+    The file's mtime is checked on every call, so processes other than the
+    one running the rebuild pick up new curves without a restart.
+    """
+    global _curves, _curves_stamp
+    path = path or DEFAULT_CURVE_PATH
+    stamp = _file_stamp(path)
+    if _curves is not None and stamp == _curves_stamp:
+        return _curves
+    with _curves_lock:
+        if _curves is None or stamp != _curves_stamp:
+            try:
+                _curves = VolumeCurves.load(path)
+                logger.info(f"Loaded volume curves for {len(_curves)} symbols from {path}")
+            except (OSError, KeyError, ValueError) as e:
+                logger.info(f"No volume curves at {path} ({e}); using the fallback profile")
+                _curves = _curves if _curves is not None else VolumeCurves.empty()
+            _curves_stamp = stamp
+    return _curves
+
+
+def rebuild_volume_curves(path: Optional[str] = None, lookback_days: int = DEFAULT_LOOKBACK_DAYS) -> VolumeCurves:
+    """Aggregate stored minute volume, rebuild, save and swap in the process-wide curves."""
+    global _curves, _curves_stamp
+    path = path or DEFAULT_CURVE_PATH
+    columns = load_minute_volume(lookback_days)
+    curves = build_volume_curves(*columns)
+    curves.save(path)
+    with _curves_lock:
+        _curves, _curves_stamp = curves, _file_stamp(path)
+    return curves
+
+
+async def scheduled_curve_rebuild() -> Dict[str, Any]:
+    """JobScheduler entry point: nightly rebuild after the close."""
+    started = time.perf_counter()
+    curves = await asyncio.get_running_loop().run_in_executor(None, rebuild_volume_curves)
+    return {
+        "symbols": len(curves),
+        "bytes": int(curves.curves.nbytes + curves.adv.nbytes),
+        "build_ms": round((time.perf_counter() - started) * 1000),
+    }
@@ -1,5 +1,6 @@
 import logging
 from typing import List, Dict, Any
+from services.price_telemetry_service import PriceTelemetryService
 
 logger = logging.getLogger(__name__)
 
@@ -18,21 +19,25 @@ class FXStreamConsumerService:
         if hasattr(self, '_initialized') and self._initialized:
             return
         self._initialized = True
+        self.telemetry = PriceTelemetryService()
         logger.info("FXStreamConsumerService initialized")
 
     def consume_batch(self, messages: List[Dict[str, Any]]):
         """
-        Process a batch of simulated Kafka messages.
+        Process a batch of Kafka messages, queueing each tick (mid price) for
+        the bulk TimescaleDB writer.
         """
-        processed_count = 0
+        pairs, mids, sources, times = [], [], [], []
         for msg in messages:
             pair = msg.get('pair')
             mid = msg.get('mid')
-            
-            # Simulate "Persist to TimescaleDB"
-            # db.execute("INSERT INTO price_telemetry ...")
-            
-            processed_count += 1
-            
+            if not pair or mid is None:
+                continue
+            pairs.append(pair)
+            mids.append(float(mid))
+            sources.append(msg.get('source') or "UNKNOWN")
+            times.append(msg.get('timestamp'))
+
+        processed_count = self.telemetry.store_ticks(pairs, mids, sources=sources, times=times)
         logger.info(f"FXConsumer: Processed {processed_count} ticks.")
         return processed_count
@@ -3,15 +3,30 @@
 FILE: services/indicators/indicator_engine.py
 ROLE: Technical Indicators Library
 PURPOSE: Provides 50+ technical indicators with parameter tuning and custom support.
+
+COMPUTATION:
+    Built-ins run as vectorized kernels (services/indicators/kernels.py).
+    calculate_indicators evaluates many indicators over one shared
+    IndicatorContext so intermediates (true range, rolling sums, EMAs) are
+    computed once per request. Results are memoized per
+    (ticker, indicator, params, bar count, last-bar timestamp, content
+    fingerprint) in an LRU; the fingerprint (CRC32 of the close and volume
+    columns) keeps series without timestamps from colliding.
 ==============================================================================
 """
 
 import logging
-import random
-from typing import Dict, Any, List, Optional
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 from datetime import datetime, timedelta
 from enum import Enum
 
+import numpy as np
+
+from services.indicators.kernels import KERNELS, IndicatorContext
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,6 +57,10 @@ BUILT_IN_INDICATORS = [
     {"id": "psar", "name": "Parabolic SAR", "category": IndicatorCategory.TREND, "params": [{"name": "af_step", "default": 0.02}, {"name": "af_max", "default": 0.2}]},
 ]
 
+_INDICATOR_DEFAULTS = {ind["id"]: {p["name"]: p["default"] for p in ind["params"]} for ind in BUILT_IN_INDICATORS}
+PERIOD_BARS = {"1M": 30, "3M": 90, "6M": 180, "1Y": 365}
+WARMUP_BARS = 200
+
 
 class IndicatorEngine:
     """
@@ -60,6 +79,11 @@ class IndicatorEngine:
             return
         self._initialized = True
         self._custom_indicators: Dict[str, Dict] = {}
+        self._results: "OrderedDict[Tuple, Dict[str, np.ndarray]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_size = 512
+        self._cache_hits = 0
+        self._cache_misses = 0
         logger.info("IndicatorEngine initialized with built-in indicators")
 
     def list_indicators(self) -> List[Dict[str, Any]]:
@@ -104,28 +128,164 @@ class IndicatorEngine:
         
         return None
 
-    def calculate_indicator(self, ticker: str, indicator_id: str, params: Dict[str, Any], period: str = "1M") -> Dict[str, Any]:
+    def calculate_indicator(
+        self,
+        ticker: str,
+        indicator_id: str,
+        params: Dict[str, Any],
+        period: str = "1M",
+        ohlcv: Optional[Mapping[str, Any]] = None
+    ) -> Dict[str, Any]:
         """Calculate indicator values for a ticker."""
-        # Generate mock data
-        base_date = datetime.now()
+        result = self.calculate_indicators(ticker, [{"id": indicator_id, "params": params}], period, ohlcv)
+        return result["indicators"][0]
+
+    def calculate_indicators(
+        self,
+        ticker: str,
+        requests: List[Dict[str, Any]],
+        period: str = "1M",
+        ohlcv: Optional[Mapping[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Calculate several indicators over one OHLCV series in a single pass.
+
+        Args:
+            ticker: Symbol the bars belong to (part of the cache key).
+            requests: [{"id": "rsi", "params": {"period": 14}}, ...]
+            period: Output window ("1M", "3M", ...); ignored when ohlcv is given.
+            ohlcv: Optional mapping/DataFrame with close (and ideally
+                open/high/low/volume/timestamp) columns. Defaults to the
+                engine's price loader.
+
+        Returns:
+            Dict with ticker, period and one result per request in order.
+        """
+        if ohlcv is None:
+            ohlcv, n_out = self._load_ohlcv(ticker, period), PERIOD_BARS.get(period, 365)
+        else:
+            n_out = None
+        timestamps = self._timestamps(ohlcv)
+        context: Optional[IndicatorContext] = None
+        last_bar = timestamps[-1] if len(timestamps) else None
+        fingerprint = self._fingerprint(ohlcv)
+
+        results = []
+        for request in requests:
+            indicator_id = request["id"]
+            params = {**_INDICATOR_DEFAULTS.get(indicator_id, {}), **(request.get("params") or {})}
+            if indicator_id not in KERNELS:
+                raise ValueError(f"Indicator '{indicator_id}' has no built-in kernel")
+            key = (ticker.upper(), indicator_id, tuple(sorted(params.items())), len(timestamps), last_bar, fingerprint)
+            outputs = self._cache_get(key)
+            if outputs is None:
+                if context is None:
+                    context = IndicatorContext(ohlcv)
+                outputs = KERNELS[indicator_id](context, **params)
+                self._cache_put(key, outputs)
+            results.append(self._format(ticker, indicator_id, params, period, timestamps, outputs, n_out))
+
+        return {
+            "ticker": ticker.upper(),
+            "period": period,
+            "indicators": results,
+            "calculated_at": datetime.now().isoformat()
+        }
+
+    def get_cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters for the indicator result cache."""
+        return {"size": len(self._results), "hits": self._cache_hits, "misses": self._cache_misses}
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._results.clear()
+            self._cache_hits = self._cache_misses = 0
+
+    def _cache_get(self, key: Tuple) -> Optional[Dict[str, np.ndarray]]:
+        with self._cache_lock:
+            outputs = self._results.get(key)
+            if outputs is None:
+                self._cache_misses += 1
+                return None
+            self._results.move_to_end(key)
+            self._cache_hits += 1
+            return outputs
+
+    def _cache_put(self, key: Tuple, outputs: Dict[str, np.ndarray]) -> None:
+        with self._cache_lock:
+            self._results[key] = outputs
+            self._results.move_to_end(key)
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+
+    @staticmethod
+    def _timestamps(ohlcv: Mapping[str, Any]) -> List[Any]:
+        if "timestamp" in ohlcv:
+            return list(ohlcv["timestamp"])
+        return list(range(len(ohlcv["close"])))
+
+    @staticmethod
+    def _fingerprint(ohlcv: Mapping[str, Any]) -> int:
+        """CRC32 over the close (and volume) bytes; cheap next to any kernel."""
+        crc = 0
+        for column in ("close", "volume"):
+            if column in ohlcv:
+                values = np.ascontiguousarray(np.asarray(ohlcv[column], dtype=np.float64))
+                crc = zlib.crc32(values.tobytes(), crc)
+        return crc
+
+    @staticmethod
+    def _format(
+        ticker: str,
+        indicator_id: str,
+        params: Dict[str, Any],
+        period: str,
+        timestamps: List[Any],
+        outputs: Dict[str, np.ndarray],
+        n_out: Optional[int]
+    ) -> Dict[str, Any]:
+        """JSON-ready rows; the primary output is `value`, others ride along."""
+        names = list(outputs)
+        start = 0 if n_out is None else max(0, len(timestamps) - n_out)
+        columns = [np.round(outputs[name][start:], 4) for name in names]
         values = []
-        num_points = 30 if period == "1M" else (90 if period == "3M" else 365)
-        
-        for i in range(num_points):
-            values.append({
-                "timestamp": (base_date - timedelta(days=num_points - i)).isoformat(),
-                "value": round(random.uniform(10, 100), 4)
-            })
-        
+        for offset, ts in enumerate(timestamps[start:]):
+            row = {"timestamp": ts.isoformat() if hasattr(ts, "isoformat") else ts}
+            for name, column in zip(names, columns):
+                value = column[offset]
+                row["value" if name == names[0] else name] = None if np.isnan(value) else float(value)
+            values.append(row)
         return {
             "ticker": ticker.upper(),
             "indicator": indicator_id,
             "params": params,
             "period": period,
+            "outputs": names,
             "values": values,
             "calculated_at": datetime.now().isoformat()
         }
 
+    def _load_ohlcv(self, ticker: str, period: str) -> Dict[str, Any]:
+        """
+        Daily OHLCV ending today, with warm-up history for long lookbacks.
+
+        In production, fetch from market data service. For now, a random walk
+        seeded by ticker so repeated requests see identical bars.
+        """
+        n = PERIOD_BARS.get(period, 365) + WARMUP_BARS
+        rng = np.random.default_rng(zlib.crc32(ticker.upper().encode()))
+        close = 100.0 * np.cumprod(1 + rng.normal(0.0005, 0.015, n))
+        spread = np.abs(rng.normal(0, 0.01, n)) * close
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return {
+            "timestamp": [today - timedelta(days=n - 1 - i) for i in range(n)],
+            "open": close * (1 + rng.normal(0, 0.003, n)),
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.integers(1_000_000, 10_000_000, n).astype(float),
+        }
+
     def create_custom_indicator(self, name: str, formula: str, params: List[Dict]) -> Dict[str, Any]:
         """Create a custom indicator."""
         cid = f"custom_{name.lower().replace(' ', '_')}"
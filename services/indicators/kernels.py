@@ -0,0 +1,323 @@
+"""
+==============================================================================
+FILE: services/indicators/kernels.py
+ROLE: Vectorized Indicator Kernels
+PURPOSE: NumPy implementations of every built-in indicator, operating on
+         whole OHLCV arrays at once.
+
+DESIGN:
+    IndicatorContext wraps one OHLCV series and memoizes intermediates
+    (true range, typical price, rolling sums/extremes, EMAs, Wilder
+    smoothing) so a multi-indicator request computes each of them once:
+    ATR and ADX share true range, CCI/MFI/VWAP share typical price, SMA and
+    Bollinger share the rolling sum, and so on.
+
+    Recursive smoothers (EMA, Wilder) run through scipy.signal.lfilter,
+    which evaluates the recurrence in C. Parabolic SAR is path-dependent
+    (its reversal state feeds the next bar) and is the only kernel that
+    loops per bar.
+
+    Warm-up bars are NaN; every output array has the input's length.
+==============================================================================
+"""
+
+from typing import Any, Callable, Dict, Mapping, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from numpy.typing import NDArray
+from scipy.signal import lfilter
+
+
+def _nan_like(x: NDArray) -> NDArray:
+    return np.full(x.shape, np.nan)
+
+
+def _safe_divide(numerator: NDArray, denominator: NDArray, fill: float = np.nan) -> NDArray:
+    out = np.full(np.broadcast(numerator, denominator).shape, fill)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+def _recursive_smooth(x: NDArray, alpha: float, start: int, seed: float) -> NDArray:
+    """y[start] = seed, y[t] = alpha * x[t] + (1 - alpha) * y[t-1] afterwards."""
+    out = _nan_like(x)
+    if start >= x.size:
+        return out
+    out[start] = seed
+    if start + 1 < x.size:
+        tail, _ = lfilter([alpha], [1.0, alpha - 1.0], x[start + 1:], zi=[(1.0 - alpha) * seed])
+        out[start + 1:] = tail
+    return out
+
+
+class IndicatorContext:
+    """
+    One OHLCV series plus memoized intermediates shared across kernels.
+    """
+
+    def __init__(self, ohlcv: Mapping[str, Any]):
+        self.close = np.asarray(ohlcv["close"], dtype=np.float64)
+        self.high = self._column(ohlcv, "high", self.close)
+        self.low = self._column(ohlcv, "low", self.close)
+        self.volume = self._column(ohlcv, "volume", np.ones_like(self.close))
+        self._memo: Dict[Tuple, NDArray] = {}
+
+    @staticmethod
+    def _column(ohlcv: Mapping[str, Any], name: str, default: NDArray) -> NDArray:
+        """Column from a dict, pandas or Polars frame; close-only input is allowed."""
+        return np.asarray(ohlcv[name], dtype=np.float64) if name in ohlcv else default
+
+    def __len__(self) -> int:
+        return self.close.size
+
+    def _cached(self, key: Tuple, compute: Callable[[], NDArray]) -> NDArray:
+        value = self._memo.get(key)
+        if value is None:
+            value = self._memo[key] = compute()
+        return value
+
+    def series(self, name: str) -> NDArray:
+        """Base OHLCV array or a named derived series."""
+        if name in ("close", "high", "low", "volume"):
+            return getattr(self, name)
+        if name == "typical":
+            return self._cached(("typical",), lambda: (self.high + self.low + self.close) / 3.0)
+        if name == "true_range":
+            return self._cached(("true_range",), self._true_range)
+        return self._memo[("derived", name)]
+
+    def _true_range(self) -> NDArray:
+        prev_close = np.concatenate(([self.close[0]], self.close[:-1])) if len(self) else self.close
+        return np.maximum(self.high, prev_close) - np.minimum(self.low, prev_close)
+
+    def rolling_sum(self, name: str, window: int, source: NDArray = None) -> NDArray:
+        """Trailing window sum via one shared cumulative sum per series."""
+        def compute() -> NDArray:
+            x = self.series(name) if source is None else source
+            out = _nan_like(x)
+            if window <= x.size:
+                csum = self._cached(("cumsum", name), lambda: np.concatenate(([0.0], np.cumsum(x))))
+                out[window - 1:] = csum[window:] - csum[:-window]
+            return out
+        return self._cached(("sum", name, window), compute)
+
+    def rolling_mean(self, name: str, window: int) -> NDArray:
+        return self._cached(("mean", name, window), lambda: self.rolling_sum(name, window) / window)
+
+    def _rolling_extreme(self, name: str, window: int, reducer: Callable) -> NDArray:
+        x = self.series(name)
+        out = _nan_like(x)
+        if window <= x.size:
+            out[window - 1:] = reducer(sliding_window_view(x, window), axis=1)
+        return out
+
+    def rolling_max(self, name: str, window: int) -> NDArray:
+        return self._cached(("max", name, window), lambda: self._rolling_extreme(name, window, np.max))
+
+    def rolling_min(self, name: str, window: int) -> NDArray:
+        return self._cached(("min", name, window), lambda: self._rolling_extreme(name, window, np.min))
+
+    def ema(self, name: str, period: int, source: NDArray = None) -> NDArray:
+        """EMA (alpha = 2 / (period + 1)) seeded with the first valid value."""
+        def compute() -> NDArray:
+            x = self.series(name) if source is None else source
+            valid = np.flatnonzero(~np.isnan(x))
+            if not valid.size:
+                return _nan_like(x)
+            start = int(valid[0])
+            return _recursive_smooth(x, 2.0 / (period + 1), start, float(x[start]))
+        return self._cached(("ema", name, period), compute)
+
+    def wilder(self, name: str, period: int, source: NDArray = None) -> NDArray:
+        """Wilder smoothing (alpha = 1 / period) seeded with the first full SMA."""
+        def compute() -> NDArray:
+            x = self.series(name) if source is None else source
+            valid = np.flatnonzero(~np.isnan(x))
+            if valid.size < period:
+                return _nan_like(x)
+            first = int(valid[0])
+            start = first + period - 1
+            return _recursive_smooth(x, 1.0 / period, start, float(x[first:start + 1].mean()))
+        return self._cached(("wilder", name, period), compute)
+
+    def derive(self, name: str, compute: Callable[[], NDArray]) -> NDArray:
+        """Register a named derived series (e.g. price change) for reuse."""
+        return self._cached(("derived", name), compute)
+
+
+# --------------------------------------------------------------------------
+# Kernels: (context, params) -> ordered dict of outputs, primary output first
+# --------------------------------------------------------------------------
+
+def _change(ctx: IndicatorContext) -> NDArray:
+    return ctx.derive("change", lambda: np.concatenate(([np.nan], np.diff(ctx.close))))
+
+
+def sma_kernel(ctx: IndicatorContext, period: int = 20) -> Dict[str, NDArray]:
+    return {"sma": ctx.rolling_mean("close", int(period))}
+
+
+def ema_kernel(ctx: IndicatorContext, period: int = 20) -> Dict[str, NDArray]:
+    return {"ema": ctx.ema("close", int(period))}
+
+
+def rsi_kernel(ctx: IndicatorContext, period: int = 14) -> Dict[str, NDArray]:
+    change = _change(ctx)
+    gains = ctx.derive("gain", lambda: np.where(np.isnan(change), np.nan, np.maximum(change, 0.0)))
+    losses = ctx.derive("loss", lambda: np.where(np.isnan(change), np.nan, np.maximum(-change, 0.0)))
+    avg_gain = ctx.wilder("gain", int(period), gains)
+    avg_loss = ctx.wilder("loss", int(period), losses)
+    rs = _safe_divide(avg_gain, avg_loss, fill=np.inf)
+    rsi = 100.0 - 100.0 / (1.0 + rs)
+    return {"rsi": np.where(np.isnan(avg_gain), np.nan, rsi)}
+
+
+def macd_kernel(ctx: IndicatorContext, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> Dict[str, NDArray]:
+    macd = ctx.ema("close", int(fast_period)) - ctx.ema("close", int(slow_period))
+    signal = ctx.ema(f"macd_{fast_period}_{slow_period}", int(signal_period), macd)
+    return {"macd": macd, "signal": signal, "histogram": macd - signal}
+
+
+def bb_kernel(ctx: IndicatorContext, period: int = 20, std_dev: float = 2) -> Dict[str, NDArray]:
+    period = int(period)
+    mid = ctx.rolling_mean("close", period)
+    squares = ctx.derive("close_sq", lambda: ctx.close * ctx.close)
+    variance = np.maximum(ctx.rolling_sum("close_sq", period, squares) / period - mid * mid, 0.0)
+    width = float(std_dev) * np.sqrt(variance)
+    return {"middle": mid, "upper": mid + width, "lower": mid - width}
+
+
+def atr_kernel(ctx: IndicatorContext, period: int = 14) -> Dict[str, NDArray]:
+    return {"atr": ctx.wilder("true_range", int(period))}
+
+
+def stoch_kernel(ctx: IndicatorContext, k_period: int = 14, d_period: int = 3) -> Dict[str, NDArray]:
+    highest = ctx.rolling_max("high", int(k_period))
+    lowest = ctx.rolling_min("low", int(k_period))
+    k = 100.0 * _safe_divide(ctx.close - lowest, highest - lowest, fill=50.0)
+    k = np.where(np.isnan(highest), np.nan, k)
+    d = _nan_like(k)
+    d_period = int(d_period)
+    valid = np.flatnonzero(~np.isnan(k))
+    if valid.size >= d_period:
+        start = int(valid[0])
+        d[start + d_period - 1:] = sliding_window_view(k[start:], d_period).mean(axis=1)
+    return {"k": k, "d": d}
+
+
+def obv_kernel(ctx: IndicatorContext) -> Dict[str, NDArray]:
+    direction = np.sign(np.nan_to_num(_change(ctx)))
+    return {"obv": np.cumsum(direction * ctx.volume)}
+
+
+def vwap_kernel(ctx: IndicatorContext) -> Dict[str, NDArray]:
+    price_volume = np.cumsum(ctx.series("typical") * ctx.volume)
+    return {"vwap": _safe_divide(price_volume, np.cumsum(ctx.volume))}
+
+
+def adx_kernel(ctx: IndicatorContext, period: int = 14) -> Dict[str, NDArray]:
+    period = int(period)
+    up = np.concatenate(([np.nan], np.diff(ctx.high)))
+    down = np.concatenate(([np.nan], -np.diff(ctx.low)))
+    plus_dm = ctx.derive("plus_dm", lambda: np.where(np.isnan(up), np.nan, np.where((up > down) & (up > 0), up, 0.0)))
+    minus_dm = ctx.derive("minus_dm", lambda: np.where(np.isnan(down), np.nan, np.where((down > up) & (down > 0), down, 0.0)))
+    true_range = ctx.derive("true_range_from_1", lambda: np.concatenate(([np.nan], ctx.series("true_range")[1:])))
+    smoothed_tr = ctx.wilder("true_range_from_1", period, true_range)
+    plus_di = 100.0 * _safe_divide(ctx.wilder("plus_dm", period, plus_dm), smoothed_tr)
+    minus_di = 100.0 * _safe_divide(ctx.wilder("minus_dm", period, minus_dm), smoothed_tr)
+    dx = 100.0 * _safe_divide(np.abs(plus_di - minus_di), plus_di + minus_di, fill=0.0)
+    dx = np.where(np.isnan(plus_di), np.nan, dx)
+    adx = ctx.wilder(f"dx_{period}", period, dx)
+    return {"adx": adx, "plus_di": plus_di, "minus_di": minus_di}
+
+
+def cci_kernel(ctx: IndicatorContext, period: int = 20) -> Dict[str, NDArray]:
+    period = int(period)
+    typical = ctx.series("typical")
+    mean = ctx.rolling_mean("typical", period)
+    deviation = _nan_like(typical)
+    if period <= typical.size:
+        windows = sliding_window_view(typical, period)
+        deviation[period - 1:] = np.abs(windows - mean[period - 1:, None]).mean(axis=1)
+    cci = _safe_divide(typical - mean, 0.015 * deviation, fill=0.0)
+    cci[np.isnan(mean)] = np.nan
+    return {"cci": cci}
+
+
+def williams_r_kernel(ctx: IndicatorContext, period: int = 14) -> Dict[str, NDArray]:
+    highest = ctx.rolling_max("high", int(period))
+    lowest = ctx.rolling_min("low", int(period))
+    value = -100.0 * _safe_divide(highest - ctx.close, highest - lowest, fill=50.0)
+    return {"williams_r": np.where(np.isnan(highest), np.nan, value)}
+
+
+def roc_kernel(ctx: IndicatorContext, period: int = 10) -> Dict[str, NDArray]:
+    period = int(period)
+    out = _nan_like(ctx.close)
+    if period < ctx.close.size:
+        out[period:] = 100.0 * (ctx.close[period:] / ctx.close[:-period] - 1.0)
+    return {"roc": out}
+
+
+def mfi_kernel(ctx: IndicatorContext, period: int = 14) -> Dict[str, NDArray]:
+    period = int(period)
+    typical = ctx.series("typical")
+    flow = typical * ctx.volume
+    step = np.concatenate(([0.0], np.diff(typical)))
+    positive = ctx.derive("mf_pos", lambda: np.where(step > 0, flow, 0.0))
+    negative = ctx.derive("mf_neg", lambda: np.where(step < 0, flow, 0.0))
+    pos_sum = ctx.rolling_sum("mf_pos", period, positive)
+    neg_sum = ctx.rolling_sum("mf_neg", period, negative)
+    ratio = _safe_divide(pos_sum, neg_sum, fill=np.inf)
+    mfi = 100.0 - 100.0 / (1.0 + ratio)
+    # The first bar has no prior typical price, so the window starts at bar 1
+    mfi[:period] = np.nan
+    return {"mfi": mfi}
+
+
+def psar_kernel(ctx: IndicatorContext, af_step: float = 0.02, af_max: float = 0.2) -> Dict[str, NDArray]:
+    high, low = ctx.high, ctx.low
+    n = high.size
+    sar = _nan_like(high)
+    if n < 2:
+        return {"psar": sar}
+    long = bool(ctx.close[1] >= ctx.close[0])
+    af = af_step
+    extreme = high[0] if long else low[0]
+    value = low[0] if long else high[0]
+    for i in range(1, n):
+        value = value + af * (extreme - value)
+        if long:
+            value = min(value, low[i - 1], low[i - 2] if i > 1 else low[i - 1])
+            if low[i] < value:
+                long, value, extreme, af = False, extreme, low[i], af_step
+            elif high[i] > extreme:
+                extreme, af = high[i], min(af + af_step, af_max)
+        else:
+            value = max(value, high[i - 1], high[i - 2] if i > 1 else high[i - 1])
+            if high[i] > value:
+                long, value, extreme, af = True, extreme, high[i], af_step
+            elif low[i] < extreme:
+                extreme, af = low[i], min(af + af_step, af_max)
+        sar[i] = value
+    return {"psar": sar}
+
+
+KERNELS: Dict[str, Callable[..., Dict[str, NDArray]]] = {
+    "sma": sma_kernel,
+    "ema": ema_kernel,
+    "rsi": rsi_kernel,
+    "macd": macd_kernel,
+    "bb": bb_kernel,
+    "atr": atr_kernel,
+    "stoch": stoch_kernel,
+    "obv": obv_kernel,
+    "vwap": vwap_kernel,
+    "adx": adx_kernel,
+    "cci": cci_kernel,
+    "williams_r": williams_r_kernel,
+    "roc": roc_kernel,
+    "mfi": mfi_kernel,
+    "psar": psar_kernel,
+}
@@ -0,0 +1,349 @@
+"""
+==============================================================================
+FILE: services/indicators/streaming.py
+ROLE: Incremental Indicator State
+PURPOSE: O(1)-per-bar EMA/RSI/MACD/ATR for live dashboards, so a new tick
+         never triggers a full-history recomputation.
+
+DESIGN:
+    - Each indicator keeps only its recursion state (last EMA, Wilder
+      averages, previous close). update(bar) returns the same values the
+      vectorized kernels produce for that bar, warm-up included.
+    - seed(ohlcv) runs one vectorized pass (services/indicators/kernels.py)
+      and lifts the final-bar state out of it; short histories are simply
+      replayed bar by bar.
+    - to_state()/indicator_from_state() round-trip through plain JSON types
+      so workers can checkpoint and resume without a warm-up.
+    - StreamingIndicatorService subscribes to RollingWindowService.add_price
+      and keeps one indicator set per symbol.
+==============================================================================
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Type, Union
+
+from services.indicators.kernels import IndicatorContext, atr_kernel, macd_kernel, rsi_kernel
+from services.rolling_window import rolling_window_service
+
+logger = logging.getLogger(__name__)
+
+Bar = Union[float, Mapping[str, float]]
+
+
+def _close(bar: Bar) -> float:
+    return float(bar["close"]) if isinstance(bar, Mapping) else float(bar)
+
+
+class _WilderAverage:
+    """SMA of the first `period` inputs, then x_t / period + (1 - 1/period) * prev."""
+
+    def __init__(self, period: int, count: int = 0, total: float = 0.0, value: Optional[float] = None):
+        self.period = period
+        self.count = count
+        self.total = total
+        self.value = value
+
+    def update(self, x: float) -> Optional[float]:
+        self.count += 1
+        if self.count < self.period:
+            self.total += x
+        elif self.count == self.period:
+            self.value = (self.total + x) / self.period
+        else:
+            self.value += (x - self.value) / self.period
+        return self.value
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"count": self.count, "total": self.total, "value": self.value}
+
+
+class _EMA:
+    """EMA seeded with its first input (pandas ewm(adjust=False) semantics)."""
+
+    def __init__(self, period: int, value: Optional[float] = None):
+        self.alpha = 2.0 / (period + 1)
+        self.value = value
+
+    def update(self, x: float) -> float:
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+class StreamingIndicator:
+    """Base class: subclasses define update, _seed_vectorized and state."""
+
+    kind = ""
+    warmup_bars = 1
+
+    def update(self, bar: Bar) -> Any:
+        raise NotImplementedError
+
+    @property
+    def value(self) -> Any:
+        raise NotImplementedError
+
+    def params(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def _state(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def _seed_vectorized(self, ctx: IndicatorContext) -> None:
+        raise NotImplementedError
+
+    def seed(self, ohlcv: Mapping[str, Any]) -> "StreamingIndicator":
+        """Initialise from history with one vectorized pass (or replay if short)."""
+        closes = ohlcv["close"]
+        if len(closes) <= self.warmup_bars:
+            highs = ohlcv["high"] if "high" in ohlcv else closes
+            lows = ohlcv["low"] if "low" in ohlcv else closes
+            for close, high, low in zip(closes, highs, lows):
+                self.update({"close": close, "high": high, "low": low})
+        else:
+            self._seed_vectorized(IndicatorContext(ohlcv))
+        return self
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-serializable checkpoint."""
+        return {"type": self.kind, "params": self.params(), "state": self._state()}
+
+
+class StreamingEMA(StreamingIndicator):
+    kind = "ema"
+
+    def __init__(self, period: int = 20):
+        self.period = period
+        self._ema = _EMA(period)
+
+    def update(self, bar: Bar) -> float:
+        return self._ema.update(_close(bar))
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._ema.value
+
+    def params(self) -> Dict[str, Any]:
+        return {"period": self.period}
+
+    def _state(self) -> Dict[str, Any]:
+        return {"value": self._ema.value}
+
+    def _restore(self, state: Dict[str, Any]) -> None:
+        self._ema.value = state["value"]
+
+    def _seed_vectorized(self, ctx: IndicatorContext) -> None:
+        self._ema.value = float(ctx.ema("close", self.period)[-1])
+
+
+class StreamingRSI(StreamingIndicator):
+    kind = "rsi"
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.warmup_bars = period + 1
+        self.prev_close: Optional[float] = None
+        self._gain = _WilderAverage(period)
+        self._loss = _WilderAverage(period)
+
+    def update(self, bar: Bar) -> Optional[float]:
+        close = _close(bar)
+        if self.prev_close is not None:
+            change = close - self.prev_close
+            self._gain.update(max(change, 0.0))
+            self._loss.update(max(-change, 0.0))
+        self.prev_close = close
+        return self.value
+
+    @property
+    def value(self) -> Optional[float]:
+        if self._gain.value is None:
+            return None
+        if self._loss.value == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self._gain.value / self._loss.value)
+
+    def params(self) -> Dict[str, Any]:
+        return {"period": self.period}
+
+    def _state(self) -> Dict[str, Any]:
+        return {"prev_close": self.prev_close, "gain": self._gain.to_state(), "loss": self._loss.to_state()}
+
+    def _restore(self, state: Dict[str, Any]) -> None:
+        self.prev_close = state["prev_close"]
+        self._gain = _WilderAverage(self.period, **state["gain"])
+        self._loss = _WilderAverage(self.period, **state["loss"])
+
+    def _seed_vectorized(self, ctx: IndicatorContext) -> None:
+        rsi_kernel(ctx, self.period)
+        n_changes = len(ctx) - 1
+        self.prev_close = float(ctx.close[-1])
+        self._gain = _WilderAverage(self.period, n_changes, value=float(ctx.wilder("gain", self.period)[-1]))
+        self._loss = _WilderAverage(self.period, n_changes, value=float(ctx.wilder("loss", self.period)[-1]))
+
+
+class StreamingMACD(StreamingIndicator):
+    kind = "macd"
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        self.fast_period, self.slow_period, self.signal_period = fast_period, slow_period, signal_period
+        self._fast = _EMA(fast_period)
+        self._slow = _EMA(slow_period)
+        self._signal = _EMA(signal_period)
+
+    def update(self, bar: Bar) -> Dict[str, float]:
+        close = _close(bar)
+        self._signal.update(self._fast.update(close) - self._slow.update(close))
+        return self.value
+
+    @property
+    def value(self) -> Optional[Dict[str, float]]:
+        if self._signal.value is None:
+            return None
+        macd = self._fast.value - self._slow.value
+        return {"macd": macd, "signal": self._signal.value, "histogram": macd - self._signal.value}
+
+    def params(self) -> Dict[str, Any]:
+        return {"fast_period": self.fast_period, "slow_period": self.slow_period, "signal_period": self.signal_period}
+
+    def _state(self) -> Dict[str, Any]:
+        return {"fast": self._fast.value, "slow": self._slow.value, "signal": self._signal.value}
+
+    def _restore(self, state: Dict[str, Any]) -> None:
+        self._fast.value, self._slow.value, self._signal.value = state["fast"], state["slow"], state["signal"]
+
+    def _seed_vectorized(self, ctx: IndicatorContext) -> None:
+        outputs = macd_kernel(ctx, self.fast_period, self.slow_period, self.signal_period)
+        self._fast.value = float(ctx.ema("close", self.fast_period)[-1])
+        self._slow.value = float(ctx.ema("close", self.slow_period)[-1])
+        self._signal.value = float(outputs["signal"][-1])
+
+
+class StreamingATR(StreamingIndicator):
+    kind = "atr"
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.warmup_bars = period
+        self.prev_close: Optional[float] = None
+        self._average = _WilderAverage(period)
+
+    def update(self, bar: Bar) -> Optional[float]:
+        close = _close(bar)
+        high = float(bar.get("high", close)) if isinstance(bar, Mapping) else close
+        low = float(bar.get("low", close)) if isinstance(bar, Mapping) else close
+        prev = close if self.prev_close is None else self.prev_close
+        self.prev_close = close
+        return self._average.update(max(high, prev) - min(low, prev))
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._average.value
+
+    def params(self) -> Dict[str, Any]:
+        return {"period": self.period}
+
+    def _state(self) -> Dict[str, Any]:
+        return {"prev_close": self.prev_close, "average": self._average.to_state()}
+
+    def _restore(self, state: Dict[str, Any]) -> None:
+        self.prev_close = state["prev_close"]
+        self._average = _WilderAverage(self.period, **state["average"])
+
+    def _seed_vectorized(self, ctx: IndicatorContext) -> None:
+        atr = atr_kernel(ctx, self.period)["atr"]
+        self.prev_close = float(ctx.close[-1])
+        self._average = _WilderAverage(self.period, len(ctx), value=float(atr[-1]))
+
+
+STREAMING_INDICATORS: Dict[str, Type[StreamingIndicator]] = {
+    cls.kind: cls for cls in (StreamingEMA, StreamingRSI, StreamingMACD, StreamingATR)
+}
+
+
+def create_streaming_indicator(indicator_id: str, **params: Any) -> StreamingIndicator:
+    if indicator_id not in STREAMING_INDICATORS:
+        raise ValueError(f"Indicator '{indicator_id}' has no streaming implementation")
+    return STREAMING_INDICATORS[indicator_id](**params)
+
+
+def indicator_from_state(checkpoint: Dict[str, Any]) -> StreamingIndicator:
+    """Rebuild an indicator from to_state() output."""
+    indicator = create_streaming_indicator(checkpoint["type"], **checkpoint["params"])
+    indicator._restore(checkpoint["state"])
+    return indicator
+
+
+class StreamingIndicatorService:
+    """
+    Per-symbol streaming indicators fed by RollingWindowService.add_price.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(StreamingIndicatorService, cls).__new__(cls)
+            cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._initialized = True
+        self._lock = threading.Lock()
+        self._indicators: Dict[str, Dict[str, StreamingIndicator]] = {}
+        rolling_window_service.subscribe(self.on_price)
+
+    def track(
+        self,
+        symbol: str,
+        name: str,
+        indicator: StreamingIndicator,
+        history: Optional[Mapping[str, Any]] = None,
+    ) -> StreamingIndicator:
+        """Register an indicator under `name`, optionally seeded from history."""
+        if history is not None and len(history["close"]):
+            indicator.seed(history)
+        with self._lock:
+            self._indicators.setdefault(symbol, {})[name] = indicator
+        return indicator
+
+    def untrack(self, symbol: str, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._indicators.pop(symbol, None)
+            else:
+                self._indicators.get(symbol, {}).pop(name, None)
+
+    def on_price(self, symbol: str, bar: Bar) -> Dict[str, Any]:
+        """Advance every indicator tracked for the symbol by one bar."""
+        with self._lock:
+            indicators = list(self._indicators.get(symbol, {}).items())
+        return {name: indicator.update(bar) for name, indicator in indicators}
+
+    def values(self, symbol: str) -> Dict[str, Any]:
+        return {name: ind.value for name, ind in self._indicators.get(symbol, {}).items()}
+
+    def checkpoint(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """JSON-serializable state of every tracked indicator."""
+        with self._lock:
+            return {
+                symbol: {name: ind.to_state() for name, ind in indicators.items()}
+                for symbol, indicators in self._indicators.items()
+            }
+
+    def restore(self, checkpoint: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+        """Replace tracked indicators with a checkpoint; no warm-up needed."""
+        restored = {
+            symbol: {name: indicator_from_state(state) for name, state in indicators.items()}
+            for symbol, indicators in checkpoint.items()
+        }
+        with self._lock:
+            self._indicators = restored
+
+    def list_symbols(self) -> List[str]:
+        return list(self._indicators)
+
+
+def get_streaming_indicator_service() -> StreamingIndicatorService:
+    return StreamingIndicatorService()
@@ -2,21 +2,38 @@ import json
 import hashlib
 import os
 import logging
-import time
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+from services.infrastructure.response_store import SQLiteResponseStore
+
 logger = logging.getLogger(__name__)
 
 class AgentResponseCache:
     """
     Persistent cache for agent LLM responses to reduce latency and API costs.
-    Uses JSON-based storage for now, easily migratable to Redis or SQLite.
+    Backed by a SQLiteResponseStore in cache_dir (WAL mode), so the API process
+    and ARQ workers share one cache with TTL expiry and size-bounded eviction.
+    Legacy per-response JSON files in cache_dir are imported once.
+    cache_dir defaults to AGENT_CACHE_DIR (data/cache/agents if unset).
     """
-    def __init__(self, cache_dir: str = "data/cache/agents"):
-        self.cache_dir = cache_dir
+    DB_FILENAME = "responses.sqlite3"
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.cache_dir = cache_dir or os.getenv("AGENT_CACHE_DIR", "data/cache/agents")
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
+        self.store = SQLiteResponseStore(
+            os.path.join(self.cache_dir, self.DB_FILENAME),
+            default_ttl=ttl_seconds if ttl_seconds is not None else float(os.getenv("AGENT_CACHE_TTL_SECONDS", 86400)),
+            max_bytes=max_bytes if max_bytes is not None else int(os.getenv("AGENT_CACHE_MAX_MB", 256)) * 1024 * 1024,
+        )
+        self._import_legacy_files()
         logger.info(f"AgentResponseCache initialized at {self.cache_dir}")
 
     def _generate_key(self, agent_id: str, prompt: str, system_message: Optional[str] = None) -> str:
@@ -24,83 +41,95 @@ class AgentResponseCache:
         content = f"{agent_id}:{system_message or ''}:{prompt}"
         return hashlib.md5(content.encode('utf-8')).hexdigest()
 
-    def get(self, agent_id: str, prompt: str, system_message: Optional[str] = None) -> Optional[str]:
-        """Retrieve a cached response if it exists."""
-        key = self._generate_key(agent_id, prompt, system_message)
-        file_path = os.path.join(self.cache_dir, f"{key}.json")
-        
-        if os.path.exists(file_path):
+    def _import_legacy_files(self) -> None:
+        """Load the old one-JSON-file-per-response layout into the store (first process only)."""
+        legacy = [f for f in os.listdir(self.cache_dir) if f.endswith(".json")]
+        if not legacy or not self.store.mark_once("legacy_imported"):
+            return
+        imported = 0
+        for f_name in legacy:
             try:
-                with open(file_path, 'r') as f:
+                with open(os.path.join(self.cache_dir, f_name), 'r') as f:
                     data = json.load(f)
-                    # Check TTL (default 24 hours) - simplified for now
-                    logger.info(f"Cache HIT for agent {agent_id}")
-                    return data.get("response")
+                cached_at = datetime.fromisoformat(data["cached_at"]).timestamp()
+                self.store.set(f_name[:-5], data.get("agent_id", ""), {
+                    "prompt": data.get("prompt"),
+                    "system_message": data.get("system_message"),
+                    "response": data.get("response"),
+                }, created_at=cached_at)
+                imported += 1
             except Exception as e:
-                logger.error(f"Error reading cache file {file_path}: {e}")
-        
-        return None
+                logger.error(f"Error importing legacy cache file {f_name}: {e}")
+        logger.info(f"AgentResponseCache imported {imported} legacy JSON entries")
+
+    def get(self, agent_id: str, prompt: str, system_message: Optional[str] = None) -> Optional[str]:
+        """Retrieve a cached response if it exists and has not expired."""
+        key = self._generate_key(agent_id, prompt, system_message)
+        try:
+            data = self.store.get(key)
+        except Exception as e:
+            logger.error(f"Error reading agent cache entry {key}: {e}")
+            return None
+        if data is None:
+            return None
+        logger.info(f"Cache HIT for agent {agent_id}")
+        return data.get("response")
 
-    def set(self, agent_id: str, prompt: str, response: str, system_message: Optional[str] = None) -> None:
+    def set(
+        self,
+        agent_id: str,
+        prompt: str,
+        response: str,
+        system_message: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
         """Store a response in the cache."""
         key = self._generate_key(agent_id, prompt, system_message)
-        file_path = os.path.join(self.cache_dir, f"{key}.json")
-        
         cache_data = {
-            "agent_id": agent_id,
             "prompt": prompt,
             "system_message": system_message,
             "response": response,
-            "cached_at": datetime.now().isoformat()
         }
-        
         try:
-            with open(file_path, 'w') as f:
-                json.dump(cache_data, f, indent=2)
+            self.store.set(key, agent_id, cache_data, ttl=ttl_seconds)
             logger.info(f"Cached response for agent {agent_id}")
         except Exception as e:
-            logger.error(f"Error writing to cache file {file_path}: {e}")
+            logger.error(f"Error writing agent cache entry {key}: {e}")
 
     def get_stats(self) -> Dict[str, Any]:
-        """Get cache statistics (file-based)."""
+        """Get cache statistics (O(1): read from the store's counters)."""
         try:
-            files = os.listdir(self.cache_dir)
-            total_size = sum(os.path.getsize(os.path.join(self.cache_dir, f)) for f in files if os.path.isfile(os.path.join(self.cache_dir, f)))
-            
+            stats = self.store.stats()
             return {
-                "type": "File System",
+                "type": "SQLite (WAL)",
                 "active": True,
-                "key_count": len(files),
-                "memory_used_mb": total_size / (1024 * 1024),
-                "memory_max_mb": 1024.0, # 1GB virtual limit
-                "hit_rate": 0.0, # Tracking hit/miss for files would need a counter
-                "miss_rate": 0.0
+                "key_count": stats["entries"],
+                "memory_used_mb": stats["bytes"] / (1024 * 1024),
+                "memory_max_mb": stats["max_bytes"] / (1024 * 1024),
+                "hit_rate": stats["hit_rate"],
+                "miss_rate": stats["miss_rate"],
+                "hits": stats["hits"],
+                "misses": stats["misses"],
+                "evictions": stats["evictions"],
+                "expirations": stats["expirations"],
             }
         except Exception as e:
             logger.error(f"Error getting agent cache stats: {e}")
             return {}
 
     def invalidate_pattern(self, pattern: str) -> int:
-        """Invalidate entries by pattern (simplistic glob match on agent_id in content)."""
-        # Since keys are MD5, we have to look inside or just clear all if pattern is '*'
-        count = 0
+        """
+        Invalidate entries by agent_id: '*' or '' clears everything, a glob
+        pattern ('Risk*') matches agent_ids, and a plain string matches any
+        agent_id containing it (as the file-based cache did).
+        """
         try:
-            if pattern == "*" or pattern == "":
-                for f in os.listdir(self.cache_dir):
-                    os.remove(os.path.join(self.cache_dir, f))
-                    count += 1
-            else:
-                # Iterate and check content - expensive but works for this scale
-                for f_name in os.listdir(self.cache_dir):
-                    f_path = os.path.join(self.cache_dir, f_name)
-                    with open(f_path, 'r') as f:
-                        data = json.load(f)
-                        if pattern in data.get("agent_id", ""):
-                            os.remove(f_path)
-                            count += 1
+            if pattern and not any(c in pattern for c in "*?["):
+                pattern = f"*{pattern}*"
+            return self.store.invalidate_glob(pattern)
         except Exception as e:
             logger.error(f"Error invalidating agent cache: {e}")
-        return count
+            return 0
 
 # Singleton helper
 _cache_instance = None
@@ -1,13 +1,163 @@
+import asyncio
+import inspect
 import logging
-from typing import Callable, List, Dict, Any
+import time
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+OVERFLOW_POLICIES = ("block", "drop_oldest", "coalesce")
+
+
+class _Subscription:
+    """
+    One handler on one topic. In async mode it owns a bounded asyncio.Queue
+    and a worker task that drains it, so a slow handler only backs up its
+    own queue. Under the 'block' policy, events that find the queue full
+    wait in one ordered backlog and move into the queue as it drains.
+    """
+
+    def __init__(
+        self,
+        topic: str,
+        handler: Callable,
+        max_queue: int,
+        overflow: str,
+        batch: bool,
+        max_batch: int,
+        key: Optional[Callable[[Dict[str, Any]], Any]],
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        if overflow == "coalesce" and key is None:
+            raise ValueError("coalesce overflow needs a key function")
+        self.topic = topic
+        self.handler = handler
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.batch = batch
+        self.max_batch = max(1, max_batch)
+        self.key = key
+        self.is_coroutine = inspect.iscoroutinefunction(handler)
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        # coalesce: the queue holds keys, the latest payload per key lives here
+        self.pending: Dict[Any, Tuple[float, Dict[str, Any]]] = {}
+        # block: (enqueued, payload, waiter or None) that found the queue full
+        self.backlog: Deque[Tuple[float, Dict[str, Any], Optional[asyncio.Future]]] = deque()
+        self.stats = {"delivered": 0, "dropped": 0, "coalesced": 0, "errors": 0,
+                      "max_queue_depth": 0, "max_backlog": 0, "latency_total": 0.0, "latency_max": 0.0}
+
+    @property
+    def depth(self) -> int:
+        return (self.queue.qsize() if self.queue is not None else 0) + len(self.backlog)
+
+    def start(self) -> None:
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    def offer(self, payload: Dict[str, Any]) -> bool:
+        """Enqueue without waiting; False when a 'block' queue is full or has a backlog."""
+        now = time.perf_counter()
+        if self.overflow == "coalesce":
+            k = self.key(payload)
+            if k in self.pending:
+                self.pending[k] = (self.pending[k][0], payload)
+                self.stats["coalesced"] += 1
+                return True
+            if self.queue.full():
+                self.pending.pop(self._drop_oldest(), None)
+            self.pending[k] = (now, payload)
+            self.queue.put_nowait(k)
+        elif self.queue.full() or self.backlog:
+            if self.overflow == "block":
+                return False
+            self._drop_oldest()
+            self.queue.put_nowait((now, payload))
+        else:
+            self.queue.put_nowait((now, payload))
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], self.queue.qsize())
+        return True
+
+    def _drop_oldest(self) -> Any:
+        item = self.queue.get_nowait()
+        self.queue.task_done()
+        self.stats["dropped"] += 1
+        return item
+
+    def defer(self, payload: Dict[str, Any], waiter: Optional[asyncio.Future] = None) -> None:
+        """Append to the backlog behind earlier deferred events."""
+        self.backlog.append((time.perf_counter(), payload, waiter))
+        self.stats["max_backlog"] = max(self.stats["max_backlog"], len(self.backlog))
+
+    async def put(self, payload: Dict[str, Any]) -> None:
+        """Enqueue, waiting (in backlog order) for room under the 'block' policy."""
+        if not self.offer(payload):
+            waiter = asyncio.get_running_loop().create_future()
+            self.defer(payload, waiter)
+            await waiter
+
+    def _refill(self) -> None:
+        """Move backlog events into the queue while it has room, releasing their publishers."""
+        while self.backlog and not self.queue.full():
+            enqueued, payload, waiter = self.backlog.popleft()
+            self.queue.put_nowait((enqueued, payload))
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
+
+    def discard_backlog(self) -> None:
+        """Drop deferred events and release anyone waiting on them."""
+        while self.backlog:
+            _, _, waiter = self.backlog.popleft()
+            self.stats["dropped"] += 1
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
+
+    def _take(self, item: Any) -> Tuple[float, Dict[str, Any]]:
+        return self.pending.pop(item) if self.overflow == "coalesce" else item
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [self._take(await self.queue.get())]
+            while len(items) < self.max_batch and not self.queue.empty():
+                items.append(self._take(self.queue.get_nowait()))
+            payloads = [p for _, p in items]
+            calls = [payloads] if self.batch else payloads
+            for arg in calls:
+                try:
+                    if self.is_coroutine:
+                        await self.handler(arg)
+                    else:
+                        await loop.run_in_executor(None, self.handler, arg)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(f"EventBus: Error in handler for '{self.topic}': {e}")
+            done = time.perf_counter()
+            for enqueued, _ in items:
+                latency = done - enqueued
+                self.stats["latency_total"] += latency
+                self.stats["latency_max"] = max(self.stats["latency_max"], latency)
+            self.stats["delivered"] += len(items)
+            for _ in items:
+                self.queue.task_done()
+            self._refill()
+
+
 class EventBusService:
     """
     Global Nervous System.
     Propagates events across the entire architecture.
     Example: 'Geopolitical Shock' (Phase 187) -> 'Margin Call' (Phase 136).
+
+    By default handlers run synchronously inside publish(). After
+    `await start()` every subscription gets its own bounded queue and
+    worker (see _Subscription); use `await apublish()` for backpressure
+    under the 'block' policy. A plain publish() on the loop thread cannot
+    wait, so its overflow goes to the subscriber's ordered backlog.
     """
     _instance = None
 
@@ -20,46 +170,106 @@ class EventBusService:
         if hasattr(self, '_initialized') and self._initialized:
             return
         self._initialized = True
-        self._subscribers: Dict[str, List[Callable]] = {}
+        self._subscribers: Dict[str, List[_Subscription]] = {}
         self._global_listeners: List[Callable] = []
-        self._history: Dict[str, List[Dict[str, Any]]] = {}
+        self._history: Dict[str, Deque[Dict[str, Any]]] = {}
         self._max_history = 1000
         self._stats: Dict[str, Dict[str, Any]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.default_max_queue = 1000
+        self.default_overflow = "block"
         logger.info("EventBusService initialized (Global Nervous System Active)")
 
+    @property
+    def is_async(self) -> bool:
+        return self._loop is not None
+
+    def _on_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    def _ensure_topic(self, topic: str) -> None:
+        if topic not in self._stats:
+            self._stats[topic] = {"publish_count": 0, "last_published": None}
+            self._history[topic] = deque(maxlen=self._max_history)
+
     def add_global_listener(self, listener: Callable):
-        """Register a callback for ALL topics."""
+        """Register a callback for ALL topics (always called inline by publish)."""
         self._global_listeners.append(listener)
         logger.info("EventBus: New global listener added")
 
-    def subscribe(self, topic: str, handler: Callable):
-        """Register a callback for a specific topic."""
-        if topic not in self._subscribers:
-            self._subscribers[topic] = []
-            self._stats[topic] = {"publish_count": 0, "last_published": None}
-            self._history[topic] = []
-        self._subscribers[topic].append(handler)
+    def subscribe(
+        self,
+        topic: str,
+        handler: Callable,
+        max_queue: Optional[int] = None,
+        overflow: Optional[str] = None,
+        batch: bool = False,
+        max_batch: int = 100,
+        key: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ):
+        """
+        Register a callback for a specific topic.
+
+        Async-mode options:
+            max_queue: Queue bound for this subscriber (default 1000).
+            overflow: 'block' (publisher waits), 'drop_oldest', or
+                'coalesce' (keep only the latest payload per key(payload)).
+            batch: Handler takes a list of up to max_batch payloads.
+        """
+        self._ensure_topic(topic)
+        sub = _Subscription(
+            topic, handler, max_queue or self.default_max_queue, overflow or self.default_overflow,
+            batch, max_batch, key,
+        )
+        self._subscribers.setdefault(topic, []).append(sub)
+        if self._loop is not None:
+            if self._on_loop():
+                sub.start()
+            else:
+                self._loop.call_soon_threadsafe(sub.start)
         logger.info(f"EventBus: New subscriber for '{topic}'")
 
-    def publish(self, topic: str, payload: Dict[str, Any]):
-        """Broadcast an event to all subscribers."""
-        logger.info(f"EventBus: Broadcasting '{topic}' -> {payload}")
-        
-        # Update metrics
-        if topic not in self._stats:
-            self._stats[topic] = {"publish_count": 0, "last_published": None}
-            self._history[topic] = []
-        
+    async def start(self) -> None:
+        """Switch to async delivery on the running event loop."""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        for subs in self._subscribers.values():
+            for sub in subs:
+                sub.start()
+        logger.info("EventBus: async delivery started")
+
+    async def stop(self, drain: bool = True) -> None:
+        """Optionally wait for queued events, then return to synchronous delivery."""
+        subs = [sub for subs in self._subscribers.values() for sub in subs if sub.task is not None]
+        if drain:
+            await asyncio.gather(*(self._drain(sub) for sub in subs))
+        for sub in subs:
+            sub.task.cancel()
+        await asyncio.gather(*(sub.task for sub in subs), return_exceptions=True)
+        for sub in subs:
+            sub.discard_backlog()
+            sub.task, sub.queue = None, None
+            sub.pending.clear()
+        self._loop = None
+
+    @staticmethod
+    async def _drain(sub: _Subscription) -> None:
+        # The worker refills from the backlog right after task_done()
+        await sub.queue.join()
+        while sub.backlog:
+            await sub.queue.join()
+
+    def _record(self, topic: str, payload: Dict[str, Any]) -> None:
+        logger.debug(f"EventBus: Broadcasting '{topic}' -> {payload}")
+        self._ensure_topic(topic)
+        now = datetime.now().isoformat()
         self._stats[topic]["publish_count"] += 1
-        self._stats[topic]["last_published"] = datetime.now().isoformat()
-        
-        # Store in history
-        self._history[topic].append({
-            "timestamp": datetime.now().isoformat(),
-            "payload": payload
-        })
-        if len(self._history[topic]) > self._max_history:
-            self._history[topic].pop(0)
+        self._stats[topic]["last_published"] = now
+        self._history[topic].append({"timestamp": now, "payload": payload})
 
         # Notify global listeners
         for listener in self._global_listeners:
@@ -68,30 +278,68 @@ class EventBusService:
             except Exception as e:
                 logger.error(f"EventBus: Error in global listener: {e}")
 
-        if topic in self._subscribers:
-            for handler in self._subscribers[topic]:
-                try:
-                    handler(payload)
-                except Exception as e:
-                    logger.error(f"EventBus: Error in handler for '{topic}': {e}")
+    def publish(self, topic: str, payload: Dict[str, Any]):
+        """Broadcast an event to all subscribers."""
+        if self._loop is not None:
+            if not self._on_loop():
+                # Other threads wait until every queue accepted the event
+                asyncio.run_coroutine_threadsafe(self.apublish(topic, payload), self._loop).result()
+                return
+            self._record(topic, payload)
+            for sub in self._subscribers.get(topic, []):
+                if not sub.offer(payload):
+                    # Cannot block the loop thread; park it in order behind the queue
+                    sub.defer(payload)
+            return
+
+        self._record(topic, payload)
+        for sub in self._subscribers.get(topic, []):
+            try:
+                sub.handler([payload] if sub.batch else payload)
+            except Exception as e:
+                logger.error(f"EventBus: Error in handler for '{topic}': {e}")
+
+    async def apublish(self, topic: str, payload: Dict[str, Any]) -> None:
+        """Publish, waiting for room in full 'block' queues (async mode)."""
+        if self._loop is None:
+            self.publish(topic, payload)
+            return
+        self._record(topic, payload)
+        for sub in self._subscribers.get(topic, []):
+            await sub.put(payload)
 
     def get_stats(self) -> Dict[str, Any]:
-        """Get throughput metrics per topic."""
+        """Get throughput, queue-depth and delivery-latency metrics per topic."""
+        topics = {}
+        for topic, base in self._stats.items():
+            subs = self._subscribers.get(topic, [])
+            delivered = sum(s.stats["delivered"] for s in subs)
+            latency = sum(s.stats["latency_total"] for s in subs)
+            topics[topic] = {
+                **base,
+                "subscribers": len(subs),
+                "queue_depth": sum(s.depth for s in subs),
+                "max_queue_depth": max((s.stats["max_queue_depth"] for s in subs), default=0),
+                "max_backlog": max((s.stats["max_backlog"] for s in subs), default=0),
+                "delivered": delivered,
+                "dropped": sum(s.stats["dropped"] for s in subs),
+                "coalesced": sum(s.stats["coalesced"] for s in subs),
+                "errors": sum(s.stats["errors"] for s in subs),
+                "avg_latency_ms": 1000 * latency / delivered if delivered else 0.0,
+                "max_latency_ms": 1000 * max((s.stats["latency_max"] for s in subs), default=0.0),
+            }
         return {
             "total_topics": len(self._stats),
-            "topics": self._stats
+            "total_messages": sum(s["publish_count"] for s in self._stats.values()),
+            "mode": "async" if self.is_async else "sync",
+            "topics": topics
         }
 
     def get_recent_messages(self, topic: str, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
-        """Recent messages for a topic (paginated)."""
+        """Recent messages for a topic (paginated), newest first."""
         if topic not in self._history:
             return []
-        
-        # Simple slicing for pagination on the list
-        messages = list(reversed(self._history[topic])) # Show newest first
-        start = offset
-        end = offset + limit
-        return messages[start:end]
+        return list(islice(reversed(self._history[topic]), offset, offset + limit))
 
     def get_all_topics_metadata(self) -> List[Dict[str, Any]]:
         """List all topics with metadata."""
@@ -104,5 +352,3 @@ class EventBusService:
                 "last_published": self._stats[topic]["last_published"]
             })
         return topics
-
-from datetime import datetime
@@ -0,0 +1,239 @@
+"""
+SQLite-backed store for cached agent responses.
+
+One WAL-mode database file is shared by the API process and the ARQ workers:
+readers never block the single writer, and a busy timeout serializes writers
+across processes. Bodies are zlib-compressed JSON; entry/byte totals are kept
+in a counters table by triggers so stats and eviction never scan the table.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    agent_id TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_agent ON responses(agent_id);
+CREATE INDEX IF NOT EXISTS idx_responses_expires ON responses(expires_at);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO counters VALUES ('entries', 0), ('bytes', 0), ('hits', 0), ('misses', 0),
+    ('evictions', 0), ('expirations', 0), ('legacy_imported', 0);
+CREATE TRIGGER IF NOT EXISTS responses_ins AFTER INSERT ON responses BEGIN
+    UPDATE counters SET value = value + 1 WHERE name = 'entries';
+    UPDATE counters SET value = value + NEW.size WHERE name = 'bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS responses_del AFTER DELETE ON responses BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = 'entries';
+    UPDATE counters SET value = value - OLD.size WHERE name = 'bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS responses_upd AFTER UPDATE OF size ON responses BEGIN
+    UPDATE counters SET value = value + NEW.size - OLD.size WHERE name = 'bytes';
+END;
+"""
+
+# Re-stamp accessed_at at most this often per entry so hits stay read-mostly
+ACCESS_STAMP_INTERVAL = 60.0
+
+
+class SQLiteResponseStore:
+    """
+    Key/value store for agent responses with TTL expiry, LRU eviction by total
+    compressed size, an agent_id index for invalidation, and hit/miss counters.
+
+    Connections are per thread and reopened after fork, so one instance is
+    safe to use from thread pools and from forked worker processes.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        default_ttl: float = 86400.0,
+        max_bytes: int = 256 * 1024 * 1024,
+        compress_level: int = 6,
+        counter_flush_every: int = 50,
+    ):
+        self.path = path
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.counter_flush_every = counter_flush_every
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE so the write lock is taken up front (no upgrade deadlocks)."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored record for key, or None when missing or expired."""
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT body, expires_at, accessed_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            if row is not None:
+                with self._transaction():
+                    if conn.execute("DELETE FROM responses WHERE key = ? AND expires_at <= ?", (key, now)).rowcount:
+                        self._bump(conn, "expirations", 1)
+            self._count(hit=False)
+            return None
+        if now - row[2] > ACCESS_STAMP_INTERVAL:
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self._count(hit=True)
+        return json.loads(zlib.decompress(row[0]))
+
+    def set(self, key: str, agent_id: str, record: Dict[str, Any], ttl: Optional[float] = None,
+            created_at: Optional[float] = None) -> None:
+        """Insert or replace a record; evicts least recently used entries past max_bytes."""
+        now = time.time()
+        created = created_at if created_at is not None else now
+        expires = created + (self.default_ttl if ttl is None else ttl)
+        body = zlib.compress(json.dumps(record).encode("utf-8"), self.compress_level)
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO responses (key, agent_id, body, size, created_at, expires_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET agent_id = excluded.agent_id, body = excluded.body,
+                    size = excluded.size, created_at = excluded.created_at,
+                    expires_at = excluded.expires_at, accessed_at = excluded.accessed_at
+                """,
+                (key, agent_id, body, len(body), created, expires, now),
+            )
+        if self._counter(conn, "bytes") > self.max_bytes:
+            self.evict()
+
+    def delete(self, key: str) -> bool:
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM responses WHERE key = ?", (key,)).rowcount > 0
+
+    def evict(self, target_ratio: float = 0.9) -> int:
+        """Drop expired entries, then the least recently used until under target_ratio * max_bytes."""
+        removed = 0
+        with self._transaction() as conn:
+            expired = conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),)).rowcount
+            self._bump(conn, "expirations", expired)
+            excess = self._counter(conn, "bytes") - int(self.max_bytes * target_ratio)
+            if excess > 0:
+                keys, freed = [], 0
+                cursor = conn.execute("SELECT key, size FROM responses ORDER BY accessed_at")
+                for key, size in cursor:
+                    keys.append((key,))
+                    freed += size
+                    if freed >= excess:
+                        break
+                cursor.close()
+                conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+                removed = len(keys)
+                self._bump(conn, "evictions", removed)
+        return removed + expired
+
+    def invalidate_agent(self, agent_id: str) -> int:
+        """Delete every entry for one agent (index lookup)."""
+        with self._transaction() as conn:
+            return conn.execute("DELETE FROM responses WHERE agent_id = ?", (agent_id,)).rowcount
+
+    def invalidate_glob(self, pattern: str) -> int:
+        """Delete entries whose agent_id matches a GLOB pattern; '*' clears everything."""
+        with self._transaction() as conn:
+            if pattern in ("", "*"):
+                return conn.execute("DELETE FROM responses").rowcount
+            return conn.execute("DELETE FROM responses WHERE agent_id GLOB ?", (pattern,)).rowcount
+
+    def _count(self, hit: bool) -> None:
+        # Hit/miss tallies are batched so reads don't each take the write lock
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+            pending = self._hits + self._misses
+        if pending >= self.counter_flush_every:
+            self.flush_counters()
+
+    def flush_counters(self) -> None:
+        with self._lock:
+            hits, misses, self._hits, self._misses = self._hits, self._misses, 0, 0
+        if hits or misses:
+            with self._transaction() as conn:
+                self._bump(conn, "hits", hits)
+                self._bump(conn, "misses", misses)
+
+    def mark_once(self, name: str) -> bool:
+        """Atomically flip a 0/1 counter; True only for the first caller across processes."""
+        with self._transaction() as conn:
+            return conn.execute("UPDATE counters SET value = 1 WHERE name = ? AND value = 0", (name,)).rowcount == 1
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, name: str, amount: int) -> None:
+        if amount:
+            conn.execute("UPDATE counters SET value = value + ? WHERE name = ?", (amount, name))
+
+    @staticmethod
+    def _counter(conn: sqlite3.Connection, name: str) -> int:
+        return conn.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Counter totals across all processes sharing the file."""
+        self.flush_counters()
+        counters = dict(self._conn().execute("SELECT name, value FROM counters"))
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "entries": counters["entries"],
+            "bytes": counters["bytes"],
+            "max_bytes": self.max_bytes,
+            "hits": counters["hits"],
+            "misses": counters["misses"],
+            "hit_rate": counters["hits"] / lookups if lookups else 0.0,
+            "miss_rate": counters["misses"] / lookups if lookups else 0.0,
+            "evictions": counters["evictions"],
+            "expirations": counters["expirations"],
+        }
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self.flush_counters()
+            conn.close()
+            self._local.conn = None
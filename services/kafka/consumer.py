@@ -10,6 +10,23 @@ PATTERN:
     Agents inherit from BaseConsumer and implement process_message().
     The consumer handles connection, deserialization, and error recovery.
 
+BATCH MODE:
+    With ConsumerConfig(batch_mode=True) the loop pulls up to max_batch_size
+    messages per consume() call (waiting at most max_batch_latency_ms),
+    hands them to process_batch() and commits offsets manually once the
+    batch succeeds. A failed batch is rewound and redelivered; after
+    max_batch_retries failed deliveries of the same slice it is replayed one
+    message at a time, and messages that still fail go to
+    handle_dead_letter() (logged, and produced to dead_letter_topic when
+    set) and are skipped, so one poison message cannot stall a partition.
+    process_batch() defaults to calling process_message() per payload;
+    override it to work on the whole batch.
+
+    With partition_workers > 0 each partition's slice runs on a worker
+    thread and commits independently. process_batch() is then called
+    concurrently on the same instance, so any state it shares across
+    partitions must be thread-safe.
+
 USAGE:
     class VIXConsumer(BaseConsumer):
         def process_message(self, message):
@@ -17,15 +34,31 @@ USAGE:
 ==============================================================================
 """
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import json
 import os
 import logging
 import threading
+import time
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# Fastest available JSON decoder: orjson, then msgspec, then the stdlib
+try:
+    import orjson
+    _json_loads = orjson.loads
+    JSON_DECODER = "orjson"
+except ImportError:
+    try:
+        import msgspec
+        _json_loads = msgspec.json.decode
+        JSON_DECODER = "msgspec"
+    except ImportError:
+        _json_loads = json.loads
+        JSON_DECODER = "json"
+
 
 @dataclass
 class ConsumerConfig:
@@ -36,6 +69,12 @@ class ConsumerConfig:
     enable_auto_commit: bool = True
     max_poll_interval_ms: int = 300000
     session_timeout_ms: int = 45000
+    batch_mode: bool = False
+    max_batch_size: int = 200
+    max_batch_latency_ms: int = 50
+    partition_workers: int = 0
+    max_batch_retries: int = 3
+    dead_letter_topic: Optional[str] = None
 
 
 class BaseConsumer(ABC):
@@ -73,6 +112,15 @@ class BaseConsumer(ABC):
         self.is_running = False
         self._error_count = 0
         self._max_errors = 10  # Circuit breaker threshold
+        self._workers: Optional[ThreadPoolExecutor] = None
+        self._dead_letter_producer = None
+        # (topic, partition) -> (first offset of the failing slice, failed deliveries)
+        self._batch_attempts: Dict[Tuple[str, int], Tuple[int, int]] = {}
+        self._batch_stats = {
+            'batches': 0, 'messages': 0, 'decode_errors': 0,
+            'failed_batches': 0, 'commits': 0, 'process_seconds': 0.0,
+            'dead_letters': 0,
+        }
         
         logger.info(f"BaseConsumer initialized for topics: {config.topics}")
     
@@ -86,7 +134,8 @@ class BaseConsumer(ABC):
                     'bootstrap.servers': self.bootstrap_servers,
                     'group.id': self.config.group_id,
                     'auto.offset.reset': self.config.auto_offset_reset,
-                    'enable.auto.commit': self.config.enable_auto_commit,
+                    # Batch mode commits offsets itself after each successful batch
+                    'enable.auto.commit': self.config.enable_auto_commit and not self.config.batch_mode,
                     'max.poll.interval.ms': self.config.max_poll_interval_ms,
                     'session.timeout.ms': self.config.session_timeout_ms,
                 })
@@ -106,6 +155,39 @@ class BaseConsumer(ABC):
         Must be implemented by subclasses.
         """
         pass
+
+    def process_batch(self, messages: List[Dict[str, Any]]) -> None:
+        """
+        Process a batch of deserialized messages (batch mode).
+
+        Raising fails the whole batch, which is then redelivered. The
+        default dispatches to process_message() in order. With
+        partition_workers > 0 this runs concurrently on the same instance.
+        """
+        for message in messages:
+            self.process_message(message)
+
+    def handle_dead_letter(self, message: Dict[str, Any], error: Exception) -> None:
+        """
+        Called for a message that keeps failing after its batch exhausted
+        max_batch_retries; the message is then skipped. Logs it and, when
+        dead_letter_topic is configured, produces it there.
+        """
+        logger.error(f"Skipping message after {self.config.max_batch_retries} failed batches: {error}")
+        if not self.config.dead_letter_topic:
+            return
+        try:
+            if self._dead_letter_producer is None:
+                from confluent_kafka import Producer
+                self._dead_letter_producer = Producer({'bootstrap.servers': self.bootstrap_servers})
+            self._dead_letter_producer.produce(
+                self.config.dead_letter_topic,
+                value=json.dumps({'message': message, 'error': str(error),
+                                  'group_id': self.config.group_id}, default=str).encode(),
+            )
+            self._dead_letter_producer.poll(0)
+        except Exception as e:
+            logger.error(f"Failed to publish dead letter to {self.config.dead_letter_topic}: {e}")
     
     def deserialize(self, raw_message: bytes) -> Optional[Dict[str, Any]]:
         """
@@ -117,9 +199,18 @@ class BaseConsumer(ABC):
         Returns:
             Deserialized dictionary, or None if deserialization fails.
         """
+        if raw_message is None:
+            return None
+        try:
+            return _json_loads(raw_message)
+        except ValueError as e:
+            if _json_loads is json.loads:
+                logger.error(f"Failed to deserialize message: {e}")
+                return None
+        # The fast decoders reject NaN/Infinity, which json.dumps emits by default
         try:
-            return json.loads(raw_message.decode('utf-8'))
-        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return json.loads(raw_message)
+        except ValueError as e:
             logger.error(f"Failed to deserialize message: {e}")
             return None
     
@@ -133,8 +224,13 @@ class BaseConsumer(ABC):
         self.is_running = True
         self._error_count = 0
         
+        if self.config.batch_mode and self.config.partition_workers > 0:
+            self._workers = ThreadPoolExecutor(
+                max_workers=self.config.partition_workers,
+                thread_name_prefix=f"{self.config.group_id}-partition",
+            )
         self._consume_thread = threading.Thread(
-            target=self._consume_loop,
+            target=self._consume_batch_loop if self.config.batch_mode else self._consume_loop,
             daemon=True
         )
         self._consume_thread.start()
@@ -147,6 +243,14 @@ class BaseConsumer(ABC):
         
         if self._consume_thread and self._consume_thread.is_alive():
             self._consume_thread.join(timeout=5.0)
+
+        if self._workers:
+            self._workers.shutdown(wait=True)
+            self._workers = None
+
+        if self._dead_letter_producer is not None:
+            self._dead_letter_producer.flush(5.0)
+            self._dead_letter_producer = None
         
         if self._consumer:
             self._consumer.close()
@@ -187,6 +291,120 @@ class BaseConsumer(ABC):
                 self.is_running = False
                 break
     
+    def _consume_batch_loop(self) -> None:
+        """Batch consumption loop: consume() -> process_batch() -> commit."""
+        timeout = self.config.max_batch_latency_ms / 1000.0
+        while self.is_running:
+            try:
+                msgs = self.consumer.consume(num_messages=self.config.max_batch_size, timeout=timeout)
+                if msgs:
+                    self._run_batch(msgs)
+            except Exception as e:
+                logger.exception(f"Consumer loop error: {e}")
+                self._error_count += 1
+
+            # Circuit breaker
+            if self._error_count >= self._max_errors:
+                logger.critical(f"Circuit breaker triggered after {self._max_errors} errors")
+                self.is_running = False
+                break
+
+    def _run_batch(self, msgs: List[Any]) -> None:
+        """Decode, group by partition, process, then commit or rewind each group."""
+        partitions: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        for msg in msgs:
+            if msg.error():
+                self._handle_error(msg.error())
+                continue
+            key = (msg.topic(), msg.partition())
+            offset = msg.offset()
+            part = partitions.get(key)
+            if part is None:
+                part = partitions[key] = {'first': offset, 'last': offset, 'payloads': []}
+            part['last'] = offset
+            payload = self.deserialize(msg.value())
+            if payload is None:
+                self._batch_stats['decode_errors'] += 1
+            else:
+                part['payloads'].append(payload)
+        if not partitions:
+            return
+
+        start = time.perf_counter()
+        if self._workers is not None and len(partitions) > 1:
+            futures = {
+                key: self._workers.submit(self.process_batch, part['payloads'])
+                for key, part in partitions.items()
+            }
+            failed = set()
+            for key, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.exception(f"Error processing batch for {key[0]}[{key[1]}]: {e}")
+                    failed.add(key)
+        else:
+            payloads = [p for part in partitions.values() for p in part['payloads']]
+            try:
+                self.process_batch(payloads)
+                failed = set()
+            except Exception as e:
+                logger.exception(f"Error processing batch of {len(payloads)} messages: {e}")
+                failed = set(partitions)
+        self._batch_stats['process_seconds'] += time.perf_counter() - start
+        self._batch_stats['batches'] += 1
+
+        retry = set()
+        for key in failed:
+            first = partitions[key]['first']
+            prev_first, attempts = self._batch_attempts.get(key, (None, 0))
+            attempts = attempts + 1 if prev_first == first else 1
+            if attempts < self.config.max_batch_retries:
+                self._batch_attempts[key] = (first, attempts)
+                retry.add(key)
+            else:
+                # Retries exhausted: isolate the poison message(s) and move on
+                self._batch_attempts.pop(key, None)
+                self._replay_singly(partitions[key]['payloads'])
+
+        done = {key: part for key, part in partitions.items() if key not in retry}
+        for key in done:
+            if key not in failed:
+                self._batch_attempts.pop(key, None)
+        self._batch_stats['messages'] += sum(len(part['payloads']) for part in done.values())
+        if done:
+            self._commit({key: part['last'] + 1 for key, part in done.items()})
+        if failed:
+            self._batch_stats['failed_batches'] += 1
+        if retry:
+            # Rewind so the failed slices are redelivered on the next consume()
+            self._error_count += 1
+            self._seek({key: partitions[key]['first'] for key in retry})
+        else:
+            self._error_count = 0  # Reset on success
+
+    def _replay_singly(self, payloads: List[Dict[str, Any]]) -> None:
+        """Process a repeatedly failing slice one message at a time, dead-lettering failures."""
+        for payload in payloads:
+            try:
+                self.process_batch([payload])
+            except Exception as e:
+                self._batch_stats['dead_letters'] += 1
+                self.handle_dead_letter(payload, e)
+
+    def _commit(self, offsets: Dict[Tuple[str, int], int]) -> None:
+        from confluent_kafka import TopicPartition
+        self.consumer.commit(
+            offsets=[TopicPartition(topic, partition, offset) for (topic, partition), offset in offsets.items()],
+            asynchronous=True,
+        )
+        self._batch_stats['commits'] += 1
+
+    def _seek(self, offsets: Dict[Tuple[str, int], int]) -> None:
+        from confluent_kafka import TopicPartition
+        for (topic, partition), offset in offsets.items():
+            self.consumer.seek(TopicPartition(topic, partition, offset))
+
     def _handle_error(self, error) -> None:
         """Handle Kafka consumer errors."""
         from confluent_kafka import KafkaError
@@ -211,7 +429,9 @@ class BaseConsumer(ABC):
             'group_id': self.config.group_id,
             'error_count': self._error_count,
             'circuit_breaker_threshold': self._max_errors,
-            'healthy': self.is_running and self._error_count < self._max_errors
+            'healthy': self.is_running and self._error_count < self._max_errors,
+            'batch_mode': self.config.batch_mode,
+            'batch_stats': dict(self._batch_stats),
         }
 
 
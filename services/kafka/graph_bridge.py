@@ -3,7 +3,8 @@ Graph Bridge Service.
 Bridges Kafka price events to Neo4j correlation updates.
 """
 import logging
-from typing import Any, Dict, List
+import threading
+from typing import Any, Dict, List, Optional
 from services.kafka.consumer import BaseConsumer, ConsumerConfig
 from services.rolling_window import rolling_window_service
 from services.correlation_calculator import CorrelationCalculator
@@ -15,24 +16,44 @@ class GraphBridge(BaseConsumer):
     def __init__(self, bootstrap_servers: str = None):
         config = ConsumerConfig(
             topics=['market.fx', 'market.equity'], # Listen to both for correlations
-            group_id='ai-investor-graph-bridge'
+            group_id='ai-investor-graph-bridge',
+            batch_mode=True
         )
         super().__init__(config, bootstrap_servers)
         self.calculator = CorrelationCalculator()
         self.symbols_tracked = set()
+        # symbols_tracked and the rolling windows are shared across partitions;
+        # serialize batches in case partition_workers is ever enabled
+        self._lock = threading.Lock()
 
     def process_message(self, message: Dict[str, Any]) -> None:
         """Process price update and recalculate correlations."""
+        with self._lock:
+            symbol = self._record_price(message)
+            if symbol:
+                self._update_correlations(symbol)
+
+    def process_batch(self, messages: List[Dict[str, Any]]) -> None:
+        """Record every tick in the batch, then recalculate once per changed symbol."""
+        with self._lock:
+            changed = dict.fromkeys(s for s in map(self._record_price, messages) if s)
+            for symbol in changed:
+                self._update_correlations(symbol)
+
+    def _record_price(self, message: Dict[str, Any]) -> Optional[str]:
+        """1. Update rolling window; returns the symbol, or None for unusable messages."""
         symbol = message.get('symbol')
         price = message.get('price', message.get('mid', message.get('value')))
         
         if not symbol or price is None:
-            return
+            return None
 
-        # 1. Update rolling window
         rolling_window_service.add_price(symbol, price)
         self.symbols_tracked.add(symbol)
+        return symbol
 
+    def _update_correlations(self, symbol: str) -> None:
+        """Queue CORRELATED_WITH updates between symbol and every tracked symbol."""
         # 2. Recalculate correlations with other tracked symbols
         # For efficiency, we only update correlations for the symbol that changed
         # compared to all other symbols currently in memory.
@@ -3,10 +3,10 @@ Order Book Kafka Consumer.
 Subscribes to depth streams and triggers liquidity analysis.
 """
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from services.kafka.consumer import BaseConsumer, ConsumerConfig
-from services.market.level2_parser import Level2Parser
 from services.market.depth_aggregator import DepthAggregator
+from services.market.order_book import OrderBook, OrderBookStore
 
 logger = logging.getLogger(__name__)
 
@@ -17,34 +17,43 @@ class OrderBookConsumer(BaseConsumer):
     def __init__(self, bootstrap_servers: Optional[str] = None):
         config = ConsumerConfig(
             topics=['orderbook-depth'],
-            group_id='ai-investor-depth-monitoring'
+            group_id='ai-investor-depth-monitoring',
+            batch_mode=True
         )
         super().__init__(config, bootstrap_servers)
-        self.parser = Level2Parser()
         self.aggregator = DepthAggregator()
-        # In memory storage for the latest book per symbol
-        self.latest_books: Dict[str, Dict] = {}
+        # In memory array-backed book per symbol, updated from snapshots and diffs
+        self.latest_books = OrderBookStore()
 
     def process_message(self, message: Dict[str, Any]) -> None:
         """Process incoming depth message."""
-        book = self.parser.parse_depth_event(message)
-        if not book:
-            return
+        book = self.latest_books.apply_event(message)
+        if book is not None:
+            self._check_imbalance(book)
 
-        symbol = book['symbol']
-        self.latest_books[symbol] = book
-        
+    def process_batch(self, messages: List[Dict[str, Any]]) -> None:
+        """Apply every event in order (diffs build on each other), then analyse each touched book once."""
+        touched: Dict[str, OrderBook] = {}
+        for message in messages:
+            book = self.latest_books.apply_event(message)
+            if book is not None:
+                touched[book.symbol] = book
+        for book in touched.values():
+            self._check_imbalance(book)
+
+    def _check_imbalance(self, book: OrderBook) -> None:
         # Calculate summary metrics
         metrics = self.aggregator.get_total_volume_at_depth(book)
         
         # Forward to risk or monitoring systems
         # For now, just logging identifying significant imbalances
         if abs(metrics['imbalance']) > 0.5:
-            logger.warning(f"Significant Liquidity Imbalance in {symbol}: {metrics['imbalance']:.2f}")
+            logger.warning(f"Significant Liquidity Imbalance in {book.symbol}: {metrics['imbalance']:.2f}")
 
     def get_book(self, symbol: str) -> Optional[Dict[str, Any]]:
-        """Get the latest cached book for a symbol."""
-        return self.latest_books.get(symbol)
+        """Get the latest cached book for a symbol (Level2Parser snapshot format)."""
+        book = self.latest_books.get(symbol)
+        return book.to_dict() if book is not None else None
 
 # Global Instance
 orderbook_consumer = OrderBookConsumer()
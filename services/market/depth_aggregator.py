@@ -5,6 +5,8 @@ Aggregates order book levels to provide liquidity insights and net volume analys
 from typing import Dict, List, Any, Optional
 import logging
 
+from services.market.order_book import OrderBook
+
 logger = logging.getLogger(__name__)
 
 class DepthAggregator:
@@ -18,12 +20,16 @@ class DepthAggregator:
         Calculate total available volume within a specific price range of the mid-price.
         
         Args:
-            book: Normalized book from Level2Parser.
+            book: Normalized book from Level2Parser, or an array-backed OrderBook
+                (answered by binary search over cumulative sizes).
             pip_range: Distance from mid-price to include in volume sum.
             
         Returns:
             Dict: {'bid_volume': float, 'ask_volume': float, 'imbalance': float}
         """
+        if isinstance(book, OrderBook):
+            return book.volume_at_depth(pip_range)
+
         mid = book.get('mid')
         if mid is None:
             return {'bid_volume': 0.0, 'ask_volume': 0.0, 'imbalance': 0.0}
@@ -49,6 +55,9 @@ class DepthAggregator:
         Calculate the Volume Weighted Average Price (VWAP) for an order of specific size.
         This provides a more accurate estimate of entry/exit price than the mid.
         """
+        if isinstance(book, OrderBook):
+            return book.vwap_for_size(size, direction)
+
         levels = book['asks'] if direction.upper() == 'BUY' else book['bids']
         
         accumulated_size = 0.0
@@ -0,0 +1,270 @@
+"""
+Array-Backed Order Book.
+Per-symbol level 2 books held in sorted NumPy arrays and updated incrementally.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Level = Tuple[float, float]
+
+
+def _level(raw: Any) -> Level:
+    """Accept {'price', 'size'} dicts or [price, size] pairs."""
+    if isinstance(raw, dict):
+        return float(raw['price']), float(raw['size'])
+    return float(raw[0]), float(raw[1])
+
+
+class BookSide:
+    """
+    One side of a book as parallel sorted arrays, best level first.
+
+    Prices are stored as sort keys (ask price, or negated bid price) so both
+    sides share one ascending searchsorted path. Cumulative size and notional
+    are rebuilt lazily on the first query after a change.
+    """
+
+    def __init__(self, is_bid: bool, capacity: int = 64):
+        self.is_bid = is_bid
+        self._sign = -1.0 if is_bid else 1.0
+        self._keys = np.empty(capacity)
+        self._sizes = np.empty(capacity)
+        self._n = 0
+        self._cum_size: Optional[np.ndarray] = None
+        self._cum_notional: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def prices(self) -> np.ndarray:
+        return self._keys[:self._n] * self._sign
+
+    @property
+    def sizes(self) -> np.ndarray:
+        return self._sizes[:self._n]
+
+    def best(self) -> Optional[float]:
+        return float(self._keys[0] * self._sign) if self._n else None
+
+    def load(self, levels: Iterable[Level]) -> None:
+        """Replace the side with a full snapshot (zero-size levels are dropped)."""
+        data = np.array([lv for lv in levels if lv[1] > 0], dtype=float).reshape(-1, 2)
+        keys = data[:, 0] * self._sign
+        order = np.argsort(keys, kind="stable")
+        n = len(order)
+        if n > len(self._keys):
+            self._keys, self._sizes = np.empty(2 * n), np.empty(2 * n)
+        self._keys[:n] = keys[order]
+        self._sizes[:n] = data[order, 1]
+        self._n = n
+        self._cum_size = None
+
+    def update(self, price: float, size: float) -> None:
+        """Insert, modify, or (size <= 0) delete the level at price."""
+        key = price * self._sign
+        n = self._n
+        i = int(self._keys[:n].searchsorted(key))
+        exists = i < n and self._keys[i] == key
+        if size > 0:
+            if exists:
+                self._sizes[i] = size
+            else:
+                if n == len(self._keys):
+                    self._keys = np.concatenate([self._keys, np.empty(n)])
+                    self._sizes = np.concatenate([self._sizes, np.empty(n)])
+                self._keys[i + 1:n + 1] = self._keys[i:n]
+                self._sizes[i + 1:n + 1] = self._sizes[i:n]
+                self._keys[i] = key
+                self._sizes[i] = size
+                self._n = n + 1
+        elif exists:
+            self._keys[i:n - 1] = self._keys[i + 1:n]
+            self._sizes[i:n - 1] = self._sizes[i + 1:n]
+            self._n = n - 1
+        else:
+            return
+        self._cum_size = None
+
+    def _cumulative_size(self) -> np.ndarray:
+        if self._cum_size is None:
+            self._cum_size = np.cumsum(self._sizes[:self._n])
+            self._cum_notional = None
+        return self._cum_size
+
+    def _cumulative_notional(self) -> np.ndarray:
+        """Running sum of size * sort key (multiply by the side's sign for money)."""
+        self._cumulative_size()  # rebuilding sizes resets the notional cache
+        if self._cum_notional is None:
+            n = self._n
+            self._cum_notional = np.cumsum(self._sizes[:n] * self._keys[:n])
+        return self._cum_notional
+
+    def volume_through(self, limit_price: float) -> float:
+        """Total size at prices no worse than limit_price."""
+        k = int(self._keys[:self._n].searchsorted(limit_price * self._sign, side="right"))
+        return float(self._cumulative_size()[k - 1]) if k else 0.0
+
+    def vwap_for_size(self, size: float) -> Optional[float]:
+        """Average fill price for taking `size` from the best level outward; None if too thin."""
+        if size <= 0 or self._n == 0:
+            return None
+        cum_size = self._cumulative_size()
+        k = int(cum_size.searchsorted(size))
+        if k == self._n:
+            return None
+        if k == 0:
+            return float(self._keys[0] * self._sign)
+        notional = self._cumulative_notional()[k - 1] + (size - cum_size[k - 1]) * self._keys[k]
+        return float(notional * self._sign / size)
+
+    def levels(self) -> List[Dict[str, float]]:
+        return [{'price': float(p), 'size': float(s)} for p, s in zip(self.prices, self.sizes)]
+
+
+class OrderBook:
+    """
+    Incrementally maintained book for one symbol.
+
+    Supports item access for the keys Level2Parser snapshots expose
+    ('symbol', 'bids', 'mid', ...) so existing book consumers accept it.
+    """
+
+    _KEYS = ('symbol', 'timestamp', 'bids', 'asks', 'spread', 'mid', 'depth_levels')
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bid_side = BookSide(is_bid=True)
+        self.ask_side = BookSide(is_bid=False)
+        self.timestamp: Optional[datetime] = None
+        self.updates = 0
+
+    def apply_snapshot(self, bids: Iterable[Any], asks: Iterable[Any]) -> None:
+        self.bid_side.load(map(_level, bids))
+        self.ask_side.load(map(_level, asks))
+        self.updates += 1
+
+    def apply_diff(self, bids: Iterable[Any] = (), asks: Iterable[Any] = ()) -> None:
+        """Apply level changes; a size of 0 deletes the level."""
+        for raw in bids:
+            self.bid_side.update(*_level(raw))
+        for raw in asks:
+            self.ask_side.update(*_level(raw))
+        self.updates += 1
+
+    @property
+    def best_bid(self) -> Optional[float]:
+        return self.bid_side.best()
+
+    @property
+    def best_ask(self) -> Optional[float]:
+        return self.ask_side.best()
+
+    @property
+    def mid(self) -> Optional[float]:
+        bid, ask = self.best_bid, self.best_ask
+        return (bid + ask) / 2 if (bid and ask) else None
+
+    @property
+    def spread(self) -> Optional[float]:
+        bid, ask = self.best_bid, self.best_ask
+        return (ask - bid) if (bid and ask) else None
+
+    @property
+    def bids(self) -> List[Dict[str, float]]:
+        return self.bid_side.levels()
+
+    @property
+    def asks(self) -> List[Dict[str, float]]:
+        return self.ask_side.levels()
+
+    @property
+    def depth_levels(self) -> int:
+        return len(self.bid_side) + len(self.ask_side)
+
+    def volume_at_depth(self, pip_range: float) -> Dict[str, float]:
+        """Bid/ask size within pip_range of mid and their imbalance."""
+        mid = self.mid
+        if mid is None:
+            return {'bid_volume': 0.0, 'ask_volume': 0.0, 'imbalance': 0.0}
+        bid_vol = self.bid_side.volume_through(mid - pip_range)
+        ask_vol = self.ask_side.volume_through(mid + pip_range)
+        total = bid_vol + ask_vol
+        return {
+            'bid_volume': bid_vol,
+            'ask_volume': ask_vol,
+            'imbalance': (bid_vol - ask_vol) / total if total > 0 else 0.0,
+        }
+
+    def vwap_for_size(self, size: float, direction: str) -> Optional[float]:
+        side = self.ask_side if direction.upper() == 'BUY' else self.bid_side
+        return side.vwap_for_size(size)
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self._KEYS else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Snapshot in the Level2Parser.parse_depth_event format."""
+        return {key: getattr(self, key) for key in self._KEYS}
+
+
+class OrderBookStore:
+    """
+    Books for many symbols, fed by depth events.
+
+    Events with type 'delta'/'update'/'diff' are applied as level changes;
+    anything else is treated as a full snapshot (the existing feed format).
+    """
+
+    DIFF_TYPES = ('delta', 'update', 'diff')
+
+    def __init__(self):
+        self.books: Dict[str, OrderBook] = {}
+
+    def __len__(self) -> int:
+        return len(self.books)
+
+    def get(self, symbol: str) -> Optional[OrderBook]:
+        return self.books.get(symbol)
+
+    def apply_event(self, payload: Dict[str, Any]) -> Optional[OrderBook]:
+        """Apply one depth event; returns the updated book, or None if malformed."""
+        symbol = payload.get('symbol')
+        if not symbol:
+            return None
+        book = self.books.get(symbol)
+        is_diff = payload.get('type') in self.DIFF_TYPES
+        if book is None:
+            if is_diff:
+                logger.debug("Dropping %s depth diff received before a snapshot", symbol)
+                return None
+            book = self.books[symbol] = OrderBook(symbol)
+        try:
+            if is_diff:
+                book.apply_diff(payload.get('bids', ()), payload.get('asks', ()))
+            else:
+                book.apply_snapshot(payload.get('bids', ()), payload.get('asks', ()))
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            logger.error("Failed to apply L2 depth event for %s: %s", symbol, str(e))
+            return None
+        book.timestamp = self._timestamp(payload.get('timestamp'))
+        return book
+
+    @staticmethod
+    def _timestamp(raw: Any) -> datetime:
+        if isinstance(raw, str):
+            try:
+                return datetime.fromisoformat(raw.replace('Z', '+00:00'))
+            except ValueError:
+                pass
+        return datetime.now(timezone.utc)
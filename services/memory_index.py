@@ -0,0 +1,209 @@
+"""
+Embedding batching and in-process vector search used by MemoryService.
+
+- EmbeddingBatcher: collects work items from many callers and hands them to
+  a handler in batches on one worker thread (encode once per batch, one
+  multi-row INSERT per batch).
+- QueryEmbeddingCache: LRU of query-string -> embedding.
+- FlatVectorIndex: bounded NumPy matrix of unit vectors; exact cosine top-k.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class EmbeddingBatcher:
+    """
+    Runs handler(items) -> results on a worker thread with up to max_batch
+    items per call. A batch is closed when it is full or max_wait seconds
+    after its first item arrived. submit() returns a concurrent Future;
+    async callers await asyncio.wrap_future(future).
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], Sequence[Any]],
+        max_batch: int = 64,
+        max_wait: float = 0.02,
+        name: str = "embedding-batcher",
+    ):
+        self.handler = handler
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self.name = name
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {"items": 0, "batches": 0, "failed_batches": 0, "max_batch": 0, "handler_seconds": 0.0}
+
+    def submit(self, item: Any) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        self._queue.put((item, future))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch, stop = [first], False
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    nxt = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch: List[Tuple[Any, Future]]) -> None:
+        items = [item for item, _ in batch]
+        start = time.perf_counter()
+        try:
+            results = self.handler(items)
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            logger.error(f"{self.name}: batch of {len(items)} failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.stats["handler_seconds"] += time.perf_counter() - start
+        self.stats["batches"] += 1
+        self.stats["items"] += len(items)
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(items))
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Finish queued work and stop the worker."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU of query -> embedding."""
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = np.asarray(compute(), dtype=np.float32)
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class FlatVectorIndex:
+    """
+    Exact cosine search over at most `capacity` vectors, oldest evicted first.
+    Rows are L2-normalized on insert so a search is one matrix-vector product.
+    """
+
+    def __init__(self, dim: int, capacity: int = 20000):
+        self.dim = dim
+        self.capacity = capacity
+        self._vectors = np.zeros((min(capacity, 1024), dim), dtype=np.float32)
+        self._payloads: List[Optional[Dict[str, Any]]] = [None] * len(self._vectors)
+        self._ids: List[Optional[Hashable]] = [None] * len(self._vectors)
+        self._slot: Dict[Hashable, int] = {}
+        self._size = 0
+        self._next = 0  # ring position once full
+        self.evicted = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, item_id: Hashable) -> bool:
+        return item_id in self._slot
+
+    def _grow(self, needed: int) -> None:
+        rows = len(self._vectors)
+        if needed <= rows or rows >= self.capacity:
+            return
+        new_rows = min(self.capacity, max(needed, rows * 2))
+        grown = np.zeros((new_rows, self.dim), dtype=np.float32)
+        grown[:rows] = self._vectors
+        self._vectors = grown
+        self._payloads.extend([None] * (new_rows - rows))
+        self._ids.extend([None] * (new_rows - rows))
+
+    def add(self, ids: Sequence[Hashable], vectors, payloads: Sequence[Dict[str, Any]]) -> int:
+        """Insert (or overwrite by id) rows; returns how many were new."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms > 0, norms, 1.0)
+        added = 0
+        with self._lock:
+            self._grow(self._size + len(ids))
+            for item_id, vec, payload in zip(ids, vectors, payloads):
+                slot = self._slot.get(item_id)
+                if slot is None:
+                    if self._size < len(self._vectors):
+                        slot = self._size
+                        self._size += 1
+                    else:
+                        slot = self._next
+                        self._next = (self._next + 1) % len(self._vectors)
+                        del self._slot[self._ids[slot]]
+                        self.evicted += 1
+                    self._slot[item_id] = slot
+                    self._ids[slot] = item_id
+                    added += 1
+                self._vectors[slot] = vec
+                self._payloads[slot] = payload
+        return added
+
+    def search(self, query, k: int = 5, min_similarity: float = -1.0) -> List[Tuple[Dict[str, Any], float]]:
+        """Top-k payloads by cosine similarity, best first."""
+        q = np.asarray(query, dtype=np.float32).reshape(self.dim)
+        norm = np.linalg.norm(q)
+        if norm > 0:
+            q = q / norm
+        with self._lock:
+            n = self._size
+            if n == 0 or k <= 0:
+                return []
+            sims = self._vectors[:n] @ q
+            k = min(k, n)
+            top = np.argpartition(-sims, k - 1)[:k] if k < n else np.arange(n)
+            top = top[np.argsort(-sims[top], kind="stable")]
+            return [(self._payloads[i], float(sims[i])) for i in top if sims[i] > min_similarity]
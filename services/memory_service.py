@@ -1,17 +1,31 @@
+import asyncio
 import logging
+import os
+import time
+from datetime import timedelta
 from typing import List, Dict, Any, Optional
 import json
 import numpy as np
 from sentence_transformers import SentenceTransformer
 from utils.scrubber import scrubber
+from services.memory_index import EmbeddingBatcher, FlatVectorIndex, QueryEmbeddingCache
 # Assuming a database manager exists in the project
 # from services.database_manager import db_manager 
 
 logger = logging.getLogger(__name__)
 
+EMBEDDING_DIM = 768
+# Rows re-read behind the sync watermark to catch transactions that committed late
+SYNC_OVERLAP = timedelta(seconds=60)
+
 class MemoryService:
     """
     Service for storing and recalling agent experiences using semantic vectors.
+
+    Writes from concurrent missions are encoded and inserted in batches on a
+    worker thread. Recall uses an LRU of query embeddings and, while the whole
+    table fits in it, an in-process FlatVectorIndex kept in sync with
+    Postgres; beyond that it falls back to the pgvector HNSW index.
     """
     
     _instance = None
@@ -22,8 +36,29 @@ class MemoryService:
             cls._instance = super(MemoryService, cls).__new__(cls)
             # Lazy load the model to save memory if service is not used
             cls._model = None 
+            cls._instance._initialized = False
         return cls._instance
 
+    def __init__(self):
+        if self._initialized:
+            return
+        self._batcher = EmbeddingBatcher(
+            self._store_batch,
+            max_batch=int(os.getenv("MEMORY_EMBED_BATCH", 64)),
+            max_wait=float(os.getenv("MEMORY_EMBED_WAIT_MS", 20)) / 1000,
+            name="memory-embedder",
+        )
+        self._query_cache = QueryEmbeddingCache(int(os.getenv("MEMORY_QUERY_CACHE_SIZE", 1024)))
+        self._index = FlatVectorIndex(EMBEDDING_DIM, int(os.getenv("MEMORY_INDEX_CAPACITY", 20000)))
+        self.use_local_index = os.getenv("MEMORY_LOCAL_INDEX", "1") == "1"
+        self.index_sync_interval = float(os.getenv("MEMORY_INDEX_SYNC_SECONDS", 5))
+        self._index_loaded = False
+        self._index_too_large = False
+        self._index_complete = False  # True once the index holds every row in the table
+        self._index_watermark = None
+        self._index_synced_at = 0.0
+        self._initialized = True
+
     @property
     def model(self):
         if self._model is None:
@@ -32,6 +67,36 @@ class MemoryService:
             self._model = SentenceTransformer('nomic-ai/nomic-embed-text-v1.5', trust_remote_code=True)
         return self._model
 
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(texts, batch_size=len(texts)), dtype=np.float32)
+
+    def _store_batch(self, items: List[Dict[str, Any]]) -> List[str]:
+        """Worker-thread handler: one encode call and one multi-row INSERT per batch."""
+        from psycopg2.extras import execute_values
+        from utils.database_manager import get_database_manager
+        db = get_database_manager()
+
+        embeddings = self._encode([f"search_document: {item['content']}" for item in items])
+        rows = [
+            (item["dept_id"], item["mission_id"], item["content"], vec.tolist(), json.dumps(item["metadata"]))
+            for item, vec in zip(items, embeddings)
+        ]
+        with db.pg_cursor() as cur:
+            inserted = execute_values(cur, """
+                INSERT INTO agent_memories (dept_id, mission_id, content, embedding, metadata)
+                VALUES %s
+                RETURNING id
+            """, rows, page_size=len(rows), fetch=True)
+
+        if self.use_local_index:
+            self._index.add(
+                [r[0] for r in inserted],
+                embeddings,
+                [{"content": item["content"], "mission_id": item["mission_id"], "metadata": item["metadata"]}
+                 for item in items],
+            )
+        return ["SUCCESS"] * len(items)
+
     async def store_experience(self, 
                                dept_id: int, 
                                content: str, 
@@ -41,21 +106,16 @@ class MemoryService:
         Redacts, vectorizes, and stores an agent experience.
         """
         try:
-            from utils.database_manager import get_database_manager
-            db = get_database_manager()
-            
             # 1. Redact sensitive info
             safe_content = scrubber.scrub_experience(content)
             
-            # 2. Generate embedding
-            embedding = self.model.encode(f"search_document: {safe_content}").tolist()
-            
-            # 3. Store in Postgres (using pgvector)
-            with db.pg_cursor() as cur:
-                cur.execute("""
-                    INSERT INTO agent_memories (dept_id, mission_id, content, embedding, metadata)
-                    VALUES (%s, %s, %s, %s, %s)
-                """, (dept_id, mission_id, safe_content, embedding, json.dumps(metadata or {})))
+            # 2-3. Embed and store in Postgres (pgvector), batched with concurrent missions
+            await asyncio.wrap_future(self._batcher.submit({
+                "dept_id": dept_id,
+                "mission_id": mission_id,
+                "content": safe_content,
+                "metadata": metadata or {},
+            }))
             
             logger.info(f"Stored experience for Dept {dept_id} (Mission: {mission_id})")
             return "SUCCESS"
@@ -74,10 +134,20 @@ class MemoryService:
             from utils.database_manager import get_database_manager
             db = get_database_manager()
             
-            # 1. Vectorize query (with prefix for nomic v1.5)
-            query_vector = self.model.encode(f"search_query: {query}").tolist()
+            # 1. Vectorize query (with prefix for nomic v1.5), cached per query string
+            query_embedding = self._query_cache.get_or_compute(
+                query, lambda: self._encode([f"search_query: {query}"])[0]
+            )
+
+            # 2. Serve from the in-process index while it covers the whole table
+            if self.use_local_index and self._sync_index(db):
+                return [
+                    {**payload, "similarity": similarity}
+                    for payload, similarity in self._index.search(query_embedding, limit, min_similarity)
+                ]
+            query_vector = query_embedding.tolist()
             
-            # 2. Query Postgres with similarity search (HNSW index)
+            # 3. Query Postgres with similarity search (HNSW index)
             with db.pg_cursor() as cur:
                 cur.execute("""
                     SELECT content, mission_id, metadata, 1 - (embedding <=> %s::vector) AS similarity 
@@ -97,4 +167,61 @@ class MemoryService:
             logger.exception("Failed to recall memories")
             return []
 
+    def _sync_index(self, db) -> bool:
+        """
+        Load the table into the local index (if it fits) and pull rows written
+        by other processes every index_sync_interval seconds. Returns True when
+        the index holds every row and can answer recall on its own.
+        """
+        if self._index_too_large:
+            return False
+        if time.monotonic() - self._index_synced_at < self.index_sync_interval:
+            return self._index_complete
+        with db.pg_cursor() as cur:
+            if not self._index_loaded:
+                cur.execute("SELECT count(*) FROM agent_memories")
+                if cur.fetchone()[0] > self._index.capacity:
+                    self._index_too_large = True
+                    logger.info("MemoryService: memory table exceeds local index capacity; using pgvector")
+                    return False
+            if self._index_watermark is None:
+                cur.execute("""
+                    SELECT id, content, mission_id, metadata, embedding::real[], created_at
+                    FROM agent_memories
+                """)
+            else:
+                cur.execute("""
+                    SELECT id, content, mission_id, metadata, embedding::real[], created_at
+                    FROM agent_memories
+                    WHERE created_at > %s
+                """, (self._index_watermark - SYNC_OVERLAP,))
+            rows = [r for r in cur.fetchall() if r[4] is not None]
+        fresh = [r for r in rows if r[0] not in self._index]
+        if fresh:
+            self._index.add(
+                [r[0] for r in fresh],
+                np.asarray([r[4] for r in fresh], dtype=np.float32),
+                [{"content": r[1], "mission_id": r[2], "metadata": r[3]} for r in fresh],
+            )
+        if rows:
+            latest = max(r[5] for r in rows)
+            self._index_watermark = max(self._index_watermark, latest) if self._index_watermark else latest
+        self._index_loaded = True
+        self._index_synced_at = time.monotonic()
+        if self._index.evicted:
+            self._index_too_large = True
+            logger.info("MemoryService: memory table outgrew local index capacity; using pgvector")
+        self._index_complete = not self._index_too_large
+        return self._index_complete
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Batching, query-cache and local-index counters."""
+        return {
+            "batcher": dict(self._batcher.stats),
+            "query_cache": {"size": len(self._query_cache), "hits": self._query_cache.hits,
+                            "misses": self._query_cache.misses},
+            "local_index": {"size": len(self._index), "capacity": self._index.capacity,
+                            "complete": self._index_complete, "enabled": self.use_local_index},
+        }
+
 memory_service = MemoryService()
@@ -0,0 +1,197 @@
+"""
+Bulk Neo4j graph writer.
+
+Callers queue one parameter row per node or edge upsert against a Cypher
+statement that reads from `row`. Rows are grouped by statement and written as
+`UNWIND $rows AS row <statement>` batches inside managed write transactions,
+so N upserts cost N / batch_size round-trips instead of N.
+A background thread flushes when batch_size rows are pending or every
+flush_interval seconds, whichever comes first. Each flush records its lag:
+the time from its oldest queued row to the end of the write.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from itertools import count
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _write_batch(tx, query: str, rows: List[Dict[str, Any]]) -> None:
+    tx.run(query, rows=rows).consume()
+
+
+class BulkGraphWriter:
+    """
+    Accumulates upsert rows and writes them in UNWIND batches.
+
+    Statements are flushed in the order they were first queued since the last
+    flush, so node upserts queued before the edges that MATCH them land first.
+    Rows queued with a `key` replace any pending row with the same key, which
+    collapses repeated updates of one edge between flushes into one write.
+    """
+
+    def __init__(
+        self,
+        driver_provider: Callable[[], Any],
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        max_pending: int = 100_000,
+        database: Optional[str] = None,
+        auto_start: bool = True,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self._driver_provider = driver_provider
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max(max_pending, batch_size)
+        self.database = database
+        self.auto_start = auto_start
+        self._groups: Dict[str, Dict[Hashable, Dict[str, Any]]] = {}
+        self._pending = 0
+        self._oldest: Optional[float] = None  # perf_counter of the oldest pending row
+        self._lags: deque = deque(maxlen=1024)
+        self._seq = count()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._stats = {"queued": 0, "coalesced": 0, "written": 0, "failed": 0, "dropped": 0,
+                       "batches": 0, "flushes": 0, "write_seconds": 0.0}
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def add(self, statement: str, row: Dict[str, Any], key: Optional[Hashable] = None) -> None:
+        """Queue one row for `statement` (Cypher that reads the row as `row`)."""
+        if self.auto_start and not self.running:
+            self.start()
+        with self._cond:
+            # Backpressure: wait for the flusher instead of growing without bound
+            while self._pending >= self.max_pending and self.running:
+                self._cond.wait(self.flush_interval)
+            group = self._groups.setdefault(statement, {})
+            if self._oldest is None:
+                self._oldest = time.perf_counter()
+            if key is None:
+                key = ("_seq", next(self._seq))
+            if key in group:
+                self._stats["coalesced"] += 1
+            else:
+                self._pending += 1
+            group[key] = row
+            self._stats["queued"] += 1
+            full = self._pending >= self.batch_size
+            if full and self.running:
+                self._cond.notify_all()
+        if full and not self.running:
+            self.flush()
+
+    def add_many(self, statement: str, rows, key: Optional[Callable[[Dict[str, Any]], Hashable]] = None) -> None:
+        """Queue many rows for one statement."""
+        for row in rows:
+            self.add(statement, row, key(row) if key else None)
+
+    def flush(self) -> int:
+        """Write everything queued so far; returns the number of rows written."""
+        with self._flush_lock:
+            with self._cond:
+                groups, self._groups, self._pending = self._groups, {}, 0
+                oldest, self._oldest = self._oldest, None
+                self._cond.notify_all()
+            if not groups:
+                return 0
+            self._stats["flushes"] += 1
+            driver = self._driver_provider()
+            if driver is None:
+                dropped = sum(len(g) for g in groups.values())
+                self._stats["dropped"] += dropped
+                logger.warning("BulkGraphWriter: no Neo4j driver, dropped %d rows", dropped)
+                return 0
+            written = 0
+            remaining = sum(len(g) for g in groups.values())
+            session_kwargs = {"database": self.database} if self.database else {}
+            try:
+                with driver.session(**session_kwargs) as session:
+                    for statement, group in groups.items():
+                        written += self._write_group(session, statement, list(group.values()))
+                        remaining -= len(group)
+            except Exception as e:
+                logger.error("BulkGraphWriter: session failed: %s", e)
+                self._stats["failed"] += remaining
+            if written and oldest is not None:
+                self._lags.append(time.perf_counter() - oldest)
+            return written
+
+    def _write_group(self, session, statement: str, rows: List[Dict[str, Any]]) -> int:
+        query = "UNWIND $rows AS row\n" + statement
+        written = 0
+        for i in range(0, len(rows), self.batch_size):
+            chunk = rows[i:i + self.batch_size]
+            start = time.perf_counter()
+            try:
+                session.execute_write(_write_batch, query, chunk)
+            except Exception as e:
+                self._stats["failed"] += len(chunk)
+                logger.error("BulkGraphWriter: batch of %d rows failed: %s", len(chunk), e)
+                continue
+            self._stats["write_seconds"] += time.perf_counter() - start
+            self._stats["batches"] += 1
+            self._stats["written"] += len(chunk)
+            written += len(chunk)
+        return written
+
+    def start(self) -> None:
+        """Start the background flush thread."""
+        with self._cond:
+            if self.running:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="neo4j-bulk-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the flush thread, then write whatever is still queued."""
+        thread = self._thread
+        if thread is not None:
+            with self._cond:
+                self._stopping = True
+                self._cond.notify_all()
+            thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stopping or self._pending >= self.batch_size,
+                    timeout=self.flush_interval,
+                )
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("BulkGraphWriter: flush failed: %s", e)
+
+    def recent_lags(self) -> List[float]:
+        """Queue-to-written seconds of the most recent successful flushes."""
+        return list(self._lags)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Row, batch, throughput and lag counters."""
+        stats = dict(self._stats)
+        lags = self.recent_lags()
+        stats["last_lag_seconds"] = lags[-1] if lags else 0.0
+        stats["max_lag_seconds"] = max(lags) if lags else 0.0
+        stats["pending"] = self._pending
+        stats["running"] = self.running
+        stats["rows_per_second"] = stats["written"] / stats["write_seconds"] if stats["write_seconds"] else 0.0
+        return stats
@@ -4,10 +4,22 @@ Updates correlation edges in the graph database.
 """
 import os
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Tuple
+
+from services.neo4j.bulk_graph_writer import BulkGraphWriter
 
 logger = logging.getLogger(__name__)
 
+CORRELATION_UPSERT = """
+MATCH (a1:Asset {symbol: row.symbol1})
+MATCH (a2:Asset {symbol: row.symbol2})
+MERGE (a1)-[r:CORRELATED_WITH {timeframe: row.timeframe}]->(a2)
+SET r.coefficient = row.coefficient,
+    r.confidence = row.confidence,
+    r.direction = row.direction,
+    r.updated_at = datetime()
+"""
+
 
 class EdgeWeightUpdater:
     """
@@ -31,6 +43,11 @@ class EdgeWeightUpdater:
             os.getenv('NEO4J_PASSWORD', 'investor_password')
         )
         self._driver = None
+        self.writer = BulkGraphWriter(
+            lambda: self.driver,
+            batch_size=int(os.getenv('NEO4J_WRITE_BATCH_SIZE', '1000')),
+            flush_interval=float(os.getenv('NEO4J_FLUSH_INTERVAL', '1.0')),
+        )
         self.initialized = True
 
     @property
@@ -50,8 +67,11 @@ class EdgeWeightUpdater:
         timeframe: str = "1D"
     ):
         """
-        Update the CORRELATED_WITH edge weight in Neo4j.
-        
+        Queue an update of the CORRELATED_WITH edge weight in Neo4j.
+
+        Edges are written in UNWIND batches by the bulk writer; a newer
+        update for the same pair and timeframe replaces an unflushed one.
+
         Args:
             symbol1: Source asset symbol.
             symbol2: Target asset symbol.
@@ -59,33 +79,42 @@ class EdgeWeightUpdater:
             confidence: Statistical confidence level.
             timeframe: Analysis timeframe.
         """
-        direction = self._get_direction(coefficient)
-
-        query = """
-        MATCH (a1:Asset {symbol: $symbol1})
-        MATCH (a2:Asset {symbol: $symbol2})
-        MERGE (a1)-[r:CORRELATED_WITH {timeframe: $timeframe}]->(a2)
-        SET r.coefficient = $coefficient,
-            r.confidence = $confidence,
-            r.direction = $direction,
-            r.updated_at = datetime()
-        RETURN r
-        """
-
-        params = {
+        row = {
             "symbol1": symbol1,
             "symbol2": symbol2,
             "coefficient": float(coefficient),
             "confidence": float(confidence),
-            "direction": direction,
+            "direction": self._get_direction(coefficient),
             "timeframe": timeframe
         }
+        self.writer.add(CORRELATION_UPSERT, row, key=(symbol1, symbol2, timeframe))
+
+    def update_correlations(
+        self,
+        edges: Iterable[Tuple[str, str, float, float]],
+        timeframe: str = "1D",
+        flush: bool = False
+    ) -> int:
+        """
+        Queue a full correlation refresh of (symbol1, symbol2, coefficient, confidence) edges.
+
+        Set flush=True to write synchronously before returning.
+        """
+        n = 0
+        for symbol1, symbol2, coefficient, confidence in edges:
+            self.update_correlation(symbol1, symbol2, coefficient, confidence, timeframe)
+            n += 1
+        if flush:
+            self.flush()
+        return n
 
+    def flush(self) -> int:
+        """Write all queued edge updates now."""
         try:
-            with self.driver.session() as session:
-                session.run(query, params)
+            return self.writer.flush()
         except Exception as e:
-            logger.error("Failed to update Neo4j correlation: %s", str(e))
+            logger.error("Failed to update Neo4j correlations: %s", str(e))
+            return 0
 
     def _get_direction(self, coefficient: float) -> str:
         """Categorize correlation direction."""
@@ -96,7 +125,8 @@ class EdgeWeightUpdater:
         return "NEUTRAL"
 
     def close(self):
-        """Close the Neo4j driver connection."""
+        """Flush queued updates and close the Neo4j driver connection."""
+        self.writer.stop()
         if self._driver:
             self._driver.close()
             self._driver = None
@@ -10,16 +10,54 @@ ACCEPTANCE CRITERIA from ROADMAP_AGENT_DEPT.md:
 - Neo4j -> Postgres Sync: A successful PG commit triggers Neo4j node update in < 100ms.
 """
 
+import atexit
 import logging
 import hashlib
+import re
 import time
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 from decimal import Decimal
 from dataclasses import dataclass
 
+from services.neo4j.bulk_graph_writer import BulkGraphWriter
+from services.neo4j.neo4j_service import get_neo4j
+
 logger = logging.getLogger(__name__)
 
+# UNWIND row statements for the bulk writer (see BulkGraphWriter.add)
+JOURNAL_ENTRY_UPSERT = """
+MERGE (je:JournalEntry {id: row.id})
+SET je.description = row.description,
+    je.timestamp = datetime(),
+    je.entry_hash = row.entry_hash,
+    je.synced_at = datetime()
+"""
+DEBIT_EDGE_UPSERT = """
+MATCH (a:Account {id: row.account_id}), (je:JournalEntry {id: row.entry_id})
+MERGE (a)-[:DEBITED {amount: row.amount}]->(je)
+"""
+CREDIT_EDGE_UPSERT = """
+MATCH (a:Account {id: row.account_id}), (je:JournalEntry {id: row.entry_id})
+MERGE (a)-[:CREDITED {amount: row.amount}]->(je)
+"""
+AGENT_EDGE_UPSERT = """
+MATCH (ag:Agent {id: row.agent_id}), (je:JournalEntry {id: row.entry_id})
+MERGE (ag)-[:CREATED]->(je)
+"""
+ACCOUNT_UPSERT = """
+MERGE (a:Account {id: row.id})
+SET a.name = row.name,
+    a.account_type = row.account_type,
+    a.synced_at = datetime()
+"""
+ACCOUNT_PARENT_UPSERT = """
+MATCH (child:Account {id: row.id}), (parent:Account {id: row.parent_id})
+MERGE (child)-[:CHILD_OF]->(parent)
+"""
+# Relationship types cannot be parameters, so they are validated before use
+_REL_TYPE = re.compile(r"^[A-Z][A-Z0-9_]*$")
+
 
 @dataclass
 class SyncEvent:
@@ -66,6 +104,10 @@ class GraphLedgerSyncService:
         self._sync_history: List[SyncEvent] = []
         self._variance_alerts: List[Dict[str, Any]] = []
         self._max_history_size: int = 1000
+        # Short interval keeps PG-commit-to-graph latency inside the 100ms target
+        self._writer = BulkGraphWriter(lambda: get_neo4j().driver, batch_size=500, flush_interval=0.05)
+        # Write out queued upserts when the process exits
+        atexit.register(self.close)
         self._initialized = True
         logger.info("GraphLedgerSyncService initialized (Singleton)")
 
@@ -82,7 +124,9 @@ class GraphLedgerSyncService:
         - (:Account)-[:CREDITED]->(:JournalEntry) relationships
         - (:Agent)-[:CREATED]->(:JournalEntry) relationship (if agent provenance)
         
-        Performance Target: < 100ms
+        Upserts are queued for the write-behind writer; `enqueue_ms` is the
+        queueing cost only. Commit-to-graph latency against the 100ms target
+        is measured per flush and reported by get_sync_metrics().
         """
         start_time = time.perf_counter()
         
@@ -91,43 +135,32 @@ class GraphLedgerSyncService:
         lines = journal_entry.get("lines", [])
         agent_id = journal_entry.get("created_by_agent")
         
-        # Create the Cypher query for Neo4j
-        cypher_commands = []
-        
-        # Create JournalEntry node
-        cypher_commands.append(f"""
-            MERGE (je:JournalEntry {{id: '{entry_id}'}})
-            SET je.description = '{description}',
-                je.timestamp = datetime(),
-                je.entry_hash = '{journal_entry.get("entry_hash", "")}',
-                je.synced_at = datetime()
-        """)
-        
+        # Queue parameterized upserts; the writer flushes them in UNWIND batches
+        rows = 1
+        self._writer.add(JOURNAL_ENTRY_UPSERT, {
+            "id": entry_id,
+            "description": description,
+            "entry_hash": journal_entry.get("entry_hash", ""),
+        }, key=entry_id)
+
         # Create relationships for each line
         for line in lines:
-            account_id = line.get("account_id", "")
-            debit = line.get("debit", 0)
-            credit = line.get("credit", 0)
-            
-            if debit > 0:
-                cypher_commands.append(f"""
-                    MATCH (a:Account {{id: '{account_id}'}}), (je:JournalEntry {{id: '{entry_id}'}})
-                    MERGE (a)-[:DEBITED {{amount: {debit}}}]->(je)
-                """)
-            if credit > 0:
-                cypher_commands.append(f"""
-                    MATCH (a:Account {{id: '{account_id}'}}), (je:JournalEntry {{id: '{entry_id}'}})
-                    MERGE (a)-[:CREDITED {{amount: {credit}}}]->(je)
-                """)
-        
+            for side, statement in (("debit", DEBIT_EDGE_UPSERT), ("credit", CREDIT_EDGE_UPSERT)):
+                amount = line.get(side, 0)
+                if amount > 0:
+                    self._writer.add(statement, {
+                        "account_id": line.get("account_id", ""),
+                        "entry_id": entry_id,
+                        "amount": float(amount),
+                    })
+                    rows += 1
+
         # Create agent provenance relationship
         if agent_id:
-            cypher_commands.append(f"""
-                MATCH (ag:Agent {{id: '{agent_id}'}}), (je:JournalEntry {{id: '{entry_id}'}})
-                MERGE (ag)-[:CREATED]->(je)
-            """)
-        
-        elapsed_ms = (time.perf_counter() - start_time) * 1000
+            self._writer.add(AGENT_EDGE_UPSERT, {"agent_id": agent_id, "entry_id": entry_id})
+            rows += 1
+
+        enqueue_ms = (time.perf_counter() - start_time) * 1000
         
         # Record sync event
         sync_event = SyncEvent(
@@ -136,22 +169,16 @@ class GraphLedgerSyncService:
             entity_type="journal_entry",
             entity_id=entry_id,
             operation="CREATE",
-            payload={"cypher_count": len(cypher_commands)},
+            payload={"cypher_count": rows, "enqueue_ms": enqueue_ms},
             timestamp=datetime.now(timezone.utc),
-            sync_latency_ms=elapsed_ms,
         )
         self._record_sync_event(sync_event)
         
-        meets_sla = elapsed_ms < 100.0
-        if not meets_sla:
-            logger.warning(f"Sync latency exceeded SLA: {elapsed_ms:.2f}ms > 100ms")
-        
         return {
             "status": "synced",
             "entry_id": entry_id,
-            "cypher_commands": len(cypher_commands),
-            "latency_ms": elapsed_ms,
-            "meets_sla": meets_sla,
+            "cypher_commands": rows,
+            "enqueue_ms": enqueue_ms,
         }
 
     async def sync_account_to_graph(
@@ -172,29 +199,22 @@ class GraphLedgerSyncService:
         account_type = account.get("account_type", "")
         parent_id = account.get("parent_id")
         
-        cypher_commands = []
-        
-        # Create Account node
-        cypher_commands.append(f"""
-            MERGE (a:Account {{id: '{account_id}'}})
-            SET a.name = '{name}',
-                a.account_type = '{account_type}',
-                a.synced_at = datetime()
-        """)
-        
+        self._writer.add(ACCOUNT_UPSERT, {
+            "id": account_id,
+            "name": name,
+            "account_type": account_type,
+        }, key=account_id)
+
         # Create parent relationship if exists
         if parent_id:
-            cypher_commands.append(f"""
-                MATCH (child:Account {{id: '{account_id}'}}), (parent:Account {{id: '{parent_id}'}})
-                MERGE (child)-[:CHILD_OF]->(parent)
-            """)
-        
-        elapsed_ms = (time.perf_counter() - start_time) * 1000
+            self._writer.add(ACCOUNT_PARENT_UPSERT, {"id": account_id, "parent_id": parent_id})
+
+        enqueue_ms = (time.perf_counter() - start_time) * 1000
         
         return {
             "status": "synced",
             "account_id": account_id,
-            "latency_ms": elapsed_ms,
+            "enqueue_ms": enqueue_ms,
         }
 
     async def verify_graph_ledger_integrity(self) -> Dict[str, Any]:
@@ -249,12 +269,13 @@ class GraphLedgerSyncService:
         - "Stock Sale" CAUSED "Tax Liability"
         - "Dividend Income" FUNDED "Bill Payment"
         """
-        cypher = f"""
-            MATCH (source:JournalEntry {{id: '{source_entry_id}'}}),
-                  (target:JournalEntry {{id: '{target_entry_id}'}})
-            MERGE (source)-[:{relationship_type}]->(target)
-        """
-        
+        if not _REL_TYPE.match(relationship_type):
+            raise ValueError(f"Invalid relationship type: {relationship_type!r}")
+        self._writer.add(f"""
+MATCH (source:JournalEntry {{id: row.source}}), (target:JournalEntry {{id: row.target}})
+MERGE (source)-[:{relationship_type}]->(target)
+""", {"source": source_entry_id, "target": target_entry_id})
+
         return {
             "status": "created",
             "source": source_entry_id,
@@ -263,16 +284,11 @@ class GraphLedgerSyncService:
         }
 
     def get_sync_metrics(self) -> Dict[str, Any]:
-        """Return synchronization performance metrics."""
-        if not self._sync_history:
-            return {
-                "total_syncs": 0,
-                "avg_latency_ms": 0.0,
-                "max_latency_ms": 0.0,
-                "sla_compliance_pct": 100.0,
-            }
-        
-        latencies = [e.sync_latency_ms for e in self._sync_history if e.sync_latency_ms]
+        """
+        Return synchronization performance metrics. Latencies are the
+        writer's queue-to-Neo4j lag per flush, i.e. commit-to-graph time.
+        """
+        latencies = [lag * 1000 for lag in self._writer.recent_lags()]
         sla_violations = sum(1 for l in latencies if l >= 100.0)
         
         return {
@@ -283,6 +299,17 @@ class GraphLedgerSyncService:
             "variance_alerts": len(self._variance_alerts),
         }
 
+    def flush(self) -> int:
+        """Write all queued graph upserts now."""
+        return self._writer.flush()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the write-behind thread and write whatever is still queued."""
+        try:
+            self._writer.stop(timeout)
+        except Exception as e:
+            logger.error(f"GraphLedgerSyncService: final flush failed: {e}")
+
     def _record_sync_event(self, event: SyncEvent) -> None:
         """Record a sync event to history."""
         self._sync_history.append(event)
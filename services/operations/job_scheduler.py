@@ -1,3 +1,4 @@
+import importlib
 import logging
 import time
 from typing import List, Dict, Any, Optional
@@ -55,6 +56,26 @@ class JobScheduler:
                 "status": "idle",
                 "type": "system",
                 "description": "Pre-load high-frequency data into Redis cache."
+            },
+            "tax_harvest_scan": {
+                "id": "tax_harvest_scan",
+                "name": "Tax-Loss Harvest Scan",
+                "schedule": "30 6 * * 1-5",
+                "last_run": None,
+                "status": "idle",
+                "type": "tax",
+                "description": "Vectorized harvest scan of every account, sharded across worker processes.",
+                "handler": "services.tax.batch_harvest_scan:scheduled_harvest_scan"
+            },
+            "volume_curve_rebuild": {
+                "id": "volume_curve_rebuild",
+                "name": "Intraday Volume Curve Rebuild",
+                "schedule": "15 17 * * 1-5",
+                "last_run": None,
+                "status": "idle",
+                "type": "execution",
+                "description": "Rebuild per-symbol intraday volume curves for VWAP scheduling from stored minute volume.",
+                "handler": "services.execution.volume_curves:scheduled_curve_rebuild"
             }
         }
 
@@ -93,13 +114,24 @@ class JobScheduler:
         # Simulate execution
         execution_id = f"{job_id}-{int(time.time())}"
         
-        # In a real system, this would be a background task
-        # For now, we'll simulate a quick async delay
-        await asyncio.sleep(1) 
-        
+        started = time.perf_counter()
+        output = None
         success = True
-        if job_id == "model_retrain" and time.time() % 2 == 0: 
-            success = False # Simulate intermittent failure for demo
+        if job.get("handler"):
+            # "module:function" resolved lazily so the scheduler imports nothing heavy
+            module_name, func_name = job["handler"].split(":")
+            try:
+                output = await getattr(importlib.import_module(module_name), func_name)()
+            except Exception as e:
+                logger.error(f"Job {job_id} failed: {e}")
+                output, success = str(e), False
+        else:
+            # In a real system, this would be a background task
+            # For now, we'll simulate a quick async delay
+            await asyncio.sleep(1) 
+            
+            if job_id == "model_retrain" and time.time() % 2 == 0: 
+                success = False # Simulate intermittent failure for demo
 
         job["status"] = "idle"
         job["last_run"] = datetime.now().isoformat()
@@ -110,10 +142,12 @@ class JobScheduler:
             "job_name": job["name"],
             "started_at": datetime.now().isoformat(), # approximate
             "ended_at": (datetime.now()).isoformat(),
-            "duration_ms": 1200,
+            "duration_ms": round((time.perf_counter() - started) * 1000),
             "status": "success" if success else "failed",
             "logs": f"Job {job_id} started at {datetime.now()}...\nProcessing core modules...\nAnalysis of delta set complete.\n" + ("Finalizing commit to production state.\nDone." if success else "CRITICAL ERROR: Data integrity check failed.\nRollback initiated.")
         }
+        if output is not None:
+            record["output"] = output
         
         self.history.insert(0, record) # Prepend
         return record
@@ -4,10 +4,12 @@ Optimization Services Package
 Provides portfolio optimization and rebalancing capabilities.
 """
 
+from services.optimization.optimizer_backend import OptimizerBackend
 from services.optimization.portfolio_optimizer_service import PortfolioOptimizerService
 from services.optimization.rebalancing_service import RebalancingService
 
 __all__ = [
+    "OptimizerBackend",
     "PortfolioOptimizerService",
     "RebalancingService",
 ]
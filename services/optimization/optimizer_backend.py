@@ -0,0 +1,419 @@
+"""
+==============================================================================
+FILE: services/optimization/optimizer_backend.py
+ROLE: Portfolio Optimizer Numerical Backend
+PURPOSE: Long-only solvers behind PortfolioOptimizerService that scale to
+         thousands of assets: closed-form gradients instead of finite
+         differences, a dedicated risk-parity solver, and warm starts from
+         each portfolio's previous solution.
+
+METHOD:
+    - Minimum variance, maximum Sharpe (via the transform
+      min y'Sy s.t. (mu - rf)'y = 1, y >= 0, w = y / sum(y)) and
+      target-return frontier points are all  min 1/2 x'Sx  s.t. Ax = b,
+      x >= 0. A primal-dual active-set iteration solves them exactly with
+      one Cholesky factorization of the free block per active-set change.
+      Factors are cached by free set, so a frontier sweep reuses them
+      between neighbouring points.
+    - Risk parity minimizes Spinu's convex 1/2 y'Sy - b'log(y) with damped
+      Newton steps, falling back to cyclical coordinate descent (closed-form
+      root per coordinate, S y maintained incrementally) when the
+      covariance is not positive definite; y is then normalized to weights.
+    - Whatever the active set cannot certify (indefinite covariance,
+      cycling, no positive excess return) falls back to SLSQP with
+      closed-form gradients and constraint Jacobians.
+    - OptimizerBackend keeps each portfolio's last solution per problem;
+      a stale start only costs iterations, never accuracy.
+
+AUTHOR: AI Investor Team
+CREATED: 2026-10-18
+==============================================================================
+"""
+
+import logging
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+from numpy.linalg import LinAlgError
+from numpy.typing import ArrayLike, NDArray
+from scipy.linalg import cho_factor, cho_solve
+from scipy.optimize import minimize
+
+logger = logging.getLogger(__name__)
+
+OBJECTIVES = ("maximize_sharpe", "minimize_risk", "maximize_return")
+
+
+@dataclass
+class OptimizerSolution:
+    """Optimal weights with solver diagnostics."""
+    weights: NDArray
+    method: str
+    iterations: int
+    converged: bool
+
+
+def variance_and_grad(w: NDArray, cov: NDArray) -> Tuple[float, NDArray]:
+    sw = cov @ w
+    return float(w @ sw), 2.0 * sw
+
+
+def volatility_and_grad(w: NDArray, cov: NDArray) -> Tuple[float, NDArray]:
+    variance, grad = variance_and_grad(w, cov)
+    vol = math.sqrt(max(variance, 1e-300))
+    return vol, grad / (2.0 * vol)
+
+
+def neg_sharpe_and_grad(w: NDArray, mu: NDArray, cov: NDArray, rf: float) -> Tuple[float, NDArray]:
+    """-(mu'w - rf) / sqrt(w'Sw) and its gradient."""
+    sw = cov @ w
+    variance = float(w @ sw)
+    if variance <= 0:
+        return 1e10, np.zeros_like(w)
+    vol = math.sqrt(variance)
+    excess = float(w @ mu) - rf
+    return -excess / vol, -(mu / vol - excess * sw / (vol * variance))
+
+
+class _FactorCache:
+    """Cholesky factors of covariance sub-blocks, keyed by free set (LRU)."""
+
+    def __init__(self, cov: NDArray, max_entries: int = 16):
+        self.cov = cov
+        self.max_entries = max_entries
+        self._factors: "OrderedDict[bytes, Any]" = OrderedDict()
+        self.factorizations = 0
+        self.reuses = 0
+
+    def solve(self, free: NDArray, rhs: NDArray) -> NDArray:
+        key = free.tobytes()
+        factor = self._factors.get(key)
+        if factor is None:
+            factor = cho_factor(self.cov[np.ix_(free, free)], lower=True, check_finite=False)
+            self._factors[key] = factor
+            self.factorizations += 1
+            if len(self._factors) > self.max_entries:
+                self._factors.popitem(last=False)
+        else:
+            self._factors.move_to_end(key)
+            self.reuses += 1
+        return cho_solve(factor, rhs, check_finite=False)
+
+
+def _active_set_qp(
+    factors: _FactorCache,
+    A: NDArray,
+    b: NDArray,
+    free: NDArray,
+    max_iter: int = 100,
+) -> Optional[Tuple[NDArray, int]]:
+    """
+    min 1/2 x'Sx  s.t.  Ax = b, x >= 0, starting from the boolean free set.
+
+    Returns (x, iterations), or None when no KKT point can be certified
+    (non-PD block, singular constraint system, or a repeated free set).
+    """
+    cov = factors.cov
+    diag_scale = float(np.abs(np.diag(cov)).max())
+    seen = set()
+    for iteration in range(1, max_iter + 1):
+        key = free.tobytes()
+        if key in seen or not free.any():
+            return None
+        seen.add(key)
+        idx = np.flatnonzero(free)
+        try:
+            inv_a = factors.solve(idx, A[:, idx].T)
+            nu = np.linalg.solve(A[:, idx] @ inv_a, b)
+        except (LinAlgError, ValueError):
+            return None
+        x = np.zeros(free.size)
+        x[idx] = inv_a @ nu
+        # Multipliers of x >= 0: g = Sx - A'nu, zero on the free set
+        g = cov[:, idx] @ x[idx] - A.T @ nu
+        g[idx] = 0.0
+        scale = float(np.abs(x).max())
+        next_free = (free & (x > -1e-12 * scale)) | (~free & (g < -1e-12 * scale * diag_scale))
+        if np.array_equal(next_free, free):
+            return np.maximum(x, 0.0), iteration
+        free = next_free
+    return None
+
+
+def _initial(w0: Optional[ArrayLike], n: int) -> NDArray:
+    if w0 is not None:
+        w0 = np.asarray(w0, dtype=np.float64)
+        if w0.shape == (n,) and np.isfinite(w0).all() and (w0 > 0).any():
+            return np.maximum(w0, 0.0)
+    return np.full(n, 1.0 / n)
+
+
+def _slsqp(
+    fun_and_grad: Callable[[NDArray], Tuple[float, NDArray]],
+    n: int,
+    w0: Optional[ArrayLike] = None,
+    target: Optional[Tuple[NDArray, float]] = None,
+    max_iter: int = 1000,
+) -> OptimizerSolution:
+    """Long-only, fully invested SLSQP with analytic gradient and Jacobians."""
+    constraints = [{"type": "eq", "fun": lambda w: w.sum() - 1.0, "jac": lambda w: np.ones_like(w)}]
+    if target is not None:
+        row, value = target
+        constraints.append({"type": "eq", "fun": lambda w: row @ w - value, "jac": lambda w: row})
+    x0 = _initial(w0, n)
+    result = minimize(
+        fun_and_grad,
+        x0 / x0.sum(),
+        jac=True,
+        method="SLSQP",
+        bounds=[(0.0, 1.0)] * n,
+        constraints=constraints,
+        options={"maxiter": max_iter},
+    )
+    if not result.success:
+        logger.warning(f"SLSQP did not converge: {result.message}")
+    return OptimizerSolution(result.x, "slsqp", int(result.nit), bool(result.success))
+
+
+def minimum_variance(cov: ArrayLike, w0: Optional[ArrayLike] = None, factors: Optional[_FactorCache] = None) -> OptimizerSolution:
+    cov = np.asarray(cov, dtype=np.float64)
+    n = cov.shape[0]
+    factors = factors or _FactorCache(cov)
+    result = _active_set_qp(factors, np.ones((1, n)), np.ones(1), _initial(w0, n) > 0)
+    if result is None:
+        return _slsqp(lambda w: variance_and_grad(w, cov), n, w0)
+    x, iterations = result
+    return OptimizerSolution(x / x.sum(), "active_set", iterations, True)
+
+
+def maximum_sharpe(mu: ArrayLike, cov: ArrayLike, rf: float = 0.0, w0: Optional[ArrayLike] = None) -> OptimizerSolution:
+    mu, cov = np.asarray(mu, dtype=np.float64), np.asarray(cov, dtype=np.float64)
+    n = mu.size
+    excess = mu - rf
+    if (excess > 0).any():
+        # Warm supports may hold negative-excess diversifiers; cold starts may not
+        free = _initial(w0, n) > 0 if w0 is not None else excess > 0
+        if not (free & (excess > 0)).any():
+            free = excess > 0
+        result = _active_set_qp(_FactorCache(cov), excess[None, :], np.ones(1), free)
+        if result is not None:
+            y, iterations = result
+            return OptimizerSolution(y / y.sum(), "active_set", iterations, True)
+    return _slsqp(lambda w: neg_sharpe_and_grad(w, mu, cov, rf), n, w0)
+
+
+def maximum_return(mu: ArrayLike) -> OptimizerSolution:
+    """The long-only, fully invested LP optimum is the best single asset."""
+    mu = np.asarray(mu, dtype=np.float64)
+    weights = np.zeros(mu.size)
+    weights[int(np.argmax(mu))] = 1.0
+    return OptimizerSolution(weights, "closed_form", 0, True)
+
+
+def _risk_errors(y: NDArray, sy: NDArray, b: NDArray) -> float:
+    return float(np.max(np.abs(y * sy - b) / b))
+
+
+def _spinu_newton(cov: NDArray, b: NDArray, y: NDArray, tol: float, max_iter: int = 50) -> Optional[Tuple[NDArray, int]]:
+    """Damped Newton on f(y) = 1/2 y'Sy - b'log(y); None if the Hessian is not PD."""
+    def spinu(v: NDArray) -> float:
+        return 0.5 * float(v @ cov @ v) - float(b @ np.log(v))
+
+    value = spinu(y)
+    for iteration in range(1, max_iter + 1):
+        sy = cov @ y
+        if _risk_errors(y, sy, b) < tol:
+            return y, iteration - 1
+        grad = sy - b / y
+        hessian = cov + np.diag(b / (y * y))
+        try:
+            step = -cho_solve(cho_factor(hessian, lower=True, check_finite=False), grad, check_finite=False)
+        except LinAlgError:
+            return None
+        t = 1.0
+        # Stay inside y > 0, then backtrack to an Armijo decrease
+        negative = step < 0
+        if negative.any():
+            t = min(1.0, 0.99 * float(np.min(-y[negative] / step[negative])))
+        slope = float(grad @ step)
+        while t > 1e-12:
+            candidate = y + t * step
+            candidate_value = spinu(candidate)
+            if candidate_value <= value + 1e-4 * t * slope:
+                break
+            t *= 0.5
+        else:
+            return None
+        y, value = candidate, candidate_value
+    sy = cov @ y
+    return (y, max_iter) if _risk_errors(y, sy, b) < tol else None
+
+
+def _spinu_ccd(cov: NDArray, b: NDArray, y: NDArray, tol: float, max_sweeps: int) -> Tuple[NDArray, int, bool]:
+    """Cyclical coordinate descent: each coordinate solves d y_i^2 + c y_i - b_i = 0."""
+    diag = np.diag(cov)
+    sy = cov @ y
+    for sweep in range(1, max_sweeps + 1):
+        for i in range(y.size):
+            d, bi, yi = diag[i], b[i], y[i]
+            c = sy[i] - d * yi
+            root = math.sqrt(c * c + 4.0 * d * bi)
+            new = 2.0 * bi / (c + root) if c >= 0 else (root - c) / (2.0 * d)
+            sy += cov[i] * (new - yi)
+            y[i] = new
+        sy = cov @ y
+        if _risk_errors(y, sy, b) < tol:
+            return y, sweep, True
+    return y, max_sweeps, False
+
+
+def risk_parity(
+    cov: ArrayLike,
+    budgets: Optional[ArrayLike] = None,
+    w0: Optional[ArrayLike] = None,
+    tol: float = 1e-8,
+    max_sweeps: int = 1000,
+) -> OptimizerSolution:
+    """
+    Weights whose risk contributions w_i (Sw)_i / w'Sw match `budgets`
+    (equal by default), from Spinu's convex formulation: Newton when the
+    covariance is positive definite, cyclical coordinate descent otherwise.
+    """
+    cov = np.asarray(cov, dtype=np.float64)
+    n = cov.shape[0]
+    b = np.full(n, 1.0 / n) if budgets is None else np.asarray(budgets, dtype=np.float64)
+    b = b / b.sum()
+    if (np.diag(cov) <= 0).any() or (b <= 0).any():
+        raise ValueError("risk parity requires positive variances and risk budgets")
+
+    y = np.maximum(_initial(w0, n), 1e-8 / n)
+    # At the optimum y'Sy = sum(b) = 1, so start on that scale
+    quad = float(y @ cov @ y)
+    if quad > 0:
+        y /= math.sqrt(quad)
+
+    result = _spinu_newton(cov, b, y.copy(), tol)
+    if result is not None:
+        y, iterations = result
+        return OptimizerSolution(y / y.sum(), "newton", iterations, True)
+    y, sweeps, converged = _spinu_ccd(cov, b, y, tol, max_sweeps)
+    if not converged:
+        logger.warning(f"Risk parity did not reach tol={tol} in {max_sweeps} sweeps")
+    return OptimizerSolution(y / y.sum(), "coordinate_descent", sweeps, converged)
+
+
+def efficient_frontier(mu: ArrayLike, cov: ArrayLike, n_points: int = 20, rf: float = 0.0) -> Dict[str, Any]:
+    """
+    Long-only frontier from minimum variance to the maximum-return asset.
+
+    Each point is warm-started from its neighbour and shares the Cholesky
+    factor cache, so points with the same active set cost a back-solve.
+    """
+    mu, cov = np.asarray(mu, dtype=np.float64), np.asarray(cov, dtype=np.float64)
+    n = mu.size
+    if n_points < 2:
+        raise ValueError("n_points must be at least 2")
+    factors = _FactorCache(cov)
+    x = minimum_variance(cov, factors=factors).weights
+    targets = np.linspace(float(x @ mu), float(mu.max()), n_points)
+    A = np.vstack([np.ones(n), mu])
+    weights = np.empty((n_points, n))
+    weights[0] = x
+    weights[-1] = maximum_return(mu).weights
+    for k in range(1, n_points - 1):
+        result = _active_set_qp(factors, A, np.array([1.0, targets[k]]), x > 0)
+        if result is None:
+            x = _slsqp(lambda w: variance_and_grad(w, cov), n, x, target=(mu, targets[k])).weights
+        else:
+            x = result[0]
+        weights[k] = x
+
+    returns = weights @ mu
+    risks = np.sqrt(np.maximum(np.einsum("ij,ij->i", weights @ cov, weights), 0.0))
+    sharpe = np.divide(returns - rf, risks, out=np.zeros(n_points), where=risks > 0)
+    return {
+        "target_returns": targets,
+        "returns": returns,
+        "risks": risks,
+        "sharpe_ratios": sharpe,
+        "weights": weights,
+        "factorizations": factors.factorizations,
+        "factor_reuses": factors.reuses,
+    }
+
+
+class OptimizerBackend:
+    """
+    Solver front end with an LRU of each portfolio's last solution per problem.
+    """
+
+    def __init__(self, cache_size: int = 256):
+        self.cache_size = cache_size
+        self._warm: "OrderedDict[Hashable, NDArray]" = OrderedDict()
+
+    def _warm_start(self, key: Optional[Hashable], n: int) -> Optional[NDArray]:
+        if key is None:
+            return None
+        weights = self._warm.get(key)
+        if weights is None or weights.size != n:
+            return None
+        self._warm.move_to_end(key)
+        return weights
+
+    def _remember(self, key: Optional[Hashable], solution: OptimizerSolution) -> OptimizerSolution:
+        if key is not None and np.isfinite(solution.weights).all():
+            self._warm[key] = solution.weights.copy()
+            self._warm.move_to_end(key)
+            while len(self._warm) > self.cache_size:
+                self._warm.popitem(last=False)
+        return solution
+
+    def mean_variance(
+        self,
+        expected_returns: ArrayLike,
+        covariance_matrix: ArrayLike,
+        objective: str,
+        risk_free_rate: float = 0.0,
+        key: Optional[Hashable] = None,
+    ) -> OptimizerSolution:
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective: {objective}")
+        warm_key = None if key is None else (key, "mean_variance", objective)
+        w0 = self._warm_start(warm_key, np.asarray(expected_returns).size)
+        if objective == "maximize_sharpe":
+            solution = maximum_sharpe(expected_returns, covariance_matrix, risk_free_rate, w0)
+        elif objective == "minimize_risk":
+            solution = minimum_variance(covariance_matrix, w0)
+        else:
+            solution = maximum_return(expected_returns)
+        return self._remember(warm_key, solution)
+
+    def minimum_variance(self, covariance_matrix: ArrayLike, key: Optional[Hashable] = None) -> OptimizerSolution:
+        warm_key = None if key is None else (key, "minimum_variance")
+        w0 = self._warm_start(warm_key, np.asarray(covariance_matrix).shape[0])
+        return self._remember(warm_key, minimum_variance(covariance_matrix, w0))
+
+    def risk_parity(
+        self,
+        covariance_matrix: ArrayLike,
+        budgets: Optional[ArrayLike] = None,
+        key: Optional[Hashable] = None,
+    ) -> OptimizerSolution:
+        warm_key = None if key is None else (key, "risk_parity")
+        w0 = self._warm_start(warm_key, np.asarray(covariance_matrix).shape[0])
+        return self._remember(warm_key, risk_parity(covariance_matrix, budgets, w0))
+
+    def efficient_frontier(
+        self,
+        expected_returns: ArrayLike,
+        covariance_matrix: ArrayLike,
+        n_points: int = 20,
+        risk_free_rate: float = 0.0,
+    ) -> Dict[str, Any]:
+        return efficient_frontier(expected_returns, covariance_matrix, n_points, risk_free_rate)
+
+    def clear_warm_starts(self) -> None:
+        self._warm.clear()
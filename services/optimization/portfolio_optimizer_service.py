@@ -47,14 +47,15 @@ from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple
 import numpy as np
 import pandas as pd
-from scipy.optimize import minimize
 from schemas.optimization import (
     OptimizationResult,
     OptimizationObjective,
     OptimizationMethod,
     OptimizationConstraints
 )
+from services.optimization.optimizer_backend import OptimizerBackend
 from services.portfolio.portfolio_aggregator import get_portfolio_aggregator
+from services.risk.covariance_service import get_covariance_service
 from services.system.cache_service import get_cache_service
 
 logger = logging.getLogger(__name__)
@@ -70,6 +71,7 @@ class PortfolioOptimizerService:
         self.portfolio_aggregator = get_portfolio_aggregator()
         self.cache_service = get_cache_service()
         self.risk_free_rate = 0.02  # 2% risk-free rate
+        self.backend = OptimizerBackend()
         
     async def optimize(
         self,
@@ -124,15 +126,16 @@ class PortfolioOptimizerService:
         # Optimize based on method
         if method == "mean_variance":
             optimal_weights = await self._mean_variance_optimize(
-                expected_returns, covariance_matrix, objective, constraints
+                expected_returns, covariance_matrix, objective, constraints,
+                warm_start_key=portfolio_id
             )
         elif method == "risk_parity":
             optimal_weights = await self._risk_parity_optimize(
-                covariance_matrix, constraints
+                covariance_matrix, constraints, warm_start_key=portfolio_id
             )
         elif method == "minimum_variance":
             optimal_weights = await self._minimum_variance_optimize(
-                covariance_matrix, constraints
+                covariance_matrix, constraints, warm_start_key=portfolio_id
             )
         else:
             raise ValueError(f"Unknown optimization method: {method}")
@@ -168,116 +171,80 @@ class PortfolioOptimizerService:
         
         return result
     
+    async def efficient_frontier(
+        self,
+        portfolio_id: str,
+        n_points: int = 20,
+        risk_model: str = "historical",
+        lookback_days: int = 252
+    ) -> Dict:
+        """
+        Long-only efficient frontier for the portfolio's holdings.
+        
+        Returns:
+            Dict with per-point returns, risks, Sharpe ratios and weights
+        """
+        portfolio_data = await self._get_portfolio_data(portfolio_id)
+        holdings = portfolio_data.get('holdings', [])
+        if not holdings:
+            raise ValueError("Portfolio has no holdings")
+        
+        symbols = [h.get('symbol', '') for h in holdings]
+        expected_returns = await self._get_expected_returns(symbols, risk_model)
+        covariance_matrix = await self._get_covariance_matrix(symbols, lookback_days)
+        
+        frontier = self.backend.efficient_frontier(
+            expected_returns, covariance_matrix, n_points, self.risk_free_rate
+        )
+        return {
+            'portfolio_id': portfolio_id,
+            'returns': frontier['returns'].tolist(),
+            'risks': frontier['risks'].tolist(),
+            'sharpe_ratios': frontier['sharpe_ratios'].tolist(),
+            'weights': [
+                {symbols[i]: float(w[i]) for i in range(len(symbols))}
+                for w in frontier['weights']
+            ]
+        }
+    
     async def _mean_variance_optimize(
         self,
         expected_returns: np.ndarray,
         covariance_matrix: np.ndarray,
         objective: str,
-        constraints: OptimizationConstraints
+        constraints: OptimizationConstraints,
+        warm_start_key: Optional[str] = None
     ) -> np.ndarray:
         """Mean-Variance Optimization."""
-        n = len(expected_returns)
-        
-        # Initial guess (equal weights)
-        x0 = np.ones(n) / n
-        
-        # Objective function
-        if objective == "maximize_sharpe":
-            def objective_func(weights):
-                portfolio_return = np.dot(weights, expected_returns)
-                portfolio_risk = np.sqrt(np.dot(weights, np.dot(covariance_matrix, weights)))
-                sharpe = (portfolio_return - self.risk_free_rate) / portfolio_risk if portfolio_risk > 0 else -1e10
-                return -sharpe  # Minimize negative Sharpe
-        elif objective == "minimize_risk":
-            def objective_func(weights):
-                return np.sqrt(np.dot(weights, np.dot(covariance_matrix, weights)))
-        elif objective == "maximize_return":
-            def objective_func(weights):
-                return -np.dot(weights, expected_returns)  # Minimize negative return
-        else:
-            raise ValueError(f"Unknown objective: {objective}")
-        
-        # Constraints
-        constraint_list = [
-            {'type': 'eq', 'fun': lambda w: np.sum(w) - 1.0}  # Weights sum to 1
-        ]
-        
-        # Bounds (long-only by default)
-        bounds = [(0.0, 1.0) for _ in range(n)]
-        
-        # Optimize
-        result = minimize(
-            objective_func,
-            x0,
-            method='SLSQP',
-            bounds=bounds,
-            constraints=constraint_list,
-            options={'maxiter': 1000}
+        solution = self.backend.mean_variance(
+            expected_returns, covariance_matrix, objective,
+            risk_free_rate=self.risk_free_rate, key=warm_start_key
         )
-        
-        if not result.success:
-            logger.warning(f"Optimization did not converge: {result.message}")
-        
-        return result.x
+        if not solution.converged:
+            logger.warning(f"Mean-variance optimization did not converge ({solution.method})")
+        return solution.weights
     
     async def _risk_parity_optimize(
         self,
         covariance_matrix: np.ndarray,
-        constraints: OptimizationConstraints
+        constraints: OptimizationConstraints,
+        warm_start_key: Optional[str] = None
     ) -> np.ndarray:
-        """Risk Parity Optimization."""
-        n = covariance_matrix.shape[0]
-        
-        # Risk parity: equal risk contribution from each asset
-        def objective_func(weights):
-            portfolio_risk = np.sqrt(np.dot(weights, np.dot(covariance_matrix, weights)))
-            marginal_contributions = np.dot(covariance_matrix, weights) / portfolio_risk
-            risk_contributions = weights * marginal_contributions
-            target_contribution = 1.0 / n
-            return np.sum((risk_contributions - target_contribution) ** 2)
-        
-        x0 = np.ones(n) / n
-        bounds = [(0.0, 1.0) for _ in range(n)]
-        constraint_list = [
-            {'type': 'eq', 'fun': lambda w: np.sum(w) - 1.0}
-        ]
-        
-        result = minimize(
-            objective_func,
-            x0,
-            method='SLSQP',
-            bounds=bounds,
-            constraints=constraint_list
-        )
-        
-        return result.x
+        """Risk Parity Optimization (equal risk contributions)."""
+        solution = self.backend.risk_parity(covariance_matrix, key=warm_start_key)
+        return solution.weights
     
     async def _minimum_variance_optimize(
         self,
         covariance_matrix: np.ndarray,
-        constraints: OptimizationConstraints
+        constraints: OptimizationConstraints,
+        warm_start_key: Optional[str] = None
     ) -> np.ndarray:
         """Minimum Variance Optimization."""
-        n = covariance_matrix.shape[0]
-        
-        def objective_func(weights):
-            return np.sqrt(np.dot(weights, np.dot(covariance_matrix, weights)))
-        
-        x0 = np.ones(n) / n
-        bounds = [(0.0, 1.0) for _ in range(n)]
-        constraint_list = [
-            {'type': 'eq', 'fun': lambda w: np.sum(w) - 1.0}
-        ]
-        
-        result = minimize(
-            objective_func,
-            x0,
-            method='SLSQP',
-            bounds=bounds,
-            constraints=constraint_list
-        )
-        
-        return result.x
+        solution = self.backend.minimum_variance(covariance_matrix, key=warm_start_key)
+        if not solution.converged:
+            logger.warning(f"Minimum-variance optimization did not converge ({solution.method})")
+        return solution.weights
     
     async def _get_portfolio_data(self, portfolio_id: str) -> Dict:
         """Get portfolio holdings."""
@@ -306,15 +273,11 @@ class PortfolioOptimizerService:
         symbols: List[str],
         lookback_days: int
     ) -> np.ndarray:
-        """Get covariance matrix for symbols."""
-        # In production, calculate from historical returns
-        # For now, return mock covariance matrix
-        n = len(symbols)
-        np.random.seed(42)
-        base_cov = np.random.rand(n, n)
-        covariance = (base_cov + base_cov.T) / 2  # Make symmetric
-        np.fill_diagonal(covariance, 0.04)  # 20% volatility on diagonal
-        return covariance
+        """Get annualized covariance matrix for symbols."""
+        estimate = get_covariance_service().annualized_covariance(
+            symbols, lookback_days, method="ledoit_wolf"
+        )
+        return estimate.to_dense()
     
     async def _check_constraints(
         self,
@@ -5,17 +5,49 @@ Finds yield generation candidates in holdings.
 import logging
 from typing import List, Dict, Any
 
+import numpy as np
+
+from services.options.greeks_engine import bs_chain_greeks
+from services.options.iv_surface import get_iv_surface_service
+
 logger = logging.getLogger(__name__)
 
+OTM_FACTOR = 1.05  # 5% OTM
+EXPIRY_YEARS = 30 / 365.0  # one-month call
+
 class CallScanner:
     """Scans for yield opportunities."""
-    
+
     def find_opportunities(self, holdings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         # Filter for 100+ share lots (standard contracts)
         candidates = [h for h in holdings if h.get("shares", 0) >= 100]
-        
+        if not candidates:
+            return []
+
+        # Price every candidate's call off its cached IV surface in one pass;
+        # tickers without surface quotes keep the placeholder figures
+        service = get_iv_surface_service()
+        spots = np.array([c['current_price'] for c in candidates], dtype=np.float64)
+        strikes = spots * OTM_FACTOR
+        ivs = np.array([
+            float(service.implied_vol(c['ticker'], spot, strike, EXPIRY_YEARS))
+            for c, spot, strike in zip(candidates, spots, strikes)
+        ])
+        quotes = bs_chain_greeks(spots, strikes, EXPIRY_YEARS, ivs, True)
+        # Premium over a 30-day expiry is the monthly yield
+        monthly_yield = quotes["price"] / spots * 100
+
         ops = []
-        for c in candidates:
+        for i, c in enumerate(candidates):
+            if np.isfinite(ivs[i]):
+                ops.append({
+                    "ticker": c['ticker'],
+                    "potential_yield": f"{monthly_yield[i]:.2f}% / mo",
+                    "recommended_strike": float(strikes[i]),
+                    "target_delta": round(float(quotes["delta"][i]), 2),
+                    "implied_vol": round(float(ivs[i]), 4),
+                })
+                continue
             # Placeholder for option chain fetch
             ops.append({
                 "ticker": c['ticker'],
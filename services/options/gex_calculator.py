@@ -3,11 +3,18 @@ Gamma Exposure (GEX) Calculator.
 Predicts institutional dealer hedging pressure based on options chain data.
 """
 from typing import List, Dict, Any, Optional
-import math
 import logging
 
+import numpy as np
+from numpy.typing import ArrayLike
+
+from services.options.greeks_engine import bs_chain_greeks
+
 logger = logging.getLogger(__name__)
 
+CONTRACT_SIZE = 100
+
+
 class GEXCalculator:
     """
     Calculates aggregate Gamma Exposure for indices (SPY, QQQ).
@@ -25,48 +32,59 @@ class GEXCalculator:
         Returns:
             Dict: {total_gex, gamma_flip_price, call_gex, put_gex}
         """
-        total_gex = 0.0
-        call_gex = 0.0
-        put_gex = 0.0
-        
-        # Group by strike for flip detection
-        strike_gex: Dict[float, float] = {}
+        return GEXCalculator.calculate_gex_arrays(
+            spot_price,
+            strikes=[float(c['strike']) for c in options_chain],
+            open_interest=[float(c['open_interest']) for c in options_chain],
+            is_call=[c['type'].upper() == 'CALL' for c in options_chain],
+            gamma=[float(c['gamma']) for c in options_chain],
+        )
 
-        for contract in options_chain:
-            strike = float(contract['strike'])
-            gamma = float(contract['gamma'])
-            oi = float(contract['open_interest'])
-            
-            # Simplified GEX calculation
-            # GEX = Gamma * OI * 100 (contract size) * Spot^2 (if normalized)
-            # Standard GEX = Gamma * OI * 100
-            gex_val = gamma * oi * 100
-            
-            if contract['type'].upper() == 'CALL':
-                call_gex += gex_val
-                strike_gex[strike] = strike_gex.get(strike, 0) + gex_val
-            else:
-                # Puts are negative gamma for dealers usually
-                put_gex -= gex_val
-                strike_gex[strike] = strike_gex.get(strike, 0) - gex_val
-                
+    @staticmethod
+    def calculate_gex_arrays(
+        spot_price: float,
+        strikes: ArrayLike,
+        open_interest: ArrayLike,
+        is_call: ArrayLike,
+        gamma: Optional[ArrayLike] = None,
+        ivs: Optional[ArrayLike] = None,
+        expiries: Optional[ArrayLike] = None,
+        r: float = 0.0,
+    ) -> Dict[str, Any]:
+        """
+        Column-oriented GEX for a full chain.
+
+        When gamma is not supplied it is computed for every contract in one
+        vectorized Black-Scholes pass from ivs and expiries (years).
+        """
+        strikes = np.asarray(strikes, dtype=np.float64)
+        is_call = np.asarray(is_call, dtype=bool)
+        if gamma is None:
+            if ivs is None or expiries is None:
+                raise ValueError("ivs and expiries are required when gamma is not supplied")
+            gamma = bs_chain_greeks(spot_price, strikes, expiries, ivs, is_call, r=r)["gamma"]
+
+        # Simplified GEX calculation
+        # GEX = Gamma * OI * 100 (contract size) * Spot^2 (if normalized)
+        # Standard GEX = Gamma * OI * 100
+        gex = np.asarray(gamma, dtype=np.float64) * np.asarray(open_interest, dtype=np.float64) * CONTRACT_SIZE
+        # Puts are negative gamma for dealers usually
+        signed = np.where(is_call, gex, -gex)
+        call_gex = float(gex[is_call].sum())
+        put_gex = 0.0 - float(gex[~is_call].sum())
         total_gex = call_gex + put_gex
 
-        # Gamma Flip is where strike_gex transitions from positive to negative
-        # Find strike closest to zero GEX
-        sorted_strikes = sorted(strike_gex.keys())
-        gamma_flip = spot_price # Default to spot
-        
-        closest_val = float('inf')
-        for s in sorted_strikes:
-            if abs(strike_gex[s]) < closest_val:
-                closest_val = abs(strike_gex[s])
-                gamma_flip = s
+        # Gamma Flip: strike whose net GEX is closest to zero (lowest strike on ties)
+        gamma_flip = float(spot_price)
+        if strikes.size:
+            unique_strikes, inverse = np.unique(strikes, return_inverse=True)
+            strike_gex = np.bincount(inverse, weights=signed, minlength=unique_strikes.size)
+            gamma_flip = float(unique_strikes[np.argmin(np.abs(strike_gex))])
 
         return {
             'total_gex': float(total_gex),
-            'call_gex': float(call_gex),
-            'put_gex': float(put_gex),
-            'gamma_flip_price': float(gamma_flip),
+            'call_gex': call_gex,
+            'put_gex': put_gex,
+            'gamma_flip_price': gamma_flip,
             'market_regime': 'LONG_GAMMA' if total_gex > 0 else 'SHORT_GAMMA'
         }
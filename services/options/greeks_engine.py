@@ -6,6 +6,10 @@ PURPOSE: Calculate Delta, Gamma, Theta, Vega, and Rho for option chains.
          Used for 'Tail Risk Hedging' (buying cheap OTM puts) and 
          'Covered Calls' (selling income).
 
+         calculate_chain_greeks prices a whole chain (strike/expiry/IV/flag
+         vectors) in one NumPy pass; calculate_bs_greeks remains the
+         single-contract entry point.
+
 INTEGRATION:
     - MarketDataService: Spot price, volatility.
     - RiskService: Portfolio beta.
@@ -18,10 +22,85 @@ CREATED: 2026-01-30
 import logging
 import math
 from decimal import Decimal
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+from scipy.special import ndtr
 
 logger = logging.getLogger(__name__)
 
+GREEK_COLUMNS = ("price", "delta", "gamma", "theta", "vega", "rho")
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+
+def bs_chain_greeks(
+    S: ArrayLike,
+    K: ArrayLike,
+    T: ArrayLike,
+    sigma: ArrayLike,
+    is_call: ArrayLike,
+    r: ArrayLike = 0.0,
+    q: ArrayLike = 0.0,
+) -> Dict[str, NDArray]:
+    """
+    Black-Scholes-Merton price and Greeks for broadcastable contract arrays.
+
+    Theta is per calendar day, vega and rho per 1% move (the same scaling
+    as calculate_bs_greeks). Contracts that cannot be priced (T <= 0,
+    sigma <= 0, non-positive or non-finite inputs) never raise: they get
+    intrinsic value, a step delta and zero for every other Greek.
+    """
+    S, K, T, sigma, r, q = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (S, K, T, sigma, r, q))
+    )
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), S.shape)
+    with np.errstate(invalid="ignore"):
+        valid = (T > 0) & (sigma > 0) & (S > 0) & (K > 0) & np.isfinite(S + K + T + sigma + r + q)
+
+    # Substitute harmless values so invalid rows compute without warnings
+    S_ = np.where(valid, S, 1.0)
+    K_ = np.where(valid, K, 1.0)
+    T_ = np.where(valid, T, 1.0)
+    sig = np.where(valid, sigma, 1.0)
+    r_ = np.where(valid, r, 0.0)
+    q_ = np.where(valid, q, 0.0)
+
+    sqrt_T = np.sqrt(T_)
+    d1 = (np.log(S_ / K_) + (r_ - q_ + 0.5 * sig * sig) * T_) / (sig * sqrt_T)
+    d2 = d1 - sig * sqrt_T
+    pdf_d1 = _INV_SQRT_2PI * np.exp(-0.5 * d1 * d1)
+    sign = np.where(is_call, 1.0, -1.0)
+    cdf_d1 = ndtr(sign * d1)
+    cdf_d2 = ndtr(sign * d2)
+    disc_r = np.exp(-r_ * T_)
+    disc_q = np.exp(-q_ * T_)
+
+    price = sign * (S_ * disc_q * cdf_d1 - K_ * disc_r * cdf_d2)
+    delta = sign * disc_q * cdf_d1
+    gamma = disc_q * pdf_d1 / (S_ * sig * sqrt_T)
+    vega = S_ * disc_q * pdf_d1 * sqrt_T / 100.0
+    theta = (
+        -S_ * disc_q * pdf_d1 * sig / (2.0 * sqrt_T)
+        - sign * r_ * K_ * disc_r * cdf_d2
+        + sign * q_ * S_ * disc_q * cdf_d1
+    ) / 365.0
+    rho = sign * K_ * T_ * disc_r * cdf_d2 / 100.0
+
+    with np.errstate(invalid="ignore"):
+        intrinsic = np.nan_to_num(np.maximum(sign * (S - K), 0.0))
+        step_delta = np.where(sign * (S - K) > 0, sign, 0.0)
+    zero = np.zeros(S.shape)
+    return {
+        "price": np.where(valid, price, intrinsic),
+        "delta": np.where(valid, delta, step_delta),
+        "gamma": np.where(valid, gamma, zero),
+        "theta": np.where(valid, theta, zero),
+        "vega": np.where(valid, vega, zero),
+        "rho": np.where(valid, rho, zero),
+    }
+
+
 class GreeksEngine:
     """
     Calculates Option Greeks using Black-Scholes logic.
@@ -34,10 +113,13 @@ class GreeksEngine:
         T: float,      # Time to Expiry (years)
         r: float,      # Risk-free Rate
         sigma: float,  # Volatility
-        is_call: bool = True
+        is_call: bool = True,
+        round_digits: Optional[int] = 4
     ) -> Dict[str, float]:
         """
         Calculate Greeks using Black-Scholes-Merton.
+
+        round_digits=None returns unrounded values.
         """
         if T <= 0:
             return {"delta": 0.0, "gamma": 0.0, "theta": 0.0, "vega": 0.0, "rho": 0.0}
@@ -69,13 +151,10 @@ class GreeksEngine:
                 theta = (- (S * pdf_d1 * sigma) / (2 * sqrt_T) 
                          + r * K * math.exp(-r * T) * cdf_neg_d2) / 365.0
 
-            return {
-                "delta": round(delta, 4),
-                "gamma": round(gamma, 4),
-                "theta": round(theta, 4),
-                "vega": round(vega, 4),
-                "rho": round(rho, 4)
-            }
+            greeks = {"delta": delta, "gamma": gamma, "theta": theta, "vega": vega, "rho": rho}
+            if round_digits is None:
+                return greeks
+            return {name: round(value, round_digits) for name, value in greeks.items()}
         except Exception as e:
             logger.error(f"Error calculating Greeks: {e}")
             return {"delta": 0.0, "gamma": 0.0, "theta": 0.0, "vega": 0.0, "rho": 0.0}
@@ -83,6 +162,38 @@ class GreeksEngine:
     # Alias for backward compatibility if needed
     calculate_greeks = calculate_bs_greeks
 
+    def calculate_chain_greeks(
+        self,
+        S: ArrayLike,
+        strikes: ArrayLike,
+        expiries: ArrayLike,
+        ivs: ArrayLike,
+        is_call: ArrayLike,
+        r: ArrayLike = 0.0,
+        q: ArrayLike = 0.0,
+        round_digits: Optional[int] = None
+    ) -> Dict[str, NDArray]:
+        """
+        Greeks for an entire option chain in one vectorized pass.
+
+        Args:
+            S: Spot price, scalar or one per contract (multi-underlying chains).
+            strikes: Strike per contract.
+            expiries: Time to expiry in years per contract.
+            ivs: Implied volatility per contract.
+            is_call: True for calls, False for puts, per contract.
+            r: Risk-free rate.
+            q: Continuous dividend yield.
+            round_digits: Optional rounding applied to every column.
+
+        Returns:
+            Dict of arrays keyed by GREEK_COLUMNS, aligned with the inputs.
+        """
+        columns = bs_chain_greeks(S, strikes, expiries, ivs, is_call, r=r, q=q)
+        if round_digits is not None:
+            columns = {name: np.round(values, round_digits) for name, values in columns.items()}
+        return columns
+
     def _norm_cdf(self, x):
         """Standard Normal CDF."""
         return (1.0 + math.erf(x / math.sqrt(2.0))) / 2.0
@@ -3,8 +3,11 @@ IV Rank Filter.
 Ensures we only sell premium when it is expensive.
 """
 import logging
+import math
 from typing import Dict, Any
 
+from services.options.iv_surface import get_iv_surface_service
+
 logger = logging.getLogger(__name__)
 
 class IVRankFilter:
@@ -20,3 +23,10 @@ class IVRankFilter:
             "is_expensive": is_expensive,
             "action": "SELL_PREMIUM" if is_expensive else "WAIT"
         }
+
+    def check_rank_from_surface(self, ticker: str, iv_high: float, iv_low: float, expiry_years: float = 30 / 365.0) -> Dict[str, Any]:
+        """Rank the cached surface's ATM IV instead of an externally supplied one."""
+        current_iv = get_iv_surface_service().atm_vol(ticker, expiry_years)
+        if math.isnan(current_iv):
+            return {"iv_rank": None, "is_expensive": False, "action": "NO_DATA"}
+        return self.check_rank(ticker, current_iv, iv_high, iv_low)
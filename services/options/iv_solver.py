@@ -0,0 +1,191 @@
+"""
+==============================================================================
+FILE: services/options/iv_solver.py
+ROLE: Batch Implied Volatility Solver
+PURPOSE: Invert Black-Scholes-Merton prices into implied volatilities for
+         entire option chains at once (one NumPy pass per iteration).
+
+METHOD:
+    - Each quote is mapped to its out-of-the-money side through put-call
+      parity, where the price is most sensitive to volatility.
+    - Corrado-Miller's closed-form approximation seeds every element.
+    - A safeguarded Newton iteration keeps a per-element volatility bracket
+      and falls back to bisection whenever the Newton step leaves it or
+      vega vanishes, so every element converges or stops at max_iter. A
+      bracket that collapses onto MIN_VOL/MAX_VOL without matching the
+      price is reported as not converged.
+    - Converged elements drop out of the active set, so later iterations
+      only touch the few stubborn (deep wing / short-dated) quotes.
+
+AUTHOR: AI Investor Team
+CREATED: 2026-10-18
+==============================================================================
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+from scipy.special import ndtr
+
+logger = logging.getLogger(__name__)
+
+MIN_VOL = 1e-4
+MAX_VOL = 5.0
+# OTM prices below this fraction of the forward carry no vol information
+PRICE_FLOOR = 1e-10
+_INV_SQRT_2PI = 1.0 / math.sqrt(2.0 * math.pi)
+
+
+@dataclass
+class IVSolveResult:
+    """Implied vols (NaN where unsolvable) with per-element diagnostics."""
+    iv: NDArray
+    converged: NDArray
+    iterations: NDArray
+
+    @property
+    def convergence_rate(self) -> float:
+        return float(self.converged.mean()) if self.converged.size else 1.0
+
+
+def _otm_price_vega(
+    sigma: NDArray,
+    fwd: NDArray,
+    strike_pv: NDArray,
+    T: NDArray,
+    is_put: NDArray,
+):
+    """Price and raw vega of the OTM-side option in discounted terms."""
+    sqrt_T = np.sqrt(T)
+    vol = sigma * sqrt_T
+    d1 = np.log(fwd / strike_pv) / vol + 0.5 * vol
+    d2 = d1 - vol
+    sign = np.where(is_put, -1.0, 1.0)
+    price = sign * (fwd * ndtr(sign * d1) - strike_pv * ndtr(sign * d2))
+    vega = fwd * _INV_SQRT_2PI * np.exp(-0.5 * d1 * d1) * sqrt_T
+    return price, vega
+
+
+def initial_vol_guess(price: ArrayLike, fwd: ArrayLike, strike_pv: ArrayLike, T: ArrayLike) -> NDArray:
+    """
+    Corrado-Miller rational approximation from a call price, with
+    discounted spot (fwd) and strike (strike_pv). Falls back to
+    Brenner-Subrahmanyam when the square-root term goes negative.
+    """
+    price, fwd, strike_pv, T = (np.asarray(x, dtype=np.float64) for x in (price, fwd, strike_pv, T))
+    half_gap = 0.5 * (fwd - strike_pv)
+    core = price - half_gap
+    radicand = core * core - (fwd - strike_pv) ** 2 / math.pi
+    guess = math.sqrt(2.0 * math.pi) / (fwd + strike_pv) * (core + np.sqrt(np.maximum(radicand, 0.0)))
+    guess = guess / np.sqrt(T)
+    atm_guess = math.sqrt(2.0 * math.pi) * price / (fwd * np.sqrt(T))
+    guess = np.where((radicand < 0) | ~np.isfinite(guess) | (guess <= 0), atm_guess, guess)
+    return np.clip(guess, MIN_VOL, MAX_VOL)
+
+
+def solve_implied_vol(
+    prices: ArrayLike,
+    S: ArrayLike,
+    K: ArrayLike,
+    T: ArrayLike,
+    is_call: ArrayLike,
+    r: ArrayLike = 0.0,
+    q: ArrayLike = 0.0,
+    tol: float = 1e-8,
+    max_iter: int = 50,
+) -> IVSolveResult:
+    """
+    Implied volatility for broadcastable arrays of option quotes.
+
+    Args:
+        prices: Observed option prices.
+        S: Spot price(s).
+        K: Strike per contract.
+        T: Time to expiry in years.
+        is_call: True for calls, False for puts.
+        r: Risk-free rate.
+        q: Continuous dividend yield.
+        tol: Relative price tolerance.
+        max_iter: Iteration cap per element.
+
+    Returns:
+        IVSolveResult; quotes outside no-arbitrage bounds, with T <= 0,
+        or whose OTM-side price is below PRICE_FLOOR of the forward get
+        NaN and converged=False instead of raising.
+    """
+    prices, S, K, T, r, q = np.broadcast_arrays(
+        *(np.asarray(x, dtype=np.float64) for x in (prices, S, K, T, r, q))
+    )
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), prices.shape)
+    shape = prices.shape
+    prices, S, K, T, r, q, is_call = (a.ravel() for a in (prices, S, K, T, r, q, is_call))
+
+    iv = np.full(prices.size, np.nan)
+    converged = np.zeros(prices.size, dtype=bool)
+    iterations = np.zeros(prices.size, dtype=np.int64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fwd = S * np.exp(-q * T)
+        strike_pv = K * np.exp(-r * T)
+        # Price the OTM side: an ITM call becomes the matching OTM put
+        use_put = fwd >= strike_pv
+        parity_gap = fwd - strike_pv
+        otm_price = np.where(
+            is_call != use_put, prices, np.where(is_call, prices - parity_gap, prices + parity_gap)
+        )
+        upper = np.where(use_put, strike_pv, fwd)
+        valid = (
+            (T > 0) & (fwd > 0) & (strike_pv > 0)
+            & (otm_price > PRICE_FLOOR * fwd) & (otm_price < upper) & np.isfinite(otm_price)
+        )
+
+    idx = np.flatnonzero(valid)
+    if idx.size:
+        f, kp, t, put, target = fwd[idx], strike_pv[idx], T[idx], use_put[idx], otm_price[idx]
+        # Seed from the equivalent call price (parity) so one formula covers both
+        call_equiv = np.where(put, target + f - kp, target)
+        sigma = initial_vol_guess(call_equiv, f, kp, t)
+        lo = np.full(idx.size, MIN_VOL)
+        hi = np.full(idx.size, MAX_VOL)
+        active = np.arange(idx.size)
+
+        for iteration in range(1, max_iter + 1):
+            s = sigma[active]
+            price, vega = _otm_price_vega(s, f[active], kp[active], t[active], put[active])
+            diff = price - target[active]
+            iterations[idx[active]] = iteration
+
+            # Relative tolerance, floored at the price's rounding noise
+            done = np.abs(diff) <= tol * target[active] + 1e-13 * f[active]
+            above = diff > 0
+            hi[active] = np.where(above, s, hi[active])
+            lo[active] = np.where(above, lo[active], s)
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                newton = s - diff / vega
+            a_lo, a_hi = lo[active], hi[active]
+            bisect = ~((newton > a_lo) & (newton < a_hi) & (vega > 1e-12))
+            sigma[active] = np.where(bisect, 0.5 * (a_lo + a_hi), newton)
+            sigma[active[done]] = s[done]
+            collapsed = (a_hi - a_lo) < 1e-10
+            # Collapsed onto a vol limit with the price still off: unsolvable in range
+            pinned = collapsed & ~done & ((a_hi >= MAX_VOL) | (a_lo <= MIN_VOL))
+            converged[idx[active[done | (collapsed & ~pinned)]]] = True
+            done |= collapsed
+
+            active = active[~done]
+            if not active.size:
+                break
+
+        iv[idx] = sigma
+        iv[idx[~converged[idx]]] = np.nan
+
+    if idx.size < prices.size:
+        logger.debug(f"IV solver: {prices.size - idx.size} quotes outside no-arbitrage bounds")
+    return IVSolveResult(
+        iv=iv.reshape(shape),
+        converged=converged.reshape(shape),
+        iterations=iterations.reshape(shape),
+    )
@@ -0,0 +1,204 @@
+"""
+==============================================================================
+FILE: services/options/iv_surface.py
+ROLE: Implied Volatility Surface Cache
+PURPOSE: Maintain a smoothed implied-volatility surface per underlying on a
+         fixed moneyness x expiry grid, updated incrementally as quotes
+         arrive, so filters and scanners can read IVs instead of relying on
+         externally supplied values.
+
+SURFACE MODEL:
+    - Quotes are solved with the batch IV solver and binned by nearest grid
+      node into weighted sums of variance (iv^2).
+    - Updates decay the sums of the nodes they quote by `memory` before
+      adding to them, so a stream of re-quotes tracks the market without
+      refitting from scratch, while nodes a batch does not touch keep
+      their last estimate.
+    - The smoothed grid is a separable Gaussian kernel regression over the
+      node sums (two small matrix products), recomputed lazily on read.
+    - Lookups interpolate bilinearly in (moneyness, expiry).
+
+AUTHOR: AI Investor Team
+CREATED: 2026-10-18
+==============================================================================
+"""
+
+import logging
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from services.options.iv_solver import IVSolveResult, solve_implied_vol
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MONEYNESS = np.linspace(0.5, 1.5, 41)
+DEFAULT_EXPIRIES = np.array([
+    7, 14, 21, 30, 45, 60, 90, 120, 180, 270, 365, 545, 730
+]) / 365.0
+
+
+def _kernel_matrix(axis: NDArray, bandwidth: float) -> NDArray:
+    """Gaussian weights between grid nodes (bandwidth in node spacings)."""
+    positions = np.arange(axis.size, dtype=np.float64)
+    distance = (positions[:, None] - positions[None, :]) / max(bandwidth, 1e-6)
+    return np.exp(-0.5 * distance * distance)
+
+
+def _locate(axis: NDArray, values: NDArray):
+    """Left node index and interpolation weight, clamped to the axis range."""
+    clipped = np.clip(values, axis[0], axis[-1])
+    left = np.clip(np.searchsorted(axis, clipped, side="right") - 1, 0, axis.size - 2)
+    weight = (clipped - axis[left]) / (axis[left + 1] - axis[left])
+    return left, weight
+
+
+class IVSurface:
+    """
+    Smoothed implied-volatility surface for one underlying.
+    """
+
+    def __init__(
+        self,
+        moneyness: ArrayLike = DEFAULT_MONEYNESS,
+        expiries: ArrayLike = DEFAULT_EXPIRIES,
+        bandwidth: float = 1.0,
+        memory: float = 0.5,
+    ):
+        self.moneyness = np.asarray(moneyness, dtype=np.float64)
+        self.expiries = np.asarray(expiries, dtype=np.float64)
+        self.memory = memory
+        self._strike_kernel = _kernel_matrix(self.moneyness, bandwidth)
+        self._expiry_kernel = _kernel_matrix(self.expiries, bandwidth)
+        shape = (self.expiries.size, self.moneyness.size)
+        self._weight = np.zeros(shape)
+        self._variance = np.zeros(shape)
+        self._smoothed: Optional[NDArray] = None
+        self.quote_count = 0
+
+    def update(self, moneyness: ArrayLike, expiries: ArrayLike, ivs: ArrayLike, weights: Optional[ArrayLike] = None) -> int:
+        """
+        Fold solved IVs into the surface; NaN IVs are ignored.
+
+        Returns:
+            Number of quotes absorbed.
+        """
+        m, t, iv = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64).ravel() for x in (moneyness, expiries, ivs)))
+        w = np.ones(iv.size) if weights is None else np.broadcast_to(np.asarray(weights, dtype=np.float64).ravel(), iv.shape)
+        keep = np.isfinite(iv) & np.isfinite(m) & (t > 0) & (w > 0)
+        if not keep.any():
+            return 0
+        m, t, iv, w = m[keep], t[keep], iv[keep], w[keep]
+
+        col = np.abs(self.moneyness[None, :] - m[:, None]).argmin(axis=1)
+        row = np.abs(self.expiries[None, :] - t[:, None]).argmin(axis=1)
+        touched = np.zeros(self._weight.shape, dtype=bool)
+        touched[row, col] = True
+        self._weight[touched] *= self.memory
+        self._variance[touched] *= self.memory
+        np.add.at(self._weight, (row, col), w)
+        np.add.at(self._variance, (row, col), w * iv * iv)
+        self._smoothed = None
+        self.quote_count += int(keep.sum())
+        return int(keep.sum())
+
+    def variance_grid(self) -> NDArray:
+        """Kernel-smoothed variance (iv^2) on the (expiry, moneyness) grid."""
+        if self._smoothed is None:
+            numerator = self._expiry_kernel @ self._variance @ self._strike_kernel.T
+            denominator = self._expiry_kernel @ self._weight @ self._strike_kernel.T
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self._smoothed = np.where(denominator > 1e-12, numerator / denominator, np.nan)
+        return self._smoothed
+
+    def iv_grid(self) -> NDArray:
+        """Smoothed implied volatility on the (expiry, moneyness) grid."""
+        return np.sqrt(self.variance_grid())
+
+    def implied_vol(self, moneyness: ArrayLike, expiries: ArrayLike) -> NDArray:
+        """Bilinear lookup of implied vol; NaN until nearby quotes exist."""
+        m, t = np.broadcast_arrays(np.asarray(moneyness, dtype=np.float64), np.asarray(expiries, dtype=np.float64))
+        grid = self.variance_grid()
+        i, wt = _locate(self.expiries, t)
+        j, wm = _locate(self.moneyness, m)
+        variance = (
+            (1 - wt) * ((1 - wm) * grid[i, j] + wm * grid[i, j + 1])
+            + wt * ((1 - wm) * grid[i + 1, j] + wm * grid[i + 1, j + 1])
+        )
+        return np.sqrt(variance)
+
+
+class IVSurfaceService:
+    """
+    Per-underlying cache of implied-volatility surfaces.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self):
+        if self._initialized:
+            return
+        self._surfaces: Dict[str, IVSurface] = {}
+        self._initialized = True
+
+    def get_surface(self, underlying: str) -> IVSurface:
+        """Cached surface for an underlying (created empty on first use)."""
+        surface = self._surfaces.get(underlying)
+        if surface is None:
+            surface = self._surfaces[underlying] = IVSurface()
+        return surface
+
+    def ingest_quotes(
+        self,
+        underlying: str,
+        spot: float,
+        strikes: ArrayLike,
+        expiries: ArrayLike,
+        prices: ArrayLike,
+        is_call: ArrayLike,
+        r: float = 0.0,
+        q: float = 0.0,
+        weights: Optional[ArrayLike] = None,
+    ) -> IVSolveResult:
+        """
+        Solve IVs for a batch of quotes and fold them into the surface.
+
+        Works equally for a full chain snapshot or a handful of updated
+        quotes from a stream.
+        """
+        result = solve_implied_vol(prices, spot, strikes, expiries, is_call, r=r, q=q)
+        moneyness = np.asarray(strikes, dtype=np.float64) / spot
+        absorbed = self.get_surface(underlying).update(moneyness, expiries, result.iv, weights)
+        logger.debug(f"IV surface {underlying}: absorbed {absorbed} quotes")
+        return result
+
+    def implied_vol(self, underlying: str, spot: float, strikes: ArrayLike, expiries: ArrayLike) -> NDArray:
+        """Surface IV for arbitrary strikes/expiries of a cached underlying."""
+        return self.get_surface(underlying).implied_vol(np.asarray(strikes, dtype=np.float64) / spot, expiries)
+
+    def atm_vol(self, underlying: str, expiry: float = 30 / 365.0) -> float:
+        """At-the-money IV for the given expiry (NaN when no quotes cached)."""
+        return float(self.get_surface(underlying).implied_vol(1.0, expiry))
+
+    def clear(self, underlying: Optional[str] = None) -> None:
+        """Drop one cached surface, or all of them."""
+        if underlying is None:
+            self._surfaces.clear()
+        else:
+            self._surfaces.pop(underlying, None)
+
+
+def get_iv_surface_service() -> IVSurfaceService:
+    """Get the singleton IV surface service."""
+    return IVSurfaceService()
@@ -27,8 +27,8 @@ import logging
 from datetime import datetime
 from typing import Dict, List, Optional
 import numpy as np
-from scipy.stats import norm
 from schemas.options import OptionsStrategy, StrategyGreeks, StrategyPnL, Greeks, StrategyAnalysis
+from services.options.greeks_engine import bs_chain_greeks
 from services.options.strategy_builder_service import get_strategy_builder_service
 from services.system.cache_service import get_cache_service
 
@@ -74,11 +74,11 @@ class OptionsAnalyticsService:
         
         leg_greeks = {}
         
-        for i, leg in enumerate(strategy.legs):
-            greeks = await self._calculate_leg_greeks(
-                leg, underlying_price, days_to_expiration, volatility
-            )
-            
+        all_greeks = await self._calculate_legs_greeks(
+            strategy.legs, underlying_price, days_to_expiration, volatility
+        )
+        
+        for i, (leg, greeks) in enumerate(zip(strategy.legs, all_greeks)):
             # Multiply by quantity and action
             multiplier = leg.quantity * (1 if leg.action.value == "buy" else -1)
             
@@ -197,6 +197,35 @@ class OptionsAnalyticsService:
             implied_volatility=volatility
         )
     
+    async def _calculate_legs_greeks(
+        self,
+        legs,
+        underlying_price: float,
+        days_to_expiration: int,
+        volatility: float
+    ) -> List[Greeks]:
+        """Calculate Greeks for all legs in one vectorized Black-Scholes pass."""
+        if not legs:
+            return []
+        columns = bs_chain_greeks(
+            underlying_price,
+            [leg.strike for leg in legs],
+            days_to_expiration / 365.0,
+            volatility,
+            [leg.option_type.value == "call" for leg in legs],
+            r=self.risk_free_rate,
+        )
+        return [
+            Greeks(
+                delta=float(columns["delta"][i]),
+                gamma=float(columns["gamma"][i]),
+                theta=float(columns["theta"][i]),
+                vega=float(columns["vega"][i]),
+                rho=float(columns["rho"][i])
+            )
+            for i in range(len(legs))
+        ]
+    
     async def _calculate_leg_greeks(
         self,
         leg,
@@ -205,48 +234,10 @@ class OptionsAnalyticsService:
         volatility: float
     ) -> Greeks:
         """Calculate Greeks for single leg using Black-Scholes."""
-        S = underlying_price
-        K = leg.strike
-        T = days_to_expiration / 365.0
-        r = self.risk_free_rate
-        sigma = volatility
-        
-        if T <= 0:
-            # At expiration
-            if leg.option_type.value == "call":
-                delta = 1.0 if S > K else 0.0
-            else:
-                delta = -1.0 if S < K else 0.0
-            return Greeks(delta=delta, gamma=0.0, theta=0.0, vega=0.0, rho=0.0)
-        
-        # Black-Scholes Greeks
-        d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
-        d2 = d1 - sigma * np.sqrt(T)
-        
-        if leg.option_type.value == "call":
-            delta = norm.cdf(d1)
-            theta = (-S * norm.pdf(d1) * sigma / (2 * np.sqrt(T)) - 
-                     r * K * np.exp(-r * T) * norm.cdf(d2)) / 365.0
-        else:  # put
-            delta = -norm.cdf(-d1)
-            theta = (-S * norm.pdf(d1) * sigma / (2 * np.sqrt(T)) + 
-                     r * K * np.exp(-r * T) * norm.cdf(-d2)) / 365.0
-        
-        gamma = norm.pdf(d1) / (S * sigma * np.sqrt(T))
-        vega = S * norm.pdf(d1) * np.sqrt(T) / 100.0  # Per 1% change in vol
-        
-        if leg.option_type.value == "call":
-            rho = K * T * np.exp(-r * T) * norm.cdf(d2) / 100.0
-        else:
-            rho = -K * T * np.exp(-r * T) * norm.cdf(-d2) / 100.0
-        
-        return Greeks(
-            delta=float(delta),
-            gamma=float(gamma),
-            theta=float(theta),
-            vega=float(vega),
-            rho=float(rho)
+        greeks = await self._calculate_legs_greeks(
+            [leg], underlying_price, days_to_expiration, volatility
         )
+        return greeks[0]
     
     async def _calculate_leg_value(
         self,
@@ -1,14 +1,46 @@
+import atexit
 import logging
-from datetime import timezone, datetime
-from typing import List, Dict, Any
-from config.database import SessionLocal
+import os
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+from config.database import SessionLocal, engine
 from sqlalchemy import text
+from services.tick_sink import TickSink, TimeLike
 
 logger = logging.getLogger(__name__)
 
+
+@contextmanager
+def _raw_cursor():
+    """psycopg2 cursor on a pooled engine connection, committed on success."""
+    if engine is None:
+        raise ConnectionError("Database engine not initialized.")
+    conn = engine.raw_connection()
+    try:
+        cur = conn.cursor()
+        try:
+            yield cur
+        finally:
+            cur.close()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
 class PriceTelemetryService:
     """
     Manages storage and retrieval of high-frequency price data (TimescaleDB).
+
+    Ticks are written behind through a TickSink (buffered, binary COPY) and the
+    latest price of symbols this process writes is answered from memory. Other
+    symbols are read from the hypertable and reused for read_ttl seconds, so
+    processes that only read (API vs. ingest workers) still see new prices.
+    Without a database engine ticks are skipped, not queued; queued ticks are
+    flushed at process exit.
     """
     _instance = None
 
@@ -21,54 +53,82 @@ class PriceTelemetryService:
         if hasattr(self, '_initialized') and self._initialized:
             return
         self._initialized = True
+        self.sink = TickSink(
+            _raw_cursor,
+            batch_size=int(os.getenv("TELEMETRY_FLUSH_ROWS", 50000)),
+            flush_interval=float(os.getenv("TELEMETRY_FLUSH_INTERVAL", 0.5)),
+            max_pending=int(os.getenv("TELEMETRY_MAX_PENDING", 1000000)),
+        )
+        self.read_ttl = float(os.getenv("TELEMETRY_READ_TTL_SECONDS", 1.0))
+        self._read_prices: Dict[str, Tuple[float, float]] = {}  # symbol -> (price, monotonic read time)
+        atexit.register(self.close)
         logger.info("PriceTelemetryService initialized")
 
-    def store_tick(self, symbol: str, price: float, volume: float = 0, source: str = "UNKNOWN"):
+    def store_tick(self, symbol: str, price: float, volume: float = 0, source: str = "UNKNOWN",
+                   ts: TimeLike = None):
         """
-        Inserts a price tick into the hypertable.
+        Queues a price tick for the next bulk write into the hypertable.
         """
-        if not SessionLocal:
+        if engine is None:
             logger.warning("DB not available. Skipping tick storage.")
             return
+        self.sink.add(symbol, price, volume, source, ts)
 
-        query = text("""
-            INSERT INTO price_telemetry (time, symbol, price, volume, source)
-            VALUES (:time, :symbol, :price, :volume, :source)
-        """)
-        
+    def store_ticks(self,
+                    symbols: Sequence[str],
+                    prices: Sequence[float],
+                    volumes: Optional[Sequence[float]] = None,
+                    sources: Union[str, Sequence[str]] = "UNKNOWN",
+                    times: Optional[Sequence[TimeLike]] = None) -> int:
+        """Queues many ticks given column-wise; returns how many were queued."""
+        if engine is None:
+            logger.warning("DB not available. Skipping tick storage.")
+            return 0
+        return self.sink.add_many(symbols, prices, volumes, sources, times)
+
+    def flush(self) -> int:
+        """Writes all queued ticks now."""
+        return self.sink.flush()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stops the flush thread and writes whatever is still queued."""
         try:
-            db = SessionLocal()
-            db.execute(query, {
-                "time": datetime.now(timezone.utc),
-                "symbol": symbol,
-                "price": price,
-                "volume": volume,
-                "source": source
-            })
-            db.commit()
-            db.close()
+            self.sink.stop(timeout)
         except Exception as e:
-            logger.error(f"Telemetry Write Error: {e}")
+            logger.error(f"Telemetry final flush failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.sink.get_stats()
 
     def get_latest_price(self, symbol: str) -> float:
         """Retrieves the most recent price for a symbol."""
+        price = self.sink.last_price(symbol)
+        if price is not None:
+            return price
+
+        # Written by another process: reuse a recent read, otherwise ask the hypertable
+        cached = self._read_prices.get(symbol)
+        if cached is not None and time.monotonic() - cached[1] < self.read_ttl:
+            return cached[0]
         if not SessionLocal:
-            return 0.0
+            return cached[0] if cached is not None else 0.0
 
         query = text("""
-            SELECT price FROM price_telemetry 
-            WHERE symbol = :symbol 
-            ORDER BY time DESC 
+            SELECT time, price FROM price_telemetry
+            WHERE symbol = :symbol
+            ORDER BY time DESC
             LIMIT 1
         """)
-        
+
         try:
             db = SessionLocal()
             result = db.execute(query, {"symbol": symbol}).fetchone()
             db.close()
             if result:
-                return float(result[0])
+                self._read_prices[symbol] = (float(result[1]), time.monotonic())
+                return float(result[1])
         except Exception as e:
             logger.error(f"Telemetry Read Error: {e}")
-            
-        return 0.0
+
+        # Read failed: a stale price beats none
+        return cached[0] if cached is not None else 0.0
@@ -2,6 +2,8 @@ import logging
 import numpy as np
 from typing import List, Dict, Any
 
+from services.quantitative.rolling_stats import rolling_corr
+
 logger = logging.getLogger(__name__)
 
 class CorrelationCalculator:
@@ -19,7 +21,15 @@ class CorrelationCalculator:
 
     def calculate_rolling_correlation(self, series_a: List[float], series_b: List[float], window: int = 20) -> List[float]:
         # rolling windows for breakdown detection
+        n_windows = len(series_a) - window + 1
+        if n_windows <= 0:
+            return []
+        # Windows that run past the end of a shorter series_b count as 0.0
+        overlap = min(len(series_a), len(series_b))
         correlations = []
-        for i in range(window, len(series_a) + 1):
-            correlations.append(self.calculate_pearson(series_a[i-window:i], series_b[i-window:i]))
-        return correlations
+        if window >= 2 and overlap >= window:
+            corr = rolling_corr(series_a[:overlap], series_b[:overlap], window)
+            correlations = [round(float(c), 4) for c in corr]
+        elif overlap >= window:
+            correlations = [0.0] * (overlap - window + 1)
+        return correlations + [0.0] * (n_windows - len(correlations))
@@ -0,0 +1,214 @@
+"""
+Covariance estimators over a (n_obs, n_assets) returns panel.
+
+sample and ledoit_wolf return dense matrices; pca returns a statistical
+factor model B B' + diag(d) kept in that compact form (n_assets x k
+loadings plus n_assets specific variances), which is all most consumers
+need for w'Sw and S w. EWMA keeps its unnormalised weighted sum of outer
+products so a new day of returns is one O(n_assets^2) rank-1 update.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("sample", "ledoit_wolf", "ewma", "pca")
+DEFAULT_EWMA_DECAY = 0.94  # RiskMetrics daily decay
+DEFAULT_FACTORS = 5
+
+
+def _returns_panel(returns: ArrayLike) -> NDArray:
+    arr = np.asarray(returns, dtype=np.float64)
+    if arr.ndim != 2:
+        raise ValueError("returns must be a 2-D (n_obs, n_assets) panel")
+    if arr.shape[0] < 2:
+        raise ValueError("at least two observations are required")
+    if not np.isfinite(arr).all():
+        raise ValueError("returns contain NaN or infinite values")
+    return arr
+
+
+@dataclass
+class CovarianceEstimate:
+    """A covariance matrix, dense or as loadings @ loadings.T + diag(specific)."""
+    method: str
+    n_obs: int
+    matrix: Optional[NDArray] = None
+    loadings: Optional[NDArray] = None
+    specific: Optional[NDArray] = None
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def is_factor_model(self) -> bool:
+        return self.matrix is None
+
+    @property
+    def n_assets(self) -> int:
+        return self.matrix.shape[0] if self.matrix is not None else self.specific.size
+
+    @property
+    def nbytes(self) -> int:
+        if self.matrix is not None:
+            return self.matrix.nbytes
+        return self.loadings.nbytes + self.specific.nbytes
+
+    def to_dense(self) -> NDArray:
+        if self.matrix is not None:
+            return self.matrix
+        dense = self.loadings @ self.loadings.T
+        dense[np.diag_indices_from(dense)] += self.specific
+        return dense
+
+    def variances(self) -> NDArray:
+        if self.matrix is not None:
+            return np.diag(self.matrix).copy()
+        return np.einsum("ij,ij->i", self.loadings, self.loadings) + self.specific
+
+    def matvec(self, weights: ArrayLike) -> NDArray:
+        """S @ w without materialising a factor-model matrix."""
+        w = np.asarray(weights, dtype=np.float64)
+        if self.matrix is not None:
+            return self.matrix @ w
+        return self.loadings @ (self.loadings.T @ w) + (self.specific * w.T).T
+
+    def portfolio_variance(self, weights: ArrayLike) -> float:
+        w = np.asarray(weights, dtype=np.float64)
+        return float(w @ self.matvec(w))
+
+    def scaled(self, factor: float) -> "CovarianceEstimate":
+        """Same estimate with every entry multiplied by factor (e.g. 252)."""
+        if self.matrix is not None:
+            return CovarianceEstimate(self.method, self.n_obs, matrix=self.matrix * factor, params=self.params)
+        return CovarianceEstimate(
+            self.method, self.n_obs, loadings=self.loadings * np.sqrt(factor),
+            specific=self.specific * factor, params=self.params,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form (factor models stay compact)."""
+        data: Dict[str, Any] = {"method": self.method, "n_obs": self.n_obs, "params": self.params}
+        if self.matrix is not None:
+            data["matrix"] = self.matrix.tolist()
+        else:
+            data["loadings"] = self.loadings.tolist()
+            data["specific"] = self.specific.tolist()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CovarianceEstimate":
+        as_array = lambda key: None if data.get(key) is None else np.asarray(data[key], dtype=np.float64)
+        return cls(
+            method=data["method"], n_obs=int(data["n_obs"]), matrix=as_array("matrix"),
+            loadings=as_array("loadings"), specific=as_array("specific"), params=data.get("params", {}),
+        )
+
+
+def sample_covariance(returns: ArrayLike) -> CovarianceEstimate:
+    arr = _returns_panel(returns)
+    centered = arr - arr.mean(axis=0)
+    matrix = centered.T @ centered / (arr.shape[0] - 1)
+    return CovarianceEstimate("sample", arr.shape[0], matrix=matrix)
+
+
+def ledoit_wolf_covariance(returns: ArrayLike) -> CovarianceEstimate:
+    """
+    Ledoit-Wolf (2004) shrinkage towards a scaled identity, with the
+    1/n_obs sample covariance the estimator is defined on.
+    """
+    arr = _returns_panel(returns)
+    n_obs, n_assets = arr.shape
+    centered = arr - arr.mean(axis=0)
+    sample = centered.T @ centered / n_obs
+    target = np.trace(sample) / n_assets
+    sample_sq = float(np.sum(sample * sample))
+    # ||S - mI||_F^2 and the mean ||x x' - S||_F^2 / T, each scaled by 1/N
+    dispersion = (sample_sq - 2 * target * np.trace(sample) + n_assets * target * target) / n_assets
+    row_norms = np.einsum("ij,ij->i", centered, centered)
+    noise = (float(np.sum(row_norms * row_norms)) / n_obs - sample_sq) / (n_obs * n_assets)
+    shrinkage = 0.0 if dispersion <= 0 else float(np.clip(noise / dispersion, 0.0, 1.0))
+    matrix = (1 - shrinkage) * sample
+    matrix[np.diag_indices(n_assets)] += shrinkage * target
+    return CovarianceEstimate("ledoit_wolf", n_obs, matrix=matrix, params={"shrinkage": shrinkage})
+
+
+def pca_covariance(returns: ArrayLike, n_factors: int = DEFAULT_FACTORS) -> CovarianceEstimate:
+    """
+    Statistical factor model from the top principal components of the
+    sample covariance; specific variances keep the sample diagonal exact.
+    """
+    arr = _returns_panel(returns)
+    n_obs, n_assets = arr.shape
+    k = max(1, min(n_factors, n_obs - 1, n_assets))
+    centered = (arr - arr.mean(axis=0)) / np.sqrt(n_obs - 1)
+    _, singular, vt = np.linalg.svd(centered, full_matrices=False)
+    loadings = vt[:k].T * singular[:k]
+    total = np.einsum("ij,ij->j", centered, centered)
+    specific = total - np.einsum("ij,ij->i", loadings, loadings)
+    specific = np.maximum(specific, 1e-12 * max(float(total.max()), 1e-300))
+    explained = float(np.sum(singular[:k] ** 2) / max(np.sum(singular ** 2), 1e-300))
+    return CovarianceEstimate(
+        "pca", n_obs, loadings=loadings, specific=specific,
+        params={"n_factors": k, "explained_variance": explained},
+    )
+
+
+class EWMACovariance:
+    """
+    Zero-mean exponentially weighted covariance (RiskMetrics) that can be
+    rolled forward one day at a time; identical to a full recompute.
+    """
+
+    def __init__(self, n_assets: int, decay: float = DEFAULT_EWMA_DECAY):
+        if not 0 < decay < 1:
+            raise ValueError("decay must be in (0, 1)")
+        self.decay = decay
+        self.weighted_sum = np.zeros((n_assets, n_assets))
+        self.total_weight = 0.0
+        self.n_obs = 0
+
+    @classmethod
+    def from_returns(cls, returns: ArrayLike, decay: float = DEFAULT_EWMA_DECAY) -> "EWMACovariance":
+        arr = _returns_panel(returns)
+        ewma = cls(arr.shape[1], decay)
+        weights = decay ** np.arange(arr.shape[0] - 1, -1, -1, dtype=np.float64)
+        ewma.weighted_sum = (arr * weights[:, None]).T @ arr
+        ewma.total_weight = float(weights.sum())
+        ewma.n_obs = arr.shape[0]
+        return ewma
+
+    def update(self, returns: ArrayLike) -> "EWMACovariance":
+        """Fold in one day (n_assets,) or several days (n_days, n_assets) in order."""
+        rows = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+        if rows.shape[1] != self.weighted_sum.shape[0]:
+            raise ValueError("returns do not match the tracked universe")
+        for row in rows:
+            self.weighted_sum *= self.decay
+            self.weighted_sum += np.outer(row, row)
+            self.total_weight = self.decay * self.total_weight + 1.0
+        self.n_obs += rows.shape[0]
+        return self
+
+    def estimate(self) -> CovarianceEstimate:
+        if self.total_weight <= 0:
+            raise ValueError("no returns folded in yet")
+        return CovarianceEstimate(
+            "ewma", self.n_obs, matrix=self.weighted_sum / self.total_weight, params={"decay": self.decay}
+        )
+
+
+def estimate_covariance(returns: ArrayLike, method: str = "ledoit_wolf", **params: Any) -> CovarianceEstimate:
+    """Dispatch to one estimator; params go to that estimator."""
+    if method == "sample":
+        return sample_covariance(returns)
+    if method == "ledoit_wolf":
+        return ledoit_wolf_covariance(returns)
+    if method == "ewma":
+        return EWMACovariance.from_returns(returns, **params).estimate()
+    if method == "pca":
+        return pca_covariance(returns, **params)
+    raise ValueError(f"Unknown covariance method: {method}")
@@ -2,6 +2,8 @@ import logging
 import numpy as np
 from typing import Dict, Any, List
 
+from services.quantitative.rolling_stats import rolling_sharpe
+
 logger = logging.getLogger(__name__)
 
 class RollingMetricsEngine:
@@ -11,17 +13,12 @@ class RollingMetricsEngine:
         """
         Policy: Annualized Sharpe over rolling 3-year window (252*3 trading days).
         Formula: (MeanReturn - Rf) / StdDev
+        Zero-volatility windows report 0.
         """
         if len(returns) < window: return []
         
-        results = []
-        for i in range(len(returns) - window + 1):
-            subset = returns[i : i + window]
-            avg_ret = np.mean(subset) * 252
-            std_dev = np.std(subset) * np.sqrt(252)
-            
-            sharpe = (avg_ret - rf_rate) / std_dev if std_dev > 0 else 0
-            results.append(round(float(sharpe), 4))
+        sharpe = rolling_sharpe(returns, window, rf_rate)
+        results = [round(float(v), 4) for v in sharpe]
             
         logger.info(f"QUANT_LOG: Calculated {len(results)} rolling Sharpe points (Window: {window})")
         return results
@@ -0,0 +1,143 @@
+"""
+Rolling statistics over 1-D series or 2-D (n_series, n_obs) panels.
+
+Every function returns only full windows, i.e. n_obs - window + 1 values per
+series, in O(n_obs) time regardless of the window length: window moments
+come from differences of cumulative sums. Each series is first shifted by
+its own mean (the same centring Welford's update performs incrementally),
+which keeps the sum-of-squares cancellation error far below the window
+variance, and variances that are numerically zero are snapped to zero.
+"""
+
+import logging
+import numpy as np
+from typing import Tuple
+
+logger = logging.getLogger(__name__)
+
+# Ratio rolling_sortino reports when a window has no downside deviation but
+# a positive excess return; matches SortinoCalculator. rolling_sharpe reports
+# 0 for zero-volatility windows unless asked for the cap.
+RATIO_CAP = 99.9
+
+
+def _panel(x) -> np.ndarray:
+    arr = np.asarray(x, dtype=np.float64)
+    if arr.ndim not in (1, 2):
+        raise ValueError("rolling statistics expect a 1-D series or 2-D (n_series, n_obs) panel")
+    return arr
+
+
+def _check_window(arr: np.ndarray, window: int) -> None:
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    if arr.shape[-1] < window:
+        raise ValueError(f"window {window} exceeds series length {arr.shape[-1]}")
+
+
+def _window_sums(arr: np.ndarray, window: int) -> np.ndarray:
+    """Sum over every full trailing window along the last axis."""
+    csum = np.cumsum(arr, axis=-1)
+    pad = np.zeros(arr.shape[:-1] + (1,))
+    csum = np.concatenate([pad, csum], axis=-1)
+    return csum[..., window:] - csum[..., :-window]
+
+
+def _centered(arr: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    shift = arr.mean(axis=-1, keepdims=True)
+    return arr - shift, shift
+
+
+def rolling_sum(x, window: int) -> np.ndarray:
+    arr = _panel(x)
+    _check_window(arr, window)
+    centered, shift = _centered(arr)
+    return _window_sums(centered, window) + window * shift
+
+
+def rolling_mean(x, window: int) -> np.ndarray:
+    return rolling_sum(x, window) / window
+
+
+def rolling_cov(x, y, window: int, ddof: int = 0) -> np.ndarray:
+    """Windowed covariance of paired series (population by default)."""
+    a, b = _panel(x), _panel(y)
+    if a.shape != b.shape:
+        raise ValueError("x and y must have the same shape")
+    _check_window(a, window)
+    a, _ = _centered(a)
+    b, _ = _centered(b)
+    sum_a = _window_sums(a, window)
+    sum_b = _window_sums(b, window)
+    sum_ab = _window_sums(a * b, window)
+    return (sum_ab - sum_a * sum_b / window) / (window - ddof)
+
+
+def rolling_var(x, window: int, ddof: int = 0) -> np.ndarray:
+    arr = _panel(x)
+    _check_window(arr, window)
+    centered, _ = _centered(arr)
+    sums = _window_sums(centered, window)
+    squares = _window_sums(centered * centered, window)
+    var = (squares - sums * sums / window) / (window - ddof)
+    # Cancellation noise is relative to the sum of squares in the window
+    noise = 1e-12 * squares / (window - ddof)
+    return np.where(var > noise, var, 0.0)
+
+
+def rolling_std(x, window: int, ddof: int = 0) -> np.ndarray:
+    return np.sqrt(rolling_var(x, window, ddof))
+
+
+def rolling_corr(x, y, window: int) -> np.ndarray:
+    """Windowed Pearson correlation; NaN where either side is constant."""
+    cov = rolling_cov(x, y, window)
+    denom = rolling_std(x, window) * rolling_std(y, window)
+    out = np.full(cov.shape, np.nan)
+    np.divide(cov, denom, out=out, where=denom > 0)
+    return np.clip(out, -1.0, 1.0)
+
+
+def rolling_downside_deviation(returns, window: int, target: float = 0.0, periods_per_year: int = 252) -> np.ndarray:
+    """Annualized sqrt(mean(min(0, r - target)^2)) per window."""
+    shortfall = np.minimum(_panel(returns) - target, 0.0)
+    return np.sqrt(np.maximum(rolling_mean(shortfall * shortfall, window), 0.0)) * np.sqrt(periods_per_year)
+
+
+def _ratio(excess: np.ndarray, risk: np.ndarray, zero_risk_ratio: float) -> np.ndarray:
+    out = np.where(excess > 0, zero_risk_ratio, 0.0)
+    np.divide(excess, risk, out=out, where=risk > 0)
+    return out
+
+
+def rolling_sharpe(
+    returns,
+    window: int,
+    rf_rate: float = 0.0,
+    periods_per_year: int = 252,
+    zero_risk_ratio: float = 0.0,
+) -> np.ndarray:
+    """
+    Annualized (mean - rf) / std per window. Zero-volatility windows with a
+    positive excess return report zero_risk_ratio (e.g. RATIO_CAP), else 0.
+    """
+    arr = _panel(returns)
+    excess = rolling_mean(arr, window) * periods_per_year - rf_rate
+    return _ratio(excess, rolling_std(arr, window) * np.sqrt(periods_per_year), zero_risk_ratio)
+
+
+def rolling_sortino(
+    returns,
+    window: int,
+    rf_rate: float = 0.0,
+    target: float = 0.0,
+    periods_per_year: int = 252,
+    zero_risk_ratio: float = RATIO_CAP,
+) -> np.ndarray:
+    """
+    Annualized (mean - rf) / downside deviation per window; windows without
+    downside but with a positive excess return report zero_risk_ratio.
+    """
+    arr = _panel(returns)
+    excess = rolling_mean(arr, window) * periods_per_year - rf_rate
+    return _ratio(excess, rolling_downside_deviation(arr, window, target, periods_per_year), zero_risk_ratio)
@@ -2,6 +2,8 @@ import logging
 import numpy as np
 from typing import List
 
+from services.quantitative.rolling_stats import rolling_std
+
 logger = logging.getLogger(__name__)
 
 class RollingVolatilityEngine:
@@ -15,11 +17,8 @@ class RollingVolatilityEngine:
         if len(returns) < window:
             return []
             
-        results = []
-        for i in range(len(returns) - window + 1):
-            subset = returns[i : i + window]
-            vol = np.std(subset) * np.sqrt(252)
-            results.append(round(float(vol), 4))
+        vol = rolling_std(returns, window) * np.sqrt(252)
+        results = [round(float(v), 4) for v in vol]
             
         logger.info(f"QUANT_LOG: Calculated {len(results)} rolling vol points (Window: {window})")
         return results
@@ -0,0 +1,208 @@
+"""
+==============================================================================
+FILE: services/risk/covariance_service.py
+ROLE: Shared Covariance Subsystem
+PURPOSE: One place that turns a universe of symbols into a covariance
+         estimate (sample, Ledoit-Wolf, EWMA or PCA factor model) for the
+         optimizer, risk decomposition and nightly risk run.
+
+CACHING:
+    - Estimates are keyed by (universe hash, lookback, method + params,
+      as-of date). Hits come from an in-process LRU first, then from the
+      shared CacheService, where estimates persist in their compact form
+      (factor models as loadings + specific variances; dense matrices only
+      up to PERSIST_MAX_DENSE_ASSETS).
+    - EWMA keeps its running state per universe. Asking for a later as-of
+      date folds in only the missing days (O(days * N^2)) instead of a full
+      O(T * N^2) pass; the window therefore grows past the lookback, where
+      the decay has already made old observations negligible.
+
+USAGE:
+    from services.risk.covariance_service import get_covariance_service
+    estimate = get_covariance_service().get_covariance(symbols, 252, "pca")
+    daily_var = estimate.portfolio_variance(weights)
+
+AUTHOR: AI Investor Team
+CREATED: 2026-10-18
+==============================================================================
+"""
+
+import hashlib
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from services.quantitative.covariance import (
+    DEFAULT_EWMA_DECAY,
+    METHODS,
+    CovarianceEstimate,
+    EWMACovariance,
+    estimate_covariance,
+)
+from services.system.cache_service import get_cache_service
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+CACHE_TTL = 7 * 24 * 3600  # as-of keyed estimates never change
+PERSIST_MAX_DENSE_ASSETS = 500
+_RETURNS_EPOCH = date(2020, 1, 1)
+
+
+class CovarianceService:
+    """
+    Cached covariance estimates per (universe, lookback, method, as-of).
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
+                    cls._instance._initialized = False
+        return cls._instance
+
+    def __init__(self, cache_size: int = 64):
+        if self._initialized:
+            return
+        self.cache_service = get_cache_service()
+        self.cache_size = cache_size
+        self._estimates: "OrderedDict[str, CovarianceEstimate]" = OrderedDict()
+        self._ewma: Dict[Tuple[str, int, float], Tuple[date, EWMACovariance]] = {}
+        self.stats = {"hits": 0, "persisted_hits": 0, "misses": 0, "ewma_rolls": 0}
+        self._initialized = True
+
+    @staticmethod
+    def universe_hash(symbols: Sequence[str]) -> str:
+        """Order-sensitive: estimate rows follow the symbol order."""
+        return hashlib.sha1("\x1f".join(symbols).encode()).hexdigest()[:16]
+
+    def cache_key(
+        self,
+        symbols: Sequence[str],
+        lookback_days: int,
+        method: str,
+        as_of: date,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        suffix = "".join(f";{k}={v}" for k, v in sorted((params or {}).items()))
+        return f"covariance:{self.universe_hash(symbols)}:{lookback_days}:{method}{suffix}:{as_of.isoformat()}"
+
+    def get_covariance(
+        self,
+        symbols: Sequence[str],
+        lookback_days: int = TRADING_DAYS,
+        method: str = "ledoit_wolf",
+        as_of: Optional[date] = None,
+        **params: Any,
+    ) -> CovarianceEstimate:
+        """
+        Daily-return covariance for `symbols` (in that order).
+
+        Args:
+            symbols: Universe; order defines the rows of the estimate.
+            lookback_days: Days of returns behind the estimate.
+            method: sample, ledoit_wolf, ewma or pca.
+            as_of: Last day of returns included (default today).
+            **params: Estimator options (decay for ewma, n_factors for pca).
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown covariance method: {method}")
+        if not symbols:
+            raise ValueError("symbols must not be empty")
+        symbols = list(symbols)
+        as_of = as_of or date.today()
+        key = self.cache_key(symbols, lookback_days, method, as_of, params)
+
+        estimate = self._estimates.get(key)
+        if estimate is not None:
+            self._estimates.move_to_end(key)
+            self.stats["hits"] += 1
+            return estimate
+        persisted = self.cache_service.get(key)
+        if persisted:
+            estimate = CovarianceEstimate.from_dict(persisted)
+            self.stats["persisted_hits"] += 1
+            self._remember(key, estimate)
+            return estimate
+
+        self.stats["misses"] += 1
+        if method == "ewma":
+            estimate = self._ewma_estimate(symbols, lookback_days, as_of, params.get("decay", DEFAULT_EWMA_DECAY))
+        else:
+            estimate = estimate_covariance(self._load_returns(symbols, lookback_days, as_of), method, **params)
+        self._remember(key, estimate)
+        if estimate.is_factor_model or estimate.n_assets <= PERSIST_MAX_DENSE_ASSETS:
+            self.cache_service.set(key, estimate.to_dict(), ttl=CACHE_TTL)
+        return estimate
+
+    def annualized_covariance(
+        self,
+        symbols: Sequence[str],
+        lookback_days: int = TRADING_DAYS,
+        method: str = "ledoit_wolf",
+        as_of: Optional[date] = None,
+        **params: Any,
+    ) -> CovarianceEstimate:
+        return self.get_covariance(symbols, lookback_days, method, as_of, **params).scaled(TRADING_DAYS)
+
+    def get_returns(self, symbols: Sequence[str], lookback_days: int = TRADING_DAYS, as_of: Optional[date] = None) -> NDArray:
+        """Daily returns panel (lookback_days, n_assets) behind every estimate."""
+        return self._load_returns(list(symbols), lookback_days, as_of or date.today())
+
+    def _ewma_estimate(self, symbols: Sequence[str], lookback_days: int, as_of: date, decay: float) -> CovarianceEstimate:
+        state_key = (self.universe_hash(symbols), lookback_days, decay)
+        state = self._ewma.get(state_key)
+        if state is not None and state[0] < as_of:
+            last_as_of, ewma = state
+            ewma.update(self._load_returns(symbols, (as_of - last_as_of).days, as_of))
+            self.stats["ewma_rolls"] += 1
+        else:
+            ewma = EWMACovariance.from_returns(self._load_returns(symbols, lookback_days, as_of), decay)
+        if state is None or state[0] <= as_of:
+            self._ewma[state_key] = (as_of, ewma)
+        return ewma.estimate()
+
+    def _remember(self, key: str, estimate: CovarianceEstimate) -> None:
+        self._estimates[key] = estimate
+        self._estimates.move_to_end(key)
+        while len(self._estimates) > self.cache_size:
+            self._estimates.popitem(last=False)
+
+    def _load_returns(self, symbols: Sequence[str], n_days: int, as_of: date) -> NDArray:
+        """
+        Daily returns for the n_days ending at as_of, shape (n_days, n_assets).
+
+        In production, fetch from the market data service. For now, a
+        one-factor model seeded per symbol over a fixed calendar, so a
+        symbol's return on a given day is the same in every request.
+        """
+        end = (as_of - _RETURNS_EPOCH).days + 1
+        if n_days < 1 or end < n_days:
+            raise ValueError(f"no return history for {n_days} days ending {as_of}")
+        market = np.random.default_rng(0).normal(0.0004, 0.011, end)[end - n_days:]
+        panel = np.empty((n_days, len(symbols)))
+        for j, symbol in enumerate(symbols):
+            rng = np.random.default_rng(zlib.crc32(symbol.upper().encode()))
+            beta, idio_vol = rng.uniform(0.6, 1.5), rng.uniform(0.008, 0.02)
+            panel[:, j] = beta * market + rng.normal(0.0, idio_vol, end)[end - n_days:]
+        return panel
+
+    def clear(self) -> None:
+        """Drop in-process estimates and EWMA state (persisted entries expire by TTL)."""
+        self._estimates.clear()
+        self._ewma.clear()
+
+
+def get_covariance_service() -> CovarianceService:
+    """Get the singleton covariance service."""
+    return CovarianceService()
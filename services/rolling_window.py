@@ -2,8 +2,11 @@
 Rolling Window Service.
 Maintains a sliding window of price data for multiple symbols.
 """
+import logging
 from collections import deque
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
 
 
 class RollingWindowService:
@@ -30,21 +33,41 @@ class RollingWindowService:
             return
         self.window_size = window_size
         self.buffers: Dict[str, deque] = {}
+        self.listeners: List[Callable[[str, Any], Any]] = []
         self.initialized = True
 
-    def add_price(self, symbol: str, price: float):
+    def subscribe(self, listener: Callable[[str, Any], Any]):
+        """
+        Register a callback invoked as listener(symbol, bar) on every new price.
+        """
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[str, Any], Any]):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def add_price(self, symbol: str, price: float, bar: Optional[Mapping[str, float]] = None):
         """
         Add a new price point to the symbol's buffer.
         
         Args:
             symbol: Asset symbol (e.g., 'EUR/USD').
             price: New price data point.
+            bar: Optional OHLC bar (with price as its close) forwarded to
+                listeners that need ranges, e.g. streaming ATR.
         """
         if symbol not in self.buffers:
             self.buffers[symbol] = deque(maxlen=self.window_size)
 
         self.buffers[symbol].append(float(price))
 
+        for listener in self.listeners:
+            try:
+                listener(symbol, bar if bar is not None else float(price))
+            except Exception as e:
+                logger.error(f"Rolling window listener failed for {symbol}: {e}")
+
     def get_history(self, symbol: str) -> List[float]:
         """Retrieve the historical price buffer for a symbol."""
         if symbol not in self.buffers:
@@ -4,7 +4,11 @@ Projects current strategy statistics forward to identify survival probability an
 """
 import random
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from services.analysis.variance_reduction import VarianceReduction, batch_mean, standard_uniforms
 
 logger = logging.getLogger(__name__)
 
@@ -60,3 +64,74 @@ class MonteCarloSimulator:
             "ruin_occurred": current_equity <= (initial_balance * 0.5),
             "trades_completed": len(equity_curve) - 1
         }
+
+    @staticmethod
+    def run_batch_simulation(
+        win_rate: float,
+        avg_win_r: float,
+        avg_loss_r: float,
+        initial_balance: float = 100000.0,
+        risk_per_trade_pct: float = 0.01,
+        num_trades: int = 1000,
+        n_paths: int = 10000,
+        variance_reduction: VarianceReduction = VarianceReduction.NONE,
+        n_replicates: int = 16,
+        seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Vectorized survival estimate over many trade sequences.
+
+        Same model as run_simulation (fixed-fraction risk, 50% ruin stop),
+        but every path is simulated at once with optional variance
+        reduction, and the ruin probability / mean final equity come with
+        batch-means standard errors over n_replicates independent blocks.
+        Under CONTROL_VARIATE the win count (mean num_trades * win_rate)
+        is the control.
+        """
+        if not 0.0 <= win_rate <= 1.0:
+            raise ValueError("win_rate must be within [0, 1]")
+        n_blocks = max(1, min(n_replicates, n_paths))
+        bounds = np.linspace(0, n_paths, n_blocks + 1).astype(int)
+        rngs = np.random.default_rng(seed).spawn(n_blocks)
+        uniforms = np.concatenate([
+            standard_uniforms(rng, variance_reduction, (hi - lo, num_trades))
+            for rng, lo, hi in zip(rngs, bounds[:-1], bounds[1:])
+        ])
+        batch_ids = np.repeat(np.arange(n_blocks), np.diff(bounds))
+
+        wins = uniforms < win_rate
+        factors = np.where(
+            wins,
+            1 + risk_per_trade_pct * avg_win_r,
+            1 - risk_per_trade_pct * abs(avg_loss_r),
+        )
+        equity = initial_balance * np.cumprod(factors, axis=1)
+
+        # Freeze each path at its first ruin, as the loop version stops there
+        ruin_hits = equity <= initial_balance * 0.5
+        ruined = ruin_hits.any(axis=1)
+        ruin_index = np.where(ruined, ruin_hits.argmax(axis=1), num_trades - 1)
+        rows = np.arange(n_paths)
+        final_equity = equity[rows, ruin_index]
+        after_ruin = np.arange(num_trades) > ruin_index[:, None]
+        equity = np.where(after_ruin, final_equity[:, None], equity)
+        peak = np.maximum(np.maximum.accumulate(equity, axis=1), initial_balance)
+        max_drawdown = ((peak - equity) / peak).max(axis=1)
+
+        control = None
+        if variance_reduction == VarianceReduction.CONTROL_VARIATE:
+            control = wins.sum(axis=1).astype(float)
+        control_mean = num_trades * win_rate
+        ruin_probability, ruin_se = batch_mean(ruined.astype(float), batch_ids, control, control_mean)
+        mean_equity, mean_equity_se = batch_mean(final_equity, batch_ids, control, control_mean)
+
+        return {
+            "ruin_probability": round(float(np.clip(ruin_probability, 0.0, 1.0)), 6),
+            "ruin_probability_se": float(ruin_se),
+            "mean_final_equity": round(mean_equity, 2),
+            "mean_final_equity_se": float(mean_equity_se),
+            "median_final_equity": round(float(np.median(final_equity)), 2),
+            "mean_max_drawdown_pct": round(float(max_drawdown.mean()) * 100, 2),
+            "n_paths": n_paths,
+            "variance_reduction": variance_reduction.value,
+        }
@@ -0,0 +1,436 @@
+"""
+==============================================================================
+FILE: services/system/tiered_cache.py
+ROLE: Two-Tier Cache Engine
+PURPOSE: In-process LRU bounded by bytes in front of an optional Redis
+         tier, with single-flight recomputation, stale-while-revalidate,
+         per-namespace TTLs and binary serialization.
+
+DESIGN:
+    - Values are serialized once (msgpack with a NumPy extension, pickle
+      protocol 5 for anything msgpack cannot express) and the same bytes
+      live in both tiers, so L1 size accounting is exact and callers never
+      share mutable cached objects.
+    - Pickled values stay in L1: they are never written to Redis, and L2
+      payloads are only decoded as msgpack (or legacy JSON), so a shared
+      Redis can never hand this process a pickle to load.
+    - Every entry has a fresh-until time and, if the namespace allows it,
+      a stale window after that. get() only returns fresh values;
+      get_or_compute() serves a stale value immediately and refreshes it in
+      the background, once per key.
+    - Concurrent misses on one key run the compute function once; the
+      other callers wait for (and share) its result.
+    - The namespace is the key prefix before the first ':'. Metrics (tier
+      hits, misses, stale serves, coalesced waits, latencies) are kept per
+      namespace.
+    - Redis entries are framed with a magic byte and their fresh-until
+      time; unframed values written by the old JSON cache still decode.
+
+AUTHOR: AI Investor Team
+CREATED: 2026-10-18
+==============================================================================
+"""
+
+import asyncio
+import fnmatch
+import json
+import logging
+import pickle
+import struct
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    logger.warning("msgpack not available; cache values use pickle. Install with: pip install msgpack")
+
+DEFAULT_TTL = 3600
+DEFAULT_L1_BYTES = 64 * 1024 * 1024
+
+_MSGPACK, _PICKLE = b"M", b"P"
+_NDARRAY_EXT = 1
+_FRAME_MAGIC = b"\xc1"  # never emitted by msgpack, invalid as JSON/UTF-8 lead byte
+_FRAME = struct.Struct("!cd")
+
+
+def _pack_default(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray) and obj.dtype.kind not in "OV":
+        data = msgpack.packb([obj.dtype.str, list(obj.shape), np.ascontiguousarray(obj).tobytes()])
+        return msgpack.ExtType(_NDARRAY_EXT, data)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"cannot msgpack {type(obj).__name__}")
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == _NDARRAY_EXT:
+        dtype, shape, buffer = msgpack.unpackb(data)
+        return np.frombuffer(buffer, dtype=np.dtype(dtype)).reshape(shape).copy()
+    return msgpack.ExtType(code, data)
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize a cache value, tagged with its format."""
+    if MSGPACK_AVAILABLE:
+        try:
+            return _MSGPACK + msgpack.packb(value, default=_pack_default, datetime=True)
+        except (TypeError, ValueError, OverflowError):
+            pass
+    return _PICKLE + pickle.dumps(value, protocol=5)
+
+
+def loads(payload: bytes) -> Any:
+    tag, body = payload[:1], payload[1:]
+    if tag == _MSGPACK:
+        return msgpack.unpackb(body, ext_hook=_ext_hook, timestamp=3, strict_map_key=False)
+    if tag == _PICKLE:
+        return pickle.loads(body)
+    raise ValueError(f"unknown cache payload format {tag!r}")
+
+
+@dataclass
+class _Entry:
+    payload: bytes
+    fresh_until: float
+    expires_at: float
+
+
+def namespace_of(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+class TieredCache:
+    """
+    Byte-bounded LRU (L1) over an optional Redis client (L2).
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        max_bytes: int = DEFAULT_L1_BYTES,
+        default_ttl: int = DEFAULT_TTL,
+        namespace_ttls: Optional[Dict[str, Tuple[int, int]]] = None,
+        refresh_workers: int = 2,
+    ):
+        """
+        Args:
+            client: Redis client with decode_responses=False, or None for L1 only.
+            max_bytes: L1 budget over serialized payload sizes.
+            default_ttl: Fresh seconds when neither the call nor the namespace sets one.
+            namespace_ttls: namespace -> (ttl, stale_ttl) seconds.
+            refresh_workers: Threads for stale-while-revalidate refreshes.
+        """
+        self._client = client
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.namespace_ttls: Dict[str, Tuple[int, int]] = dict(namespace_ttls or {})
+        self._l1: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._l1_bytes = 0
+        self._lock = threading.RLock()
+        self._inflight: Dict[str, Future] = {}
+        self._ainflight: Dict[Tuple[int, str], asyncio.Future] = {}
+        self._tasks: set = set()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="cache-refresh")
+        self._metrics: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    # -- configuration -----------------------------------------------------
+
+    def set_namespace_ttl(self, namespace: str, ttl: int, stale_ttl: int = 0) -> None:
+        self.namespace_ttls[namespace] = (ttl, stale_ttl)
+
+    def _ttls(self, key: str, ttl: Optional[int], stale_ttl: Optional[int]) -> Tuple[float, float]:
+        ns_ttl, ns_stale = self.namespace_ttls.get(namespace_of(key), (self.default_ttl, 0))
+        return float(ns_ttl if ttl is None else ttl), float(ns_stale if stale_ttl is None else stale_ttl)
+
+    def _count(self, key: str, metric: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._metrics[namespace_of(key)][metric] += amount
+
+    # -- tiers -------------------------------------------------------------
+
+    def _l1_put(self, key: str, entry: _Entry) -> None:
+        size = len(entry.payload)
+        with self._lock:
+            old = self._l1.pop(key, None)
+            if old is not None:
+                self._l1_bytes -= len(old.payload)
+            if size > self.max_bytes:
+                return
+            self._l1[key] = entry
+            self._l1_bytes += size
+            while self._l1_bytes > self.max_bytes:
+                evicted_key, evicted = self._l1.popitem(last=False)
+                self._l1_bytes -= len(evicted.payload)
+                self._metrics[namespace_of(evicted_key)]["evictions"] += 1
+
+    def _l1_drop(self, key: str) -> bool:
+        with self._lock:
+            entry = self._l1.pop(key, None)
+            if entry is not None:
+                self._l1_bytes -= len(entry.payload)
+            return entry is not None
+
+    def _lookup(self, key: str, now: float) -> Tuple[Optional[_Entry], str]:
+        """(entry, tier) from L1, else L2 (promoted to L1); entry None if missing or hard-expired."""
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._l1.move_to_end(key)
+                    return entry, "l1_hits"
+                self._l1_drop(key)
+        if self._client is None:
+            return None, ""
+        try:
+            raw = self._client.get(key)
+        except Exception as e:
+            logger.error(f"Cache L2 GET error for {key}: {e}")
+            return None, ""
+        if not raw:
+            return None, ""
+        if raw[:1] == _FRAME_MAGIC:
+            _, fresh_until = _FRAME.unpack_from(raw)
+            payload = raw[_FRAME.size:]
+            if payload[:1] != _MSGPACK:
+                logger.warning(f"Cache L2 entry {key} is not msgpack; ignoring it")
+                return None, ""
+            ttl_left = self._client.pttl(key) / 1000.0
+            entry = _Entry(payload, fresh_until, now + ttl_left if ttl_left > 0 else fresh_until)
+        else:
+            # Written by the previous JSON-only cache
+            entry = _Entry(dumps(json.loads(raw)), now + self.default_ttl, now + self.default_ttl)
+        self._l1_put(key, entry)
+        return entry, "l2_hits"
+
+    def _store(self, key: str, value: Any, ttl: Optional[int], stale_ttl: Optional[int]) -> None:
+        fresh, stale = self._ttls(key, ttl, stale_ttl)
+        now = time.time()
+        entry = _Entry(dumps(value), now + fresh, now + fresh + stale)
+        self._l1_put(key, entry)
+        if self._client is not None:
+            if entry.payload[:1] == _PICKLE:
+                # L1 only; drop any older shared copy so other processes miss
+                self._client.delete(key)
+                self._count(key, "l1_only_sets")
+            else:
+                framed = _FRAME.pack(_FRAME_MAGIC, entry.fresh_until) + entry.payload
+                self._client.set(key, framed, px=max(1, int((fresh + stale) * 1000)))
+        self._count(key, "sets")
+
+    # -- public API --------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Any]:
+        """Fresh value for key, or None."""
+        start = time.perf_counter()
+        try:
+            now = time.time()
+            entry, tier = self._lookup(key, now)
+            if entry is None or entry.fresh_until <= now:
+                self._count(key, "misses")
+                return None
+            self._count(key, tier)
+            return loads(entry.payload)
+        except Exception as e:
+            logger.error(f"Cache GET error for {key}: {e}")
+            return None
+        finally:
+            self._count(key, "get_seconds", time.perf_counter() - start)
+            self._count(key, "gets")
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, stale_ttl: Optional[int] = None) -> bool:
+        """Store value; ttl/stale_ttl default to the namespace's, then default_ttl."""
+        try:
+            self._store(key, value, ttl, stale_ttl)
+            return True
+        except Exception as e:
+            logger.error(f"Cache SET error for {key}: {e}")
+            return False
+
+    def delete(self, key: str) -> bool:
+        try:
+            removed = self._l1_drop(key)
+            if self._client is not None:
+                removed = bool(self._client.delete(key)) or removed
+            return removed
+        except Exception as e:
+            logger.error(f"Cache DELETE error for {key}: {e}")
+            return False
+
+    def clear_namespace(self, prefix: str) -> int:
+        """Delete every key starting with prefix from both tiers."""
+        try:
+            with self._lock:
+                local = [k for k in self._l1 if k.startswith(prefix)]
+                for k in local:
+                    self._l1_drop(k)
+            if self._client is None:
+                return len(local)
+            keys = list(self._client.scan_iter(match=f"{prefix}*", count=1000))
+            return max(len(local), self._client.delete(*keys) if keys else 0)
+        except Exception as e:
+            logger.error(f"Cache clear error for {prefix}: {e}")
+            return 0
+
+    def clear_pattern(self, pattern: str) -> int:
+        """Delete every key matching a Redis-style glob ('a:*:b') from both tiers."""
+        try:
+            with self._lock:
+                local = [k for k in self._l1 if fnmatch.fnmatchcase(k, pattern)]
+                for k in local:
+                    self._l1_drop(k)
+            if self._client is None:
+                return len(local)
+            keys = list(self._client.scan_iter(match=pattern, count=1000))
+            return max(len(local), self._client.delete(*keys) if keys else 0)
+        except Exception as e:
+            logger.error(f"Cache clear error for {pattern}: {e}")
+            return 0
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        ttl: Optional[int] = None,
+        stale_ttl: Optional[int] = None,
+    ) -> Any:
+        """
+        Cached value, computing it on a miss. Concurrent misses share one
+        compute call; a stale hit returns at once and refreshes in the background.
+        """
+        now = time.time()
+        entry, tier = self._lookup(key, now)
+        if entry is not None:
+            if entry.fresh_until <= now:
+                self._count(key, "stale_hits")
+                self._refresh_in_background(key, compute, ttl, stale_ttl)
+            else:
+                self._count(key, tier)
+            return loads(entry.payload)
+
+        self._count(key, "misses")
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self._count(key, "coalesced")
+            return future.result()
+        try:
+            value = self._compute_and_store(key, compute, ttl, stale_ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        stale_ttl: Optional[int] = None,
+    ) -> Any:
+        """get_or_compute for coroutine functions; coalesces within one event loop."""
+        loop = asyncio.get_running_loop()
+        now = time.time()
+        entry, tier = self._lookup(key, now)
+        if entry is not None:
+            if entry.fresh_until > now:
+                self._count(key, tier)
+            else:
+                self._count(key, "stale_hits")
+                if (id(loop), key) not in self._ainflight:
+                    refresh = loop.create_task(self._arun(loop, key, compute, ttl, stale_ttl))
+                    self._tasks.add(refresh)
+                    refresh.add_done_callback(self._tasks.discard)
+                    refresh.add_done_callback(lambda t: t.cancelled() or t.exception())
+            return loads(entry.payload)
+
+        self._count(key, "misses")
+        future = self._ainflight.get((id(loop), key))
+        if future is not None:
+            self._count(key, "coalesced")
+            return await asyncio.shield(future)
+        return await self._arun(loop, key, compute, ttl, stale_ttl)
+
+    async def _arun(self, loop, key, compute, ttl, stale_ttl) -> Any:
+        future = self._ainflight[(id(loop), key)] = loop.create_future()
+        try:
+            start = time.perf_counter()
+            value = await compute()
+            self._count(key, "computes")
+            self._count(key, "compute_seconds", time.perf_counter() - start)
+            self.set(key, value, ttl, stale_ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise; mark retrieved for the leader
+            raise
+        finally:
+            self._ainflight.pop((id(loop), key), None)
+
+    def _compute_and_store(self, key, compute, ttl, stale_ttl) -> Any:
+        start = time.perf_counter()
+        value = compute()
+        self._count(key, "computes")
+        self._count(key, "compute_seconds", time.perf_counter() - start)
+        self.set(key, value, ttl, stale_ttl)
+        return value
+
+    def _refresh_in_background(self, key, compute, ttl, stale_ttl) -> None:
+        with self._lock:
+            if key in self._inflight:
+                return
+            future = self._inflight[key] = Future()
+
+        def run() -> None:
+            try:
+                future.set_result(self._compute_and_store(key, compute, ttl, stale_ttl))
+            except Exception as e:
+                logger.error(f"Cache refresh error for {key}: {e}")
+                self._count(key, "errors")
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+        self._refresher.submit(run)
+
+    # -- metrics -----------------------------------------------------------
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-namespace counters plus derived hit rate and mean latencies."""
+        with self._lock:
+            namespaces = {}
+            for ns, raw in self._metrics.items():
+                hits = raw["l1_hits"] + raw["l2_hits"] + raw["stale_hits"]
+                lookups = hits + raw["misses"]
+                namespaces[ns] = {
+                    **{k: int(v) for k, v in raw.items() if not k.endswith("_seconds")},
+                    "hit_rate": hits / lookups if lookups else 0.0,
+                    "avg_get_ms": 1000 * raw["get_seconds"] / raw["gets"] if raw["gets"] else 0.0,
+                    "avg_compute_ms": 1000 * raw["compute_seconds"] / raw["computes"] if raw["computes"] else 0.0,
+                }
+            return {
+                "l1_entries": len(self._l1),
+                "l1_bytes": self._l1_bytes,
+                "l1_max_bytes": self.max_bytes,
+                "l2": self._client is not None,
+                "namespaces": namespaces,
+            }
@@ -1,5 +1,6 @@
 """Tax services package for Phase 52."""
 
 from services.tax.harvest_service import TaxHarvestService
+from services.tax.tax_lot_store import LotMethod, TaxLotStore
 
-__all__ = ["TaxHarvestService"]
+__all__ = ["TaxHarvestService", "TaxLotStore", "LotMethod"]
@@ -0,0 +1,351 @@
+"""
+==============================================================================
+FILE: services/tax/batch_harvest_scan.py
+ROLE: Portfolio-Wide Tax-Loss Harvesting Scan
+PURPOSE: Score every open lot of many accounts at once and pick, per
+         account, the harvest set with the best net benefit that fits a
+         turnover budget.
+
+METHOD:
+    - Lots arrive as columns (one array per field across all accounts), so
+      unrealized P&L, holding term, tax savings, round-trip cost and
+      wash-sale exposure are a handful of NumPy expressions per scan.
+    - Wash-sale exposure: another lot of the same substantially-identical
+      group (TaxLotStore.group_of) in the same household was bought within
+      WASH_SALE_DAYS of the scan date. Accounts without a household are
+      their own household.
+    - Selection: eligible lots are ranked per account by net benefit per
+      dollar sold and taken greedily in that order, skipping lots that no
+      longer fit the account's budget. Each round accepts every lot in
+      the fitting prefix of each account (segmented cumsum) and drops the
+      first lot that does not fit.
+    - Accounts are sharded across spawned worker processes, keeping each
+      household in one shard; each worker loads and scores its own shard,
+      so only results cross processes.
+
+SCHEDULING:
+    JobScheduler's "tax_harvest_scan" job runs scheduled_harvest_scan().
+
+AUTHOR: AI Investor Team
+CREATED: 2026-10-18
+==============================================================================
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+from services.tax.tax_lot_store import LONG_TERM_DAYS, WASH_SALE_DAYS, TaxLotStore
+from utils.database_manager import db_manager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARD_SIZE = 2500
+
+
+@dataclass
+class LotColumns:
+    """Open lots of many accounts, one array per field (row = lot)."""
+    account_ids: List[str]
+    account: NDArray  # index into account_ids
+    lot_ids: NDArray
+    symbols: NDArray
+    quantity: NDArray
+    cost_per_share: NDArray
+    price: NDArray
+    acquired: NDArray  # date ordinals
+
+    @classmethod
+    def from_rows(cls, account_ids: Sequence[str], rows: Sequence[tuple]) -> "LotColumns":
+        """Rows of (account_id, lot_id, symbol, quantity, cost_per_share, price, acquired)."""
+        index = {a: i for i, a in enumerate(account_ids)}
+        acct, lot_ids, symbols, qty, cost, price, acquired = (list(c) for c in zip(*rows)) if rows else ([],) * 7
+        return cls(
+            account_ids=list(account_ids),
+            account=np.array([index[a] for a in acct], dtype=np.int64),
+            lot_ids=np.array(lot_ids, dtype=object),
+            symbols=np.array(symbols, dtype=object),
+            quantity=np.array(qty, dtype=np.float64),
+            cost_per_share=np.array(cost, dtype=np.float64),
+            price=np.array(price, dtype=np.float64),
+            acquired=np.array([d.toordinal() for d in acquired], dtype=np.int64),
+        )
+
+
+@dataclass
+class HarvestScanConfig:
+    """Rates and thresholds; defaults match EnhancedTaxHarvestingService."""
+    short_term_rate: float = 0.32
+    long_term_rate: float = 0.15
+    transaction_cost_rate: float = 0.001  # per side
+    min_loss_dollar: float = 500.0
+    min_loss_pct: float = 0.05
+    turnover_budget: Optional[float] = None  # max sale value per account
+    identical_groups: Dict[str, str] = field(default_factory=dict)  # symbol -> group, as in TaxLotStore
+    households: Dict[str, str] = field(default_factory=dict)  # account_id -> household key
+
+
+@dataclass
+class HarvestScanResult:
+    """Selected lots (columns) and per-account totals."""
+    account_ids: List[str]
+    account: NDArray
+    lot_ids: NDArray
+    symbols: NDArray
+    harvested_loss: NDArray
+    tax_savings: NDArray
+    net_benefit: NDArray
+    sale_value: NDArray
+    is_long_term: NDArray
+    rank: NDArray  # 1-based within the account
+    account_tax_savings: NDArray
+    account_net_benefit: NDArray
+    account_sale_value: NDArray
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    def for_account(self, account_id: str) -> List[Dict[str, Any]]:
+        rows = np.flatnonzero(self.account == self.account_ids.index(account_id))
+        return [
+            {
+                "lot_id": self.lot_ids[i],
+                "symbol": self.symbols[i],
+                "harvested_loss": float(self.harvested_loss[i]),
+                "tax_savings": float(self.tax_savings[i]),
+                "net_benefit": float(self.net_benefit[i]),
+                "sale_value": float(self.sale_value[i]),
+                "is_long_term": bool(self.is_long_term[i]),
+                "rank": int(self.rank[i]),
+            }
+            for i in rows[np.argsort(self.rank[rows])]
+        ]
+
+    @classmethod
+    def merge(cls, shards: Sequence["HarvestScanResult"]) -> "HarvestScanResult":
+        """Concatenate results of disjoint account shards."""
+        offsets = np.cumsum([0] + [len(s.account_ids) for s in shards[:-1]])
+        cat = lambda name: np.concatenate([getattr(s, name) for s in shards])
+        stats = {k: sum(s.stats.get(k, 0) for s in shards) for k in ("lots_scanned", "eligible", "wash_blocked")}
+        return cls(
+            account_ids=[a for s in shards for a in s.account_ids],
+            account=np.concatenate([s.account + off for s, off in zip(shards, offsets)]),
+            lot_ids=cat("lot_ids"), symbols=cat("symbols"), harvested_loss=cat("harvested_loss"),
+            tax_savings=cat("tax_savings"), net_benefit=cat("net_benefit"), sale_value=cat("sale_value"),
+            is_long_term=cat("is_long_term"), rank=cat("rank"),
+            account_tax_savings=cat("account_tax_savings"), account_net_benefit=cat("account_net_benefit"),
+            account_sale_value=cat("account_sale_value"), stats={**stats, "shards": len(shards)},
+        )
+
+
+def _segment_starts(acct: NDArray) -> NDArray:
+    """For rows sorted by account, the index of each row's first row of its account."""
+    starts = np.flatnonzero(np.r_[True, acct[1:] != acct[:-1]]) if acct.size else np.empty(0, np.int64)
+    return np.repeat(starts, np.diff(np.r_[starts, acct.size]))
+
+
+def _fit_budget(values: NDArray, acct: NDArray, limit: NDArray) -> NDArray:
+    """
+    Greedy per-account selection over rows already in priority order: take
+    each row whose value still fits the account's remaining budget, skip
+    the rest. Returns the mask of taken rows.
+    """
+    keep = np.zeros(values.size, dtype=bool)
+    remaining = limit.astype(np.float64).copy()
+    pending = np.flatnonzero(values <= remaining[acct] + 1e-9)
+    while pending.size:
+        a = acct[pending]
+        running = np.cumsum(values[pending])
+        running -= np.r_[0.0, running][_segment_starts(a)]
+        fits = running <= remaining[a] + 1e-9  # a prefix of each account's rows
+        keep[pending[fits]] = True
+        remaining -= np.bincount(a[fits], weights=values[pending[fits]], minlength=remaining.size)
+        # Drop each account's first misfit, then anything the rest of the budget can't hold
+        misfit = np.flatnonzero(~fits)
+        first_misfit = misfit[np.r_[True, a[misfit[1:]] != a[misfit[:-1]]]] if misfit.size else misfit
+        rest = np.setdiff1d(misfit, first_misfit, assume_unique=True)
+        pending = pending[rest[values[pending[rest]] <= remaining[a[rest]] + 1e-9]]
+    return keep
+
+
+def scan_lot_columns(
+    lots: LotColumns,
+    as_of: date,
+    config: Optional[HarvestScanConfig] = None,
+    budgets: Union[None, float, NDArray] = None,
+) -> HarvestScanResult:
+    """
+    Score every lot and select each account's harvest set.
+
+    Args:
+        lots: Open lots of the accounts to scan.
+        as_of: Sale date the scan assumes.
+        config: Rates and thresholds.
+        budgets: Max sale value per account (scalar or per account);
+            defaults to config.turnover_budget, None meaning unlimited.
+    """
+    config = config or HarvestScanConfig()
+    n_accounts = len(lots.account_ids)
+    today = as_of.toordinal()
+
+    sale_value = lots.quantity * lots.price
+    basis = lots.quantity * lots.cost_per_share
+    loss = np.maximum(basis - sale_value, 0.0)
+    loss_pct = np.divide(loss, basis, out=np.zeros_like(loss), where=basis > 0)
+    is_long_term = (today - lots.acquired) > LONG_TERM_DAYS
+    tax_savings = loss * np.where(is_long_term, config.long_term_rate, config.short_term_rate)
+    net_benefit = tax_savings - sale_value * config.transaction_cost_rate * 2  # sell + replacement buy
+
+    # Another lot of the same (household, substantially-identical group) bought inside the window
+    unique_symbols, symbol_code = np.unique(lots.symbols.astype(str), return_inverse=True)
+    group_of = TaxLotStore(config.identical_groups).group_of
+    _, group_code = np.unique(np.array([group_of(s) for s in unique_symbols], dtype=str), return_inverse=True)
+    _, household = np.unique(np.array([config.households.get(a, a) for a in lots.account_ids], dtype=str),
+                             return_inverse=True)
+    group = group_code[symbol_code]
+    _, position = np.unique(household[lots.account] * (int(group.max(initial=0)) + 1) + group, return_inverse=True)
+    recent = (lots.acquired <= today) & (today - lots.acquired <= WASH_SALE_DAYS)
+    wash = np.bincount(position, weights=recent, minlength=position.size)[position] - recent > 0
+
+    meets_threshold = (loss >= config.min_loss_dollar) | (loss_pct >= config.min_loss_pct)
+    candidate = (loss > 0) & meets_threshold & (net_benefit > 0)
+    eligible = np.flatnonzero(candidate & ~wash)
+
+    # Per account: best net benefit per dollar sold first, greedily within the budget
+    ratio = net_benefit[eligible] / np.maximum(sale_value[eligible], 1e-12)
+    eligible = eligible[np.lexsort((-ratio, lots.account[eligible]))]
+    acct = lots.account[eligible]
+
+    limit = config.turnover_budget if budgets is None else budgets
+    if limit is None:
+        keep = np.ones(acct.size, dtype=bool)
+    else:
+        limit = np.broadcast_to(np.asarray(limit, dtype=np.float64), (n_accounts,))
+        keep = _fit_budget(sale_value[eligible], acct, limit)
+    chosen, acct = eligible[keep], acct[keep]
+    rank = np.arange(acct.size) - _segment_starts(acct) + 1
+
+    per_account = lambda values: np.bincount(acct, weights=values[chosen], minlength=n_accounts)
+    return HarvestScanResult(
+        account_ids=list(lots.account_ids),
+        account=acct,
+        lot_ids=lots.lot_ids[chosen],
+        symbols=lots.symbols[chosen],
+        harvested_loss=loss[chosen],
+        tax_savings=tax_savings[chosen],
+        net_benefit=net_benefit[chosen],
+        sale_value=sale_value[chosen],
+        is_long_term=is_long_term[chosen],
+        rank=rank,
+        account_tax_savings=per_account(tax_savings),
+        account_net_benefit=per_account(net_benefit),
+        account_sale_value=per_account(sale_value),
+        stats={
+            "lots_scanned": int(lots.quantity.size),
+            "eligible": int(eligible.size),
+            "wash_blocked": int(np.count_nonzero(candidate & wash)),
+        },
+    )
+
+
+def load_lot_columns(account_ids: Sequence[str], as_of: date) -> LotColumns:
+    """Open lots of `account_ids` from the tax_lots table in one query."""
+    with db_manager.pg_cursor() as cur:
+        cur.execute("""
+            SELECT account_id::text, id::text, ticker, quantity, cost_basis_per_share,
+                   current_price, purchase_date::date
+            FROM tax_lots
+            WHERE account_id = ANY(%s::uuid[]) AND quantity > 0 AND purchase_date::date <= %s
+        """, (list(account_ids), as_of))
+        rows = cur.fetchall()
+    return LotColumns.from_rows(account_ids, rows)
+
+
+def list_lot_accounts() -> List[str]:
+    """Every account holding at least one open lot."""
+    with db_manager.pg_cursor() as cur:
+        cur.execute("SELECT DISTINCT account_id::text FROM tax_lots WHERE quantity > 0 ORDER BY 1")
+        return [row[0] for row in cur.fetchall()]
+
+
+def _shard_accounts(account_ids: List[str], households: Dict[str, str], shard_size: int) -> List[List[str]]:
+    """Chunks of about shard_size accounts; a household is never split across chunks."""
+    if not households:
+        return [account_ids[i:i + shard_size] for i in range(0, len(account_ids), shard_size)] or [[]]
+    members: Dict[str, List[str]] = {}
+    for account in account_ids:
+        members.setdefault(households.get(account, account), []).append(account)
+    shards: List[List[str]] = [[]]
+    for group in members.values():
+        if shards[-1] and len(shards[-1]) + len(group) > shard_size:
+            shards.append([])
+        shards[-1].extend(group)
+    return shards
+
+
+def _scan_shard(
+    loader: Callable[[Sequence[str], date], LotColumns],
+    account_ids: Sequence[str],
+    as_of: date,
+    config: HarvestScanConfig,
+) -> HarvestScanResult:
+    return scan_lot_columns(loader(account_ids, as_of), as_of, config)
+
+
+def run_batch_harvest_scan(
+    account_ids: Sequence[str],
+    as_of: Optional[date] = None,
+    config: Optional[HarvestScanConfig] = None,
+    workers: int = 1,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    loader: Callable[[Sequence[str], date], LotColumns] = load_lot_columns,
+) -> HarvestScanResult:
+    """
+    Load and scan accounts in shards of `shard_size`, over `workers`
+    spawned processes when workers > 1. `loader` must be a module-level
+    function so it can be sent to the workers.
+    """
+    start = time.perf_counter()
+    as_of = as_of or date.today()
+    config = config or HarvestScanConfig()
+    account_ids = list(account_ids)
+    shards = _shard_accounts(account_ids, config.households, shard_size)
+
+    if workers <= 1 or len(shards) == 1:
+        results = [_scan_shard(loader, shard, as_of, config) for shard in shards]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(shards)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            futures = [pool.submit(_scan_shard, loader, shard, as_of, config) for shard in shards]
+            results = [future.result() for future in futures]
+
+    result = HarvestScanResult.merge(results)
+    result.stats["elapsed_ms"] = (time.perf_counter() - start) * 1000
+    result.stats["workers"] = workers
+    logger.info(
+        f"Harvest scan: {len(account_ids)} accounts, {result.stats['lots_scanned']} lots, "
+        f"{result.lot_ids.size} selected in {result.stats['elapsed_ms']:.1f}ms"
+    )
+    return result
+
+
+async def scheduled_harvest_scan(workers: int = 4) -> Dict[str, Any]:
+    """JobScheduler entry point: scan every account holding lots."""
+    loop = asyncio.get_running_loop()
+    account_ids = await loop.run_in_executor(None, list_lot_accounts)
+    result = await loop.run_in_executor(None, lambda: run_batch_harvest_scan(account_ids, workers=workers))
+    return {
+        "accounts": len(account_ids),
+        "lots_selected": int(result.lot_ids.size),
+        "total_tax_savings": round(float(result.account_tax_savings.sum()), 2),
+        "total_net_benefit": round(float(result.account_net_benefit.sum()), 2),
+        **{k: v for k, v in result.stats.items() if k != "elapsed_ms"},
+    }
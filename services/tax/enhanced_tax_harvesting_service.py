@@ -18,6 +18,7 @@ FEATURES:
     - Correlated replacement suggestions
     - Batch harvesting processing
     - Tax savings estimation
+    - Vectorized multi-account scans (services/tax/batch_harvest_scan.py)
 
 AUTHOR: AI Investor Team
 CREATED: 2026-01-21
@@ -25,11 +26,13 @@ LAST_MODIFIED: 2026-01-21
 ==============================================================================
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from services.tax.harvest_service import TaxHarvestService, HarvestCandidate
+from services.tax.batch_harvest_scan import HarvestScanConfig, HarvestScanResult, run_batch_harvest_scan
 from services.portfolio.portfolio_aggregator import get_portfolio_aggregator
 from services.system.cache_service import get_cache_service
 
@@ -181,6 +184,36 @@ class EnhancedTaxHarvestingService:
             requires_approval=requires_approval
         )
 
+    async def scan_accounts(
+        self,
+        account_ids: List[str],
+        turnover_budget: Optional[float] = None,
+        workers: int = 1
+    ) -> HarvestScanResult:
+        """
+        Score every lot of many accounts in one vectorized pass.
+        
+        Args:
+            account_ids: Accounts to scan (thousands per call is fine)
+            turnover_budget: Max sale value per account (None: unlimited)
+            workers: Worker processes the account shards are spread over
+            
+        Returns:
+            HarvestScanResult with each account's ranked harvest set
+        """
+        config = HarvestScanConfig(
+            long_term_rate=0.15,
+            short_term_rate=0.32,
+            transaction_cost_rate=self.transaction_cost_rate,
+            min_loss_dollar=self.default_threshold_dollar,
+            min_loss_pct=self.default_threshold_pct,
+            turnover_budget=turnover_budget,
+        )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, lambda: run_batch_harvest_scan(account_ids, config=config, workers=workers)
+        )
+    
     async def check_wash_sale_violation(
         self,
         portfolio_id: str,
@@ -13,20 +13,22 @@ class GainLossMatcher:
         2. Match Long-term against Long-term.
         3. Match remaining losses across types.
         """
-        # Group by term
-        st_gains = [g for g in gains if g.get("term") == "SHORT"]
-        lt_gains = [g for g in gains if g.get("term") == "LONG"]
-        st_losses = [l for l in losses if l.get("term") == "SHORT"]
-        lt_losses = [l for l in losses if l.get("term") == "LONG"]
-        
-        # Primary matching logic (simplified for logic gate)
-        st_net = sum(g["amount"] for g in st_gains) - sum(l["amount"] for l in st_losses)
-        lt_net = sum(g["amount"] for g in lt_gains) - sum(l["amount"] for l in lt_losses)
+        # Net per term in one pass over each list
+        net = {"SHORT": 0.0, "LONG": 0.0}
+        for g in gains:
+            if g.get("term") in net:
+                net[g["term"]] += g["amount"]
+        total_losses = 0.0
+        for l in losses:
+            total_losses += l["amount"]
+            if l.get("term") in net:
+                net[l["term"]] -= l["amount"]
+        st_net, lt_net = net["SHORT"], net["LONG"]
         
         logger.info(f"TAX_LOG: Gain-Loss Matching: ST Net ${st_net:,.2f}, LT Net ${lt_net:,.2f}")
         
         return {
             "short_term_net": round(st_net, 2),
             "long_term_net": round(lt_net, 2),
-            "total_harvested_offset": round(sum(l["amount"] for l in losses), 2)
+            "total_harvested_offset": round(total_losses, 2)
         }
@@ -17,12 +17,13 @@ Usage:
 """
 
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 from enum import Enum
 import logging
 import uuid
 from utils.database_manager import db_manager
+from services.tax.tax_lot_store import TaxLotStore
 
 logger = logging.getLogger(__name__)
 
@@ -95,6 +96,9 @@ class TaxHarvestService:
     def __init__(self) -> None:
         """Initialize the tax harvest service."""
         self._trade_history: Dict[str, List[Dict]] = {}
+        self._lot_stores: Dict[str, TaxLotStore] = {}
+        # user:ticker -> (history list, trades indexed from it, last indexed trade)
+        self._indexed_trades: Dict[str, Tuple[List[Dict], int, Optional[Dict]]] = {}
         self._correlations: Dict[str, Dict] = self._load_correlations()
         logger.info("TaxHarvestService initialized")
     
@@ -195,30 +199,18 @@ class TaxHarvestService:
         Returns:
             WashSaleCheck with violation status
         """
-        # Get trade history for this ticker
-        trades = self._trade_history.get(f"{user_id}:{ticker}", [])
-        
-        # Check for recent purchases (within 30 days)
-        now = datetime.now(timezone.utc)
-        thirty_days_ago = now - timedelta(days=30)
-        
-        blocking_trades = []
-        for trade in trades:
-            trade_date = datetime.fromisoformat(trade["date"])
-            if trade_date.tzinfo is None:
-                trade_date = trade_date.replace(tzinfo=timezone.utc)
-            if trade["action"] == "BUY" and trade_date >= thirty_days_ago:
-                blocking_trades.append(trade)
+        # Purchases within 30 days before the sale (or already scheduled after it)
+        store = self._store_for(user_id, ticker)
+        today = datetime.now(timezone.utc).date()
+        purchases = store.purchases_between(ticker, today - timedelta(days=30), date.max)
+        blocking_trades = [p.data for p in purchases]
         
         violates = len(blocking_trades) > 0
         safe_date = None
         
         if blocking_trades:
-            # Latest buy + 31 days
-            latest_buy = max(
-                datetime.fromisoformat(t["date"]).replace(tzinfo=timezone.utc) if datetime.fromisoformat(t["date"]).tzinfo is None else datetime.fromisoformat(t["date"])
-                for t in blocking_trades
-            )
+            # Latest buy + 31 days (the index is date-ordered)
+            latest_buy = purchases[-1].trade_date
             safe_date = (latest_buy + timedelta(days=31)).strftime("%Y-%m-%d")
         
         return WashSaleCheck(
@@ -228,6 +220,37 @@ class TaxHarvestService:
             safe_date=safe_date
         )
     
+    def record_trade(self, user_id: str, ticker: str, action: str, trade_date: datetime, amount: float = 0.0) -> None:
+        """Append a trade to the user's history; it is indexed on the next check."""
+        self._trade_history.setdefault(f"{user_id}:{ticker}", []).append(
+            {"date": trade_date.isoformat(), "action": action, "amount": amount}
+        )
+    
+    def _store_for(self, user_id: str, ticker: str) -> TaxLotStore:
+        """
+        TaxLotStore of the user's ticker history with not-yet-indexed trades
+        folded in. Only appends are indexed incrementally; the store is
+        rebuilt when the history list is replaced, shrinks, or no longer holds
+        the last indexed trade at its old position.
+        """
+        key = f"{user_id}:{ticker}"
+        trades = self._trade_history.get(key, [])
+        indexed, done, last = self._indexed_trades.get(key, (None, 0, None))
+        if (key not in self._lot_stores or indexed is not trades or len(trades) < done
+                or (done and trades[done - 1] is not last)):
+            self._lot_stores[key], done = TaxLotStore(), 0
+        store = self._lot_stores[key]
+        for trade in trades[done:]:
+            trade_date = datetime.fromisoformat(trade["date"])
+            if trade_date.tzinfo is not None:
+                trade_date = trade_date.astimezone(timezone.utc)
+            if trade["action"] == "BUY":
+                store.record_purchase(ticker, trade_date.date(), trade.get("amount", 0.0), **trade)
+            elif trade["action"] == "SELL":
+                store.record_sale(ticker, trade_date.date(), trade.get("amount", 0.0), **trade)
+        self._indexed_trades[key] = (trades, len(trades), trades[-1] if trades else None)
+        return store
+    
     async def calculate_tax_savings(
         self,
         loss_amount: float,
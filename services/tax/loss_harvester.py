@@ -1,7 +1,11 @@
-
 import logging
+from datetime import date
 from decimal import Decimal
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Mapping, Optional
+
+import numpy as np
+
+from services.tax.tax_lot_store import TaxLotStore
 
 logger = logging.getLogger(__name__)
 
@@ -11,27 +15,36 @@ class LossHarvester:
     Aims for Net Zero taxable gain.
     """
     
-    def find_offset_candidates(self, recognized_gains: Decimal, portfolio_lots: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def __init__(self, store: Optional[TaxLotStore] = None):
+        self.store = store if store is not None else TaxLotStore()
+    
+    def find_offset_candidates(self, recognized_gains: Decimal, prices: Mapping[str, float], as_of: date) -> List[Dict[str, Any]]:
         """
-        Matches gains with unrealized losses.
+        Matches gains with unrealized losses of the open lots in the
+        TaxLotStore, largest loss first, evaluated in one what-if pass; lots
+        whose loss a wash sale would defer are skipped.
         """
         logger.info(f"Targeting ${recognized_gains} in offsets.")
+        sale = self.store.what_if_sell(prices, as_of)
+        loss = sale.harvestable_loss
+        order = np.argsort(-loss, kind="stable")[: int(np.count_nonzero(loss))]
+        covered = np.cumsum(loss[order])
+        # Take lots until the running total first reaches the target
+        target = float(recognized_gains)
+        taken = int(np.searchsorted(covered, target, side="left")) + 1 if target > 0 else 0
+        chosen = order[:taken]
+        covered_gain = float(covered[chosen.size - 1]) if chosen.size else 0.0
         
-        # Heuristic: Sort by greatest unrealized loss percentage
-        losers = [lot for lot in portfolio_lots if lot["unrealized_gain_loss"] < 0]
-        losers.sort(key=lambda x: x["unrealized_gain_loss"])
-        
-        candidates = []
-        covered_gain = Decimal('0.00')
-        
-        for lot in losers:
-            if covered_gain >= recognized_gains:
-                break
-            
-            loss = Decimal(str(abs(lot["unrealized_gain_loss"])))
-            candidates.append(lot)
-            covered_gain += loss
-            
-        logger.info(f"Loss Harvesting: Found {len(candidates)} lots to offset ${covered_gain}")
+        logger.info(f"Loss Harvesting: Found {chosen.size} lots to offset ${covered_gain:,.2f}")
         
-        return candidates
+        return [
+            {
+                "lot_id": sale.lot_ids[i],
+                "symbol": sale.symbols[i],
+                "quantity": float(sale.quantity[i]),
+                "adjusted_basis": float(sale.adjusted_basis[i]),
+                "unrealized_gain_loss": float(sale.gain[i]),
+                "is_long_term": bool(sale.is_long_term[i]),
+            }
+            for i in chosen
+        ]
@@ -0,0 +1,386 @@
+"""
+Tax-Lot Store - indexed lots, lot relief and wash-sale windows.
+
+Purchases and sales are indexed per substantially-identical group by date
+ordinal, so "any buy/sale within 30 days of D" is two bisects instead of a
+scan over the trade history. Open lots carry their wash-sale basis
+adjustment, are relieved under FIFO, LIFO, HIFO or specific-ID, and can be
+evaluated as hypothetical sales in bulk with NumPy. A wash sale splits the
+replacement lot so only the matched shares take the disallowed loss and the
+sold shares' holding period.
+"""
+import logging
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from enum import Enum
+from itertools import count
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+logger = logging.getLogger(__name__)
+
+WASH_SALE_DAYS = 30
+LONG_TERM_DAYS = 365
+_EPS = 1e-9
+
+
+class LotMethod(Enum):
+    """Order in which open lots are relieved by a sale."""
+    FIFO = "FIFO"
+    LIFO = "LIFO"
+    HIFO = "HIFO"
+    SPECIFIC_ID = "SPECIFIC_ID"
+
+
+@dataclass
+class TaxLot:
+    """An open (or closed, quantity 0) purchase lot."""
+    lot_id: str
+    symbol: str
+    quantity: float
+    cost_per_share: float
+    acquired: date
+    adjustment_per_share: float = 0.0
+    wash_matched: float = 0.0  # shares already used as a wash-sale replacement
+    tacked_days: int = 0  # holding period carried over from wash-sold shares
+
+    @property
+    def holding_start(self) -> date:
+        """Start of the holding period, including any tacked-on days."""
+        return self.acquired - timedelta(days=self.tacked_days)
+
+    @property
+    def basis_per_share(self) -> float:
+        return self.cost_per_share + self.adjustment_per_share
+
+    @property
+    def adjusted_basis(self) -> float:
+        return self.quantity * self.basis_per_share
+
+
+@dataclass
+class TradeRecord:
+    """One indexed buy or sale; sales keep their wash-sale bookkeeping."""
+    symbol: str
+    trade_date: date
+    quantity: float = 0.0
+    lot_id: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    loss_per_share: float = 0.0
+    unmatched: float = 0.0
+    disallowed_loss: float = 0.0
+    held_days: int = 0  # holding period of the sold shares, tacked onto replacements
+
+
+@dataclass
+class LotRelief:
+    """Shares of one lot closed by a sale."""
+    lot_id: str
+    symbol: str
+    quantity: float
+    proceeds: float
+    adjusted_basis: float
+    gain: float
+    is_long_term: bool
+    disallowed_loss: float = 0.0
+
+    @property
+    def recognized_gain(self) -> float:
+        return self.gain + self.disallowed_loss
+
+
+@dataclass
+class WhatIfSale:
+    """Column-wise outcome of selling many lots on one date."""
+    lot_ids: List[str]
+    symbols: List[str]
+    quantity: NDArray
+    proceeds: NDArray
+    adjusted_basis: NDArray
+    gain: NDArray
+    is_long_term: NDArray
+    wash_sale_risk: NDArray
+
+    @property
+    def harvestable_loss(self) -> NDArray:
+        """Losses that would be recognized now (not deferred by a wash sale)."""
+        return np.where((self.gain < 0) & ~self.wash_sale_risk, -self.gain, 0.0)
+
+
+class _DateIndex:
+    """Records of one group kept sorted by date ordinal."""
+
+    def __init__(self) -> None:
+        self.ordinals: List[int] = []
+        self.records: List[TradeRecord] = []
+
+    def add(self, record: TradeRecord) -> None:
+        ordinal = record.trade_date.toordinal()
+        pos = bisect_right(self.ordinals, ordinal)
+        self.ordinals.insert(pos, ordinal)
+        self.records.insert(pos, record)
+
+    def bounds(self, start: date, end: date) -> Tuple[int, int]:
+        return bisect_left(self.ordinals, start.toordinal()), bisect_right(self.ordinals, end.toordinal())
+
+    def between(self, start: date, end: date) -> List[TradeRecord]:
+        lo, hi = self.bounds(start, end)
+        return self.records[lo:hi]
+
+
+class TaxLotStore:
+    """
+    Lots and trades of one account (or household), indexed by
+    (substantially-identical group, date).
+    """
+
+    def __init__(self, identical_groups: Optional[Mapping[str, str]] = None, window_days: int = WASH_SALE_DAYS):
+        """
+        Args:
+            identical_groups: symbol -> group key for securities treated as
+                substantially identical (e.g. share classes); others are
+                their own group.
+            window_days: Wash-sale window on each side of a sale.
+        """
+        self.identical_groups = {k.upper(): v.upper() for k, v in (identical_groups or {}).items()}
+        self.window = timedelta(days=window_days)
+        self._buys: Dict[str, _DateIndex] = {}
+        self._sales: Dict[str, _DateIndex] = {}
+        self._open: Dict[str, List[TaxLot]] = {}  # symbol -> open lots by acquisition date
+        self._lots: Dict[str, TaxLot] = {}
+        self._ids = count(1)
+
+    def group_of(self, symbol: str) -> str:
+        symbol = symbol.upper()
+        return self.identical_groups.get(symbol, symbol)
+
+    # -- recording ---------------------------------------------------------
+
+    def add_lot(
+        self,
+        symbol: str,
+        quantity: float,
+        cost_per_share: float,
+        acquired: date,
+        lot_id: Optional[str] = None,
+    ) -> TaxLot:
+        """Open a lot; it absorbs disallowed losses of earlier sales in the window."""
+        if quantity <= 0:
+            raise ValueError("quantity must be positive")
+        symbol = symbol.upper()
+        lot = TaxLot(lot_id or f"lot-{next(self._ids)}", symbol, float(quantity), float(cost_per_share), acquired)
+        if lot.lot_id in self._lots:
+            raise ValueError(f"duplicate lot id {lot.lot_id}")
+        self._lots[lot.lot_id] = lot
+        self._insert_open(lot)
+        self._buys.setdefault(self.group_of(symbol), _DateIndex()).add(
+            TradeRecord(symbol, acquired, lot.quantity, lot.lot_id)
+        )
+        for sale in self.sales_within(symbol, acquired):
+            if sale.unmatched > _EPS:
+                self._absorb(sale, [lot])
+        return lot
+
+    def _insert_open(self, lot: TaxLot) -> None:
+        lots = self._open.setdefault(lot.symbol, [])
+        if not lots or lots[-1].acquired <= lot.acquired:
+            lots.append(lot)
+        else:
+            lots.insert(bisect_right(lots, lot.acquired, key=lambda l: l.acquired), lot)
+
+    def record_purchase(self, symbol: str, trade_date: date, quantity: float = 0.0, **data: Any) -> TradeRecord:
+        """Index a buy that is not tracked as a lot (e.g. another account's trade)."""
+        record = TradeRecord(symbol.upper(), trade_date, quantity, data=data)
+        self._buys.setdefault(self.group_of(symbol), _DateIndex()).add(record)
+        return record
+
+    def record_sale(self, symbol: str, trade_date: date, quantity: float = 0.0, **data: Any) -> TradeRecord:
+        """Index a sale without relieving lots."""
+        record = TradeRecord(symbol.upper(), trade_date, quantity, data=data)
+        self._sales.setdefault(self.group_of(symbol), _DateIndex()).add(record)
+        return record
+
+    # -- window queries ----------------------------------------------------
+
+    def purchases_between(self, symbol: str, start: date, end: date) -> List[TradeRecord]:
+        index = self._buys.get(self.group_of(symbol))
+        return index.between(start, end) if index else []
+
+    def sales_between(self, symbol: str, start: date, end: date) -> List[TradeRecord]:
+        index = self._sales.get(self.group_of(symbol))
+        return index.between(start, end) if index else []
+
+    def purchases_within(self, symbol: str, on: date) -> List[TradeRecord]:
+        return self.purchases_between(symbol, on - self.window, on + self.window)
+
+    def sales_within(self, symbol: str, on: date) -> List[TradeRecord]:
+        return self.sales_between(symbol, on - self.window, on + self.window)
+
+    def has_sale_within(self, symbol: str, on: date) -> bool:
+        index = self._sales.get(self.group_of(symbol))
+        if not index:
+            return False
+        lo, hi = index.bounds(on - self.window, on + self.window)
+        return hi > lo
+
+    # -- lots --------------------------------------------------------------
+
+    def get_lot(self, lot_id: str) -> TaxLot:
+        return self._lots[lot_id]
+
+    def open_lots(self, symbol: Optional[str] = None) -> List[TaxLot]:
+        if symbol is not None:
+            return list(self._open.get(symbol.upper(), []))
+        return [lot for lots in self._open.values() for lot in lots]
+
+    def _relief_order(self, symbol: str, method: LotMethod, lot_ids: Optional[Sequence[str]]) -> Iterable[TaxLot]:
+        lots = self._open.get(symbol, [])
+        if method is LotMethod.FIFO:
+            return lots
+        if method is LotMethod.LIFO:
+            return reversed(lots)
+        if method is LotMethod.HIFO:
+            return sorted(lots, key=lambda l: -l.basis_per_share)
+        if not lot_ids:
+            raise ValueError("SPECIFIC_ID relief needs lot_ids")
+        chosen = [self._lots[i] for i in lot_ids]
+        if any(l.symbol != symbol or l.quantity <= _EPS for l in chosen):
+            raise ValueError(f"lot_ids must be open lots of {symbol}")
+        return chosen
+
+    def sell(
+        self,
+        symbol: str,
+        quantity: float,
+        price: float,
+        sale_date: date,
+        method: LotMethod = LotMethod.FIFO,
+        lot_ids: Optional[Sequence[str]] = None,
+    ) -> List[LotRelief]:
+        """
+        Relieve `quantity` shares and index the sale. A loss on shares with a
+        replacement purchase in the window is disallowed share-for-share and
+        added to the replacement lots' basis.
+        """
+        symbol = symbol.upper()
+        available = sum(l.quantity for l in self._open.get(symbol, []))
+        if quantity <= 0 or quantity > available + _EPS:
+            raise ValueError(f"cannot sell {quantity} {symbol}; {available} open")
+        remaining = float(quantity)
+        reliefs: List[LotRelief] = []
+        for lot in list(self._relief_order(symbol, LotMethod(method), lot_ids)):
+            if remaining <= _EPS:
+                break
+            take = min(remaining, lot.quantity)
+            basis = take * lot.basis_per_share
+            reliefs.append(LotRelief(
+                lot.lot_id, symbol, take, take * price, basis, take * price - basis,
+                (sale_date - lot.holding_start).days > LONG_TERM_DAYS,
+            ))
+            lot.quantity -= take
+            lot.wash_matched = min(lot.wash_matched, lot.quantity)
+            remaining -= take
+        if remaining > _EPS:
+            raise ValueError(f"selected lots hold less than {quantity} {symbol}")
+        self._open[symbol] = [l for l in self._open[symbol] if l.quantity > _EPS]
+
+        sales = self._sales.setdefault(self.group_of(symbol), _DateIndex())
+        sold = {r.lot_id for r in reliefs}
+        replacements = [
+            self._lots[b.lot_id] for b in self.purchases_within(symbol, sale_date)
+            if b.lot_id is not None and b.lot_id not in sold
+        ]
+        for relief in reliefs:
+            record = TradeRecord(symbol, sale_date, relief.quantity, relief.lot_id)
+            if relief.gain < 0:
+                record.loss_per_share = -relief.gain / relief.quantity
+                record.unmatched = relief.quantity
+                record.held_days = (sale_date - self._lots[relief.lot_id].holding_start).days
+                self._absorb(record, replacements)
+                relief.disallowed_loss = record.disallowed_loss
+            sales.add(record)
+        return reliefs
+
+    def _absorb(self, sale: TradeRecord, lots: Iterable[TaxLot]) -> None:
+        """
+        Match the sale's unmatched loss shares against replacement lots. The
+        matched shares are split into their own lot (unless the whole lot is
+        matched), which takes the disallowed loss per share and the sold
+        shares' holding period; the rest of the lot is left untouched.
+        """
+        for lot in lots:
+            take = min(sale.unmatched, lot.quantity - lot.wash_matched)
+            if take <= _EPS:
+                continue
+            if lot.quantity - take > _EPS:
+                lot = self._split(lot, take)
+            disallowed = take * sale.loss_per_share
+            lot.adjustment_per_share += disallowed / take
+            lot.tacked_days += sale.held_days
+            lot.wash_matched = lot.quantity
+            sale.unmatched -= take
+            sale.disallowed_loss += disallowed
+            if sale.unmatched <= _EPS:
+                break
+
+    def _split(self, lot: TaxLot, quantity: float) -> TaxLot:
+        """Move `quantity` unmatched shares of lot into a new open lot with the same cost."""
+        lot.quantity -= quantity
+        piece = TaxLot(f"{lot.lot_id}.{next(self._ids)}", lot.symbol, quantity, lot.cost_per_share,
+                       lot.acquired, lot.adjustment_per_share, tacked_days=lot.tacked_days)
+        self._lots[piece.lot_id] = piece
+        self._insert_open(piece)
+        return piece
+
+    # -- bulk what-if ------------------------------------------------------
+
+    def what_if_sell(
+        self,
+        prices: Mapping[str, float],
+        sale_date: date,
+        lot_ids: Optional[Sequence[str]] = None,
+    ) -> WhatIfSale:
+        """
+        Outcome of selling each lot in full at `prices` on `sale_date`
+        (default: every open lot). A loss is at wash-sale risk when any other
+        purchase of its group falls inside the window.
+        """
+        lots = self.open_lots() if lot_ids is None else [self._lots[i] for i in lot_ids]
+        prices = {k.upper(): v for k, v in prices.items()}
+        missing = {l.symbol for l in lots} - prices.keys()
+        if missing:
+            raise ValueError(f"missing prices for {sorted(missing)}")
+        quantity = np.fromiter((l.quantity for l in lots), np.float64, len(lots))
+        basis = np.fromiter((l.basis_per_share for l in lots), np.float64, len(lots))
+        price = np.fromiter((prices[l.symbol] for l in lots), np.float64, len(lots))
+        acquired = np.fromiter((l.acquired.toordinal() for l in lots), np.int64, len(lots))
+        held_from = np.fromiter((l.holding_start.toordinal() for l in lots), np.int64, len(lots))
+        groups = np.array([self.group_of(l.symbol) for l in lots], dtype=object)
+
+        proceeds = quantity * price
+        adjusted = quantity * basis
+        lo, hi = (sale_date - self.window).toordinal(), (sale_date + self.window).toordinal()
+        buys_in_window = np.zeros(len(lots), dtype=np.int64)
+        if len(lots):
+            unique, inverse = np.unique(groups, return_inverse=True)
+            per_group = np.zeros(unique.size, dtype=np.int64)
+            for g, group in enumerate(unique):
+                index = self._buys.get(group)
+                if index:
+                    per_group[g] = bisect_right(index.ordinals, hi) - bisect_left(index.ordinals, lo)
+            # A lot's own purchase is not a replacement for itself
+            buys_in_window = per_group[inverse] - ((acquired >= lo) & (acquired <= hi))
+        gain = proceeds - adjusted
+        return WhatIfSale(
+            lot_ids=[l.lot_id for l in lots],
+            symbols=[l.symbol for l in lots],
+            quantity=quantity,
+            proceeds=proceeds,
+            adjusted_basis=adjusted,
+            gain=gain,
+            is_long_term=(sale_date.toordinal() - held_from) > LONG_TERM_DAYS,
+            wash_sale_risk=(gain < 0) & (buys_in_window > 0),
+        )
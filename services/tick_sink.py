@@ -0,0 +1,353 @@
+"""
+Write-behind tick sink for the price_telemetry hypertable.
+
+Ticks are appended to columnar buffers (one typed array per column) and
+written with `COPY ... FROM STDIN (FORMAT binary)`, one COPY per flush, so N
+ticks cost one round-trip and no per-row SQL parsing. The binary payload is
+built with NumPy record arrays: rows whose symbol/source strings have the same
+byte lengths share a fixed layout and are encoded in one vectorized pass.
+A background thread flushes when batch_size ticks are pending or every
+flush_interval seconds; failed COPYs are retried with exponential backoff.
+"""
+import io
+import logging
+import struct
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Callable, ContextManager, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+COPY_TRAILER = struct.pack("!h", -1)
+# Bytes handed to libpq per write while streaming a payload
+COPY_CHUNK_BYTES = 1 << 20
+COLUMNS = ("time", "symbol", "price", "volume", "source")
+
+# timestamptz is sent as microseconds since 2000-01-01 UTC
+PG_EPOCH_OFFSET_US = 946_684_800 * 1_000_000
+
+TimeLike = Union[None, int, float, str, datetime]
+
+
+def to_pg_micros(ts: TimeLike = None) -> int:
+    """Convert None (now), epoch seconds, an ISO string or a datetime to Postgres epoch microseconds."""
+    if ts is None:
+        return int(time.time() * 1_000_000) - PG_EPOCH_OFFSET_US
+    if isinstance(ts, str):
+        ts = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    if isinstance(ts, datetime):
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        return int(ts.timestamp() * 1_000_000) - PG_EPOCH_OFFSET_US
+    return int(float(ts) * 1_000_000) - PG_EPOCH_OFFSET_US
+
+
+class TickColumns:
+    """
+    One buffer's worth of ticks, stored column-wise.
+
+    (symbol, source) pairs are interned to small integer labels, so a tick
+    costs four typed-array appends.
+    """
+
+    __slots__ = ("times", "prices", "volumes", "labels")
+
+    def __init__(self):
+        self.times = array("q")
+        self.prices = array("d")
+        self.volumes = array("d")
+        self.labels = array("i")
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+class CopyEncoder:
+    """Builds binary COPY payloads for (time, symbol, price, volume, source) rows."""
+
+    def __init__(self):
+        self._label_ids: Dict[Tuple[str, str], int] = {}
+        self._labels: List[Tuple[bytes, bytes]] = []
+        self._layout_ids: Dict[Tuple[int, int], int] = {}
+        self._layout_of: List[int] = []
+        self._dtypes: List[np.dtype] = []
+        self._arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._lock = threading.Lock()
+
+    def label(self, symbol: str, source: str) -> int:
+        """Interned id for a (symbol, source) pair."""
+        key = (symbol, source)
+        label = self._label_ids.get(key)
+        if label is not None:
+            return label
+        sym, src = symbol.encode("utf-8"), source.encode("utf-8")
+        if not sym or not src:
+            raise ValueError("symbol and source must be non-empty")
+        with self._lock:
+            label = self._label_ids.get(key)
+            if label is None:
+                shape = (len(sym), len(src))
+                layout = self._layout_ids.get(shape)
+                if layout is None:
+                    layout = self._layout_ids[shape] = len(self._dtypes)
+                    self._dtypes.append(self._row_dtype(*shape))
+                self._labels.append((sym, src))
+                self._layout_of.append(layout)
+                self._arrays = None
+                label = self._label_ids[key] = len(self._labels) - 1
+        return label
+
+    @staticmethod
+    def _row_dtype(sym_len: int, src_len: int) -> np.dtype:
+        return np.dtype([
+            ("fields", ">i2"),
+            ("time_len", ">i4"), ("time", ">i8"),
+            ("symbol_len", ">i4"), ("symbol", f"S{sym_len}"),
+            ("price_len", ">i4"), ("price", ">f8"),
+            ("volume_len", ">i4"), ("volume", ">f8"),
+            ("source_len", ">i4"), ("source", f"S{src_len}"),
+        ])
+
+    def _label_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        with self._lock:
+            if self._arrays is None:
+                self._arrays = (
+                    np.array([sym for sym, _ in self._labels], dtype=bytes),
+                    np.array([src for _, src in self._labels], dtype=bytes),
+                    np.array(self._layout_of, dtype=np.int32),
+                )
+            return self._arrays
+
+    def encode(self, columns: TickColumns) -> bytes:
+        """Header, one tuple per tick (grouped by string layout, not input order), trailer."""
+        labels = np.frombuffer(columns.labels, dtype=np.int32)
+        times = np.frombuffer(columns.times, dtype=np.int64)
+        prices = np.frombuffer(columns.prices, dtype=np.float64)
+        volumes = np.frombuffer(columns.volumes, dtype=np.float64)
+        symbols, sources, layout_of = self._label_arrays()
+        parts = [COPY_HEADER]
+        row_layouts = layout_of[labels]
+        for layout in np.unique(row_layouts):
+            idx = np.flatnonzero(row_layouts == layout)
+            dtype = self._dtypes[layout]
+            rec = np.empty(len(idx), dtype=dtype)
+            rec["fields"] = len(COLUMNS)
+            rec["time_len"] = 8
+            rec["time"] = times[idx]
+            rec["symbol_len"] = dtype["symbol"].itemsize
+            rec["symbol"] = symbols[labels[idx]]
+            rec["price_len"] = 8
+            rec["price"] = prices[idx]
+            rec["volume_len"] = 8
+            rec["volume"] = volumes[idx]
+            rec["source_len"] = dtype["source"].itemsize
+            rec["source"] = sources[labels[idx]]
+            parts.append(rec.tobytes())
+        parts.append(COPY_TRAILER)
+        return b"".join(parts)
+
+
+class TickSink:
+    """
+    Buffers ticks and COPYs them into a Postgres table in the background.
+
+    cursor_factory returns a context manager yielding a psycopg2 cursor and
+    committing on exit. add() blocks while max_pending ticks are waiting
+    (e.g. during a database outage) instead of growing without bound; a batch
+    that still fails after max_retries is dropped and counted. The latest
+    price per symbol is kept in memory for cheap last-price reads.
+    """
+
+    def __init__(
+        self,
+        cursor_factory: Callable[[], ContextManager[Any]],
+        table: str = "price_telemetry",
+        batch_size: int = 50_000,
+        flush_interval: float = 0.5,
+        max_pending: int = 1_000_000,
+        max_retries: int = 3,
+        retry_backoff: float = 0.2,
+        auto_start: bool = True,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self._cursor_factory = cursor_factory
+        self.table = table
+        self.copy_sql = f"COPY {table} ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT binary)"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max(max_pending, batch_size)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.auto_start = auto_start
+        self.encoder = CopyEncoder()
+        self._buffer = TickColumns()
+        self.last_prices: Dict[str, Tuple[float, int]] = {}
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._stats = {"queued": 0, "written": 0, "dropped": 0, "retries": 0, "batches": 0,
+                       "blocked_seconds": 0.0, "encode_seconds": 0.0, "write_seconds": 0.0}
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def add(self, symbol: str, price: float, volume: float = 0.0, source: str = "UNKNOWN",
+            ts: TimeLike = None) -> None:
+        """Queue one tick."""
+        self.add_many((symbol,), (price,), (volume,), source, None if ts is None else (ts,))
+
+    def add_many(
+        self,
+        symbols: Sequence[str],
+        prices: Sequence[float],
+        volumes: Optional[Sequence[float]] = None,
+        sources: Union[str, Sequence[str]] = "UNKNOWN",
+        times: Optional[Sequence[TimeLike]] = None,
+    ) -> int:
+        """Queue ticks given column-wise; `sources` may be one value for all rows."""
+        n = len(symbols)
+        if n == 0:
+            return 0
+        if self.auto_start and not self.running:
+            self.start()
+        if isinstance(sources, str):
+            sources = (sources,) * n
+        label = self.encoder.label
+        labels = [label(sym, src) for sym, src in zip(symbols, sources)]
+        stamps = [to_pg_micros(ts) for ts in times] if times is not None else [to_pg_micros()] * n
+        with self._cond:
+            if len(self._buffer) >= self.max_pending and self.running:
+                # Backpressure: wait for the flusher instead of growing without bound
+                start = time.perf_counter()
+                while len(self._buffer) >= self.max_pending and self.running:
+                    self._cond.wait(self.flush_interval)
+                self._stats["blocked_seconds"] += time.perf_counter() - start
+            buf = self._buffer
+            buf.labels.extend(labels)
+            buf.times.extend(stamps)
+            buf.prices.extend(prices)
+            buf.volumes.extend(volumes if volumes is not None else [0.0] * n)
+            for sym, price, stamp in zip(symbols, prices, stamps):
+                last = self.last_prices.get(sym)
+                if last is None or stamp >= last[1]:
+                    self.last_prices[sym] = (float(price), stamp)
+            self._stats["queued"] += n
+            full = len(buf) >= self.batch_size
+            if full and self.running:
+                self._cond.notify_all()
+        if full and not self.running:
+            self.flush()
+        return n
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        last = self.last_prices.get(symbol)
+        return last[0] if last else None
+
+    def flush(self) -> int:
+        """COPY everything queued so far; returns the number of ticks written."""
+        with self._flush_lock:
+            with self._cond:
+                columns, self._buffer = self._buffer, TickColumns()
+                self._cond.notify_all()
+            if not columns:
+                return 0
+            start = time.perf_counter()
+            payload = self.encoder.encode(columns)
+            self._stats["encode_seconds"] += time.perf_counter() - start
+            return self._write(payload, len(columns))
+
+    def _write(self, payload: bytes, rows: int) -> int:
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                with self._cursor_factory() as cur:
+                    cur.copy_expert(self.copy_sql, io.BytesIO(payload), size=COPY_CHUNK_BYTES)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self._stats["dropped"] += rows
+                    logger.error("TickSink: dropped %d ticks after %d attempts: %s", rows, attempt + 1, e)
+                    return 0
+                self._stats["retries"] += 1
+                delay = self.retry_backoff * (2 ** attempt)
+                logger.warning("TickSink: COPY of %d ticks failed (%s), retrying in %.2fs", rows, e, delay)
+                time.sleep(delay)
+                continue
+            self._stats["write_seconds"] += time.perf_counter() - start
+            self._stats["batches"] += 1
+            self._stats["written"] += rows
+            return rows
+        return 0
+
+    def start(self) -> None:
+        """Start the background flush thread."""
+        with self._cond:
+            if self.running:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="tick-sink", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the flush thread, then write whatever is still queued."""
+        thread = self._thread
+        if thread is not None:
+            with self._cond:
+                self._stopping = True
+                self._cond.notify_all()
+            thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stopping or len(self._buffer) >= self.batch_size,
+                    timeout=self.flush_interval,
+                )
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("TickSink: flush failed: %s", e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tick, batch and throughput counters."""
+        stats = dict(self._stats)
+        stats["pending"] = self.pending
+        stats["running"] = self.running
+        stats["symbols"] = len(self.last_prices)
+        stats["rows_per_second"] = stats["written"] / stats["write_seconds"] if stats["write_seconds"] else 0.0
+        return stats
+
+
+def decode_copy_binary(payload: bytes) -> Iterable[Tuple[int, str, float, float, str]]:
+    """Parse a payload produced by CopyEncoder (used by tests and the benchmark)."""
+    if not payload.startswith(COPY_HEADER):
+        raise ValueError("missing PGCOPY header")
+    pos = len(COPY_HEADER)
+    while True:
+        (fields,) = struct.unpack_from("!h", payload, pos)
+        pos += 2
+        if fields == -1:
+            return
+        values = []
+        for _ in range(fields):
+            (length,) = struct.unpack_from("!i", payload, pos)
+            pos += 4
+            values.append(payload[pos:pos + length])
+            pos += length
+        t, sym, price, volume, src = values
+        yield (struct.unpack("!q", t)[0], sym.decode("utf-8"), struct.unpack("!d", price)[0],
+               struct.unpack("!d", volume)[0], src.decode("utf-8"))
@@ -212,3 +212,57 @@ async def test_calculate_concentration_risk_single_holding(service):
     # Single holding should have high concentration
     assert result.by_holding is not None
     assert result.by_holding.max_weight == 1.0
+
+
+@pytest.mark.asyncio
+async def test_portfolio_volatility_uses_shared_covariance(service, mock_portfolio_data):
+    """Test portfolio volatility is sqrt(w'Sw) on the annualized shared estimate."""
+    import numpy as np
+    from services.quantitative.covariance import CovarianceEstimate
+    
+    cov = np.diag([0.04, 0.09, 0.01, 0.16])
+    covariance_service = Mock()
+    covariance_service.annualized_covariance.return_value = CovarianceEstimate("ledoit_wolf", 252, matrix=cov)
+    with patch('services.analytics.risk_decomposition_service.get_covariance_service', return_value=covariance_service):
+        volatility = await service._calculate_portfolio_volatility(mock_portfolio_data, 126)
+    
+    weights = np.array([0.4, 0.3, 0.2, 0.1])
+    assert volatility == pytest.approx(np.sqrt(weights @ cov @ weights))
+    covariance_service.annualized_covariance.assert_called_once_with(
+        ['AAPL', 'MSFT', 'JPM', 'TSLA'], 126, method="ledoit_wolf"
+    )
+
+
+@pytest.mark.asyncio
+async def test_tail_risk_contributions_sum_to_portfolio_totals(service, mock_portfolio_data):
+    """Test Euler contributions add up to portfolio VaR/CVaR for both scenario sources."""
+    from services.analysis.monte_carlo import MonteCarloEngine, SimulationConfig
+    
+    service._get_portfolio_data = AsyncMock(return_value=mock_portfolio_data)
+    service.monte_carlo = MonteCarloEngine(SimulationConfig(n_simulations=20000, chunk_size=5000))
+    
+    for method in ("historical", "monte_carlo"):
+        result = await service.calculate_tail_risk_contributions(
+            portfolio_id="test_portfolio", confidence_level=0.95, method=method, seed=11
+        )
+        assert result.portfolio_cvar >= result.portfolio_var > 0
+        assert sum(c.var_contribution for c in result.contributions) == pytest.approx(result.portfolio_var)
+        assert sum(c.cvar_contribution for c in result.contributions) == pytest.approx(result.portfolio_cvar)
+        for contribution, holding in zip(result.contributions, mock_portfolio_data['holdings']):
+            assert contribution.cvar_contribution == pytest.approx(holding['weight'] * contribution.marginal_cvar)
+    assert result.n_scenarios == 20000 and result.scenario_seed == 11
+    
+    with pytest.raises(ValueError, match="Unknown tail risk method"):
+        await service.calculate_tail_risk_contributions(portfolio_id="test_portfolio", method="parametric")
+
+
+@pytest.mark.asyncio
+async def test_tail_risk_horizon_applies_to_historical(service, mock_portfolio_data):
+    """Test horizon_days scales historical scenarios, not only simulated ones."""
+    service._get_portfolio_data = AsyncMock(return_value=mock_portfolio_data)
+    daily = await service.calculate_tail_risk_contributions(portfolio_id="test_portfolio", method="historical")
+    yearly = await service.calculate_tail_risk_contributions(
+        portfolio_id="test_portfolio", method="historical", horizon_days=252
+    )
+    assert yearly.portfolio_var > 5 * daily.portfolio_var
+    assert sum(c.var_contribution for c in yearly.contributions) == pytest.approx(yearly.portfolio_var)
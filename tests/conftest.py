@@ -27,6 +27,15 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def isolated_agent_cache(tmp_path, monkeypatch):
+    """Keep agent response caching out of the source tree and fresh per test."""
+    monkeypatch.setenv("AGENT_CACHE_DIR", str(tmp_path / "agent_cache"))
+    cache_module = sys.modules.get("services.infrastructure.cache_service")
+    if cache_module is not None:
+        monkeypatch.setattr(cache_module, "_cache_instance", None)
+
+
 @pytest.fixture
 def mock_db():
     """Provide a mock database connection."""
@@ -0,0 +1,166 @@
+import pytest
+from services.execution.matching_engine import MatchingEngine
+from services.execution.paper_exchange import PaperExchange
+
+
+def seed(engine, symbol="AAPL", ts=0.0):
+    # bids 99.99 / 99.98 / 99.97, asks 100.01 / 100.02 / 100.03, 100 each
+    for k in range(1, 4):
+        engine.on_depth(symbol, "BID", round(100 - 0.01 * k, 2), 100.0, ts)
+        engine.on_depth(symbol, "ASK", round(100 + 0.01 * k, 2), 100.0, ts)
+
+
+class TestMatchingEngine:
+
+    def test_market_order_walks_levels(self):
+        engine = MatchingEngine()
+        seed(engine)
+        order = engine.submit("AAPL", "BUY", 250, "MARKET")
+
+        assert order.status == "FILLED"
+        assert [(f.price, f.quantity, f.liquidity) for f in engine.fills] == [
+            (100.01, 100, "TAKER"), (100.02, 100, "TAKER"), (100.03, 50, "TAKER")]
+        assert engine.best_ask("AAPL") == 100.03
+        assert "AAPL" in engine.books and not engine.orders
+
+    def test_ioc_limit_fills_partially_and_cancels_rest(self):
+        engine = MatchingEngine()
+        seed(engine)
+        order = engine.submit("AAPL", "SELL", 150, "LIMIT", price=99.99, tif="IOC")
+
+        assert order.filled == 100
+        assert order.status == "CANCELLED"
+        assert engine.best_bid("AAPL") == 99.98
+
+    def test_resting_limit_queue_position_and_trades(self):
+        engine = MatchingEngine(queue_position=1.0)
+        seed(engine)
+        first = engine.submit("AAPL", "BUY", 30, "LIMIT", price=99.99)
+        second = engine.submit("AAPL", "BUY", 30, "LIMIT", price=99.99)
+        assert (first.status, first.ahead, second.ahead) == ("OPEN", 100.0, 100.0)
+
+        engine.on_depth("AAPL", "BID", 99.99, 60.0, 1.0)  # 40 cancelled ahead of us
+        assert first.ahead == 60.0
+
+        engine.on_trade("AAPL", 99.99, 80.0, 2.0, aggressor="SELL")  # 60 external, then 20 to `first`
+        assert (first.filled, second.filled) == (20.0, 0.0)
+        engine.on_trade("AAPL", 99.99, 25.0, 3.0, aggressor="SELL")  # time priority: first, then second
+        assert (first.status, second.filled) == ("FILLED", 15.0)
+        assert all(f.liquidity == "MAKER" and f.price == 99.99 for f in engine.fills)
+
+    def test_front_of_queue_when_configured(self):
+        engine = MatchingEngine(queue_position=0.0)
+        seed(engine)
+        order = engine.submit("AAPL", "SELL", 10, "LIMIT", price=100.01)
+        engine.on_trade("AAPL", 100.01, 10.0, 1.0, aggressor="BUY")
+        assert order.status == "FILLED"
+
+    def test_book_crossing_resting_order_fills_at_limit(self):
+        engine = MatchingEngine()
+        seed(engine)
+        order = engine.submit("AAPL", "BUY", 50, "LIMIT", price=100.0)
+        engine.on_depth("AAPL", "ASK", 99.995, 20.0, 1.0)
+        assert (order.filled, order.status) == (20.0, "PARTIALLY_FILLED")
+        engine.on_depth("AAPL", "ASK", 100.0, 500.0, 2.0)
+        assert order.status == "FILLED"
+        assert {f.price for f in engine.fills} == {100.0}
+
+    def test_stop_orders_trigger_on_trade_and_touch(self):
+        engine = MatchingEngine()
+        seed(engine)
+        stop = engine.submit("AAPL", "SELL", 50, "STOP", stop_price=99.95)
+        stop_limit = engine.submit("AAPL", "BUY", 10, "STOP_LIMIT", price=100.10, stop_price=100.05)
+        assert not engine.fills
+
+        engine.on_trade("AAPL", 99.95, 1.0, 1.0, aggressor="SELL")
+        assert stop.status == "FILLED" and stop.avg_price == 99.99
+
+        engine.on_depth("AAPL", "BID", 100.05, 5.0, 2.0)  # bid reaches the buy stop
+        assert stop_limit.triggered and stop_limit.status == "FILLED"
+        assert stop_limit.avg_price == 100.01
+
+    def test_latency_delays_orders_and_cancels(self):
+        engine = MatchingEngine(latency=0.5)
+        seed(engine)
+        order = engine.submit("AAPL", "BUY", 10, "MARKET", ts=1.0)
+        assert order.status == "PENDING"
+        engine.on_depth("AAPL", "ASK", 100.01, 0.0, 1.2)  # book moves before the order lands
+        engine.on_depth("AAPL", "ASK", 100.02, 100.0, 1.6)
+        assert order.status == "FILLED" and order.avg_price == 100.02
+
+        resting = engine.submit("AAPL", "SELL", 10, "LIMIT", price=100.05, ts=2.0)
+        engine.advance(2.5)
+        assert resting.status == "OPEN"
+        assert engine.cancel(resting.order_id, ts=3.0)
+        engine.on_trade("AAPL", 100.05, 1000.0, 3.2, aggressor="BUY")  # cancel still in flight
+        assert resting.status == "FILLED"
+        engine.advance(4.0)
+        assert not engine.cancel(resting.order_id)
+
+    def test_replay_fast_path_keeps_book_consistent(self):
+        engine = MatchingEngine()
+        events = [(0.0, "D", "EURUSD", side, px, 1e6) for side, px in
+                  (("BID", 1.0849), ("BID", 1.0848), ("ASK", 1.0851), ("ASK", 1.0852))]
+        events += [(1.0, "D", "EURUSD", "BID", 1.0849, 0.0), (1.1, "D", "EURUSD", "ASK", 1.0850, 2e6),
+                   (1.2, "T", "EURUSD", None, 1.0850, 5e5)]
+        assert engine.run(events) == 7
+        assert (engine.best_bid("EURUSD"), engine.best_ask("EURUSD")) == (1.0848, 1.0850)
+
+        order = engine.submit("EURUSD", "BUY", 3e6, "LIMIT", price=1.0851)
+        assert order.filled == 3e6 and order.avg_price == pytest.approx((2e6 * 1.0850 + 1e6 * 1.0851) / 3e6)
+
+    def test_rejects_invalid_orders(self):
+        engine = MatchingEngine()
+        with pytest.raises(ValueError):
+            engine.submit("AAPL", "BUY", 10, "LIMIT")
+        with pytest.raises(ValueError):
+            engine.submit("AAPL", "HOLD", 10, "MARKET")
+
+
+class TestPaperExchangeBook:
+
+    def test_limit_order_fills_update_account(self):
+        exchange = PaperExchange(initial_cash=10000.0)
+        seed(exchange.engine)
+        order = exchange.submit_order("AAPL", 50, "BUY", "LIMIT", limit_price=99.98)
+        assert order["status"] == "OPEN"
+
+        exchange.on_depth("AAPL", "ASK", 99.98, 80.0, 1.0)
+        assert exchange.get_order(order["id"])["status"] == "FILLED"
+        assert exchange.cash == pytest.approx(10000.0 - 50 * 99.98)
+        assert exchange.positions["AAPL"]["quantity"] == 50
+
+        sell = exchange.submit_order("AAPL", 60, "SELL", "MARKET")
+        assert sell["reason"] == "Insufficient Position"
+
+    def test_open_orders_count_against_buying_power(self):
+        exchange = PaperExchange(initial_cash=1000.0)
+        seed(exchange.engine)
+        assert exchange.submit_order("AAPL", 8, "BUY", "LIMIT", limit_price=99.0)["status"] == "OPEN"
+        assert exchange.submit_order("AAPL", 3, "BUY", "LIMIT", limit_price=99.0)["reason"] == "Insufficient Funds"
+
+    def test_market_path_respects_open_sell_orders(self):
+        exchange = PaperExchange(initial_cash=0.0)
+        exchange.positions["X"] = {"quantity": 5, "avg_price": 100.0}
+        assert exchange.submit_order("X", 5, "SELL", "LIMIT", limit_price=101.0)["status"] == "OPEN"
+
+        assert exchange.submit_market_order("X", 5, "SELL", 100.0)["reason"] == "Insufficient Position"
+        exchange.on_trade("X", 101.0, 10.0, 1.0, aggressor="BUY")
+        assert exchange.cash == pytest.approx(505.0) and "X" not in exchange.positions
+
+    def test_oversold_fill_keeps_account_consistent(self):
+        exchange = PaperExchange(initial_cash=0.0)
+        exchange.positions["X"] = {"quantity": 5, "avg_price": 100.0}
+        exchange.submit_order("X", 5, "SELL", "LIMIT", limit_price=101.0)
+        del exchange.positions["X"]  # position changed outside the exchange
+        exchange.on_trade("X", 101.0, 10.0, 1.0, aggressor="BUY")
+        assert exchange.cash == pytest.approx(505.0) and "X" not in exchange.positions
+
+    def test_market_buy_reserves_the_walked_price(self):
+        exchange = PaperExchange(initial_cash=25_003.0)
+        seed(exchange.engine)
+        # 250 @ best ask 100.01 = 25,002.5, but walking the book costs 25,004.5
+        assert exchange.engine.sweep_price("AAPL", "BUY", 250) == pytest.approx(25_004.5 / 250)
+        assert exchange.submit_order("AAPL", 250, "BUY", "MARKET")["reason"] == "Insufficient Funds"
+        assert exchange.submit_order("AAPL", 200, "BUY", "MARKET")["status"] == "FILLED"
+        assert exchange.cash >= 0
@@ -0,0 +1,133 @@
+import os
+import numpy as np
+import pytest
+from services.execution.algo_execution import AlgoEngine
+from services.execution.volume_curves import (
+    SESSION_MINUTES, VolumeCurves, build_volume_curves, profile_to_curve,
+)
+
+
+def minute_bars(symbol_shapes, n_days=5, scale=1000.0):
+    """Columns for n_days of every session minute, volume = scale * shape(minute) * (day + 1)."""
+    symbols, days, minutes, volumes = [], [], [], []
+    grid = np.arange(SESSION_MINUTES)
+    for symbol, shape in symbol_shapes.items():
+        for day in range(n_days):
+            symbols += [symbol] * SESSION_MINUTES
+            days += [738000 + day] * SESSION_MINUTES
+            minutes += grid.tolist()
+            volumes += (scale * shape(grid) * (day + 1)).tolist()
+    return symbols, days, minutes, volumes
+
+
+U_SHAPE = lambda m: 1.0 + ((m - 195) / 195.0) ** 2 * 3
+FLAT = lambda m: np.ones_like(m, dtype=float)
+
+
+@pytest.fixture
+def engine():
+    curves = build_volume_curves(*minute_bars({"AAPL": U_SHAPE, "FLAT": FLAT}), shrinkage_days=0)
+    return AlgoEngine(curves=curves)
+
+
+class TestVolumeCurves:
+
+    def test_build_normalizes_each_day_and_tracks_adv(self):
+        curves = build_volume_curves(*minute_bars({"AAPL": U_SHAPE}), shrinkage_days=0)
+        row = curves.curves[0]
+        assert row.sum() == pytest.approx(1.0, rel=1e-5)
+        expected = U_SHAPE(np.arange(SESSION_MINUTES))
+        np.testing.assert_allclose(row, expected / expected.sum(), rtol=1e-4)
+        day_total = 1000.0 * expected.sum()
+        assert curves.adv[0] == pytest.approx(day_total * 3)  # mean of 1x..5x
+
+    def test_sparse_symbols_shrink_toward_average(self):
+        cols = minute_bars({"AAPL": U_SHAPE, "FLAT": FLAT}, n_days=1)
+        cols[2][0] = -5  # pre-market row is ignored
+        curves = build_volume_curves(*cols, shrinkage_days=1.0)
+        flat = curves.curves[curves.symbols.index("FLAT")]
+        assert flat[10] > flat[195]  # pulled halfway to the U-shaped average
+        assert flat.sum() == pytest.approx(1.0, rel=1e-5)
+
+    def test_save_load_roundtrip_and_unknown_symbols(self, tmp_path):
+        curves = build_volume_curves(*minute_bars({"AAPL": U_SHAPE}))
+        path = str(tmp_path / "curves.npz")
+        curves.save(path)
+        loaded = VolumeCurves.load(path, fallback=profile_to_curve([1.0]))
+        assert loaded.symbols == ["AAPL"] and loaded.curves.dtype == np.float32
+        rows, adv, found = loaded.rows(["AAPL", "ZZZ"])
+        assert found.tolist() == [True, False] and adv[1] == 0.0
+        np.testing.assert_allclose(rows[1], 1.0 / SESSION_MINUTES)
+
+    def test_profile_to_curve_keeps_bucket_shares(self):
+        curve = profile_to_curve([0.15, 0.10, 0.08, 0.07, 0.06, 0.06, 0.07, 0.08, 0.13, 0.20])
+        assert curve.size == SESSION_MINUTES
+        assert curve[:39].sum() == pytest.approx(0.15)
+
+
+class TestBasketScheduler:
+
+    def test_vwap_follows_curve_and_sums_exactly(self, engine):
+        schedule = engine.schedule_basket(["AAPL", "FLAT", "NEW"], [10_001, 999, 500], slices=13)
+        assert schedule.child_quantities.sum(axis=1).tolist() == [10_001, 999, 500]
+        aapl = schedule.child_quantities[0]
+        assert aapl[0] > aapl[6] < aapl[-1]  # U shape
+        assert np.ptp(schedule.child_quantities[1]) <= 1
+        # exact proportional split within one share
+        assert np.abs(aapl - 10_001 * schedule.weights[0]).max() < 1.0
+
+    def test_per_order_windows_and_twap(self, engine):
+        schedule = engine.schedule_basket(["AAPL", "AAPL"], [300, 300], [0, 300], [60, 390], slices=3)
+        assert schedule.boundaries.tolist() == [[0, 20, 40, 60], [300, 330, 360, 390]]
+        assert schedule.child_quantities[0][0] > schedule.child_quantities[0][-1]
+        twap = engine.schedule_basket(["AAPL"], [100], 0, 390, slices=3, strategy="TWAP")
+        assert twap.child_quantities[0].tolist() == [33, 34, 33]
+        with pytest.raises(ValueError):
+            engine.schedule_basket(["AAPL"], [100], 60, 60)
+
+    def test_symbol_vwap_schedule_uses_curve(self, engine):
+        assert engine.generate_vwap_schedule(1000, [0.1, 0.9]) == [100, 900]
+        schedule = engine.generate_vwap_schedule(1000, symbol="FLAT", slices=5)
+        assert sum(schedule) == 1000 and max(schedule) - min(schedule) <= 1
+
+    def test_replan_tilts_remaining_quantity_by_volume_surprise(self, engine):
+        schedule = engine.schedule_basket(["FLAT"] * 3, [1000] * 3, slices=6)
+        expected = schedule.adv[0] * 130 / SESSION_MINUTES
+        replanned = engine.replan_basket(schedule, 130, [300, 300, 300],
+                                         [expected, 3 * expected, expected / 3])
+        kids = replanned.child_quantities
+        assert kids.sum(axis=1).tolist() == [700, 700, 700]
+        assert kids[:, :2].sum() == 0  # slices before minute 130 are over
+        assert np.ptp(kids[0, 2:]) <= 1
+        assert kids[1, 2] > kids[1, -1] and kids[2, 2] < kids[2, -1]
+
+    def test_replan_after_window_puts_remainder_last(self, engine):
+        schedule = engine.schedule_basket(["AAPL"], [100], 0, 60, slices=2)
+        replanned = engine.replan_basket(schedule, 200, [40], [0])
+        assert replanned.child_quantities[0].tolist() == [0, 60]
+
+
+class TestSharedCurves:
+
+    def test_engine_sees_rebuilt_curves(self, tmp_path, monkeypatch):
+        from services.execution import volume_curves
+
+        path = str(tmp_path / "curves.npz")
+        monkeypatch.setattr(volume_curves, "_curves", None)
+        monkeypatch.setattr(volume_curves, "_curves_stamp", None)
+        monkeypatch.setattr(volume_curves, "DEFAULT_CURVE_PATH", path)
+        engine = AlgoEngine()
+        u_shape = engine.generate_vwap_schedule(1000, symbol="FLAT", slices=5)
+        assert u_shape[0] > u_shape[2]  # no file yet: default U-shape
+
+        build_volume_curves(*minute_bars({"FLAT": FLAT})).save(path)
+        flat = engine.generate_vwap_schedule(1000, symbol="FLAT", slices=5)
+        assert max(flat) - min(flat) <= 1
+
+        build_volume_curves(*minute_bars({"FLAT": U_SHAPE})).save(path)
+        os.utime(path, (1, 1))  # force a new mtime within the same second
+        assert engine.generate_vwap_schedule(1000, symbol="FLAT", slices=5)[0] > flat[0]
+
+    def test_unknown_symbols_use_default_profile(self, engine):
+        schedule = engine.schedule_basket(["NEW"], [1000], slices=10)
+        assert schedule.child_quantities[0].tolist() == engine.generate_vwap_schedule(1000)
@@ -14,6 +14,8 @@ import time
 import asyncio
 from decimal import Decimal
 from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
 
 # Import Phase 1 modules
 from services.auth.sovereign_auth_service import sovereign_auth_service
@@ -28,6 +30,32 @@ from schemas.sovereign_ledger import (
 from agents.orchestrator import get_orchestrator_agents
 
 
+class RecordingDriver:
+    """Stand-in Neo4j driver that records the rows of every UNWIND write."""
+
+    def __init__(self):
+        self.rows = []
+
+    def session(self, **kwargs):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute_write(self, fn, *args):
+        fn(self, *args)
+
+    def run(self, query, rows):
+        self.rows.extend(rows)
+        return self
+
+    def consume(self):
+        return None
+
+
 class TestSovereignKernelE2E:
     """End-to-end tests for the Phase 1 Sovereign Kernel."""
 
@@ -116,6 +144,8 @@ class TestSovereignKernelE2E:
         - PG commit triggers Neo4j update in < 100ms
         """
         sync_service = get_graph_ledger_sync_service()
+        driver = RecordingDriver()
+        lags_before = len(sync_service._writer.recent_lags())
         
         journal_data = {
             "id": "e2e-sync-test-001",
@@ -128,11 +158,18 @@ class TestSovereignKernelE2E:
             "created_by_agent": "guardian.6.1",
         }
         
-        result = await sync_service.sync_journal_entry_to_graph(journal_data)
+        with patch("services.neo4j.graph_ledger_sync.get_neo4j", return_value=SimpleNamespace(driver=driver)):
+            result = await sync_service.sync_journal_entry_to_graph(journal_data)
+            sync_service.flush()
         
         assert result["status"] == "synced"
-        assert result["latency_ms"] < 100.0, f"Sync took {result['latency_ms']:.2f}ms, target <100ms"
-        assert result["meets_sla"] is True
+        assert result["enqueue_ms"] < 100.0, f"Enqueue took {result['enqueue_ms']:.2f}ms, target <100ms"
+        # The upserts reached the driver and the commit-to-graph lag was measured
+        assert any(row.get("id") == "e2e-sync-test-001" for row in driver.rows)
+        lags = sync_service._writer.recent_lags()
+        assert len(lags) > lags_before
+        assert lags[-1] * 1000 < 100.0, f"Graph lag {lags[-1] * 1000:.2f}ms, target <100ms"
+        assert sync_service.get_sync_metrics()["max_latency_ms"] > 0.0
 
     @pytest.mark.asyncio
     async def test_e2e_graph_ledger_integrity_verification(self) -> None:
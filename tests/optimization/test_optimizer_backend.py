@@ -0,0 +1,177 @@
+"""
+Tests for the analytic optimizer backend
+"""
+
+import pytest
+import numpy as np
+from unittest.mock import AsyncMock, patch
+from scipy.optimize import check_grad, minimize
+
+from services.optimization.optimizer_backend import (
+    OptimizerBackend,
+    _spinu_ccd,
+    efficient_frontier,
+    maximum_return,
+    maximum_sharpe,
+    minimum_variance,
+    neg_sharpe_and_grad,
+    risk_parity,
+    variance_and_grad,
+    volatility_and_grad,
+)
+from services.optimization.portfolio_optimizer_service import PortfolioOptimizerService
+
+
+def _universe(n, seed=3):
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0.0, 0.15, (n, 4))
+    cov = loadings @ loadings.T + np.diag(rng.uniform(0.1, 0.4, n) ** 2)
+    mu = 0.04 + loadings @ np.array([0.05, 0.02, 0.01, 0.03]) + rng.normal(0.02, 0.03, n)
+    return mu, cov
+
+
+def _reference(fun, n, extra=()):
+    result = minimize(
+        fun, np.ones(n) / n, method="SLSQP", bounds=[(0.0, 1.0)] * n,
+        constraints=[{"type": "eq", "fun": lambda w: w.sum() - 1.0}, *extra],
+        options={"maxiter": 1000, "ftol": 1e-14},
+    )
+    return result.x
+
+
+def test_gradients_match_finite_differences():
+    mu, cov = _universe(12)
+    w = np.random.default_rng(0).dirichlet(np.ones(12))
+    for fg in (
+        lambda x: variance_and_grad(x, cov),
+        lambda x: volatility_and_grad(x, cov),
+        lambda x: neg_sharpe_and_grad(x, mu, cov, 0.02),
+    ):
+        assert check_grad(lambda x: fg(x)[0], lambda x: fg(x)[1], w) < 1e-6
+
+
+def test_minimum_variance_is_exact_long_only_optimum():
+    mu, cov = _universe(25)
+    solution = minimum_variance(cov)
+    w = solution.weights
+    assert solution.method == "active_set" and solution.converged
+    assert w.min() >= 0 and w.sum() == pytest.approx(1.0)
+    # KKT: equal marginal variance on held assets, no cheaper asset left out
+    marginal = cov @ w
+    held = w > 0
+    assert np.ptp(marginal[held]) < 1e-12
+    assert marginal[~held].min() >= marginal[held].max() - 1e-12
+    reference = _reference(lambda x: x @ cov @ x, 25)
+    assert w @ cov @ w <= reference @ cov @ reference + 1e-12
+
+
+def test_maximum_sharpe_matches_slsqp():
+    mu, cov = _universe(20)
+    solution = maximum_sharpe(mu, cov, rf=0.02)
+    reference = _reference(lambda x: neg_sharpe_and_grad(x, mu, cov, 0.02)[0], 20)
+    assert solution.method == "active_set"
+    assert np.abs(solution.weights - reference).max() < 1e-3
+    assert -neg_sharpe_and_grad(solution.weights, mu, cov, 0.02)[0] >= \
+        -neg_sharpe_and_grad(reference, mu, cov, 0.02)[0] - 1e-9
+
+
+def test_maximum_sharpe_without_positive_excess_falls_back():
+    mu, cov = _universe(6)
+    solution = maximum_sharpe(mu - 1.0, cov, rf=0.0)
+    assert solution.method == "slsqp"
+    assert solution.weights.sum() == pytest.approx(1.0)
+
+
+def test_maximum_return_is_best_asset():
+    weights = maximum_return([0.05, 0.12, 0.08]).weights
+    np.testing.assert_array_equal(weights, [0.0, 1.0, 0.0])
+
+
+def test_risk_parity_equalizes_contributions_and_respects_budgets():
+    _, cov = _universe(30)
+    solution = risk_parity(cov)
+    contributions = solution.weights * (cov @ solution.weights)
+    assert solution.method == "newton" and solution.converged
+    assert contributions.max() / contributions.min() - 1 < 1e-7
+
+    budgets = np.linspace(1, 3, 30)
+    weights = risk_parity(cov, budgets).weights
+    shares = weights * (cov @ weights) / (weights @ cov @ weights)
+    np.testing.assert_allclose(shares, budgets / budgets.sum(), rtol=1e-7)
+
+
+def test_risk_parity_handles_indefinite_covariance():
+    # The service's placeholder covariance is not positive semi-definite
+    rng = np.random.default_rng(42)
+    base = rng.random((4, 4))
+    cov = (base + base.T) / 2
+    np.fill_diagonal(cov, 0.04)
+    solution = risk_parity(cov)
+    contributions = solution.weights * (cov @ solution.weights)
+    assert solution.converged
+    assert contributions.max() / contributions.min() - 1 < 1e-6
+
+
+def test_coordinate_descent_matches_newton():
+    _, cov = _universe(15)
+    budgets = np.full(15, 1.0 / 15)
+    y, sweeps, converged = _spinu_ccd(cov, budgets, np.ones(15), 1e-10, 5000)
+    assert converged and sweeps > 1
+    np.testing.assert_allclose(y / y.sum(), risk_parity(cov, tol=1e-10).weights, rtol=1e-8)
+
+
+def test_efficient_frontier_is_monotone_and_reuses_factors():
+    mu, cov = _universe(40)
+    frontier = efficient_frontier(mu, cov, n_points=15, rf=0.02)
+    assert np.all(np.diff(frontier["returns"]) > 0)
+    assert np.all(np.diff(frontier["risks"]) >= -1e-12)
+    np.testing.assert_allclose(frontier["returns"], frontier["target_returns"], atol=1e-10)
+    np.testing.assert_allclose(frontier["weights"][0], minimum_variance(cov).weights, atol=1e-12)
+    assert frontier["weights"][-1][np.argmax(mu)] == 1.0
+    assert frontier["factor_reuses"] > 0
+
+
+def test_backend_warm_start_reuses_previous_solution():
+    mu, cov = _universe(60)
+    backend = OptimizerBackend()
+    cold = backend.mean_variance(mu, cov, "maximize_sharpe", 0.02, key="p1")
+    warm = backend.mean_variance(mu * 1.001, cov, "maximize_sharpe", 0.02, key="p1")
+    assert warm.iterations == 1 < cold.iterations
+    # A resized universe ignores the stale start instead of failing
+    resized = backend.mean_variance(mu[:30], cov[:30, :30], "maximize_sharpe", 0.02, key="p1")
+    assert resized.weights.shape == (30,)
+
+    backend.clear_warm_starts()
+    assert backend.mean_variance(mu, cov, "maximize_sharpe", 0.02, key="p1").iterations == cold.iterations
+
+
+def test_backend_rejects_unknown_objective():
+    mu, cov = _universe(5)
+    with pytest.raises(ValueError, match="Unknown objective"):
+        OptimizerBackend().mean_variance(mu, cov, "maximize_alpha")
+
+
+@pytest.fixture
+def service():
+    with patch('services.optimization.portfolio_optimizer_service.get_portfolio_aggregator'), \
+         patch('services.optimization.portfolio_optimizer_service.get_cache_service'):
+        return PortfolioOptimizerService()
+
+
+@pytest.mark.asyncio
+async def test_service_methods_use_backend(service):
+    mu, cov = _universe(8)
+    weights = await service._mean_variance_optimize(mu, cov, "maximize_sharpe", None, warm_start_key="p1")
+    np.testing.assert_allclose(weights, maximum_sharpe(mu, cov, service.risk_free_rate).weights)
+    np.testing.assert_allclose(await service._minimum_variance_optimize(cov, None), minimum_variance(cov).weights)
+    np.testing.assert_allclose(await service._risk_parity_optimize(cov, None), risk_parity(cov).weights)
+
+
+@pytest.mark.asyncio
+async def test_service_efficient_frontier(service):
+    mu, cov = _universe(3)
+    service._get_expected_returns = AsyncMock(return_value=mu)
+    service._get_covariance_matrix = AsyncMock(return_value=cov)
+    frontier = await service.efficient_frontier("p1", n_points=5)
+    assert len(frontier['returns']) == len(frontier['weights']) == 5
+    assert set(frontier['weights'][0]) == {'AAPL', 'MSFT', 'JPM'}
@@ -46,13 +46,13 @@ def mock_strategy():
 @pytest.mark.asyncio
 async def test_calculate_greeks(service, mock_strategy):
     """Test Greeks calculation."""
-    service._calculate_leg_greeks = AsyncMock(return_value=Greeks(
+    service._calculate_legs_greeks = AsyncMock(return_value=[Greeks(
         delta=0.5,
         gamma=0.02,
         theta=-0.05,
         vega=0.15,
         rho=0.01
-    ))
+    )])
     
     result = await service.calculate_greeks(
         strategy=mock_strategy,
@@ -136,7 +136,7 @@ async def test_calculate_greeks_multiple_legs(service):
         max_loss=-200.0
     )
     
-    service._calculate_leg_greeks = AsyncMock(side_effect=[
+    service._calculate_legs_greeks = AsyncMock(return_value=[
         Greeks(delta=0.5, gamma=0.02, theta=-0.05, vega=0.15, rho=0.01),
         Greeks(delta=0.3, gamma=0.01, theta=-0.03, vega=0.10, rho=0.005),
     ])
@@ -154,7 +154,7 @@ async def test_calculate_greeks_multiple_legs(service):
 @pytest.mark.asyncio
 async def test_calculate_greeks_error_handling(service, mock_strategy):
     """Test error handling in Greeks calculation."""
-    service._calculate_leg_greeks = AsyncMock(side_effect=Exception("Calculation error"))
+    service._calculate_legs_greeks = AsyncMock(side_effect=Exception("Calculation error"))
     
     with pytest.raises(Exception):
         await service.calculate_greeks(
@@ -162,3 +162,19 @@ async def test_calculate_greeks_error_handling(service, mock_strategy):
             underlying_price=145.0,
             days_to_expiration=30
         )
+
+
+@pytest.mark.asyncio
+async def test_batched_leg_greeks_match_single_leg(service, mock_strategy):
+    """Batched leg Greeks agree with the single-leg path, including expiry."""
+    leg = mock_strategy.legs[0]
+    put_leg = leg.model_copy(update={"option_type": OptionType.PUT, "strike": 155.0})
+
+    batch = await service._calculate_legs_greeks([leg, put_leg], 145.0, 30, 0.20)
+    single = await service._calculate_leg_greeks(put_leg, 145.0, 30, 0.20)
+    expired = await service._calculate_legs_greeks([leg, put_leg], 145.0, 0, 0.20)
+
+    assert batch[1] == single
+    assert 0 < batch[0].delta < 1 and -1 < batch[1].delta < 0
+    assert [g.delta for g in expired] == [0.0, -1.0]
+    assert expired[0].gamma == 0.0
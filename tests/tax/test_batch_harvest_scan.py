@@ -0,0 +1,126 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from services.tax.batch_harvest_scan import (
+    HarvestScanConfig,
+    LotColumns,
+    run_batch_harvest_scan,
+    scan_lot_columns,
+)
+
+AS_OF = date(2026, 3, 2)
+
+
+def synthetic_lots(account_ids, as_of):
+    """Deterministic lots per account (module level so spawned workers can load it)."""
+    rows = []
+    for account in account_ids:
+        rng = np.random.default_rng(int(account.split("-")[1]))
+        for j in range(20):
+            rows.append((
+                account, f"{account}:{j}", f"S{rng.integers(0, 8)}", float(rng.integers(10, 200)),
+                float(rng.uniform(20, 200)), float(rng.uniform(20, 200)),
+                as_of - timedelta(days=int(rng.integers(0, 900))),
+            ))
+    return LotColumns.from_rows(account_ids, rows)
+
+
+def _reference(lots, config):
+    """Lot-by-lot version of the scan's scoring and per-account greedy cut."""
+    today = AS_OF.toordinal()
+    picked = {}
+    for a in range(len(lots.account_ids)):
+        rows = []
+        for i in np.flatnonzero(lots.account == a):
+            value = lots.quantity[i] * lots.price[i]
+            basis = lots.quantity[i] * lots.cost_per_share[i]
+            loss = max(basis - value, 0.0)
+            long_term = today - lots.acquired[i] > 365
+            net = loss * (config.long_term_rate if long_term else config.short_term_rate) - value * 0.002
+            wash = any(
+                k != i and lots.symbols[k] == lots.symbols[i] and 0 <= today - lots.acquired[k] <= 30
+                for k in np.flatnonzero(lots.account == a)
+            )
+            if loss > 0 and (loss >= 500 or loss / basis >= 0.05) and net > 0 and not wash:
+                rows.append((-net / value, lots.lot_ids[i], value))
+        spent, chosen = 0.0, []
+        for _, lot_id, value in sorted(rows):
+            if config.turnover_budget is not None and spent + value > config.turnover_budget:
+                continue
+            spent += value
+            chosen.append(lot_id)
+        picked[lots.account_ids[a]] = chosen
+    return picked
+
+
+@pytest.mark.parametrize("budget", [None, 5000.0, 20000.0])
+def test_scan_matches_lot_by_lot_reference(budget):
+    accounts = [f"acct-{i}" for i in range(30)]
+    lots = synthetic_lots(accounts, AS_OF)
+    config = HarvestScanConfig(turnover_budget=budget)
+    result = scan_lot_columns(lots, AS_OF, config)
+    expected = _reference(lots, config)
+    for account in accounts:
+        assert [r["lot_id"] for r in result.for_account(account)] == expected[account]
+        rows = result.for_account(account)
+        if budget is not None:
+            assert sum(r["sale_value"] for r in rows) <= budget
+    assert result.account_tax_savings.sum() == pytest.approx(result.tax_savings.sum())
+    assert result.stats["lots_scanned"] == 600
+
+
+def test_recent_buy_of_same_symbol_blocks_loss_lot():
+    lots = LotColumns.from_rows(["a"], [
+        ("a", "old", "XYZ", 100.0, 50.0, 30.0, AS_OF - timedelta(days=400)),
+        ("a", "new", "XYZ", 10.0, 31.0, 30.0, AS_OF - timedelta(days=10)),
+        ("a", "other", "ABC", 100.0, 50.0, 30.0, AS_OF - timedelta(days=400)),
+    ])
+    result = scan_lot_columns(lots, AS_OF)
+    assert list(result.lot_ids) == ["other"]
+    assert result.stats["wash_blocked"] == 1
+    assert bool(result.is_long_term[0])
+    assert result.tax_savings[0] == pytest.approx(2000.0 * 0.15)
+
+
+def test_sharded_workers_match_single_pass():
+    accounts = [f"acct-{i}" for i in range(40)]
+    single = scan_lot_columns(synthetic_lots(accounts, AS_OF), AS_OF)
+    sharded = run_batch_harvest_scan(accounts, AS_OF, workers=2, shard_size=15, loader=synthetic_lots)
+    assert sharded.stats["shards"] == 3 and sharded.account_ids == accounts
+    np.testing.assert_array_equal(sharded.lot_ids, single.lot_ids)
+    np.testing.assert_array_equal(sharded.account, single.account)
+    np.testing.assert_allclose(sharded.account_net_benefit, single.account_net_benefit)
+
+
+def test_oversized_top_lot_is_skipped_not_a_cutoff():
+    lots = LotColumns.from_rows(["a"], [
+        ("a", "big", "XYZ", 1000.0, 50.0, 30.0, AS_OF - timedelta(days=400)),  # best ratio, $30k sale
+        ("a", "mid", "ABC", 100.0, 50.0, 35.0, AS_OF - timedelta(days=400)),
+        ("a", "small", "DEF", 50.0, 50.0, 40.0, AS_OF - timedelta(days=400)),
+    ])
+    result = scan_lot_columns(lots, AS_OF, HarvestScanConfig(turnover_budget=6000.0))
+    assert list(result.lot_ids) == ["mid", "small"]
+    assert result.rank.tolist() == [1, 2]
+    assert result.account_sale_value[0] == pytest.approx(5500.0)
+
+
+def test_identical_groups_and_households_block_wash_sales():
+    rows = [
+        ("ira", "old", "GOOGL", 100.0, 50.0, 30.0, AS_OF - timedelta(days=400)),
+        ("taxable", "new", "GOOG", 10.0, 31.0, 30.0, AS_OF - timedelta(days=10)),
+    ]
+    lots = LotColumns.from_rows(["ira", "taxable"], rows)
+    assert list(scan_lot_columns(lots, AS_OF).lot_ids) == ["old"]
+
+    config = HarvestScanConfig(identical_groups={"GOOG": "GOOGL"}, households={"ira": "h1", "taxable": "h1"})
+    result = scan_lot_columns(lots, AS_OF, config)
+    assert result.lot_ids.size == 0 and result.stats["wash_blocked"] == 1
+
+
+def test_shards_keep_households_together():
+    accounts = [f"acct-{i}" for i in range(6)]
+    config = HarvestScanConfig(households={"acct-0": "h", "acct-5": "h"})
+    result = run_batch_harvest_scan(accounts, AS_OF, config, shard_size=2, loader=synthetic_lots)
+    assert result.account_ids[:2] == ["acct-0", "acct-5"] and sorted(result.account_ids) == accounts
@@ -24,6 +24,24 @@ class TestTaxHarvestService:
         assert result.violates_wash_sale is True
         assert len(result.blocking_trades) == 1
 
+    @pytest.mark.asyncio
+    async def test_replaced_trade_history_is_reindexed(self):
+        service = TaxHarvestService()
+        key = "u1:TEST_REPLACE"
+        recent = (datetime.now(timezone.utc) - timedelta(days=5)).isoformat()
+        old = (datetime.now(timezone.utc) - timedelta(days=90)).isoformat()
+        service._trade_history[key] = [{"date": recent, "action": "BUY", "amount": 1}]
+        assert (await service.check_wash_sale_violation("TEST_REPLACE", "u1")).violates_wash_sale
+
+        # Same length, different list: the old index must not be reused
+        service._trade_history[key] = [{"date": old, "action": "BUY", "amount": 1}]
+        assert not (await service.check_wash_sale_violation("TEST_REPLACE", "u1")).violates_wash_sale
+
+        # Truncated in place, then a new buy appended (same length again)
+        service._trade_history[key].clear()
+        service.record_trade("u1", "TEST_REPLACE", "BUY", datetime.now(timezone.utc) - timedelta(days=2))
+        assert (await service.check_wash_sale_violation("TEST_REPLACE", "u1")).violates_wash_sale
+
     @pytest.mark.asyncio
     async def test_harvest_candidate_identification(self):
         service = TaxHarvestService()
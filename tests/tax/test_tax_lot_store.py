@@ -0,0 +1,120 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from services.tax.loss_harvester import LossHarvester
+from services.tax.tax_lot_store import LotMethod, TaxLotStore
+from services.tax.wash_sale_protector import WashSaleProtector
+
+D0 = date(2025, 1, 2)
+
+
+def _store():
+    store = TaxLotStore()
+    store.add_lot("AAPL", 10, 100.0, D0, "a1")
+    store.add_lot("AAPL", 10, 150.0, D0 + timedelta(days=100), "a2")
+    store.add_lot("AAPL", 10, 120.0, D0 + timedelta(days=200), "a3")
+    return store
+
+
+@pytest.mark.parametrize("method, lot_ids, expected", [
+    (LotMethod.FIFO, None, ["a1", "a2"]),
+    (LotMethod.LIFO, None, ["a3", "a2"]),
+    (LotMethod.HIFO, None, ["a2", "a3"]),
+    (LotMethod.SPECIFIC_ID, ["a3", "a1"], ["a3", "a1"]),
+])
+def test_relief_order(method, lot_ids, expected):
+    store = _store()
+    reliefs = store.sell("AAPL", 15, 130.0, D0 + timedelta(days=400), method, lot_ids)
+    assert [r.lot_id for r in reliefs] == expected
+    assert [r.quantity for r in reliefs] == [10, 5]
+    assert sum(l.quantity for l in store.open_lots("AAPL")) == 15
+    with pytest.raises(ValueError):
+        store.sell("AAPL", 16, 130.0, D0 + timedelta(days=400))
+
+
+def test_wash_sale_loss_moves_into_replacement_basis():
+    store = TaxLotStore(identical_groups={"GOOG": "GOOGL"})
+    store.add_lot("GOOGL", 10, 200.0, D0, "old")
+    sale_day = D0 + timedelta(days=100)
+    # Replacement bought 20 days before the sale in a substantially identical class
+    store.add_lot("GOOG", 4, 150.0, sale_day - timedelta(days=20), "rep")
+    (relief,) = store.sell("GOOGL", 10, 160.0, sale_day)
+    assert relief.gain == pytest.approx(-400.0)
+    assert relief.disallowed_loss == pytest.approx(160.0)  # 4 of 10 shares replaced
+    assert store.get_lot("rep").basis_per_share == pytest.approx(190.0)
+
+    # A buy after the sale absorbs the rest; one outside the window does not
+    late = store.add_lot("GOOGL", 10, 150.0, sale_day + timedelta(days=31))
+    later = store.add_lot("GOOGL", 10, 150.0, sale_day + timedelta(days=10))
+    assert late.adjustment_per_share == 0
+    # Only the 6 matched shares take the remaining $240; they split off
+    assert later.quantity == 4 and later.adjusted_basis == pytest.approx(600.0)
+    (piece,) = [l for l in store.open_lots("GOOGL") if l.lot_id.startswith(later.lot_id + ".")]
+    assert piece.quantity == 6 and piece.adjusted_basis == pytest.approx(900.0 + 240.0)
+    assert sum(l.adjusted_basis for l in store.open_lots("GOOGL")) == pytest.approx(1500.0 + 1500.0 + 240.0)
+
+
+def test_wash_sale_replacement_tacks_holding_period():
+    store = TaxLotStore()
+    store.add_lot("VTI", 10, 200.0, D0, "old")
+    sale_day = D0 + timedelta(days=300)
+    store.sell("VTI", 10, 150.0, sale_day)
+    rep = store.add_lot("VTI", 10, 150.0, sale_day + timedelta(days=5), "rep")
+    assert rep.holding_start == rep.acquired - timedelta(days=300)
+    # 70 days after the buy the tacked holding period is over a year
+    (relief,) = store.sell("VTI", 10, 200.0, rep.acquired + timedelta(days=70))
+    assert relief.is_long_term
+    assert relief.gain == pytest.approx(2000.0 - 2000.0)
+
+
+def test_what_if_sell_flags_wash_risk_and_terms():
+    store = _store()
+    store.add_lot("MSFT", 5, 400.0, D0, "m1")
+    sale_day = D0 + timedelta(days=210)
+    sale = store.what_if_sell({"AAPL": 110.0, "MSFT": 420.0}, sale_day)
+    by_id = dict(zip(sale.lot_ids, range(len(sale.lot_ids))))
+    np.testing.assert_allclose(sale.gain[[by_id["a1"], by_id["a2"], by_id["m1"]]], [100.0, -400.0, 100.0])
+    # a3 was bought 10 days ago, so selling a2 at a loss would be a wash sale
+    assert sale.wash_sale_risk[by_id["a2"]] and not sale.wash_sale_risk[by_id["m1"]]
+    # ...but a3 itself has no other purchase in its window
+    assert not sale.wash_sale_risk[by_id["a3"]]
+    assert not sale.is_long_term.any()
+    assert store.what_if_sell({"AAPL": 110.0}, D0 + timedelta(days=400), ["a1"]).is_long_term.all()
+
+
+def test_bulk_what_if_matches_lot_by_lot_relief():
+    rng = np.random.default_rng(3)
+    store = TaxLotStore()
+    for i in range(2000):
+        store.add_lot(f"S{i % 50}", rng.integers(1, 100), rng.uniform(10, 200), D0 + timedelta(days=int(rng.integers(0, 700))))
+    prices = {f"S{j}": rng.uniform(10, 200) for j in range(50)}
+    sale_day = D0 + timedelta(days=720)
+    sale = store.what_if_sell(prices, sale_day)
+    for i in rng.choice(len(sale.lot_ids), 50, replace=False):
+        lot = store.get_lot(sale.lot_ids[i])
+        assert sale.gain[i] == pytest.approx(lot.quantity * (prices[lot.symbol] - lot.basis_per_share))
+        others = [p for p in store.purchases_within(lot.symbol, sale_day) if p.lot_id != lot.lot_id]
+        assert sale.wash_sale_risk[i] == (sale.gain[i] < 0 and bool(others))
+
+
+def test_wash_sale_protector_uses_window_index():
+    protector = WashSaleProtector(identical_groups={"VOO": "SP500", "IVV": "SP500"})
+    protector.record_sale("VOO", date(2025, 3, 1))
+    assert not protector.can_buy("VOO", date(2025, 3, 31))
+    assert not protector.can_buy("IVV", date(2025, 1, 30))
+    assert protector.can_buy("VOO", date(2025, 4, 1))
+    assert protector.can_buy("VTI", date(2025, 3, 2))
+
+
+def test_loss_harvester_offsets_from_store():
+    store = _store()
+    store.add_lot("MSFT", 5, 400.0, D0, "m1")
+    harvester = LossHarvester(store)
+    prices = {"AAPL": 90.0, "MSFT": 300.0}
+    lots = harvester.find_offset_candidates(Decimal("1000"), prices, D0 + timedelta(days=400))
+    # a2 (-600) then m1 (-500) reach the target; a3 and a1 are not needed
+    assert [l["lot_id"] for l in lots] == ["a2", "m1"]
+    assert harvester.find_offset_candidates(Decimal("0"), prices, D0 + timedelta(days=400)) == []
@@ -0,0 +1,79 @@
+import json
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from services.infrastructure.cache_service import AgentResponseCache
+from services.infrastructure.response_store import SQLiteResponseStore
+
+
+def _writer(cache_dir, worker):
+    cache = AgentResponseCache(cache_dir)
+    for i in range(50):
+        cache.set(f"agent-{worker}", f"prompt {i}", f"response {worker}/{i}")
+    cache.store.close()
+
+
+def test_round_trip_compresses_and_counts_hits(tmp_path):
+    cache = AgentResponseCache(str(tmp_path))
+    long_response = "dividend " * 2000
+    cache.set("Risk", "why?", long_response, "sys")
+    assert cache.get("Risk", "why?", "sys") == long_response
+    assert cache.get("Risk", "why?", "other sys") is None
+    stats = cache.get_stats()
+    assert stats["key_count"] == 1 and stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == pytest.approx(0.5)
+    assert stats["memory_used_mb"] * 1024 * 1024 < len(long_response) / 10
+
+
+def test_ttl_expiry_and_size_bounded_lru_eviction(tmp_path):
+    store = SQLiteResponseStore(str(tmp_path / "r.sqlite3"), max_bytes=4000, compress_level=0)
+    store.set("gone", "a", {"response": "x"}, ttl=0)
+    assert store.get("gone") is None and store.stats()["expirations"] == 1
+    for i in range(6):
+        store.set(f"k{i}", "a", {"response": "y" * 900})
+        time.sleep(0.002)
+    stats = store.stats()
+    assert stats["bytes"] <= 4000 and stats["evictions"] >= 2
+    assert store.get("k5") is not None and store.get("k0") is None
+
+
+def test_invalidation_by_agent_and_glob(tmp_path):
+    cache = AgentResponseCache(str(tmp_path))
+    for agent in ("RiskAgent", "RiskSentry", "TaxAgent"):
+        for i in range(3):
+            cache.set(agent, f"p{i}", "r")
+    assert cache.invalidate_pattern("TaxAgent") == 3
+    assert cache.invalidate_pattern("Sentry") == 3  # plain strings match as substrings
+    assert cache.invalidate_pattern("Risk*") == 3
+    cache.set("TaxAgent", "p", "r")
+    assert cache.invalidate_pattern("*") == 1 and cache.get_stats()["key_count"] == 0
+
+
+def test_legacy_json_files_are_imported_once(tmp_path):
+    legacy = AgentResponseCache(str(tmp_path))
+    key = legacy._generate_key("Old", "prompt", None)
+    legacy.store.close()
+    os.remove(tmp_path / AgentResponseCache.DB_FILENAME)
+    with open(tmp_path / f"{key}.json", "w") as f:
+        json.dump({"agent_id": "Old", "prompt": "prompt", "system_message": None,
+                   "response": "legacy", "cached_at": "2099-01-01T00:00:00"}, f)
+    cache = AgentResponseCache(str(tmp_path))
+    assert cache.get("Old", "prompt") == "legacy"
+    cache.invalidate_pattern("Old")
+    assert AgentResponseCache(str(tmp_path)).get("Old", "prompt") is None
+
+
+def test_processes_share_one_store(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_writer, args=(str(tmp_path), w)) for w in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+        assert p.exitcode == 0
+    cache = AgentResponseCache(str(tmp_path))
+    assert cache.get_stats()["key_count"] == 150
+    assert cache.get("agent-2", "prompt 49") == "response 2/49"
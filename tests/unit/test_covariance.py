@@ -0,0 +1,140 @@
+import json
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from services.quantitative.covariance import (
+    CovarianceEstimate,
+    EWMACovariance,
+    estimate_covariance,
+    ledoit_wolf_covariance,
+    pca_covariance,
+    sample_covariance,
+)
+from services.risk.covariance_service import CovarianceService
+
+
+def _returns(n_obs=120, n_assets=8, seed=1):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, (n_obs, 1))
+    return market * rng.uniform(0.5, 1.5, n_assets) + rng.normal(0, 0.01, (n_obs, n_assets))
+
+
+def test_sample_matches_numpy():
+    r = _returns()
+    np.testing.assert_allclose(sample_covariance(r).matrix, np.cov(r, rowvar=False))
+
+
+def test_ledoit_wolf_matches_direct_formula():
+    r = _returns(40, 30)
+    x = r - r.mean(axis=0)
+    n_obs, n = x.shape
+    s = x.T @ x / n_obs
+    m = np.trace(s) / n
+    d2 = np.sum((s - m * np.eye(n)) ** 2) / n
+    b2 = sum(np.sum((np.outer(row, row) - s) ** 2) for row in x) / n_obs ** 2 / n
+    delta = min(b2, d2) / d2
+
+    estimate = ledoit_wolf_covariance(r)
+    assert estimate.params["shrinkage"] == pytest.approx(delta)
+    np.testing.assert_allclose(estimate.matrix, delta * m * np.eye(n) + (1 - delta) * s)
+    # Well conditioned even with fewer observations than assets
+    assert np.linalg.eigvalsh(ledoit_wolf_covariance(r[:20]).matrix).min() > 0
+
+
+def test_pca_factor_model_is_compact_and_consistent():
+    r = _returns(250, 60)
+    estimate = pca_covariance(r, n_factors=3)
+    assert estimate.is_factor_model and estimate.loadings.shape == (60, 3)
+    np.testing.assert_allclose(estimate.variances(), np.diag(np.cov(r, rowvar=False)))
+    w = np.full(60, 1 / 60)
+    dense = estimate.to_dense()
+    np.testing.assert_allclose(estimate.matvec(w), dense @ w)
+    assert estimate.portfolio_variance(w) == pytest.approx(w @ dense @ w)
+    assert estimate.nbytes < dense.nbytes
+    assert pca_covariance(r[:3], n_factors=10).params["n_factors"] == 2
+
+
+def test_ewma_incremental_update_equals_full_pass():
+    r = _returns(100, 5)
+    full = EWMACovariance.from_returns(r, decay=0.9).estimate().matrix
+    rolled = EWMACovariance.from_returns(r[:97], decay=0.9).update(r[97]).update(r[98:])
+    np.testing.assert_allclose(rolled.estimate().matrix, full, rtol=1e-12)
+    assert rolled.n_obs == 100
+
+    weights = 0.9 ** np.arange(99, -1, -1)
+    expected = (r * weights[:, None]).T @ r / weights.sum()
+    np.testing.assert_allclose(full, expected)
+
+
+def test_estimate_round_trips_through_json_and_scales():
+    r = _returns()
+    for method in ("sample", "pca"):
+        estimate = estimate_covariance(r, method)
+        restored = CovarianceEstimate.from_dict(json.loads(json.dumps(estimate.to_dict())))
+        np.testing.assert_allclose(restored.to_dense(), estimate.to_dense())
+        np.testing.assert_allclose(estimate.scaled(252).to_dense(), estimate.to_dense() * 252)
+    with pytest.raises(ValueError, match="Unknown covariance method"):
+        estimate_covariance(r, "garch")
+
+
+@pytest.fixture
+def service():
+    store = {}
+    cache = MagicMock()
+    cache.get.side_effect = store.get
+    cache.set.side_effect = lambda key, value, ttl=None: store.__setitem__(key, value)
+    with patch("services.risk.covariance_service.get_cache_service", return_value=cache):
+        CovarianceService._instance = None
+        svc = CovarianceService()
+    yield svc
+    CovarianceService._instance = None
+
+
+SYMBOLS = ["AAPL", "MSFT", "JPM", "XOM"]
+
+
+def test_service_caches_in_memory_then_persisted(service):
+    as_of = date(2026, 6, 30)
+    first = service.get_covariance(SYMBOLS, 120, "pca", as_of, n_factors=2)
+    assert service.get_covariance(SYMBOLS, 120, "pca", as_of, n_factors=2) is first
+    service.clear()
+    restored = service.get_covariance(SYMBOLS, 120, "pca", as_of, n_factors=2)
+    np.testing.assert_allclose(restored.to_dense(), first.to_dense())
+    assert service.stats == {"hits": 1, "persisted_hits": 1, "misses": 1, "ewma_rolls": 0}
+    # Universe order, lookback, method, params and date are all part of the key
+    keys = {
+        service.cache_key(SYMBOLS, 120, "pca", as_of, {"n_factors": 2}),
+        service.cache_key(SYMBOLS[::-1], 120, "pca", as_of, {"n_factors": 2}),
+        service.cache_key(SYMBOLS, 60, "pca", as_of, {"n_factors": 2}),
+        service.cache_key(SYMBOLS, 120, "sample", as_of),
+        service.cache_key(SYMBOLS, 120, "pca", as_of, {"n_factors": 3}),
+        service.cache_key(SYMBOLS, 120, "pca", as_of + timedelta(days=1), {"n_factors": 2}),
+    }
+    assert len(keys) == 6
+
+
+def test_service_mock_returns_are_stable_across_windows(service):
+    as_of = date(2026, 6, 30)
+    long = service._load_returns(SYMBOLS, 30, as_of)
+    short = service._load_returns(SYMBOLS[1:], 10, as_of - timedelta(days=5))
+    np.testing.assert_array_equal(short, long[-15:-5, 1:])
+
+
+def test_service_rolls_ewma_forward_with_only_new_days(service):
+    as_of = date(2026, 6, 30)
+    service.get_covariance(SYMBOLS, 200, "ewma", as_of)
+    with patch.object(service, "_load_returns", wraps=service._load_returns) as loader:
+        rolled = service.get_covariance(SYMBOLS, 200, "ewma", as_of + timedelta(days=2))
+    loader.assert_called_once_with(SYMBOLS, 2, as_of + timedelta(days=2))
+    assert service.stats["ewma_rolls"] == 1 and rolled.n_obs == 202
+
+    history = service._load_returns(SYMBOLS, 202, as_of + timedelta(days=2))
+    np.testing.assert_allclose(rolled.matrix, EWMACovariance.from_returns(history).estimate().matrix, rtol=1e-12)
+
+
+def test_service_rejects_unknown_method(service):
+    with pytest.raises(ValueError, match="Unknown covariance method"):
+        service.get_covariance(SYMBOLS, method="garch")
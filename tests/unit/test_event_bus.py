@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.infrastructure.event_bus import EventBusService
+
+
+@pytest.fixture
+def bus():
+    EventBusService._instance = None
+    yield EventBusService()
+    EventBusService._instance = None
+
+
+def test_sync_mode_delivers_inline_and_keeps_bounded_history(bus):
+    bus._max_history = 3
+    seen = []
+    bus.subscribe("shock", seen.append)
+    for i in range(5):
+        bus.publish("shock", {"i": i})
+    assert seen == [{"i": i} for i in range(5)]
+    assert [m["payload"]["i"] for m in bus.get_recent_messages("shock")] == [4, 3, 2]
+    assert bus.get_recent_messages("shock", limit=1, offset=1)[0]["payload"] == {"i": 3}
+    assert bus.get_stats()["total_messages"] == 5
+
+
+async def test_slow_subscriber_does_not_stall_others(bus):
+    fast, slow = [], []
+    release = asyncio.Event()
+
+    async def slow_handler(payload):
+        await release.wait()
+        slow.append(payload)
+
+    bus.subscribe("shock", fast.append)
+    bus.subscribe("shock", slow_handler)
+    await bus.start()
+    for i in range(10):
+        bus.publish("shock", {"i": i})
+    for _ in range(100):
+        if len(fast) == 10:
+            break
+        await asyncio.sleep(0.01)
+    assert len(fast) == 10 and slow == []
+    release.set()
+    await bus.stop()
+    assert len(slow) == 10
+    stats = bus.get_stats()["topics"]["shock"]
+    assert stats["delivered"] == 20 and stats["queue_depth"] == 0 and stats["max_latency_ms"] > 0
+
+
+async def test_batch_delivery_and_overflow_policies(bus):
+    batches, latest, recent = [], [], []
+    gate = asyncio.Event()
+
+    async def batch_handler(payloads):
+        await gate.wait()
+        batches.append(payloads)
+
+    async def coalesced(payload):
+        await gate.wait()
+        latest.append(payload)
+
+    async def dropping(payload):
+        await gate.wait()
+        recent.append(payload["i"])
+
+    bus.subscribe("px", batch_handler, batch=True, max_batch=50)
+    bus.subscribe("px", coalesced, overflow="coalesce", key=lambda p: p["sym"])
+    bus.subscribe("px", dropping, max_queue=3, overflow="drop_oldest")
+    await bus.start()
+    await asyncio.sleep(0)
+    for i in range(20):
+        bus.publish("px", {"sym": "AAPL" if i % 2 else "MSFT", "i": i})
+    gate.set()
+    await bus.stop()
+
+    assert sum(len(b) for b in batches) == 20 and len(batches) <= 2
+    # first of each key was taken by the waiting worker; the rest collapse to the latest
+    assert [p["i"] for p in latest][-2:] == [18, 19]
+    assert recent[-3:] == [17, 18, 19]
+    stats = bus.get_stats()["topics"]["px"]
+    assert stats["dropped"] >= 16 and stats["coalesced"] >= 16
+
+
+async def test_block_policy_applies_backpressure(bus):
+    release = asyncio.Event()
+
+    async def handler(payload):
+        await release.wait()
+
+    bus.subscribe("orders", handler, max_queue=2)
+    await bus.start()
+    await bus.apublish("orders", {"i": 0})
+    await asyncio.sleep(0)  # worker takes the first event and waits
+    await bus.apublish("orders", {"i": 1})
+    await bus.apublish("orders", {"i": 2})
+    blocked = asyncio.ensure_future(bus.apublish("orders", {"i": 3}))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+    release.set()
+    await asyncio.wait_for(blocked, 1)
+
+    # Publishers on other threads block until their event is queued
+    done = threading.Event()
+    threading.Thread(target=lambda: (bus.publish("orders", {"i": 4}), done.set())).start()
+    for _ in range(100):
+        if done.is_set():
+            break
+        await asyncio.sleep(0.01)
+    assert done.is_set()
+    await bus.stop()
+    assert bus.get_stats()["topics"]["orders"]["delivered"] == 5
+
+
+async def test_loop_thread_overflow_keeps_order_and_stops_cleanly(bus):
+    seen = []
+    gate = asyncio.Event()
+
+    async def handler(payload):
+        await gate.wait()
+        seen.append(payload["i"])
+
+    bus.subscribe("fills", handler, max_queue=2)
+    await bus.start()
+    await asyncio.sleep(0)
+    for i in range(10):
+        bus.publish("fills", {"i": i})
+    assert bus.get_stats()["topics"]["fills"]["max_backlog"] > 0
+    gate.set()
+    await bus.stop()
+    assert seen == list(range(10))
+
+    # Not draining: parked events are dropped and waiting publishers released
+    gate.clear()
+    await bus.start()
+    await asyncio.sleep(0)
+    for i in range(5):
+        bus.publish("fills", {"i": i})
+    waiting = asyncio.ensure_future(bus.apublish("fills", {"i": 5}))
+    await asyncio.sleep(0)
+    await bus.stop(drain=False)
+    await asyncio.wait_for(waiting, 1)
+    assert bus.get_stats()["topics"]["fills"]["dropped"] >= 3
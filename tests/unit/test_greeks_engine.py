@@ -0,0 +1,95 @@
+"""
+Unit tests for the vectorized option-chain Greeks engine and array GEX.
+"""
+import numpy as np
+import pytest
+
+from services.options.gex_calculator import GEXCalculator
+from services.options.greeks_engine import GREEK_COLUMNS, GreeksEngine
+
+
+@pytest.fixture
+def engine() -> GreeksEngine:
+    return GreeksEngine()
+
+
+def test_chain_matches_scalar_engine(engine: GreeksEngine) -> None:
+    rng = np.random.default_rng(7)
+    n = 500
+    strikes = rng.uniform(60, 140, n)
+    expiries = rng.uniform(0.02, 2.0, n)
+    ivs = rng.uniform(0.1, 0.8, n)
+    is_call = rng.random(n) < 0.5
+
+    chain = engine.calculate_chain_greeks(100.0, strikes, expiries, ivs, is_call, r=0.05)
+
+    assert set(chain) == set(GREEK_COLUMNS)
+    for i in range(0, n, 37):
+        scalar = engine.calculate_bs_greeks(
+            100.0, strikes[i], expiries[i], 0.05, ivs[i], bool(is_call[i]), round_digits=None
+        )
+        for name, value in scalar.items():
+            assert chain[name][i] == pytest.approx(value, rel=1e-9, abs=1e-12)
+
+
+def test_put_call_parity_with_dividend_yield(engine: GreeksEngine) -> None:
+    strikes = np.array([80.0, 100.0, 120.0])
+    calls = engine.calculate_chain_greeks(100.0, strikes, 0.5, 0.3, True, r=0.04, q=0.02)
+    puts = engine.calculate_chain_greeks(100.0, strikes, 0.5, 0.3, False, r=0.04, q=0.02)
+
+    forward_gap = 100.0 * np.exp(-0.02 * 0.5) - strikes * np.exp(-0.04 * 0.5)
+    np.testing.assert_allclose(calls["price"] - puts["price"], forward_gap)
+    np.testing.assert_allclose(calls["gamma"], puts["gamma"])
+
+
+def test_degenerate_contracts_do_not_raise(engine: GreeksEngine) -> None:
+    chain = engine.calculate_chain_greeks(
+        100.0,
+        strikes=[90.0, 110.0, 100.0, 0.0, np.nan],
+        expiries=[0.0, -0.1, 0.5, 0.5, 0.5],
+        ivs=[0.2, 0.2, 0.0, 0.2, 0.2],
+        is_call=[True, False, True, True, True],
+    )
+
+    np.testing.assert_array_equal(chain["delta"], [1.0, -1.0, 0.0, 1.0, 0.0])
+    np.testing.assert_array_equal(chain["price"], [10.0, 10.0, 0.0, 100.0, 0.0])
+    assert not chain["gamma"].any()
+    assert all(np.isfinite(values).all() for values in chain.values())
+
+
+def test_rounding_is_opt_in(engine: GreeksEngine) -> None:
+    raw = engine.calculate_chain_greeks(100.0, [105.0], [0.25], [0.25], [True])
+    rounded = engine.calculate_chain_greeks(100.0, [105.0], [0.25], [0.25], [True], round_digits=4)
+
+    assert rounded["delta"][0] == round(raw["delta"][0], 4)
+    assert raw["delta"][0] != rounded["delta"][0]
+
+
+def test_array_gex_matches_contract_list() -> None:
+    rng = np.random.default_rng(3)
+    n = 200
+    strikes = rng.choice(np.arange(4800, 5200, 25), n).astype(float)
+    oi = rng.integers(0, 5000, n).astype(float)
+    is_call = rng.random(n) < 0.5
+    ivs = rng.uniform(0.1, 0.4, n)
+    expiries = rng.uniform(0.02, 0.5, n)
+    gamma = GreeksEngine().calculate_chain_greeks(5000.0, strikes, expiries, ivs, is_call)["gamma"]
+
+    chain = [
+        {"strike": k, "gamma": g, "open_interest": o, "type": "CALL" if c else "PUT"}
+        for k, g, o, c in zip(strikes, gamma, oi, is_call)
+    ]
+    expected = GEXCalculator.calculate_gex(5000.0, chain)
+    result = GEXCalculator.calculate_gex_arrays(
+        5000.0, strikes, oi, is_call, ivs=ivs, expiries=expiries
+    )
+
+    assert result["total_gex"] == pytest.approx(expected["total_gex"])
+    assert result["gamma_flip_price"] == expected["gamma_flip_price"]
+    assert result["market_regime"] == expected["market_regime"]
+
+
+def test_array_gex_requires_gamma_inputs() -> None:
+    with pytest.raises(ValueError):
+        GEXCalculator.calculate_gex_arrays(100.0, [100.0], [10.0], [True])
+    assert GEXCalculator.calculate_gex(100.0, [])["gamma_flip_price"] == 100.0
@@ -0,0 +1,149 @@
+"""
+Unit tests for the vectorized IndicatorEngine kernels and result cache.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.indicators.indicator_engine import BUILT_IN_INDICATORS, get_indicator_engine
+from services.indicators.kernels import KERNELS, IndicatorContext
+
+
+@pytest.fixture
+def bars() -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    n = 300
+    close = 50 * np.cumprod(1 + rng.normal(0, 0.02, n))
+    spread = np.abs(rng.normal(0, 0.01, n)) * close
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2025-01-01", periods=n, freq="D"),
+        "open": close,
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.integers(1_000, 5_000, n).astype(float),
+    })
+
+
+@pytest.fixture
+def engine():
+    engine = get_indicator_engine()
+    engine.clear_cache()
+    yield engine
+    engine.clear_cache()
+
+
+def _wilder(series: pd.Series, period: int) -> pd.Series:
+    """Reference Wilder smoothing: SMA seed, then alpha = 1 / period."""
+    values = series.to_numpy()
+    out = np.full(values.size, np.nan)
+    first = int(np.flatnonzero(~np.isnan(values))[0])
+    out[first + period - 1] = values[first:first + period].mean()
+    for i in range(first + period, values.size):
+        out[i] = out[i - 1] + (values[i] - out[i - 1]) / period
+    return pd.Series(out)
+
+
+def test_every_built_in_has_a_kernel() -> None:
+    assert {ind["id"] for ind in BUILT_IN_INDICATORS} == set(KERNELS)
+
+
+def test_moving_averages_and_bands_match_pandas(bars) -> None:
+    ctx = IndicatorContext(bars)
+    close = bars["close"]
+
+    np.testing.assert_allclose(KERNELS["sma"](ctx, period=20)["sma"], close.rolling(20).mean(), equal_nan=True)
+    np.testing.assert_allclose(KERNELS["ema"](ctx, period=20)["ema"], close.ewm(span=20, adjust=False).mean())
+
+    bands = KERNELS["bb"](ctx, period=20, std_dev=2)
+    np.testing.assert_allclose(bands["upper"], close.rolling(20).mean() + 2 * close.rolling(20).std(ddof=0), equal_nan=True)
+
+    macd = KERNELS["macd"](ctx)
+    expected = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    np.testing.assert_allclose(macd["macd"], expected)
+    np.testing.assert_allclose(macd["signal"], expected.ewm(span=9, adjust=False).mean())
+
+
+def test_wilder_indicators_match_reference(bars) -> None:
+    ctx = IndicatorContext(bars)
+    change = bars["close"].diff()
+
+    gain = _wilder(change.clip(lower=0).where(change.notna()), 14)
+    loss = _wilder((-change).clip(lower=0).where(change.notna()), 14)
+    np.testing.assert_allclose(KERNELS["rsi"](ctx, period=14)["rsi"], 100 - 100 / (1 + gain / loss), equal_nan=True)
+
+    prev_close = bars["close"].shift(1).fillna(bars["close"].iloc[0])
+    true_range = np.maximum(bars["high"], prev_close) - np.minimum(bars["low"], prev_close)
+    np.testing.assert_allclose(KERNELS["atr"](ctx, period=14)["atr"], _wilder(true_range, 14), equal_nan=True)
+
+    adx = KERNELS["adx"](ctx, period=14)
+    assert np.nanmin(adx["adx"]) >= 0 and np.nanmax(adx["adx"]) <= 100
+    assert np.isnan(adx["adx"][:27]).all() and not np.isnan(adx["adx"][27:]).any()
+
+
+def test_oscillators_and_volume_indicators(bars) -> None:
+    ctx = IndicatorContext(bars)
+    highest, lowest = bars["high"].rolling(14).max(), bars["low"].rolling(14).min()
+
+    stoch = KERNELS["stoch"](ctx)
+    k = 100 * (bars["close"] - lowest) / (highest - lowest)
+    np.testing.assert_allclose(stoch["k"], k, equal_nan=True)
+    np.testing.assert_allclose(stoch["d"], k.rolling(3).mean(), equal_nan=True)
+    np.testing.assert_allclose(KERNELS["williams_r"](ctx)["williams_r"], -100 * (highest - bars["close"]) / (highest - lowest), equal_nan=True)
+    np.testing.assert_allclose(KERNELS["roc"](ctx, period=10)["roc"], 100 * bars["close"].pct_change(10), equal_nan=True)
+
+    obv = (np.sign(bars["close"].diff()).fillna(0) * bars["volume"]).cumsum()
+    np.testing.assert_allclose(KERNELS["obv"](ctx)["obv"], obv)
+
+    typical = (bars["high"] + bars["low"] + bars["close"]) / 3
+    mean_dev = typical.rolling(20).apply(lambda w: np.abs(w - w.mean()).mean(), raw=True)
+    cci = (typical - typical.rolling(20).mean()) / (0.015 * mean_dev)
+    np.testing.assert_allclose(KERNELS["cci"](ctx, period=20)["cci"], cci, equal_nan=True)
+
+    mfi = KERNELS["mfi"](ctx, period=14)["mfi"]
+    assert np.nanmin(mfi) >= 0 and np.nanmax(mfi) <= 100
+
+    psar = KERNELS["psar"](ctx)["psar"]
+    # SAR sits below the bar in uptrends and above it in downtrends
+    assert ((psar[1:] <= bars["low"].to_numpy()[1:]) | (psar[1:] >= bars["high"].to_numpy()[1:])).all()
+
+
+def test_multi_indicator_pass_and_lru_cache(engine, bars) -> None:
+    requests = [{"id": "atr", "params": {"period": 14}}, {"id": "adx"}, {"id": "bb"}, {"id": "sma"}]
+
+    first = engine.calculate_indicators("TEST", requests, ohlcv=bars)
+    again = engine.calculate_indicators("TEST", requests, ohlcv=bars)
+
+    assert [r["indicator"] for r in first["indicators"]] == ["atr", "adx", "bb", "sma"]
+    assert first["indicators"][2]["outputs"] == ["middle", "upper", "lower"]
+    assert [r["values"] for r in again["indicators"]] == [r["values"] for r in first["indicators"]]
+    assert engine.get_cache_stats()["hits"] == 4
+
+    # A new bar changes the last-bar timestamp and misses the cache
+    engine.calculate_indicators("TEST", requests[:1], ohlcv=bars.iloc[1:])
+    assert engine.get_cache_stats()["misses"] == 5
+
+    engine.cache_size = 2
+    engine.calculate_indicators("OTHER", requests, ohlcv=bars)
+    assert engine.get_cache_stats()["size"] == 2
+
+
+def test_cache_distinguishes_series_without_timestamps(engine, bars) -> None:
+    plain = bars.drop(columns="timestamp")
+    shifted = plain.assign(close=plain["close"] * 2)
+
+    first = engine.calculate_indicator("TEST", "sma", {"period": 5}, ohlcv=plain)
+    second = engine.calculate_indicator("TEST", "sma", {"period": 5}, ohlcv=shifted)
+
+    assert engine.get_cache_stats()["misses"] == 2
+    assert second["values"][-1]["value"] == pytest.approx(2 * first["values"][-1]["value"], abs=1e-3)
+
+
+def test_calculate_indicator_uses_loader_and_rejects_unknown(engine) -> None:
+    result = engine.calculate_indicator("AAPL", "rsi", {"period": 14}, period="1M")
+
+    assert result["ticker"] == "AAPL"
+    assert len(result["values"]) == 30
+    assert all(0 <= row["value"] <= 100 for row in result["values"])
+    with pytest.raises(ValueError):
+        engine.calculate_indicator("AAPL", "nonexistent", {})
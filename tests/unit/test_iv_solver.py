@@ -0,0 +1,138 @@
+"""
+Unit tests for the batch implied-volatility solver and IV surface cache.
+"""
+import numpy as np
+import pytest
+
+from services.options.greeks_engine import bs_chain_greeks
+from services.options.iv_filter import IVRankFilter
+from services.options.iv_solver import initial_vol_guess, solve_implied_vol
+from services.options.iv_surface import IVSurface, get_iv_surface_service
+
+
+@pytest.fixture
+def chain():
+    rng = np.random.default_rng(11)
+    n = 2000
+    strikes = rng.uniform(70, 130, n)
+    expiries = rng.uniform(0.05, 2.0, n)
+    ivs = rng.uniform(0.1, 0.9, n)
+    is_call = rng.random(n) < 0.5
+    prices = bs_chain_greeks(100.0, strikes, expiries, ivs, is_call, r=0.03, q=0.01)["price"]
+    return strikes, expiries, ivs, is_call, prices
+
+
+@pytest.fixture
+def surface_service():
+    service = get_iv_surface_service()
+    service.clear()
+    yield service
+    service.clear()
+
+
+def test_solver_recovers_vols_across_chain(chain) -> None:
+    strikes, expiries, ivs, is_call, prices = chain
+
+    result = solve_implied_vol(prices, 100.0, strikes, expiries, is_call, r=0.03, q=0.01)
+
+    # A few deep-wing quotes fall below the price floor and are left as NaN
+    solvable = result.iterations > 0
+    assert solvable.mean() > 0.99
+    assert result.converged[solvable].all()
+    np.testing.assert_allclose(result.iv[solvable], ivs[solvable], atol=1e-6)
+    assert result.iterations.max() <= 30
+
+
+def test_initial_guess_is_close_near_the_money() -> None:
+    price = bs_chain_greeks(100.0, 100.0, 0.5, 0.25, True)["price"]
+
+    assert initial_vol_guess(price, 100.0, 100.0, 0.5) == pytest.approx(0.25, abs=1e-3)
+
+
+def test_arbitrage_violations_are_masked_not_raised() -> None:
+    result = solve_implied_vol(
+        prices=[0.5, 150.0, 5.0, 5.0],
+        S=100.0,
+        K=[80.0, 100.0, 100.0, 100.0],
+        T=[1.0, 1.0, 0.0, 1.0],
+        is_call=[True, True, True, True],
+    )
+
+    assert np.isnan(result.iv[:3]).all()
+    assert not result.converged[:3].any()
+    assert result.converged[3]
+
+
+def test_surface_update_and_lookup(chain) -> None:
+    strikes, expiries, _, is_call, _ = chain
+    flat_prices = bs_chain_greeks(100.0, strikes, expiries, 0.3, is_call)["price"]
+    surface = IVSurface()
+    iv = solve_implied_vol(flat_prices, 100.0, strikes, expiries, is_call).iv
+
+    assert surface.update(strikes / 100.0, expiries, iv) == np.isfinite(iv).sum()
+    assert surface.implied_vol([0.9, 1.0, 1.1], 0.5) == pytest.approx([0.3] * 3, abs=1e-6)
+
+    # Re-quotes at a higher level pull the surface toward the new market
+    surface.update(strikes / 100.0, expiries, iv + 0.1)
+    assert 0.3 < float(surface.implied_vol(1.0, 0.5)) < 0.4
+
+
+def test_surface_service_caches_per_underlying(surface_service, chain) -> None:
+    strikes, expiries, ivs, is_call, prices = chain
+    result = surface_service.ingest_quotes("XYZ", 100.0, strikes, expiries, prices, is_call, r=0.03, q=0.01)
+
+    assert surface_service.get_surface("XYZ").quote_count == result.converged.sum()
+    assert 0.1 < surface_service.atm_vol("XYZ") < 0.9
+    assert np.isnan(surface_service.atm_vol("OTHER"))
+
+
+def test_iv_rank_filter_reads_surface(surface_service, chain) -> None:
+    strikes, expiries, _, is_call, _ = chain
+    prices = bs_chain_greeks(100.0, strikes, expiries, 0.45, is_call)["price"]
+    surface_service.ingest_quotes("XYZ", 100.0, strikes, expiries, prices, is_call)
+
+    ranked = IVRankFilter().check_rank_from_surface("XYZ", iv_high=0.6, iv_low=0.2)
+
+    assert ranked["iv_rank"] == pytest.approx(62.5, abs=0.1)
+    assert ranked["action"] == "SELL_PREMIUM"
+    assert IVRankFilter().check_rank_from_surface("NONE", 0.6, 0.2)["action"] == "NO_DATA"
+
+
+def test_vol_cap_is_not_reported_as_converged() -> None:
+    # An ATM call at 99.5 needs far more than MAX_VOL
+    result = solve_implied_vol([99.5, 10.0], 100.0, 100.0, 1.0, True)
+
+    assert not result.converged[0] and np.isnan(result.iv[0])
+    assert result.converged[1]
+
+
+def test_surface_keeps_untouched_nodes_under_streaming_updates() -> None:
+    strikes = np.linspace(60, 140, 25)
+    prices = bs_chain_greeks(100.0, strikes, 0.25, 0.3, True)["price"]
+    surface = IVSurface()
+    surface.update(strikes / 100.0, 0.25, solve_implied_vol(prices, 100.0, strikes, 0.25, True).iv)
+
+    for _ in range(45):
+        surface.update(1.0, 0.25, 0.35)
+
+    assert surface.implied_vol([0.7, 0.8], 0.25) == pytest.approx([0.3, 0.3], abs=0.02)
+    assert 0.3 < float(surface.implied_vol(1.0, 0.25)) <= 0.35
+
+
+def test_call_scanner_prices_off_the_surface(surface_service, chain) -> None:
+    from services.options.call_scanner import CallScanner
+
+    strikes, expiries, _, is_call, _ = chain
+    prices = bs_chain_greeks(100.0, strikes, expiries, 0.3, is_call)["price"]
+    surface_service.ingest_quotes("XYZ", 100.0, strikes, expiries, prices, is_call)
+
+    ops = CallScanner().find_opportunities([
+        {"ticker": "XYZ", "shares": 200, "current_price": 100.0},
+        {"ticker": "NONE", "shares": 100, "current_price": 50.0},
+        {"ticker": "ODD", "shares": 10, "current_price": 50.0},
+    ])
+
+    assert [op["ticker"] for op in ops] == ["XYZ", "NONE"]
+    assert ops[0]["implied_vol"] == pytest.approx(0.3, abs=1e-3)
+    assert 0.2 < ops[0]["target_delta"] < 0.4
+    assert ops[1]["potential_yield"] == "0.85% / mo"
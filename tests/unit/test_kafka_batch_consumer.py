@@ -0,0 +1,175 @@
+"""
+Unit Tests - Kafka batch consumption mode, driven by an in-memory consumer.
+"""
+import json
+import threading
+import time
+
+import pytest
+
+from services.kafka.consumer import BaseConsumer, ConsumerConfig
+
+
+class FakeMessage:
+    def __init__(self, topic, partition, offset, value):
+        self._topic, self._partition, self._offset, self._value = topic, partition, offset, value
+
+    def error(self):
+        return None
+
+    def topic(self):
+        return self._topic
+
+    def partition(self):
+        return self._partition
+
+    def offset(self):
+        return self._offset
+
+    def value(self):
+        return self._value
+
+
+class FakeKafka:
+    """Per-partition logs with a read position, commit and seek."""
+
+    def __init__(self, partitions):
+        self.logs = partitions  # {(topic, partition): [bytes, ...]}
+        self.position = {key: 0 for key in partitions}
+        self.committed = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, topics):
+        pass
+
+    def consume(self, num_messages=1, timeout=-1):
+        with self.lock:
+            out = []
+            for key, log in self.logs.items():
+                while self.position[key] < len(log) and len(out) < num_messages:
+                    pos = self.position[key]
+                    out.append(FakeMessage(key[0], key[1], pos, log[pos]))
+                    self.position[key] += 1
+        if not out:
+            time.sleep(timeout)
+        return out
+
+    def commit(self, offsets=None, asynchronous=True):
+        for tp in offsets:
+            self.committed[(tp.topic, tp.partition)] = tp.offset
+
+    def seek(self, tp):
+        with self.lock:
+            self.position[(tp.topic, tp.partition)] = tp.offset
+
+    def close(self):
+        pass
+
+
+class Recorder(BaseConsumer):
+    def __init__(self, config, fail_once_on=None):
+        super().__init__(config)
+        self.batches = []
+        self.fail_once_on = fail_once_on
+        self.lock = threading.Lock()
+
+    def process_message(self, message):
+        pass
+
+    def process_batch(self, messages):
+        if self.fail_once_on and any(m.get("i") == self.fail_once_on for m in messages):
+            self.fail_once_on = None
+            raise RuntimeError("downstream unavailable")
+        with self.lock:
+            self.batches.append(list(messages))
+
+
+def _logs(n_partitions, per_partition):
+    return {
+        ("px", p): [json.dumps({"p": p, "i": p * 1000 + i}).encode() for i in range(per_partition)]
+        for p in range(n_partitions)
+    }
+
+
+def _run_until(consumer, fake, expected):
+    consumer._consumer = fake
+    consumer.start()
+    for _ in range(300):
+        if sum(map(len, consumer.batches)) >= expected and fake.committed == {k: len(v) for k, v in fake.logs.items()}:
+            break
+        time.sleep(0.01)
+    consumer.stop()
+
+
+def test_batches_are_bounded_and_offsets_committed_after_success():
+    fake = FakeKafka(_logs(2, 120))
+    consumer = Recorder(ConsumerConfig(topics=["px"], group_id="g", batch_mode=True, max_batch_size=50,
+                                       max_batch_latency_ms=5))
+    _run_until(consumer, fake, 240)
+    assert max(map(len, consumer.batches)) <= 50
+    assert sorted(m["i"] for b in consumer.batches for m in b) == sorted(
+        p * 1000 + i for p in range(2) for i in range(120))
+    assert fake.committed == {("px", 0): 120, ("px", 1): 120}
+    assert consumer.health_check()["batch_stats"]["messages"] == 240
+
+
+def test_failed_batch_is_rewound_and_redelivered():
+    fake = FakeKafka(_logs(1, 30))
+    consumer = Recorder(ConsumerConfig(topics=["px"], group_id="g", batch_mode=True, max_batch_size=10,
+                                       max_batch_latency_ms=5), fail_once_on=15)
+    _run_until(consumer, fake, 30)
+    delivered = [m["i"] for b in consumer.batches for m in b]
+    assert delivered == list(range(30))  # nothing lost, order kept, no duplicates after the rewind
+    stats = consumer.health_check()["batch_stats"]
+    assert stats["failed_batches"] == 1 and consumer._error_count == 0
+
+
+def test_partition_workers_keep_per_partition_order_and_skip_bad_json():
+    logs = _logs(4, 100)
+    logs[("px", 2)][10] = b"{not json"
+    fake = FakeKafka(logs)
+    consumer = Recorder(ConsumerConfig(topics=["px"], group_id="g", batch_mode=True, max_batch_size=64,
+                                       max_batch_latency_ms=5, partition_workers=4))
+    _run_until(consumer, fake, 399)
+    for p in range(4):
+        seen = [m["i"] for b in consumer.batches for m in b if m["p"] == p]
+        assert seen == sorted(seen) and len(seen) == (99 if p == 2 else 100)
+    assert all(len({m["p"] for m in b}) == 1 for b in consumer.batches)
+    assert consumer.health_check()["batch_stats"]["decode_errors"] == 1
+
+
+def test_default_process_batch_dispatches_per_message():
+    seen = []
+
+    class PerMessage(BaseConsumer):
+        def process_message(self, message):
+            seen.append(message)
+
+    PerMessage(ConsumerConfig(topics=["t"], group_id="g")).process_batch([{"a": 1}, {"a": 2}])
+    assert seen == [{"a": 1}, {"a": 2}]
+
+
+def test_poison_message_is_dead_lettered_after_retries():
+    class Poisoned(Recorder):
+        def __init__(self, config):
+            super().__init__(config)
+            self.dead = []
+
+        def process_batch(self, messages):
+            if any(m.get("i") == 7 for m in messages):
+                raise ValueError("bad payload")
+            super().process_batch(messages)
+
+        def handle_dead_letter(self, message, error):
+            self.dead.append(message["i"])
+
+    fake = FakeKafka(_logs(1, 20))
+    consumer = Poisoned(ConsumerConfig(topics=["px"], group_id="g", batch_mode=True, max_batch_size=10,
+                                       max_batch_latency_ms=5, max_batch_retries=3))
+    _run_until(consumer, fake, 19)
+    delivered = sorted({m["i"] for b in consumer.batches for m in b})
+    assert delivered == [i for i in range(20) if i != 7]
+    assert consumer.dead == [7]
+    assert fake.committed == {("px", 0): 20}
+    assert consumer.is_running is False and consumer._error_count == 0  # stopped by the test, not the breaker
+    assert consumer.health_check()["batch_stats"]["failed_batches"] == 3
@@ -107,6 +107,17 @@ class TestBaseConsumer:
         
         assert result is None
     
+    def test_deserialize_non_finite_floats(self) -> None:
+        """NaN/Infinity from json.dumps producers still decode (stdlib fallback)."""
+        config = ConsumerConfig(topics=['test'], group_id='test')
+        consumer = ConcreteConsumer(config)
+        
+        result = consumer.deserialize(b'{"bid": NaN, "ask": Infinity, "last": -Infinity}')
+        
+        assert result is not None
+        assert result['bid'] != result['bid']
+        assert result['ask'] == float('inf') and result['last'] == float('-inf')
+    
     def test_health_check_initial(self) -> None:
         """Test health check returns correct initial state."""
         config = ConsumerConfig(topics=['test.topic'], group_id='test-group')
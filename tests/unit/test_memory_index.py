@@ -0,0 +1,82 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from services.memory_index import EmbeddingBatcher, FlatVectorIndex, QueryEmbeddingCache
+
+
+def test_batcher_groups_concurrent_submissions():
+    seen = []
+    gate = threading.Event()
+
+    def handler(items):
+        gate.wait(1)
+        seen.append(list(items))
+        return [i * 10 for i in items]
+
+    batcher = EmbeddingBatcher(handler, max_batch=8, max_wait=0.05)
+
+    async def run():
+        futures = [asyncio.wrap_future(batcher.submit(i)) for i in range(20)]
+        gate.set()
+        return await asyncio.gather(*futures)
+
+    assert asyncio.run(run()) == [i * 10 for i in range(20)]
+    batcher.close()
+    assert [i for batch in seen for i in batch] == list(range(20))
+    assert max(len(b) for b in seen) <= 8 and len(seen) < 20
+    assert batcher.stats["items"] == 20
+
+
+def test_batcher_propagates_handler_errors():
+    def handler(items):
+        raise RuntimeError("db down")
+
+    batcher = EmbeddingBatcher(handler, max_wait=0.0)
+    with pytest.raises(RuntimeError, match="db down"):
+        batcher.submit("x").result(2)
+    batcher.close()
+    assert batcher.stats["failed_batches"] == 1
+
+
+def test_query_cache_is_lru():
+    cache = QueryEmbeddingCache(maxsize=2)
+    calls = []
+
+    def embed(q):
+        return lambda: calls.append(q) or np.ones(3)
+
+    cache.get_or_compute("a", embed("a"))
+    cache.get_or_compute("b", embed("b"))
+    cache.get_or_compute("a", embed("a"))
+    cache.get_or_compute("c", embed("c"))  # evicts b
+    cache.get_or_compute("b", embed("b"))
+    assert calls == ["a", "b", "c", "b"] and (cache.hits, cache.misses) == (1, 4)
+
+
+def test_flat_index_matches_brute_force_cosine():
+    rng = np.random.default_rng(3)
+    vectors = rng.standard_normal((500, 16)).astype(np.float32)
+    index = FlatVectorIndex(16, capacity=1000)
+    for start in range(0, 500, 100):  # growth across several adds
+        ids = list(range(start, start + 100))
+        index.add(ids, vectors[start:start + 100], [{"id": i} for i in ids])
+    query = rng.standard_normal(16)
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    sims = unit @ (query / np.linalg.norm(query))
+    expected = np.argsort(-sims)[:5]
+    hits = index.search(query, k=5)
+    assert [p["id"] for p, _ in hits] == expected.tolist()
+    np.testing.assert_allclose([s for _, s in hits], sims[expected], rtol=1e-5)
+    assert all(s > 0.3 for _, s in index.search(query, k=50, min_similarity=0.3))
+
+
+def test_flat_index_overwrites_by_id_and_evicts_oldest():
+    index = FlatVectorIndex(2, capacity=3)
+    index.add(["a", "b", "c"], np.eye(3, 2) + 0.1, [{"n": "a"}, {"n": "b"}, {"n": "c"}])
+    assert index.add(["a"], [[0.0, 1.0]], [{"n": "a2"}]) == 0
+    assert index.search([0.0, 1.0], k=1)[0][0] == {"n": "a2"}
+    index.add(["d"], [[1.0, 1.0]], [{"n": "d"}])
+    assert "a" not in index and "d" in index and len(index) == 3 and index.evicted == 1
@@ -0,0 +1,77 @@
+"""
+Unit tests for the array-backed incremental order book.
+"""
+import random
+
+import pytest
+
+from services.kafka.orderbook_consumer import OrderBookConsumer
+from services.market.depth_aggregator import DepthAggregator
+from services.market.level2_parser import Level2Parser
+from services.market.order_book import OrderBook, OrderBookStore
+from services.risk.liquidity_validator import LiquidityValidator
+
+
+def test_random_diffs_match_dict_reference():
+    rng = random.Random(11)
+    book = OrderBook("EUR/USD")
+    ref = {"bids": {}, "asks": {}}
+    for _ in range(3000):
+        side = rng.choice(["bids", "asks"])
+        base = 1.0850 if side == "asks" else 1.0849
+        price = round(base + (rng.randint(0, 40) if side == "asks" else -rng.randint(0, 40)) * 0.00001, 5)
+        size = rng.choice([0, 0, rng.randint(1, 50) * 100_000])
+        book.apply_diff(**{side: [{"price": price, "size": size}]})
+        if size:
+            ref[side][price] = size
+        else:
+            ref[side].pop(price, None)
+
+    bids = sorted(ref["bids"].items(), reverse=True)
+    asks = sorted(ref["asks"].items())
+    assert [(l["price"], l["size"]) for l in book.bids] == bids
+    assert [(l["price"], l["size"]) for l in book.asks] == asks
+
+    legacy = Level2Parser.parse_depth_event({
+        "symbol": "EUR/USD", "timestamp": "2026-01-25T21:30:00Z",
+        "bids": [{"price": p, "size": s} for p, s in bids],
+        "asks": [{"price": p, "size": s} for p, s in asks],
+    })
+    assert book.mid == pytest.approx(legacy["mid"])
+    for pip_range in (0.00005, 0.0002, 0.01):
+        fast = DepthAggregator.get_total_volume_at_depth(book, pip_range)
+        slow = DepthAggregator.get_total_volume_at_depth(legacy, pip_range)
+        assert fast == pytest.approx(slow)
+    total_asks = sum(s for _, s in asks)
+    for size in (50_000, 1_000_000, total_asks / 2, total_asks, total_asks + 1):
+        for direction in ("BUY", "SELL"):
+            fast = DepthAggregator.get_vwap_for_size(book, size, direction)
+            slow = DepthAggregator.get_vwap_for_size(legacy, size, direction)
+            assert fast == pytest.approx(slow) if slow is not None else fast is None
+
+
+def test_store_handles_snapshots_diffs_and_pairs():
+    store = OrderBookStore()
+    assert store.apply_event({"symbol": "BTC", "type": "delta", "bids": [[100, 1]]}) is None  # no snapshot yet
+    book = store.apply_event({"symbol": "BTC", "timestamp": "2026-01-25T21:30:00Z",
+                              "bids": [[99.0, 2.0], [100.0, 1.0]], "asks": [[101.0, 3.0]]})
+    assert book["bids"][0] == {"price": 100.0, "size": 1.0} and book["spread"] == 1.0
+    store.apply_event({"symbol": "BTC", "type": "delta", "bids": [[100.0, 0], [100.5, 4.0]], "asks": [[101.0, 1.0]]})
+    assert (book.best_bid, book.best_ask, book.depth_levels) == (100.5, 101.0, 3)
+    assert store.apply_event({"symbol": "BTC", "type": "delta", "bids": [["bad"]]}) is None
+
+
+def test_order_book_drops_into_existing_consumers():
+    book = OrderBookStore().apply_event({
+        "symbol": "EUR/USD", "timestamp": "2026-01-25T21:30:00Z",
+        "bids": [{"price": 1.08500, "size": 5_000_000}, {"price": 1.08490, "size": 3_000_000}],
+        "asks": [{"price": 1.08502, "size": 4_000_000}, {"price": 1.08510, "size": 2_500_000}],
+    })
+    assert LiquidityValidator.is_safe_to_execute(book)["safe"] is True
+
+    consumer = OrderBookConsumer()
+    consumer.process_batch([
+        {"symbol": "X", "timestamp": "t", "bids": [[10.0, 1.0]], "asks": [[10.1, 1.0]]},
+        {"symbol": "X", "type": "delta", "asks": [[10.05, 2.0]]},
+    ])
+    assert consumer.get_book("X")["asks"][0] == {"price": 10.05, "size": 2.0}
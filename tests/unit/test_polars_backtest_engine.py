@@ -0,0 +1,161 @@
+"""
+Unit Tests for PolarsBacktestEngine batch and cached execution paths.
+"""
+
+import math
+
+import pytest
+
+pl = pytest.importorskip("polars")
+
+from services.backtest import BacktestConfig, get_backtest_engine
+
+
+def _make_bars(ticker: str, n: int, drift: float) -> list:
+    """Deterministic oscillating price path so SMAs cross repeatedly."""
+    price = 100.0
+    bars = []
+    for i in range(n):
+        price *= 1 + drift + 0.02 * math.sin(i / 7.0)
+        bars.append({"ticker": ticker, "timestamp": i, "close": price})
+    return bars
+
+
+@pytest.fixture
+def engine():
+    engine = get_backtest_engine()
+    engine.clear_cache()
+    yield engine
+    engine.clear_cache()
+
+
+@pytest.fixture
+def panel() -> "pl.DataFrame":
+    return pl.DataFrame(_make_bars("AAA", 400, 0.001) + _make_bars("BBB", 400, -0.0005))
+
+
+def test_grid_matches_single_run(engine, panel):
+    grid = [(5, 20), (10, 50)]
+    config = BacktestConfig("SMA Cross", "AAA", "2020-01-01", "2021-01-01")
+    result = engine.run_sma_grid(panel, grid, cost_per_side=config.commission + config.slippage)
+
+    assert result.height == 4
+    assert set(result["ticker"].to_list()) == {"AAA", "BBB"}
+
+    single = engine.run_sma_crossover(
+        config, 10, 50, panel.filter(pl.col("ticker") == "AAA")
+    )
+    row = result.filter(
+        (pl.col("ticker") == "AAA") & (pl.col("fast_period") == 10)
+    ).row(0, named=True)
+
+    assert row["total_return_pct"] == pytest.approx(single.total_return_pct)
+    assert row["sharpe_ratio"] == pytest.approx(single.sharpe_ratio)
+    assert row["total_trades"] == single.total_trades
+    assert single.total_trades > 0
+
+
+def test_grid_scans_parquet_and_filters_tickers(engine, panel, tmp_path):
+    path = tmp_path / "bars.parquet"
+    panel.write_parquet(path)
+
+    result = engine.run_sma_grid(str(path), [(5, 20)], tickers=["BBB"])
+
+    assert result["ticker"].to_list() == ["BBB"]
+    assert result["bars"][0] == 400
+
+
+def test_grid_rejects_empty_or_invalid_params(engine, panel):
+    with pytest.raises(ValueError):
+        engine.run_sma_grid(panel, [])
+    with pytest.raises(ValueError):
+        engine.run_sma_grid(panel, [(0, 20)])
+    with pytest.raises(ValueError, match="shorter"):
+        engine.run_sma_grid(panel, [(5, 20), (20, 20)])
+
+
+def test_price_frame_is_cached_for_reuse(engine):
+    config = BacktestConfig("SMA Cross", "AAA", "2020-01-01", "2021-01-01")
+    bars = _make_bars("AAA", 200, 0.001)
+
+    first = engine.run_sma_crossover(config, 5, 20, bars)
+    cached = engine.run_sma_crossover(config, 5, 20)
+
+    assert engine.get_performance_stats()["cache_size"] == 1
+    assert cached.total_return_pct == pytest.approx(first.total_return_pct)
+
+
+def test_price_frame_cache_is_lru_bounded(engine, monkeypatch):
+    monkeypatch.setattr(engine, "cache_size", 2)
+    configs = [BacktestConfig("SMA Cross", t, "2020-01-01", "2021-01-01") for t in ("AAA", "BBB", "CCC")]
+    engine.get_price_frame(configs[0], _make_bars("AAA", 50, 0.001))
+    engine.get_price_frame(configs[1], _make_bars("BBB", 50, 0.001))
+    engine.get_price_frame(configs[0], None)  # touch AAA so BBB is least recent
+    engine.get_price_frame(configs[2], _make_bars("CCC", 50, 0.001))
+
+    assert engine.get_performance_stats()["cache_size"] == 2
+    assert engine.get_price_frame(configs[1], None) is None
+    assert engine.get_price_frame(configs[0], None) is not None
+
+
+def _reference_trade_stats(closes, fast, slow, cost):
+    """Slow loop reference for net drawdown, total return and per-trade aggregates."""
+    def sma(i, w):
+        return sum(closes[i - w + 1:i + 1]) / w if i >= w - 1 else None
+
+    signal = [
+        sma(i, fast) > sma(i, slow) if sma(i, slow) is not None else False
+        for i in range(len(closes))
+    ]
+    equity, peak, max_dd, entry, trades = 1.0, 1.0, 0.0, None, []
+    for i in range(1, len(closes)):
+        if signal[i]:
+            equity *= closes[i] / closes[i - 1]
+            if entry is None:
+                entry = closes[i - 1]
+                equity /= 1 + cost
+        if entry is not None and not (i + 1 < len(closes) and signal[i + 1]):
+            trades.append(closes[i] / entry * (1 - cost) / (1 + cost) - 1)
+            equity *= 1 - cost
+            entry = None
+        peak = max(peak, equity)
+        max_dd = max(max_dd, 1 - equity / peak)
+    wins = [t for t in trades if t > 0]
+    losses = [t for t in trades if t < 0]
+    return max_dd * 100, len(wins) / len(trades), sum(wins) / -sum(losses), len(trades), (equity - 1) * 100
+
+
+def test_vectorized_trade_metrics_match_reference_loop(engine):
+    config = BacktestConfig("SMA Cross", "AAA", "2020-01-01", "2021-01-01")
+    bars = _make_bars("AAA", 600, 0.0005)
+    closes = [bar["close"] for bar in bars]
+
+    result = engine.run_sma_crossover(config, 5, 20, bars, include_trades=True)
+    max_dd, win_rate, profit_factor, n_trades, total_return = _reference_trade_stats(
+        closes, 5, 20, config.commission + config.slippage
+    )
+
+    assert result.max_drawdown_pct == pytest.approx(max_dd)
+    assert result.win_rate == pytest.approx(win_rate)
+    assert result.profit_factor == pytest.approx(profit_factor)
+    assert result.total_return_pct == pytest.approx(total_return)
+    assert result.total_trades == n_trades
+
+    ledger = result.trade_ledger
+    assert ledger.num_rows == 2 * n_trades
+    assert ledger.column_names == ["timestamp", "ticker", "side", "quantity", "price", "commission"]
+    assert ledger.column("side").to_pylist()[:2] == ["BUY", "SELL"]
+
+
+def test_trade_ledger_is_opt_in(engine):
+    config = BacktestConfig("SMA Cross", "AAA", "2020-01-01", "2021-01-01")
+    result = engine.run_sma_crossover(config, 5, 20, _make_bars("AAA", 200, 0.001))
+
+    assert result.trade_ledger is None
+
+
+def test_grid_reports_drawdown_and_trade_stats(engine, panel):
+    result = engine.run_sma_grid(panel, [(5, 20)])
+
+    assert (result["max_drawdown_pct"] >= 0).all()
+    assert result["win_rate"].is_between(0, 1).all()
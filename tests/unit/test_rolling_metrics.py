@@ -3,12 +3,18 @@ from services.quantitative.rolling_metrics import RollingMetricsEngine
 
 def test_sharpe_calculation():
     svc = RollingMetricsEngine()
-    # 252 returns of 0.01% daily (approx 2.5% annual), Rf=0 -> Sharpe constant
-    rets = [0.0001] * 252*3
+    # Alternating 0.03% / -0.01% daily: positive mean with real volatility, Rf=0
+    rets = [0.0003, -0.0001] * 378
     res = svc.calculate_rolling_sharpe(rets, 0.0, window=252*3)
     assert len(res) == 1
     assert res[0] > 0
 
+def test_sharpe_zero_volatility_is_zero():
+    svc = RollingMetricsEngine()
+    # Constant returns have no risk to reward: Sharpe is reported as 0, not a huge ratio
+    res = svc.calculate_rolling_sharpe([0.0001] * 252*3, 0.0, window=252*3)
+    assert res == [0.0]
+
 def test_sortino_downside_only():
     svc = RollingMetricsEngine()
     # Big positive moves shouldn't hurt Sortino much, but Sharpe would be lower
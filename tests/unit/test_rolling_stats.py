@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from services.quantitative import rolling_stats as rs
+from services.quantitative.correlation_calculator import CorrelationCalculator
+from services.quantitative.rolling_metrics import RollingMetricsEngine
+from services.quantitative.rolling_volatility import RollingVolatilityEngine
+
+
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(21)
+    return rng.normal(0.0004, 0.012, size=(6, 400))
+
+
+def _naive(panel, window, fn):
+    n = panel.shape[-1] - window + 1
+    return np.array([[fn(row[i:i + window]) for i in range(n)] for row in panel])
+
+
+def test_moments_match_naive_windows(panel):
+    window = 63
+    np.testing.assert_allclose(rs.rolling_mean(panel, window), _naive(panel, window, np.mean), atol=1e-15)
+    np.testing.assert_allclose(rs.rolling_std(panel, window), _naive(panel, window, np.std), rtol=1e-9)
+    np.testing.assert_allclose(rs.rolling_std(panel, window, ddof=1), _naive(panel, window, lambda w: np.std(w, ddof=1)), rtol=1e-9)
+
+
+def test_covariance_and_correlation_match_naive(panel):
+    window = 30
+    x, y = panel[:3], panel[:3] * 0.5 + panel[3:] * 0.5
+    expected = np.array([
+        [np.corrcoef(a[i:i + window], b[i:i + window])[0, 1] for i in range(a.size - window + 1)]
+        for a, b in zip(x, y)
+    ])
+    np.testing.assert_allclose(rs.rolling_corr(x, y, window), expected, rtol=1e-9)
+    np.testing.assert_allclose(rs.rolling_cov(x[0], y[0], window)[0], np.cov(x[0, :window], y[0, :window], bias=True)[0, 1])
+
+
+def test_sharpe_and_sortino_match_naive(panel):
+    window = 126
+    sharpe = _naive(panel, window, lambda w: (w.mean() * 252 - 0.02) / (w.std() * np.sqrt(252)))
+    downside = _naive(panel, window, lambda w: np.sqrt(np.mean(np.minimum(w, 0) ** 2)) * np.sqrt(252))
+    sortino = (rs.rolling_mean(panel, window) * 252 - 0.02) / downside
+
+    np.testing.assert_allclose(rs.rolling_sharpe(panel, window, 0.02), sharpe, rtol=1e-9)
+    np.testing.assert_allclose(rs.rolling_downside_deviation(panel, window), downside, rtol=1e-9)
+    np.testing.assert_allclose(rs.rolling_sortino(panel, window, 0.02), sortino, rtol=1e-9)
+
+
+def test_degenerate_windows():
+    flat = np.full(50, 0.001)
+
+    assert not rs.rolling_std(flat, 10).any()
+    assert not rs.rolling_sharpe(flat, 10).any()
+    assert (rs.rolling_sharpe(flat, 10, zero_risk_ratio=rs.RATIO_CAP) == rs.RATIO_CAP).all()
+    assert (rs.rolling_sortino(flat, 10) == rs.RATIO_CAP).all()
+    assert np.isnan(rs.rolling_corr(flat, np.arange(50.0), 10)).all()
+    with pytest.raises(ValueError):
+        rs.rolling_mean(flat, 51)
+
+
+def test_trending_prices_stay_accurate():
+    prices = np.linspace(10, 1000, 5000) + np.sin(np.arange(5000))
+    naive = _naive(prices[None, :], 20, np.std)[0]
+
+    np.testing.assert_allclose(rs.rolling_std(prices, 20), naive, rtol=1e-8)
+
+
+def test_engines_delegate_with_existing_signatures(panel):
+    returns = panel[0].tolist()
+
+    vol = RollingVolatilityEngine().calculate_rolling_vol(returns, window=21)
+    sharpe = RollingMetricsEngine().calculate_rolling_sharpe(returns, 0.0, window=252)
+    corr = CorrelationCalculator().calculate_rolling_correlation(returns, panel[1].tolist(), window=20)
+
+    assert len(vol) == len(returns) - 20
+    assert vol[0] == round(float(np.std(returns[:21]) * np.sqrt(252)), 4)
+    assert len(sharpe) == len(returns) - 251
+    assert corr[0] == round(float(np.corrcoef(returns[:20], panel[1, :20])[0, 1]), 4)
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from scipy.stats import norm
+
+from services.analysis.monte_carlo import MonteCarloEngine, SimulationConfig
+from services.risk.tail_risk_contributions import scenario_tail_contributions, simulated_tail_contributions
+
+
+def _model(n=6, seed=0):
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0, 0.01, (n, 2))
+    cov = loadings @ loadings.T + np.diag(rng.uniform(0.005, 0.015, n) ** 2)
+    return rng.dirichlet(np.ones(n)), np.full(n, 2e-4), cov
+
+
+def test_scenario_contributions_on_explicit_matrix():
+    returns = np.array([
+        [-0.10, 0.02], [-0.04, -0.06], [0.01, -0.02], [0.03, 0.01], [0.02, 0.04],
+        [-0.01, 0.00], [0.00, 0.01], [0.05, -0.01], [0.01, 0.02], [-0.02, -0.01],
+    ])
+    w = np.array([0.6, 0.4])
+    result = scenario_tail_contributions(returns, w, confidence_level=0.8)
+    losses = -(returns @ w)
+    worst = np.sort(losses)[::-1]
+    assert result.var == pytest.approx(worst[1])
+    assert result.cvar == pytest.approx(worst[:2].mean())
+    np.testing.assert_allclose(result.marginal_cvar, -returns[np.argsort(-losses)[:2]].mean(axis=0))
+    assert result.component_cvar.sum() == pytest.approx(result.cvar)
+    assert result.component_var.sum() == pytest.approx(result.var)
+
+
+@pytest.mark.parametrize("horizon", [1, 5])
+def test_simulated_matches_replayed_asset_paths(horizon):
+    w, mu, cov = _model()
+    engine = MonteCarloEngine(SimulationConfig(n_simulations=6000, chunk_size=1500))
+    result = simulated_tail_contributions(engine, w, mu, cov, 0.99, horizon_days=horizon, seed=5)
+    assert result.seed == 5
+
+    paths = np.concatenate([
+        chunk.sum(axis=1) for chunk in engine.iter_asset_return_chunks(mu, cov, 6000, horizon, 1500, seed=5)
+    ])
+    replay = scenario_tail_contributions(paths, w, 0.99)
+    assert result.var == pytest.approx(replay.var, rel=1e-10)
+    assert result.cvar == pytest.approx(replay.cvar, rel=1e-10)
+    np.testing.assert_allclose(result.component_var, replay.component_var, rtol=1e-8)
+    np.testing.assert_allclose(result.component_cvar, replay.component_cvar, rtol=1e-8)
+
+
+def test_simulated_contributions_match_gaussian_euler_formulas():
+    w, mu, cov = _model(seed=2)
+    mu = np.zeros_like(mu)
+    engine = MonteCarloEngine(SimulationConfig(n_simulations=200000, chunk_size=50000, random_seed=9))
+    result = simulated_tail_contributions(engine, w, mu, cov, 0.95)
+    vol = np.sqrt(w @ cov @ w)
+    beta = cov @ w / vol
+    assert result.var == pytest.approx(norm.ppf(0.95) * vol, rel=0.02)
+    assert result.cvar == pytest.approx(norm.pdf(norm.ppf(0.95)) / 0.05 * vol, rel=0.02)
+    expected_cvar = beta * norm.pdf(norm.ppf(0.95)) / 0.05
+    expected_var = beta * norm.ppf(0.95)
+    np.testing.assert_allclose(result.marginal_cvar, expected_cvar, atol=0.03 * expected_cvar.max())
+    np.testing.assert_allclose(result.marginal_var, expected_var, atol=0.05 * expected_var.max())
+
+
+def test_invalid_inputs_raise():
+    w, mu, cov = _model()
+    with pytest.raises(ValueError, match="confidence_level"):
+        scenario_tail_contributions(np.zeros((10, 6)), w, confidence_level=1.0)
+    with pytest.raises(ValueError, match="dimensions"):
+        simulated_tail_contributions(MonteCarloEngine(), w[:3], mu, cov)
+
+
+def test_shock_chunks_respect_byte_budget():
+    engine = MonteCarloEngine(SimulationConfig(n_simulations=1000, chunk_size=1000, chunk_bytes=8 * 10 * 50 * 64))
+    chunks = list(engine.iter_shock_chunks(50, n_days=10))
+    assert max(c.shape[0] for c in chunks) <= 64
+    assert sum(c.shape[0] for c in chunks) == 1000
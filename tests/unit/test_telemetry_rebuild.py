@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import MagicMock, patch
 from services.unified_activity_service import UnifiedActivityService
 from services.price_telemetry_service import PriceTelemetryService
+from services.tick_sink import TickSink
 
 class TestTelemetryRebuild(unittest.TestCase):
 
@@ -23,17 +24,58 @@ class TestTelemetryRebuild(unittest.TestCase):
         mock_session.add.assert_called()
         mock_session.commit.assert_called()
 
+    @patch("services.price_telemetry_service.engine", MagicMock())
     @patch("services.price_telemetry_service.SessionLocal")
     def test_price_storage(self, mock_session_cls):
-        """Test storing a price tick."""
-        mock_session = MagicMock()
-        mock_session_cls.return_value = mock_session
-        
-        self.telemetry_svc.store_tick("BTC", 50000.0)
-        
-        # Verify execute called
-        mock_session.execute.assert_called()
-        mock_session.commit.assert_called()
+        """Test storing a price tick is buffered and served from memory."""
+        sink = TickSink(MagicMock(), auto_start=False)
+        original, self.telemetry_svc.sink = self.telemetry_svc.sink, sink
+        try:
+            self.telemetry_svc.store_tick("BTC", 50000.0)
+
+            # Queued for the bulk COPY, no per-tick session
+            self.assertEqual(sink.pending, 1)
+            mock_session_cls.assert_not_called()
+            self.assertEqual(self.telemetry_svc.get_latest_price("BTC"), 50000.0)
+            mock_session_cls.assert_not_called()
+        finally:
+            self.telemetry_svc.sink = original
+
+    @patch("services.price_telemetry_service.engine", None)
+    def test_price_storage_skipped_without_db(self):
+        """Without an engine ticks are dropped at once, not queued for retries."""
+        sink = TickSink(MagicMock(), auto_start=False)
+        original, self.telemetry_svc.sink = self.telemetry_svc.sink, sink
+        try:
+            self.telemetry_svc.store_tick("BTC", 50000.0)
+            self.assertEqual(self.telemetry_svc.store_ticks(["ETH"], [3000.0]), 0)
+            self.assertEqual(sink.pending, 0)
+        finally:
+            self.telemetry_svc.sink = original
+
+    @patch("services.price_telemetry_service.time.monotonic")
+    @patch("services.price_telemetry_service.SessionLocal")
+    def test_read_price_refreshes_after_ttl(self, mock_session_cls, mock_monotonic):
+        """Prices written by another process are re-read once the cached read is stale."""
+        rows = iter([("t1", 100.0), ("t2", 101.5)])
+        mock_session_cls.return_value.execute.return_value.fetchone.side_effect = lambda: next(rows)
+        sink = TickSink(MagicMock(), auto_start=False)
+        original, self.telemetry_svc.sink = self.telemetry_svc.sink, sink
+        self.telemetry_svc._read_prices.clear()
+        try:
+            mock_monotonic.return_value = 10.0
+            self.assertEqual(self.telemetry_svc.get_latest_price("EURUSD"), 100.0)
+            mock_monotonic.return_value = 10.0 + self.telemetry_svc.read_ttl / 2
+            self.assertEqual(self.telemetry_svc.get_latest_price("EURUSD"), 100.0)
+            self.assertEqual(mock_session_cls.call_count, 1)
+
+            mock_monotonic.return_value = 10.0 + self.telemetry_svc.read_ttl * 2
+            self.assertEqual(self.telemetry_svc.get_latest_price("EURUSD"), 101.5)
+            self.assertEqual(mock_session_cls.call_count, 2)
+            self.assertIsNone(sink.last_price("EURUSD"))  # reads never enter the written-price map
+        finally:
+            self.telemetry_svc.sink = original
+            self.telemetry_svc._read_prices.clear()
 
 if __name__ == '__main__':
     unittest.main()
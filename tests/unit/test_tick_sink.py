@@ -0,0 +1,98 @@
+"""
+Unit tests for the write-behind binary COPY tick sink.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pytest
+
+from services.tick_sink import TickSink, decode_copy_binary, to_pg_micros
+
+
+class FakeCopyTarget:
+    """cursor_factory stand-in that records COPY payloads; fails the first `failures` calls."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+        self.statements = []
+        self.rows = []
+
+    @contextmanager
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("database unavailable")
+        yield self
+
+    def copy_expert(self, sql, file, size=8192):
+        self.statements.append(sql)
+        self.rows.extend(decode_copy_binary(file.read()))
+
+
+def test_copy_payload_round_trips_mixed_layouts():
+    target = FakeCopyTarget()
+    sink = TickSink(target, auto_start=False)
+    ts = datetime(2026, 3, 2, 14, 30, tzinfo=timezone.utc)
+    sink.add("EURUSD", 1.0851, 0, "INSTITUTIONAL_SIM", ts)
+    sink.add("BTC", 50000.5, 0.25, "BINANCE", ts.isoformat())
+    sink.add_many(["EURUSD", "AAPL"], [1.0852, 189.1], [0.0, 300.0], "POLYGON", [ts.timestamp()] * 2)
+
+    assert sink.flush() == 4
+    assert target.statements == [
+        "COPY price_telemetry (time, symbol, price, volume, source) FROM STDIN WITH (FORMAT binary)"]
+    assert sorted(target.rows, key=lambda r: (r[1], r[4])) == [
+        (to_pg_micros(ts), "AAPL", 189.1, 300.0, "POLYGON"),
+        (to_pg_micros(ts), "BTC", 50000.5, 0.25, "BINANCE"),
+        (to_pg_micros(ts), "EURUSD", 1.0851, 0.0, "INSTITUTIONAL_SIM"),
+        (to_pg_micros(ts), "EURUSD", 1.0852, 0.0, "POLYGON"),
+    ]
+    assert sink.pending == 0
+    assert sink.flush() == 0
+
+
+def test_last_price_map_keeps_newest_tick():
+    sink = TickSink(FakeCopyTarget(), auto_start=False)
+    sink.add("EURUSD", 1.0850, ts=100.0)
+    sink.add("EURUSD", 1.0840, ts=50.0)  # late, out-of-order tick
+    assert sink.last_price("EURUSD") == 1.0850
+    assert sink.last_price("GBPUSD") is None
+
+
+def test_size_trigger_flushes_without_background_thread():
+    target = FakeCopyTarget()
+    sink = TickSink(target, batch_size=3, auto_start=False)
+    sink.add_many(["A", "B"], [1.0, 2.0])
+    assert target.calls == 0
+    sink.add("C", 3.0)
+    assert len(target.rows) == 3 and sink.pending == 0
+
+
+def test_failed_copy_is_retried_then_dropped():
+    target = FakeCopyTarget(failures=2)
+    sink = TickSink(target, max_retries=2, retry_backoff=0.0, auto_start=False)
+    sink.add("A", 1.0)
+    assert sink.flush() == 1
+    stats = sink.get_stats()
+    assert stats["retries"] == 2 and stats["written"] == 1 and stats["dropped"] == 0
+
+    target.failures, target.calls = 10, 0
+    sink.add("A", 2.0)
+    assert sink.flush() == 0
+    assert sink.get_stats()["dropped"] == 1
+
+
+def test_background_flush_and_stop():
+    target = FakeCopyTarget()
+    sink = TickSink(target, batch_size=1000, flush_interval=0.01)
+    sink.add_many([f"SYM{i % 7}" for i in range(2500)], [float(i) for i in range(2500)])
+    sink.stop(timeout=5)
+    assert not sink.running
+    assert len(target.rows) == 2500
+    assert sorted(r[2] for r in target.rows) == [float(i) for i in range(2500)]
+
+
+def test_empty_symbol_is_rejected():
+    sink = TickSink(FakeCopyTarget(), auto_start=False)
+    with pytest.raises(ValueError):
+        sink.add("", 1.0)
@@ -0,0 +1,160 @@
+import asyncio
+import fnmatch
+import json
+import pickle
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from services.system.tiered_cache import TieredCache, dumps, loads
+
+
+class DictRedis:
+    """Just the redis-py calls TieredCache makes, over a dict of bytes."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, px=None):
+        self.data[key] = value
+        return True
+
+    def pttl(self, key):
+        return 60_000
+
+    def delete(self, *keys):
+        return sum(self.data.pop(k, None) is not None for k in keys)
+
+    def scan_iter(self, match="*", count=None):
+        return [k for k in list(self.data) if fnmatch.fnmatchcase(k, match)]
+
+
+def test_serialization_round_trips_numpy_and_falls_back_to_pickle():
+    value = {"w": np.arange(12, dtype=np.float32).reshape(3, 4), "n": np.int64(3), "ts": datetime(2026, 1, 2, tzinfo=timezone.utc)}
+    restored = loads(dumps(value))
+    np.testing.assert_array_equal(restored["w"], value["w"])
+    assert restored["w"].dtype == np.float32 and restored["w"].flags.writeable
+    assert restored["n"] == 3 and restored["ts"] == value["ts"]
+    assert dumps(value)[:1] == b"M"
+    assert dumps({1, 2})[:1] == b"P" and loads(dumps({1, 2})) == {1, 2}
+
+
+def test_l1_is_bounded_by_bytes_and_evicts_lru():
+    cache = TieredCache(max_bytes=3000)
+    for i in range(3):
+        cache.set(f"ns:{i}", b"x" * 900)
+    cache.get("ns:0")  # refresh 0 so 1 is the LRU entry
+    cache.set("ns:3", b"x" * 900)
+    assert cache.get("ns:1") is None and cache.get("ns:0") is not None
+    metrics = cache.get_metrics()
+    assert metrics["l1_bytes"] <= 3000 and metrics["namespaces"]["ns"]["evictions"] == 1
+
+
+def test_l2_hit_promotes_and_legacy_json_still_reads():
+    redis = DictRedis()
+    writer, reader = TieredCache(redis), TieredCache(redis)
+    writer.set("opt:a", {"weights": np.ones(3)})
+    np.testing.assert_array_equal(reader.get("opt:a")["weights"], np.ones(3))
+    reader.get("opt:a")
+    stats = reader.get_metrics()["namespaces"]["opt"]
+    assert (stats["l2_hits"], stats["l1_hits"]) == (1, 1)
+
+    redis.data["opt:legacy"] = json.dumps({"a": 1}).encode()
+    assert reader.get("opt:legacy") == {"a": 1}
+    assert reader.clear_namespace("opt:") == 2 and reader.get("opt:a") is None
+
+
+def test_pickled_values_stay_out_of_redis():
+    redis = DictRedis()
+    writer, reader = TieredCache(redis), TieredCache(redis)
+    writer.set("ns:set", {1, 2})
+    assert writer.get("ns:set") == {1, 2}
+    assert "ns:set" not in redis.data and reader.get("ns:set") is None
+
+    class Boom:
+        def __reduce__(self):
+            return (eval, ("1/0",))
+
+    forged = b"\xc1" + b"\x00" * 8 + b"P" + pickle.dumps(Boom())
+    redis.data["ns:forged"] = forged
+    assert reader.get("ns:forged") is None
+
+
+def test_clear_pattern_matches_globs():
+    redis = DictRedis()
+    cache = TieredCache(redis)
+    for key in ("a:1:b", "a:2:c", "a:3:b", "x:1:b"):
+        cache.set(key, 1)
+    assert cache.clear_pattern("a:*:b") == 2
+    assert [cache.get(k) for k in ("a:1:b", "a:2:c", "a:3:b", "x:1:b")] == [None, 1, None, 1]
+
+
+def test_namespace_ttls_and_expiry():
+    cache = TieredCache(namespace_ttls={"short": (0, 0)})
+    cache.set("short:k", 1)
+    cache.set("long:k", 1)
+    assert cache.get("short:k") is None and cache.get("long:k") == 1
+
+
+def test_concurrent_misses_compute_once():
+    cache = TieredCache()
+    calls = []
+    gate = threading.Event()
+
+    def compute():
+        calls.append(1)
+        gate.wait(1)
+        return 42
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("risk:k", compute))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert results == [42] * 8 and len(calls) == 1
+    assert cache.get_metrics()["namespaces"]["risk"]["coalesced"] == 7
+
+
+def test_stale_value_is_served_while_refreshing():
+    cache = TieredCache()
+    cache.set("cov:k", "old", ttl=0, stale_ttl=60)
+    refreshed = threading.Event()
+
+    def compute():
+        refreshed.set()
+        return "new"
+
+    assert cache.get("cov:k") is None  # plain get never returns stale data
+    assert cache.get_or_compute("cov:k", compute, ttl=60) == "old"
+    assert refreshed.wait(2)
+    for _ in range(100):
+        if cache.get("cov:k") == "new":
+            break
+        time.sleep(0.01)
+    assert cache.get("cov:k") == "new"
+    assert cache.get_metrics()["namespaces"]["cov"]["stale_hits"] == 1
+
+
+def test_async_misses_coalesce():
+    cache = TieredCache()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"x": 1}
+
+    async def run():
+        return await asyncio.gather(*[cache.aget_or_compute("opt:k", compute) for _ in range(5)])
+
+    assert asyncio.run(run()) == [{"x": 1}] * 5
+    assert len(calls) == 1
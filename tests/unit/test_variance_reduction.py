@@ -0,0 +1,130 @@
+"""
+==============================================================================
+Unit Tests - Monte Carlo Variance Reduction
+==============================================================================
+Tests antithetic, moment-matching, control-variate and Sobol/Halton modes
+plus the batch-means standard errors reported with every result.
+==============================================================================
+"""
+import pytest
+import numpy as np
+
+from services.analysis.monte_carlo import MonteCarloEngine, SimulationConfig
+from services.analysis.variance_reduction import (
+    VarianceReduction,
+    brownian_bridge_increments,
+    standard_normals,
+    standard_uniforms,
+)
+from services.simulation.monte_carlo_sim import MonteCarloSimulator
+
+
+class TestShockGenerators:
+    """Test suite for the variance-reduced draw generators."""
+
+    def test_antithetic_pairs_are_mirrored(self) -> None:
+        """Test adjacent rows are exact negatives."""
+        draws = standard_normals(np.random.default_rng(0), VarianceReduction.ANTITHETIC, (9, 4))
+
+        assert draws.shape == (9, 4)
+        np.testing.assert_array_equal(draws[0::2][:4], -draws[1::2])
+
+    def test_moment_matching_fixes_sample_moments(self) -> None:
+        """Test each step has exactly zero mean and unit variance."""
+        draws = standard_normals(np.random.default_rng(0), VarianceReduction.MOMENT_MATCHING, (500, 3))
+
+        np.testing.assert_allclose(draws.mean(axis=0), 0.0, atol=1e-12)
+        np.testing.assert_allclose(draws.std(axis=0), 1.0)
+
+    def test_brownian_bridge_preserves_increment_law(self) -> None:
+        """Test bridge increments stay independent unit-variance normals."""
+        normals = np.random.default_rng(1).standard_normal((40000, 8))
+
+        increments = brownian_bridge_increments(normals)
+
+        np.testing.assert_allclose(np.cov(increments.T), np.eye(8), atol=0.03)
+        np.testing.assert_allclose(increments.sum(axis=1), np.sqrt(8) * normals[:, 0])
+
+    def test_sobol_uniforms_are_balanced(self) -> None:
+        """Test scrambled Sobol points cover each margin evenly."""
+        uniforms = standard_uniforms(np.random.default_rng(2), VarianceReduction.SOBOL, (1024, 5))
+
+        counts = np.histogram(uniforms[:, 0], bins=16, range=(0, 1))[0]
+        assert counts.min() == counts.max() == 64
+
+
+class TestStandardErrors:
+    """Test suite for standard errors reported by MonteCarloEngine."""
+
+    def _run(self, mode: VarianceReduction) -> dict:
+        config = SimulationConfig(n_simulations=8192, random_seed=5, variance_reduction=mode)
+        return MonteCarloEngine(config).run_simulation()
+
+    def test_plain_run_reports_standard_errors(self) -> None:
+        """Test every estimate comes with a finite standard error."""
+        result = self._run(VarianceReduction.NONE)
+
+        assert set(result["standard_errors"]) == set(result["estimates"])
+        assert all(np.isfinite(se) and se > 0 for se in result["standard_errors"].values())
+        assert result["estimates"]["cvar_99"] >= result["estimates"]["var_99"]
+
+    @pytest.mark.parametrize("mode", [VarianceReduction.ANTITHETIC, VarianceReduction.CONTROL_VARIATE])
+    def test_mean_estimators_tighten(self, mode: VarianceReduction) -> None:
+        """Test antithetic and control variates shrink expected-return error."""
+        plain = self._run(VarianceReduction.NONE)["standard_errors"]["expected_return"]
+
+        assert self._run(mode)["standard_errors"]["expected_return"] < plain / 2
+
+    def test_sobol_tightens_tail_estimates(self) -> None:
+        """Test QMC with a Brownian bridge shrinks the CVaR 99% error."""
+        plain = self._run(VarianceReduction.NONE)
+        sobol = self._run(VarianceReduction.SOBOL)
+
+        assert sobol["standard_errors"]["cvar_99"] < plain["standard_errors"]["cvar_99"] / 2
+        assert sobol["estimates"]["cvar_99"] == pytest.approx(plain["estimates"]["cvar_99"], abs=0.02)
+
+    def test_portfolio_result_reports_standard_errors(self) -> None:
+        """Test simulate_portfolio exposes standard errors per metric."""
+        config = SimulationConfig(random_seed=9, n_days=10, variance_reduction=VarianceReduction.HALTON)
+        cov = np.diag([1e-4, 2e-4])
+
+        result = MonteCarloEngine(config).simulate_portfolio(
+            np.array([0.5, 0.5]), np.zeros(2), cov, n_simulations=4096
+        )
+
+        assert "cvar_99" in result.standard_errors
+        assert result.standard_errors["var_95"] > 0
+
+
+class TestBatchTradeSimulation:
+    """Test suite for MonteCarloSimulator.run_batch_simulation."""
+
+    def test_reproducible_with_seed(self) -> None:
+        """Test identical seeds give identical estimates."""
+        kwargs = dict(num_trades=100, n_paths=2000, seed=7)
+
+        first = MonteCarloSimulator.run_batch_simulation(0.5, 1.5, 1.0, **kwargs)
+        second = MonteCarloSimulator.run_batch_simulation(0.5, 1.5, 1.0, **kwargs)
+
+        assert first == second
+        assert 0.0 <= first["ruin_probability"] <= 1.0
+
+    def test_control_variate_tightens_final_equity(self) -> None:
+        """Test the win-count control shrinks the mean equity error."""
+        kwargs = dict(num_trades=200, n_paths=4000, seed=3, risk_per_trade_pct=0.02)
+
+        plain = MonteCarloSimulator.run_batch_simulation(0.45, 1.5, 1.0, **kwargs)
+        controlled = MonteCarloSimulator.run_batch_simulation(
+            0.45, 1.5, 1.0, variance_reduction=VarianceReduction.CONTROL_VARIATE, **kwargs
+        )
+
+        assert controlled["mean_final_equity_se"] < plain["mean_final_equity_se"] / 2
+
+    def test_certain_loss_always_ruins(self) -> None:
+        """Test a zero win rate hits the ruin stop on every path."""
+        result = MonteCarloSimulator.run_batch_simulation(
+            0.0, 1.0, 1.0, risk_per_trade_pct=0.05, num_trades=50, n_paths=100, seed=1
+        )
+
+        assert result["ruin_probability"] == 1.0
+        assert result["mean_final_equity"] <= 50000.0
@@ -0,0 +1,96 @@
+"""
+Unit Tests for the walk-forward SMA optimizer.
+"""
+
+import math
+
+import pytest
+
+pl = pytest.importorskip("polars")
+pytest.importorskip("pyarrow")
+
+from services.backtest import BacktestConfig, get_backtest_engine
+from services.backtest.walk_forward import WalkForwardOptimizer, split_walk_forward
+
+
+GRID = [(5, 20), (10, 40), (15, 60)]
+
+
+@pytest.fixture
+def bars() -> list:
+    price = 100.0
+    rows = []
+    for i in range(1200):
+        price *= 1 + 0.0002 + 0.01 * math.sin(i / 11.0)
+        rows.append({"timestamp": i, "close": price})
+    return rows
+
+
+@pytest.fixture
+def config() -> BacktestConfig:
+    get_backtest_engine().clear_cache()
+    return BacktestConfig("Walk Forward", "WF", "2020-01-01", "2024-01-01")
+
+
+def test_rolling_and_anchored_splits():
+    rolling = split_walk_forward(1000, train_bars=400, test_bars=200)
+    anchored = split_walk_forward(1000, train_bars=400, test_bars=200, anchored=True)
+
+    assert [(f.train_start, f.test_start, f.test_end) for f in rolling] == [
+        (0, 400, 600), (200, 600, 800), (400, 800, 1000)
+    ]
+    assert all(f.train_start == 0 for f in anchored)
+    assert all(f.train_end == f.test_start for f in rolling)
+
+
+def test_split_rejects_non_positive_windows():
+    with pytest.raises(ValueError):
+        split_walk_forward(1000, train_bars=0, test_bars=100)
+
+
+def test_in_process_run_stitches_out_of_sample_curve(bars, config):
+    result = WalkForwardOptimizer(max_workers=1).run(config, bars, GRID, train_bars=600, test_bars=200)
+
+    assert len(result.folds) == 3
+    assert result.oos_equity.height == 600
+    assert result.oos_equity["timestamp"].to_list() == list(range(600, 1200))
+    for fold in result.folds:
+        assert fold.best_params in GRID
+        board = fold.leaderboard["sharpe_ratio"].to_list()
+        assert board == sorted(board, reverse=True)
+
+    final_equity = result.oos_equity["equity"][-1]
+    compounded = math.prod(1 + f.oos_return_pct / 100 for f in result.folds)
+    assert final_equity == pytest.approx(config.initial_capital * compounded)
+
+
+def test_run_requires_enough_history(bars, config):
+    with pytest.raises(ValueError):
+        WalkForwardOptimizer(max_workers=1).run(config, bars[:100], GRID, train_bars=600, test_bars=200)
+
+
+@pytest.mark.slow
+def test_process_pool_matches_in_process(bars, config):
+    inline = WalkForwardOptimizer(max_workers=1).run(config, bars, GRID, train_bars=600, test_bars=200)
+    pooled = WalkForwardOptimizer(max_workers=2, chunk_size=1).run(
+        config, bars, GRID, train_bars=600, test_bars=200
+    )
+
+    assert [f.best_params for f in pooled.folds] == [f.best_params for f in inline.folds]
+    assert pooled.oos_equity["equity"].to_list() == pytest.approx(inline.oos_equity["equity"].to_list())
+
+
+def test_lower_is_better_objectives_rank_ascending(bars, config):
+    result = WalkForwardOptimizer(max_workers=1, objective="max_drawdown_pct").run(
+        config, bars, GRID, train_bars=600, test_bars=200
+    )
+
+    for fold in result.folds:
+        board = fold.leaderboard["max_drawdown_pct"].to_list()
+        assert board == sorted(board)
+        assert fold.best_params == tuple(fold.leaderboard.select("fast_period", "slow_period").row(0))
+
+
+def test_unknown_objective_is_rejected():
+    with pytest.raises(ValueError):
+        WalkForwardOptimizer(objective="drawdown")
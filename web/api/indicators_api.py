@@ -28,6 +28,17 @@ class CalculateRequest(BaseModel):
     period: str = "1M"
 
 
+class IndicatorSpec(BaseModel):
+    id: str
+    params: Dict[str, Any] = {}
+
+
+class BatchCalculateRequest(BaseModel):
+    ticker: str
+    indicators: List[IndicatorSpec]
+    period: str = "1M"
+
+
 class CustomIndicatorRequest(BaseModel):
     name: str
     formula: str
@@ -60,12 +71,31 @@ async def calculate_indicator(
     engine: IndicatorEngine = Depends(get_indicator_engine)
 ):
     """Calculate indicator values for a ticker."""
-    return engine.calculate_indicator(
-        ticker=request.ticker,
-        indicator_id=request.indicator,
-        params=request.params,
-        period=request.period
-    )
+    try:
+        return engine.calculate_indicator(
+            ticker=request.ticker,
+            indicator_id=request.indicator,
+            params=request.params,
+            period=request.period
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/calculate/batch", response_model=Dict[str, Any])
+async def calculate_indicators(
+    request: BatchCalculateRequest,
+    engine: IndicatorEngine = Depends(get_indicator_engine)
+):
+    """Calculate several indicators for a ticker in one pass."""
+    try:
+        return engine.calculate_indicators(
+            ticker=request.ticker,
+            requests=[spec.model_dump() for spec in request.indicators],
+            period=request.period
+        )
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/custom", response_model=Dict[str, Any])